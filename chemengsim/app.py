@@ -5,6 +5,7 @@ Main application module for Chemical Engineering Lab Simulator.
 import streamlit as st
 import platform
 import os
+from chemengsim import registry, timing
 
 # Detect if running on Android or mobile
 is_mobile = False
@@ -28,40 +29,16 @@ def main():
     # Add mode options in sidebar
     view_mode = st.sidebar.radio("Mode", ["Simulation", "Demo Video", "Quiz", "Report Generation", "Chat Assistant"])
     
-    experiment = st.sidebar.selectbox(
-        "Choose an experiment",
-        [
-            "Home",
-            "1. Isothermal Batch Reactor",
-            "2. Isothermal Semi-batch Reactor",
-            "3. Isothermal CSTR",
-            "4. Isothermal PFR",
-            "5. Crushers and Ball Mill",
-            "6. Plate and Frame Filter Press",
-            "7. Rotary Vacuum Filter",
-            "8. Centrifuge and Flotation",
-            "9. Classifiers",
-            "10. Trommel"
-        ]
-    )
+    experiment = st.sidebar.selectbox("Choose an experiment", registry.labels())
+    selected = registry.by_label(experiment)
     
     # Store current experiment in session state for reference by other modules
     st.session_state['selected_experiment'] = experiment
     
-    # Common experiment name mapping
-    exp_names = [
-        "",  # Home page has no number
-        "batch_reactor",
-        "semi_batch_reactor",
-        "cstr",
-        "pfr",
-        "crushers",
-        "filter_press",
-        "rotary_vacuum_filter",
-        "centrifuge_flotation",
-        "classifiers",
-        "trommel"
-    ]
+    # Record hot-path timings for the debug panel (?debug=timing) or the metrics file
+    show_timing = st.query_params.get("debug") == "timing"
+    if show_timing or timing.METRICS_FILE:
+        timing.begin(f"{view_mode}: {experiment}")
     
     # Display the appropriate experiment page based on selection
     if experiment == "Home":
@@ -76,12 +53,9 @@ def main():
             st.info("The chat assistant feature may still be under development.")
     elif view_mode == "Quiz":
         try:
-            # Extract experiment name from selection
-            exp_num = int(experiment.split(".")[0])
-            
             # Import quiz module and run quiz
             from chemengsim.quizzes import quiz_module
-            quiz_module.run_quiz(exp_names[exp_num])
+            quiz_module.run_quiz(selected.quiz_key)
         except Exception as e:
             st.error(f"Error loading quiz: {str(e)}")
             st.info("Some quizzes may still be under development.")
@@ -89,12 +63,9 @@ def main():
         try:
             # Skip if Home is selected
             if experiment != "Home":
-                # Extract experiment name from selection
-                exp_num = int(experiment.split(".")[0])
-                
                 # Import demo video module and display video
                 from chemengsim.videos import demo_videos
-                demo_videos.display_demo_video(exp_names[exp_num])
+                demo_videos.display_demo_video(selected.video_key)
             else:
                 st.title("Demonstration Videos")
                 st.markdown("""
@@ -117,14 +88,11 @@ def main():
             st.info("The report generation feature may still be under development for some experiments.")
     else:  # Simulation mode
         if experiment != "Home":
-            # Extract experiment name from selection for import
-            exp_num = int(experiment.split(".")[0])
-            
             try:
-                # Dynamic import of the experiment module
-                module_name = f"chemengsim.experiments.{exp_names[exp_num]}"
-                module = __import__(module_name, fromlist=['app'])
-                module.app()
+                # Lazy import of the selected experiment module only
+                module = selected.load()
+                with timing.span(f"page.{selected.slug}"):
+                    module.app()
             except Exception as e:
                 st.error(f"Error loading experiment simulation: {str(e)}")
                 st.write(f"## {experiment}")
@@ -225,6 +193,13 @@ def main():
         <p>MADE WITH LOVE FOR CHEMICAL ENGINEERING COMMUNITY ❤️</p>
     </div>
     """, unsafe_allow_html=True)
+    
+    run = timing.end()
+    if run is not None and show_timing:
+        timing.render_panel(run)
+    
+    # Import the other experiment modules in the background once this page is shown
+    registry.prewarm()
 
 def display_home_page():
     """Display the enhanced home page with experiment cards"""
@@ -298,100 +273,17 @@ def display_home_page():
     # Use 1 column for mobile or 2 columns for desktop
     if is_mobile:
         # Mobile layout - single column
-        experiments = [
-            ("1. Isothermal Batch Reactor", "Study of a non-catalytic homogeneous reaction in a batch reactor, including concentration profiles and conversion analysis."),
-            ("2. Isothermal Semi-batch Reactor", "Simulation of reactions in semi-batch mode with continuous addition of one reactant."),
-            ("3. Isothermal CSTR", "Continuous stirred tank reactor simulation with heat transfer analysis."),
-            ("4. Isothermal PFR", "Plug flow reactor with variable parameters and comparison to other reactor types."),
-            ("5. Crushers and Ball Mill", "Size reduction equipment simulation and analysis of product size distribution."),
-            ("6. Plate and Frame Filter Press", "Solid-liquid separation with analysis of filtration rates and cake formation."),
-            ("7. Rotary Vacuum Filter", "Continuous filtration process with drum operation visualization."),
-            ("8. Centrifuge and Flotation", "Solid-liquid separation in basket centrifuge and mineral separation in flotation cells."),
-            ("9. Classifiers", "Particle classification using cone classifiers and thickeners for solid-liquid separation."),
-            ("10. Trommel", "Rotary screen simulation with particle size distribution and efficiency analysis.")
-        ]
-        
-        for title, description in experiments:
-            st.markdown(f"""
-            <div class="experiment-card">
-                <p class="experiment-title">{title}</p>
-                <p>{description}</p>
-            </div>
-            """, unsafe_allow_html=True)
+        columns = [st.container()]
     else:
-        # Desktop layout - two columns
-        col1, col2 = st.columns(2)
-        
-        # Experiments in first column
-        with col1:
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">1. Isothermal Batch Reactor</p>
-                <p>Study of a non-catalytic homogeneous reaction in a batch reactor, including concentration profiles and conversion analysis.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">2. Isothermal Semi-batch Reactor</p>
-                <p>Simulation of reactions in semi-batch mode with continuous addition of one reactant.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">3. Isothermal CSTR</p>
-                <p>Continuous stirred tank reactor simulation with heat transfer analysis.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">4. Isothermal PFR</p>
-                <p>Plug flow reactor with variable parameters and comparison to other reactor types.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">5. Crushers and Ball Mill</p>
-                <p>Size reduction equipment simulation and analysis of product size distribution.</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Experiments in second column
-        with col2:
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">6. Plate and Frame Filter Press</p>
-                <p>Solid-liquid separation with analysis of filtration rates and cake formation.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">7. Rotary Vacuum Filter</p>
-                <p>Continuous filtration process with drum operation visualization.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">8. Centrifuge and Flotation</p>
-                <p>Solid-liquid separation in basket centrifuge and mineral separation in flotation cells.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="experiment-card">
-                <p class="experiment-title">9. Classifiers</p>
-                <p>Particle classification using cone classifiers and thickeners for solid-liquid separation.</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
+        # Desktop layout - two columns, filled top to bottom
+        columns = st.columns(2)
+    
+    per_column = -(-len(registry.EXPERIMENTS) // len(columns))
+    for i, exp in enumerate(registry.EXPERIMENTS):
+        with columns[i // per_column]:
+            st.markdown(f"""
             <div class="experiment-card">
-                <p class="experiment-title">10. Trommel</p>
-                <p>Rotary screen simulation with particle size distribution and efficiency analysis.</p>
+                <p class="experiment-title">{exp.label}</p>
+                <p>{exp.description}</p>
             </div>
             """, unsafe_allow_html=True)
\ No newline at end of file
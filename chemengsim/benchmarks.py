@@ -0,0 +1,477 @@
+"""
+Performance Benchmarks
+======================
+
+Timing suite for the simulator: the compute stage of every experiment at default and
+extreme parameters, figure rendering of every page, DOCX report generation and the
+cold import of ``chemengsim.app``.
+
+Run from the repository root::
+
+    python -m chemengsim.benchmarks run -o baseline.json
+    python -m chemengsim.benchmarks run -o current.json
+    python -m chemengsim.benchmarks compare baseline.json current.json
+
+``compare`` exits with status 1 when a benchmark slowed down by more than the
+threshold, so it can gate CI jobs.
+"""
+
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import importlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import warnings
+from dataclasses import replace
+from unittest import mock
+
+import matplotlib
+import numpy as np
+import scipy
+
+from chemengsim.core import (batch_reactor, crushers, cstr, estimation, feed_optimization, multiplicity,
+                             pfr, rtd, semi_batch_reactor, sweep)
+
+# Parameters at the edges of the sidebar ranges, with fine output grids
+EXTREME_PARAMS = {
+    'batch_reactor': dict(initial_conc_ea=0.02, temperature=60, reaction_time=120, num_points=5000),
+    'jacketed_batch_reactor': dict(initial_conc_naoh=1.0, initial_conc_ea=1.0, initial_temperature=60,
+                                   jacket_temp=25, reaction_time=120, heat_transfer_area=1.0, num_points=2000),
+    'semi_batch_reactor': dict(feed_flow_rate=1.0, feed_conc_ea=0.2, temperature=60, total_time=120,
+                               num_points=2000),
+    'cstr': dict(feed_flow_rate=0.1, reactor_volume=100.0, temperature=60, num_points=2000),
+    'pfr': dict(pfr_type=pfr.COILED_TUBE, feed_flow_rate=0.1, tube_length=20.0, temperature=60,
+                num_points=2000),
+    'crushers': dict(crusher_type=crushers.BALL_MILL, mill_speed_percent=95.0, mill_fill_percent=50.0),
+    'filter_press': dict(filtration_pressure=50.0, slurry_concentration=500.0, max_time=36000.0,
+                         num_points=5000),
+    'rotary_vacuum_filter': dict(drum_speed=0.1, submergence=50.0, num_points=5000),
+    'centrifuge': dict(rotation_speed=3000.0, particle_size=5.0, num_points=5000),
+    'flotation': dict(flotation_time=60.0, num_points=5000),
+    'cone_classifier': dict(feed_rate=100.0, num_points=5000),
+    'thickener': dict(flocculant_dosage=0.0, num_points=5000),
+    'trommel': dict(rotation_speed=40.0, num_points=2000),
+}
+
+# Scenarios in the vectorized batch reactor benchmark
+COHORT_SIZE = 1000
+
+# Curves in the stacked semi-batch sweep benchmark
+STACKED_CURVES = 300
+
+# Feed rates and cooling capacities per axis of the runaway screening benchmark
+RUNAWAY_GRID = 20
+
+# Runs in the kinetic parameter estimation benchmark
+ESTIMATION_RUNS = 60
+
+# Page name -> (experiment module, page function)
+PAGES = {
+    'batch_reactor': ('chemengsim.experiments.batch_reactor', 'app'),
+    'semi_batch_reactor': ('chemengsim.experiments.semi_batch_reactor', 'app'),
+    'cstr': ('chemengsim.experiments.cstr', 'app'),
+    'pfr': ('chemengsim.experiments.pfr', 'app'),
+    'crushers': ('chemengsim.experiments.crushers', 'app'),
+    'filter_press': ('chemengsim.experiments.filter_press', 'app'),
+    'rotary_vacuum_filter': ('chemengsim.experiments.rotary_vacuum_filter', 'app'),
+    'centrifuge': ('chemengsim.experiments.centrifuge_flotation', 'centrifuge_app'),
+    'flotation': ('chemengsim.experiments.centrifuge_flotation', 'flotation_app'),
+    'cone_classifier': ('chemengsim.experiments.classifiers', 'cone_classifier_app'),
+    'thickener': ('chemengsim.experiments.classifiers', 'thickener_app'),
+    'trommel': ('chemengsim.experiments.trommel', 'app'),
+}
+
+DEFAULT_THRESHOLD = 0.2    # relative slowdown flagged as a regression
+DEFAULT_MIN_DELTA = 0.001  # seconds, smaller absolute changes are noise
+
+
+def measure(func, repeat=5):
+    """
+    Times ``func`` like ``timeit``: calls are batched until a batch takes at least 0.2 s.
+
+    Returns:
+    --------
+    dict
+        Per-call ``min``, ``median``, ``mean`` and ``stdev`` (seconds), ``number`` of
+        calls per batch and ``repeat`` batches
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return _summary(times, number)
+
+
+def _summary(times, number):
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'number': number,
+        'repeat': len(times)
+    }
+
+
+@contextlib.contextmanager
+def _headless():
+    """Silence the bare-mode Streamlit warnings and keep matplotlib off-screen"""
+    matplotlib.use('Agg')
+    logging.disable(logging.WARNING)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def compute_benchmarks(repeat):
+    """Yield ``(name, bench)`` for every model at default and extreme parameters, bypassing caches"""
+    for experiment, overrides in EXTREME_PARAMS.items():
+        params_type, simulate = sweep.resolve(experiment)
+        uncached = simulate.__wrapped__
+        for label, params in (('default', params_type()), ('extreme', replace(params_type(), **overrides))):
+            yield ('compute.%s.%s' % (experiment, label),
+                   lambda uncached=uncached, params=params: measure(lambda: uncached(params), repeat))
+
+    # A lab section's worth of batch runs evaluated in one call
+    rng = np.random.default_rng(0)
+    cohort = (rng.uniform(0.001, 1.0, COHORT_SIZE), rng.uniform(0.001, 1.0, COHORT_SIZE),
+              rng.uniform(25, 60, COHORT_SIZE), np.linspace(0, 120, 100))
+    yield ('compute.batch_reactor.cohort',
+           lambda: measure(lambda: batch_reactor.profiles(*cohort), repeat))
+    # A page's worth of semi-batch curves integrated as one stacked system
+    flow_rates = np.linspace(0.01, 1.0, STACKED_CURVES)
+    yield ('compute.semi_batch_reactor.stacked',
+           lambda: measure(lambda: semi_batch_reactor.profiles.__wrapped__(semi_batch_reactor.Params(),
+                                                                            feed_flow_rate=flow_rates), repeat))
+
+    # Feed schedules branching from a shared start-up
+    startup = semi_batch_reactor.FeedSegment(20, 0.3)
+    schedules = tuple((startup, semi_batch_reactor.FeedSegment(100, rate, final_flow_rate=final, max_volume=20))
+                      for rate in (0.0, 0.1, 0.3) for final in (0.0, 0.3))
+    yield ('compute.semi_batch_reactor.schedules',
+           lambda: measure(lambda: semi_batch_reactor.compare_schedules.__wrapped__(
+               semi_batch_reactor.Params(initial_conc_naoh=0.5, feed_conc_ea=1.0, num_points=1000), schedules),
+               repeat))
+
+    # Runaway screening of a feed rate × cooling grid in one stacked solve
+    runaway_params = semi_batch_reactor.Params(initial_conc_naoh=3.0, feed_conc_ea=6.0, temperature=40, total_time=60)
+    yield ('compute.semi_batch_reactor.runaway',
+           lambda: measure(lambda: semi_batch_reactor.screen_runaway.__wrapped__(
+               runaway_params, semi_batch_reactor.RunawayParams(), np.linspace(0.01, 0.3, RUNAWAY_GRID),
+               np.geomspace(0.5, 50, RUNAWAY_GRID)), repeat))
+
+    # Feed profile optimization from every starting profile, serially for stable timings
+    yield ('compute.feed_optimization.optimize',
+           lambda: measure(lambda: feed_optimization.optimize_feed.__wrapped__(
+               semi_batch_reactor.Params(), feed_optimization.OptimizationParams(workers=1)), repeat))
+
+    targets = np.linspace(10, 99, 100)[:, np.newaxis]
+    yield ('compute.batch_reactor.time_to_conversion',
+           lambda: measure(lambda: batch_reactor.time_to_conversion(targets, *cohort[:3]), repeat))
+    yield ('compute.semi_batch_reactor.time_to_conversion',
+           lambda: measure(lambda: semi_batch_reactor.time_to_conversion(
+               targets[::10], semi_batch_reactor.Params(total_time=120), feed_flow_rate=np.linspace(0.02, 0.5, 10)),
+               repeat))
+
+    # CSTR steady states of the cohort's feeds over a range of residence times
+    residence_times = np.linspace(0.1, 100, 100)[:, np.newaxis]
+    yield ('compute.cstr.steady_state_conversion',
+           lambda: measure(lambda: cstr.steady_state_conversion(residence_times, *cohort[:3]), repeat))
+
+    # Non-isothermal CSTR response to a random feed-rate disturbance sampled every minute
+    disturbance_times = np.linspace(0, 200, 201)
+    disturbance = cstr.Signal(tuple(disturbance_times), tuple(2.0 + 0.2 * rng.standard_normal(len(disturbance_times))))
+    yield ('compute.cstr.transient',
+           lambda: measure(lambda: cstr.simulate_transient.__wrapped__(
+               cstr.Params(feed_conc_naoh=0.5, feed_conc_ea=0.5),
+               cstr.TransientParams(duration=200, feed_flow_rate=disturbance, energy_balance=True)), repeat))
+
+    # Ignition and extinction branches of a highly exothermic CSTR over the residence time
+    multiple = cstr.Params(feed_conc_naoh=3.0, feed_conc_ea=3.0)
+    exothermic = multiplicity.ThermalParams(activation_factor=4.5)
+    yield ('compute.multiplicity.continuation',
+           lambda: measure(lambda: multiplicity._trace_branches.__wrapped__(
+               multiple, exothermic, 'residence_time', 0.1, 10.0, 2000), repeat))
+
+    # Dispersed-PFR RTD with a finite tracer pulse, and both models fitted to a class of 400 tracer runs
+    yield ('compute.rtd.simulate',
+           lambda: measure(lambda: rtd.simulate.__wrapped__(
+               rtd.Params(model=rtd.DISPERSION, peclet=2.0, pulse_width=2.0, num_points=65536)), repeat))
+    tracer_runs = rtd.runs_from_dataframe(rtd.example_runs(np.linspace(3, 30, 20), np.linspace(1, 8, 20), seed=1))
+    yield ('compute.rtd.fit_tracer',
+           lambda: measure(lambda: (rtd.fit_tracer(tracer_runs, rtd.TANKS),
+                                    rtd.fit_tracer(tracer_runs, rtd.DISPERSION)), repeat))
+
+    # Compartment model of the non-ideal CSTR fitted to 400 step-tracer runs with a known feed concentration
+    compartment_runs = rtd.runs_from_dataframe(cstr.example_tracer_runs(
+        active_fractions=np.linspace(0.5, 0.95, 20), bypass_fractions=np.linspace(0, 0.3, 20), seed=2))
+    yield ('compute.cstr.fit_compartments',
+           lambda: measure(lambda: cstr.fit_compartments(compartment_runs, 10.0, scale=100.0), repeat))
+
+    # Joint and per-run fits of a lab section's uploaded sheet
+    sheet = estimation.example_runs(temperatures=tuple(np.linspace(20, 50, ESTIMATION_RUNS)))
+    yield ('compute.estimation.fit',
+           lambda: measure(lambda: (estimation.fit_arrhenius(estimation.runs_from_dataframe(sheet)),
+                                    estimation.fit_rate_constants(estimation.runs_from_dataframe(sheet))), repeat))
+
+
+def page_renders(page):
+    """
+    Run a page headlessly and return a function per figure it shows, encoding that figure
+    to PNG (uncached for :func:`chemengsim.figures.image` plots)
+    """
+    from chemengsim import figures
+
+    module_name, function = PAGES[page]
+    renders = []
+
+    def show(fig):
+        renders.append(lambda: figures.encode(fig))
+
+    def image(draw, *args, figsize=(10, 6)):
+        renders.append(lambda: figures.rasterize(draw, *args, figsize=figsize))
+
+    with mock.patch.object(figures, 'show', show), mock.patch.object(figures, 'image', image):
+        getattr(importlib.import_module(module_name), function)()
+    return renders
+
+
+def render_benchmarks(repeat):
+    """Yield ``(name, bench)`` for the PNG encoding of every page's figures"""
+    def bench(page):
+        renders = page_renders(page)
+
+        def render():
+            for render_figure in renders:
+                render_figure()
+
+        return measure(render, repeat)
+
+    for page in PAGES:
+        yield 'render.%s' % page, lambda page=page: bench(page)
+
+
+def report_benchmarks(repeat):
+    """Yield ``(name, bench)`` for building a complete lab report as DOCX bytes"""
+    from chemengsim import figures
+    from chemengsim.core import batch_reactor
+
+    result = batch_reactor.simulate.__wrapped__(batch_reactor.Params())
+    table = result.to_dataframe()
+    # One explicit figure, built outside the timed region and never registered with pyplot
+    with figures.subplots(figsize=(8, 5)) as (fig, ax):
+        ax.plot(result.time_points, result.conc_naoh)
+
+    def build_report():
+        from chemengsim.report_generation.report_generator import ReportGenerator
+
+        generator = ReportGenerator('benchmark', 'Isothermal Batch Reactor')
+        generator.create_new_document()
+        generator.add_title_page({'name': 'Benchmark', 'id': '0000'})
+        generator.add_aim_and_objective('Benchmark aim', ['First objective', 'Second objective'])
+        generator.add_theory(['Theory paragraph'] * 5)
+        generator.add_observation_table(table)
+        generator.add_graph(fig, caption='Concentration profile')
+        generator.add_conclusion('Benchmark conclusion')
+        buffer = io.BytesIO()
+        generator.document.save(buffer)
+        return buffer.getvalue()
+
+    yield 'report.docx', lambda: measure(build_report, repeat)
+
+
+# Benchmark name -> statements timed in a fresh interpreter
+IMPORTS = {
+    'import.chemengsim.app': 'import chemengsim.app',
+    # Everything imported before the first experiment page can paint
+    'import.first_experiment': 'import chemengsim.app; import chemengsim.experiments.batch_reactor',
+}
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); {}; print(time.perf_counter() - start)"
+
+
+def import_benchmarks(repeat):
+    """Yield ``(name, bench)`` for cold imports in a fresh interpreter"""
+    def bench(statement):
+        env = dict(os.environ, PYTHONWARNINGS='ignore')
+        times = []
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(statement)], capture_output=True,
+                                 text=True, check=True, env=env, cwd=os.getcwd())
+            times.append(float(out.stdout.strip().splitlines()[-1]))
+        return _summary(times, 1)
+
+    for name, statement in IMPORTS.items():
+        yield name, lambda statement=statement: bench(statement)
+
+
+# Suite name -> generator of (benchmark name, callable returning its timing)
+SUITES = {
+    'compute': compute_benchmarks,
+    'render': render_benchmarks,
+    'report': report_benchmarks,
+    'import': import_benchmarks,
+}
+
+
+def metadata():
+    """Environment the benchmarks ran in"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def run(suites=tuple(SUITES), pattern='*', repeat=5, progress=None):
+    """
+    Runs the selected benchmark suites.
+
+    Parameters:
+    -----------
+    suites : sequence of str
+        Names from :data:`SUITES`
+    pattern : str
+        Glob matched against benchmark names, e.g. ``'compute.pfr.*'``
+    repeat : int
+        Number of timed batches per benchmark
+    progress : callable, optional
+        Called with ``(name, timing)`` after each benchmark
+
+    Returns:
+    --------
+    dict
+        ``{'meta': ..., 'benchmarks': {name: timing}}``, ready to dump as JSON
+    """
+    results = {}
+    with _headless():
+        for suite in suites:
+            for name, bench in SUITES[suite](repeat):
+                if not fnmatch.fnmatch(name, pattern):
+                    continue
+                try:
+                    timing = results[name] = bench()
+                except ImportError as exc:
+                    # Optional report dependencies (python-docx, docxtpl) may be missing
+                    timing = results[name] = {'skipped': str(exc)}
+                if progress is not None:
+                    progress(name, timing)
+    return {'meta': metadata(), 'benchmarks': results}
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """
+    Compares the median timings of two benchmark runs.
+
+    Parameters:
+    -----------
+    baseline, current : dict
+        Outputs of :func:`run`
+    threshold : float
+        Relative slowdown above which a benchmark is flagged
+    min_delta : float
+        Absolute slowdown (s) below which changes are ignored as noise
+
+    Returns:
+    --------
+    list of dict
+        One row per benchmark present in both runs with ``name``, ``baseline``,
+        ``current``, ``ratio`` and ``status`` (``'regression'``, ``'improvement'`` or ``'ok'``)
+    """
+    rows = []
+    for name, base in baseline['benchmarks'].items():
+        if 'median' not in base or 'median' not in current['benchmarks'].get(name, {}):
+            continue
+        before, after = base['median'], current['benchmarks'][name]['median']
+        ratio = after / before if before > 0 else float('inf')
+        if ratio > 1 + threshold and after - before > min_delta:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold) and before - after > min_delta:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': before, 'current': after, 'ratio': ratio, 'status': status})
+    return rows
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '%.3g %s' % (seconds / scale, unit)
+    return '%.3g ns' % (seconds / 1e-9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m chemengsim.benchmarks', description=__doc__.split('\n\n')[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks and write JSON results')
+    run_parser.add_argument('-o', '--output', help='JSON file to write (default: stdout)')
+    run_parser.add_argument('-s', '--suite', action='append', choices=sorted(SUITES),
+                            help='suite to run (default: all)')
+    run_parser.add_argument('-k', '--pattern', default='*', help='glob selecting benchmark names')
+    run_parser.add_argument('--repeat', type=int, default=5)
+
+    compare_parser = commands.add_parser('compare', help='flag regressions against a baseline run')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='relative slowdown flagged as a regression (default: %(default)s)')
+    compare_parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA,
+                                help='absolute slowdown in seconds ignored as noise (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        def progress(name, timing):
+            if 'skipped' in timing:
+                print('%-45s skipped: %s' % (name, timing['skipped']), file=sys.stderr)
+                return
+            print('%-45s %10s ± %s' % (name, _format_time(timing['median']), _format_time(timing['stdev'])),
+                  file=sys.stderr)
+
+        results = run(args.suite or tuple(SUITES), args.pattern, args.repeat, progress)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.min_delta)
+    for row in rows:
+        print('%-45s %10s -> %10s  x%.2f  %s' % (row['name'], _format_time(row['baseline']),
+                                                 _format_time(row['current']), row['ratio'],
+                                                 row['status'].upper() if row['status'] != 'ok' else ''))
+    regressions = [row for row in rows if row['status'] == 'regression']
+    print('%d benchmarks compared, %d regressions' % (len(rows), len(regressions)), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,6 +6,7 @@ This module provides a chat interface to answer questions about the experiments.
 
 import streamlit as st
 import re
+from chemengsim import registry
 
 def load_experiment_info():
     """
@@ -66,11 +67,7 @@ def load_experiment_info():
     }
     
     # Add generic entries for experiments not specifically defined yet
-    all_experiments = [
-        "batch_reactor", "semi_batch_reactor", "cstr", "pfr", "crushers", 
-        "filter_press", "rotary_vacuum_filter", "centrifuge_flotation", 
-        "classifiers", "trommel"
-    ]
+    all_experiments = [experiment.slug for experiment in registry.EXPERIMENTS]
     
     for exp in all_experiments:
         if exp not in experiment_info:
@@ -179,28 +176,10 @@ def chat_interface():
     
     # If on Home page, show general info about all experiments
     if current_experiment == 'Home':
-        exp_num = None
         current_exp_key = None
     else:
-        # Extract the experiment number and key
-        exp_num = int(current_experiment.split(".")[0])
-        
-        # Common experiment name mapping
-        exp_names = [
-            "",  # Home page has no number
-            "batch_reactor",
-            "semi_batch_reactor",
-            "cstr",
-            "pfr",
-            "crushers",
-            "filter_press",
-            "rotary_vacuum_filter",
-            "centrifuge_flotation",
-            "classifiers",
-            "trommel"
-        ]
-        
-        current_exp_key = exp_names[exp_num]
+        selected = registry.by_label(current_experiment)
+        current_exp_key = selected.slug
     
     # Initialize chat history if it doesn't exist
     if 'chat_history' not in st.session_state:
@@ -0,0 +1,36 @@
+"""
+Simulation Core
+===============
+
+Streamlit-free compute functions for every experiment in the Chemical Engineering Lab Simulator.
+
+Each experiment module exposes a frozen ``Params`` dataclass, a ``Result`` dataclass and a pure
+``simulate(params) -> Result`` function, so models can be run from scripts, sweeps and benchmarks
+without a Streamlit script run. Import the experiment modules directly, e.g.
+``from chemengsim.core import batch_reactor``.
+
+The ``simulate`` functions are memoized by :mod:`chemengsim.core.cache`; call
+``simulate.__wrapped__`` to bypass the cache.
+"""
+
+__all__ = [
+    "cache",
+    "store",
+    "sweep",
+    "kinetics",
+    "reactions",
+    "estimation",
+    "batch_reactor",
+    "semi_batch_reactor",
+    "feed_optimization",
+    "cstr",
+    "multiplicity",
+    "pfr",
+    "rtd",
+    "crushers",
+    "filter_press",
+    "rotary_vacuum_filter",
+    "centrifuge_flotation",
+    "classifiers",
+    "trommel",
+]
@@ -0,0 +1,491 @@
+"""
+Isothermal Batch Reactor Model
+==============================
+
+Second-order saponification of ethyl acetate in a constant-volume batch reactor.
+
+:func:`profiles` evaluates the closed-form solution for whole arrays of scenarios at
+once, e.g. every group of a lab section; :func:`simulate` is the single-run case used by
+the experiment page and also integrates any other :mod:`~chemengsim.core.reactions` network.
+:func:`time_to_conversion` answers the inverse question, how long until a target conversion,
+for arrays of conditions.  :func:`uncertainty` propagates noisy temperature and concentration
+readings to percentile bands of the profiles by Monte Carlo sampling.  :func:`simulate_jacketed`
+drops the isothermal assumption and integrates the energy balance of a jacketed reactor.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from chemengsim.core import kinetics, reactions
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+
+@dataclass(frozen=True)
+class Params:
+    """Operating conditions of the batch reactor"""
+    initial_conc_naoh: float = 0.01   # mol/L
+    initial_conc_ea: float = 0.01     # mol/L
+    temperature: float = 35.0         # °C
+    reaction_time: float = 30.0       # minutes
+    num_points: int = 100
+    network: reactions.Network = reactions.SAPONIFICATION
+    target_conversion: float = 90.0   # % of NaOH, for Result.time_to_target
+
+
+@dataclass(frozen=True)
+class Result:
+    """Concentration profiles computed by :func:`simulate`"""
+    k: float
+    reaction_order: str
+    time_points: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray
+    concentrations: np.ndarray        # every species of the network, shape (n_species, num_points)
+    time_to_target: float             # minutes to the target conversion; inf if never reached
+                                      # (for integrated networks: within the reaction time)
+
+    @timing.timed('tabulate.batch_reactor.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the profiles with the column names used for CSV download"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'NaOH Concentration (mol/L)': self.conc_naoh,
+            'Ethyl Acetate Concentration (mol/L)': self.conc_ea,
+            'Sodium Acetate Concentration (mol/L)': self.conc_products,
+            'Ethanol Concentration (mol/L)': self.conc_products,
+            'Conversion (%)': self.conversion
+        })
+
+
+@dataclass(frozen=True)
+class Profiles:
+    """
+    Concentration profiles of many scenarios computed by :func:`profiles`.
+
+    ``k`` has the broadcast shape S of the scenario arguments; the concentration and
+    conversion arrays have shape S + ``time_points.shape``.
+    """
+    k: np.ndarray
+    time_points: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray
+
+
+@dataclass(frozen=True)
+class TemperatureEffect:
+    """Rate constants over a temperature range and the Arrhenius fit through them"""
+    temperatures: np.ndarray
+    temp_kelvin: np.ndarray
+    k_values: np.ndarray
+    slope: float
+    intercept: float
+
+    @property
+    def activation_energy(self):
+        """Activation energy estimated from the Arrhenius slope (kJ/mol)"""
+        return -self.slope * 8.314 / 1000
+
+
+@dataclass(frozen=True)
+class JacketedParams:
+    """Initial charge, jacket and operating conditions of the non-isothermal batch reactor"""
+    initial_conc_naoh: float = 0.01          # mol/L
+    initial_conc_ea: float = 0.01            # mol/L
+    initial_temperature: float = 35.0        # °C
+    jacket_temp: float = 35.0                # °C
+    reaction_time: float = 30.0              # minutes
+    volume: float = 1.0                      # L
+    overall_heat_transfer: float = 200.0     # W/m²·K
+    heat_transfer_area: float = 0.05         # m²
+    heat_capacity: float = 4184.0            # J/(L·K) (water)
+    num_points: int = 100
+    network: reactions.Network = reactions.SAPONIFICATION
+
+
+@dataclass(frozen=True)
+class JacketedResult:
+    """Temperature, concentration and heat-flow profiles computed by :func:`simulate_jacketed`"""
+    time_points: np.ndarray
+    temperature: np.ndarray            # °C
+    k: np.ndarray                      # L/(mol·min) of the first reaction step
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray
+    concentrations: np.ndarray         # every species of the network, shape (n_species, num_points)
+    heat_generation: np.ndarray        # J/min
+    heat_removal: np.ndarray           # J/min, to the jacket
+    adiabatic_temperature_rise: float  # K
+    max_temperature: float             # °C
+    time_of_max_temperature: float     # minutes
+
+    @timing.timed('tabulate.batch_reactor.JacketedResult.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the profiles with the column names used for CSV download"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'Temperature (°C)': self.temperature,
+            'Rate Constant k (L/mol·min)': self.k,
+            'NaOH Concentration (mol/L)': self.conc_naoh,
+            'Ethyl Acetate Concentration (mol/L)': self.conc_ea,
+            'Products Concentration (mol/L)': self.conc_products,
+            'Conversion (%)': self.conversion,
+            'Heat Generation (J/min)': self.heat_generation,
+            'Heat Removal (J/min)': self.heat_removal
+        })
+
+
+@dataclass(frozen=True)
+class UncertaintyParams:
+    """Measurement noise and sampling settings of :func:`uncertainty`"""
+    temperature_std: float = 1.0      # °C
+    conc_rel_std: float = 2.0         # % of the initial concentrations
+    n_samples: int = 100_000          # upper limit on the number of draws
+    max_evaluations: int = 5_000_000  # draws × time points, bounds the work for fine time grids
+    chunk_size: int = 10_000          # draws evaluated at once
+    num_bins: int = 2000              # histogram bins per time point
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class Uncertainty:
+    """
+    Percentile bands of the profiles computed by :func:`uncertainty`.
+
+    ``conc_naoh`` and ``conversion`` have one row per entry of ``percentiles``.
+    """
+    time_points: np.ndarray
+    percentiles: tuple
+    conc_naoh: np.ndarray
+    conversion: np.ndarray
+    n_samples: int                    # draws evaluated within the work budget
+
+
+class _StreamingPercentiles:
+    """
+    Percentiles of many columns estimated from fixed-range histograms, so samples can be
+    added chunk by chunk without being kept.
+
+    The range of each column is the spread of the first chunk widened by that spread on
+    either side; later values outside it are counted in the edge bins.
+    """
+
+    def __init__(self, first_chunk, num_bins):
+        low, high = first_chunk.min(axis=0), first_chunk.max(axis=0)
+        spread = high - low
+        self.low = low - spread
+        # A column without spread (e.g. t = 0) gets a negligible bin width
+        self.width = np.maximum(3 * spread, 1e-12 * np.maximum(np.abs(low), 1)) / num_bins
+        self.num_bins = num_bins
+        self.counts = np.zeros((first_chunk.shape[1], num_bins), dtype=np.int64)
+        self.offsets = np.arange(first_chunk.shape[1]) * num_bins
+        self.add(first_chunk)
+
+    def add(self, samples):
+        """Count a chunk of samples of shape (n, num_columns)"""
+        bins = np.clip(((samples - self.low) / self.width).astype(np.int64), 0, self.num_bins - 1)
+        self.counts += np.bincount((bins + self.offsets).ravel(),
+                                   minlength=self.counts.size).reshape(self.counts.shape)
+
+    def percentiles(self, q):
+        """Percentiles ``q`` of every column, interpolated linearly within a bin"""
+        cumulative = np.cumsum(self.counts, axis=1)
+        targets = np.multiply.outer(np.asarray(q, dtype=float) / 100, cumulative[:, -1])
+        rows = np.arange(len(cumulative))
+        result = np.empty(targets.shape)
+        for i, target in enumerate(targets):
+            index = np.minimum((cumulative < target[:, np.newaxis]).sum(axis=1), self.num_bins - 1)
+            below = np.where(index > 0, cumulative[rows, index - 1], 0)
+            fraction = (target - below) / np.maximum(self.counts[rows, index], 1)
+            result[i] = self.low + (index + fraction) * self.width
+        return result
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Simulates the batch reactor concentration profiles.
+
+    Parameters:
+    -----------
+    params : Params
+        Reactor operating conditions
+
+    Returns:
+    --------
+    Result
+        Rate constant and concentration/conversion profiles
+    """
+    # Generate time points for the simulation
+    time_points = np.linspace(0, params.reaction_time, params.num_points)
+    network = params.network
+    k = float(network.rate_constants(params.temperature)[0][0])
+
+    if network == reactions.SAPONIFICATION:
+        # Closed-form solution of the single second-order step and its inverse
+        profile = profiles(params.initial_conc_naoh, params.initial_conc_ea, params.temperature, time_points)
+        concentrations = np.stack([profile.conc_naoh, profile.conc_ea, profile.conc_products, profile.conc_products])
+        time_to_target = float(time_to_conversion(params.target_conversion, params.initial_conc_naoh,
+                                                  params.initial_conc_ea, params.temperature))
+    else:
+        # The target crossing is located during the same integration; inf beyond the reaction time
+        naoh = network.index('NaOH')
+        target_conc = params.initial_conc_naoh * (1 - params.target_conversion / 100)
+
+        def target_reached(t, conc):
+            return conc[naoh] - target_conc
+
+        initial_conc = network.vector({'NaOH': params.initial_conc_naoh, 'EtOAc': params.initial_conc_ea})
+        solution = reactions.batch(network, initial_conc, time_points, params.temperature, event=target_reached)
+        concentrations = solution.conc
+        time_to_target = float(solution.t_events[0]) if len(solution.t_events) else np.inf
+    conc_naoh = concentrations[network.index('NaOH')]
+
+    if abs(params.initial_conc_naoh - params.initial_conc_ea) < 1e-6:
+        reaction_order = "Second-order (equal concentrations)"
+    else:
+        reaction_order = "Second-order (different concentrations)"
+
+    return Result(
+        k=k,
+        reaction_order=reaction_order,
+        time_points=time_points,
+        conc_naoh=conc_naoh,
+        conc_ea=concentrations[network.index('EtOAc')],
+        # Products formed from the NaOH consumed
+        conc_products=params.initial_conc_naoh - conc_naoh,
+        conversion=(1 - conc_naoh / params.initial_conc_naoh) * 100,
+        concentrations=concentrations,
+        time_to_target=time_to_target
+    )
+
+
+@memoize
+def simulate_jacketed(params: JacketedParams) -> JacketedResult:
+    """
+    Integrates the material and energy balances of the jacketed batch reactor.
+
+    Parameters:
+    -----------
+    params : JacketedParams
+        Initial charge, jacket and operating conditions
+
+    Returns:
+    --------
+    JacketedResult
+        Temperature, concentration and heat-flow profiles and the temperature peak
+    """
+    network = params.network
+    time_points = np.linspace(0, params.reaction_time, params.num_points)
+    ua = params.overall_heat_transfer * params.heat_transfer_area * 60  # J/(min·K)
+
+    solution = reactions.jacketed_batch(
+        network,
+        network.vector({'NaOH': params.initial_conc_naoh, 'EtOAc': params.initial_conc_ea}),
+        params.initial_temperature,
+        params.volume,
+        params.heat_capacity,
+        ua,
+        params.jacket_temp,
+        time_points
+    )
+    temperature = solution.temperature
+    conc_naoh = solution['NaOH']
+
+    # Heat released by the reactions and removed through the jacket
+    heat_generation = -(network.heats_of_reaction @ network.rates(solution.conc, temperature)) * params.volume
+    heat_removal = ua * (temperature - params.jacket_temp)
+
+    # Peak located by the maximum event, or at one of the ends of a monotonic profile
+    times = np.concatenate([solution.t_events, time_points])
+    peaks = np.concatenate([solution.temperature_events, temperature])
+    peak = int(np.argmax(peaks))
+
+    # Temperature rise if the limiting reactant reacted completely without cooling
+    limiting_conc = min(params.initial_conc_naoh, params.initial_conc_ea)
+    adiabatic_rise = -network.heats_of_reaction[0] * limiting_conc / params.heat_capacity
+
+    return JacketedResult(
+        time_points=time_points,
+        temperature=temperature,
+        k=network.rate_constants(temperature)[0][0],
+        conc_naoh=conc_naoh,
+        conc_ea=solution['EtOAc'],
+        conc_products=params.initial_conc_naoh - conc_naoh,
+        conversion=(1 - conc_naoh / params.initial_conc_naoh) * 100,
+        concentrations=solution.conc,
+        heat_generation=heat_generation,
+        heat_removal=heat_removal,
+        adiabatic_temperature_rise=float(adiabatic_rise),
+        max_temperature=float(peaks[peak]),
+        time_of_max_temperature=float(times[peak])
+    )
+
+
+def profiles(initial_conc_naoh, initial_conc_ea, temperature, time_points) -> Profiles:
+    """
+    Evaluates the concentration profiles of many batch runs in one vectorized call.
+
+    Parameters:
+    -----------
+    initial_conc_naoh : float or numpy.ndarray
+        Initial NaOH concentrations (mol/L)
+    initial_conc_ea : float or numpy.ndarray
+        Initial ethyl acetate concentrations (mol/L)
+    temperature : float or numpy.ndarray
+        Reaction temperatures (°C); broadcast with the concentrations to the scenario shape S
+    time_points : float or numpy.ndarray
+        Times (minutes), appended as the trailing axes of the profiles
+
+    Returns:
+    --------
+    Profiles
+        Rate constants of shape S and profiles of shape S + ``time_points.shape``
+    """
+    C_A0, C_B0, temperature = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in
+                                                    (initial_conc_naoh, initial_conc_ea, temperature)))
+    time_points = np.asarray(time_points, dtype=float)
+    k = kinetics.rate_constant(temperature)
+
+    # Scenario axes first, time axes last
+    expand = (Ellipsis,) + (np.newaxis,) * time_points.ndim
+    C_A0, C_B0 = C_A0[expand], C_B0[expand]
+    conc_naoh = kinetics.second_order_conc(C_A0, C_B0, k[expand], time_points)
+
+    # Calculate concentration of ethyl acetate, products
+    conc_ea = conc_naoh - C_A0 + C_B0
+    conc_products = C_A0 - conc_naoh  # Same for both products
+    conversion = (1 - conc_naoh / C_A0) * 100
+
+    return Profiles(
+        k=k,
+        time_points=time_points,
+        conc_naoh=conc_naoh,
+        conc_ea=conc_ea,
+        conc_products=conc_products,
+        conversion=conversion
+    )
+
+
+def time_to_conversion(target_conversion, initial_conc_naoh, initial_conc_ea, temperature):
+    """
+    Reaction times to reach target NaOH conversions, for many batch runs in one vectorized call.
+
+    Closed-form inverse of :func:`profiles` (no forward simulation), for equal and unequal
+    initial concentrations alike.
+
+    Parameters:
+    -----------
+    target_conversion : float or numpy.ndarray
+        Target NaOH conversions (%)
+    initial_conc_naoh : float or numpy.ndarray
+        Initial NaOH concentrations (mol/L)
+    initial_conc_ea : float or numpy.ndarray
+        Initial ethyl acetate concentrations (mol/L)
+    temperature : float or numpy.ndarray
+        Reaction temperatures (°C)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Times (minutes) of the broadcast shape of the arguments; inf where the target is at
+        or beyond the conversion allowed by the ethyl acetate charge
+    """
+    k = kinetics.rate_constant(np.asarray(temperature, dtype=float))
+    return kinetics.second_order_time(initial_conc_naoh, initial_conc_ea, k, np.divide(target_conversion, 100))
+
+
+def temperature_effect(temperatures=(25, 30, 35, 40, 45, 50)) -> TemperatureEffect:
+    """
+    Evaluates the rate constant over a temperature range for the Arrhenius plot.
+
+    Parameters:
+    -----------
+    temperatures : sequence of float
+        Temperatures (°C)
+
+    Returns:
+    --------
+    TemperatureEffect
+        Rate constants and the linear fit of ln(k) against 1000/T
+    """
+    temperatures = np.asarray(temperatures, dtype=float)
+    temp_kelvin = temperatures + 273.15
+    k_values = kinetics.rate_constant(temperatures)
+
+    # Calculate activation energy from slope
+    slope, intercept = np.polyfit(1000 / temp_kelvin, np.log(k_values), 1)
+
+    return TemperatureEffect(
+        temperatures=temperatures,
+        temp_kelvin=temp_kelvin,
+        k_values=k_values,
+        slope=slope,
+        intercept=intercept
+    )
+
+
+@memoize
+def uncertainty(params: Params, uncertainty_params: UncertaintyParams,
+                percentiles=(5, 50, 95)) -> Uncertainty:
+    """
+    Propagates measurement noise to percentile bands of the batch reactor profiles.
+
+    Temperatures and initial concentrations are drawn from normal distributions around the
+    readings of ``params``.  Draws are evaluated by the closed-form solution in chunks of
+    ``chunk_size`` and reduced to streaming histograms, so memory stays bounded however many
+    samples are taken.  The number of draws is capped so that draws × time points stays within
+    ``max_evaluations``, but never below one chunk; it depends only on the arguments, so the
+    memoized and stored bands are the same whichever process computed them.
+
+    Parameters:
+    -----------
+    params : Params
+        Measured operating conditions
+    uncertainty_params : UncertaintyParams
+        Standard deviations of the readings and sampling settings
+    percentiles : sequence of float
+        Percentiles of the bands
+
+    Returns:
+    --------
+    Uncertainty
+        Bands of the NaOH concentration and conversion, and the number of draws evaluated
+    """
+    time_points = np.linspace(0, params.reaction_time, params.num_points)
+    rng = np.random.default_rng(uncertainty_params.seed)
+    conc_rel_std = uncertainty_params.conc_rel_std / 100
+    conc_naoh = conversion = None
+
+    total = min(uncertainty_params.n_samples,
+                max(uncertainty_params.max_evaluations // params.num_points, uncertainty_params.chunk_size))
+    n_samples = 0
+    while n_samples < total:
+        size = min(uncertainty_params.chunk_size, total - n_samples)
+        temperature = rng.normal(params.temperature, uncertainty_params.temperature_std, size)
+        C_A0, C_B0 = (np.maximum(rng.normal(conc, conc * conc_rel_std, size), 1e-12)[:, np.newaxis]
+                      for conc in (params.initial_conc_naoh, params.initial_conc_ea))
+        k = kinetics.rate_constant(temperature)[:, np.newaxis]
+        conc = kinetics.second_order_conc(C_A0, C_B0, k, time_points)
+        if conc_naoh is None:
+            conc_naoh = _StreamingPercentiles(conc, uncertainty_params.num_bins)
+            conversion = _StreamingPercentiles((1 - conc / C_A0) * 100, uncertainty_params.num_bins)
+        else:
+            conc_naoh.add(conc)
+            conversion.add((1 - conc / C_A0) * 100)
+        n_samples += size
+
+    return Uncertainty(
+        time_points=time_points,
+        percentiles=tuple(percentiles),
+        conc_naoh=conc_naoh.percentiles(percentiles),
+        conversion=conversion.percentiles(percentiles),
+        n_samples=n_samples
+    )
@@ -0,0 +1,256 @@
+"""
+Result Cache
+============
+
+Bounded, parameter-keyed memoization of the experiment models.
+
+Every widget interaction reruns an experiment's ``app()`` script from the top, so the
+model computation is repeated even when only a tab or expander changed.  Functions
+decorated with :func:`memoize` keep their results in a shared :class:`ResultCache`
+keyed by the normalized argument tuple, with least-recently-used eviction, a
+time-to-live and a memory cap.
+
+NumPy arrays reachable from a cached result are made read-only, so a caller cannot
+corrupt the entry returned to the next session.  ``Result.to_dataframe`` builds a new
+DataFrame on every call, so tables derived from a cached result are never shared.
+
+The default limits can be changed with the ``CHEMENGSIM_CACHE_MAX_ENTRIES``,
+``CHEMENGSIM_CACHE_MAX_MB`` and ``CHEMENGSIM_CACHE_TTL`` (seconds) environment
+variables; ``CHEMENGSIM_CACHE_MAX_ENTRIES=0`` disables caching.
+
+Misses fall through to the disk-backed :mod:`chemengsim.core.store` shared by all
+sessions and processes before the model is recomputed.
+"""
+
+import dataclasses
+import functools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from chemengsim import timing
+from chemengsim.core.store import ResultStore
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_MB = 64.0
+DEFAULT_TTL = 3600.0  # seconds
+
+
+def normalize(value):
+    """Hashable, canonical form of a model argument used to build cache keys"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__qualname__,) + tuple(
+            (field.name, normalize(getattr(value, field.name))) for field in dataclasses.fields(value))
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        # 35 and 35.0 come from the same slider, and -0.0 == 0.0
+        value = float(value) + 0.0
+        return int(value) if value.is_integer() else value
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    return value
+
+
+def freeze(value):
+    """Make the arrays reachable from a result read-only, returning the frozen result"""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        for field in dataclasses.fields(value):
+            freeze(getattr(value, field.name))
+    elif isinstance(value, (list, tuple)):
+        frozen = tuple(freeze(item) for item in value)
+        return type(value)(*frozen) if hasattr(value, '_fields') else frozen
+    elif isinstance(value, dict):
+        for item in value.values():
+            freeze(item)
+    return value
+
+
+def size_of(value):
+    """Approximate memory footprint (bytes) of a result"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(size_of(getattr(value, field.name))
+                                          for field in dataclasses.fields(value))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a time-to-live and a memory cap.
+
+    Parameters:
+    -----------
+    max_entries : int
+        Maximum number of cached results; 0 disables caching
+    max_bytes : int
+        Maximum total size of the cached results (bytes)
+    ttl : float or None
+        Seconds after which an entry expires; None keeps entries until evicted
+    clock : callable
+        Time source, ``time.monotonic`` by default
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=int(DEFAULT_MAX_MB * 2**20),
+                 ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, size, expiry)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """Cache configured from the ``CHEMENGSIM_CACHE_*`` environment variables"""
+        ttl = float(os.environ.get('CHEMENGSIM_CACHE_TTL', DEFAULT_TTL))
+        return cls(max_entries=int(os.environ.get('CHEMENGSIM_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+                   max_bytes=int(float(os.environ.get('CHEMENGSIM_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 2**20),
+                   ttl=ttl if ttl > 0 else None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return ``(True, value)`` for a live entry, else ``(False, None)``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        """Store a frozen value, evicting least-recently-used entries to stay within the limits"""
+        value = freeze(value)
+        size = size_of(value)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return value
+        expiry = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expiry)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` on a miss"""
+        hit, value = self.get(key)
+        if hit:
+            return value
+        return self.put(key, compute())
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+default_cache = ResultCache.from_env()
+default_store = ResultStore.from_env()
+
+
+def memoize(func=None, *, cache=None, store=None):
+    """
+    Decorator caching a model function on its normalized arguments.
+
+    The uncached function stays available as ``func.__wrapped__``, the in-memory cache
+    as ``func.cache`` and the shared disk store (None when disabled) as ``func.store``.
+    Can be applied bare (``@memoize``) or with specific backends
+    (``@memoize(cache=..., store=...)``).
+    """
+    if func is None:
+        return functools.partial(memoize, cache=cache, store=store)
+
+    prefix = (func.__module__, func.__qualname__)
+    label = 'compute.%s.%s' % (func.__module__.rsplit('.', 1)[-1], func.__qualname__)
+
+    def evaluate(*args, **kwargs):
+        with timing.span(label + '.model'):
+            return func(*args, **kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with timing.span(label):
+            key = prefix + (normalize(args), normalize(kwargs))
+
+            def compute():
+                if wrapper.store is None:
+                    return evaluate(*args, **kwargs)
+                return wrapper.store.get_or_compute(func, key, lambda: evaluate(*args, **kwargs))
+
+            return wrapper.cache.get_or_compute(key, compute)
+
+    wrapper.cache = default_cache if cache is None else cache
+    wrapper.store = default_store if store is None else store
+    return wrapper
+
+
+def stats():
+    """Counters of the shared default cache"""
+    return default_cache.stats()
+
+
+def clear():
+    """Empty the shared default cache"""
+    default_cache.clear()
+
+
+def store_stats():
+    """Counters of the shared disk store, or None when it is disabled"""
+    return None if default_store is None else default_store.stats()
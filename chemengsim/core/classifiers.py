@@ -0,0 +1,355 @@
+"""
+Classifier and Thickener Models
+===============================
+
+Size classification in a cone classifier and sedimentation in a continuous gravity thickener.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+# Empirical correction of the Stokes cut size, typical for cone classifiers
+NON_IDEAL_FACTOR = 1.2
+
+# Thickener settling assumptions
+THICKENER_VISCOSITY = 0.001  # Pa·s (water at 20°C)
+COMPRESSION_TIME = 20        # minutes, when compression zone begins to dominate
+INITIAL_HEIGHT = 1.0         # m, initial height in the batch settling test
+
+
+@dataclass(frozen=True)
+class ConeClassifierParams:
+    """Geometry, flows and material properties of the cone classifier"""
+    cone_diameter: float = 2.0         # m
+    cone_height: float = 4.0           # m
+    feed_rate: float = 30.0            # m³/h
+    underflow_rate: float = 10.0       # m³/h
+    solid_density: float = 2700.0      # kg/m³
+    fluid_density: float = 1000.0      # kg/m³
+    fluid_viscosity: float = 0.001     # Pa·s
+    pulp_density: float = 20.0         # % solids by weight
+    d_min: float = 10.0                # μm
+    d_max: float = 500.0               # μm
+    num_points: int = 100
+
+
+@dataclass(frozen=True)
+class ConeClassifierResult:
+    """Cut size and size distributions computed by :func:`simulate_cone_classifier`"""
+    cone_volume: float
+    residence_time: float
+    upward_velocity_mps: float
+    cut_size_microns: float
+    actual_cut_size: float
+    imperfection: float
+    d25: float
+    d75: float
+    size_points: np.ndarray
+    cdf_feed: np.ndarray
+    partition_curve: np.ndarray
+    cum_underflow: np.ndarray
+    cum_overflow: np.ndarray
+
+    @timing.timed('tabulate.classifiers.ConeClassifierResult.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the partition curve and cumulative size distributions"""
+        return pd.DataFrame({
+            'Particle Size (μm)': self.size_points,
+            'Feed CDF (%)': self.cdf_feed * 100,
+            'Partition Coefficient': self.partition_curve,
+            'Underflow CDF (%)': self.cum_underflow,
+            'Overflow CDF (%)': self.cum_overflow
+        })
+
+
+@dataclass(frozen=True)
+class FishHook:
+    """Ideal partition curve and the same curve with a fish-hook at fine sizes"""
+    size_points: np.ndarray
+    partition_std: np.ndarray
+    partition_fh: np.ndarray
+
+
+@dataclass(frozen=True)
+class ThickenerParams:
+    """Geometry, flows, material properties and flocculant dosage of the thickener"""
+    thickener_diameter: float = 10.0         # m
+    thickener_height: float = 4.0            # m
+    rake_speed: float = 0.1                  # rpm
+    feed_rate: float = 50.0                  # m³/h
+    feed_solids: float = 10.0                # % by weight
+    overflow_solids: float = 100.0           # ppm
+    underflow_solids_target: float = 50.0    # % by weight
+    solid_density: float = 2700.0            # kg/m³
+    liquid_density: float = 1000.0           # kg/m³
+    particle_size: float = 75.0              # μm
+    flocculant_dosage: float = 50.0          # g/ton
+    num_points: int = 100
+
+
+@dataclass(frozen=True)
+class ThickenerResult:
+    """Capacity, batch settling and concentration profile computed by :func:`simulate_thickener`"""
+    thickener_area: float
+    unit_area_loading: float
+    unit_area_solids_loading: float
+    max_capacity: float
+    settling_velocity_mh: float
+    underflow_rate: float
+    overflow_rate: float
+    residence_time: float
+    compression_time: float
+    settling_times: np.ndarray
+    interface_heights: np.ndarray
+    settling_rates: np.ndarray
+    heights: np.ndarray
+    solids_conc: np.ndarray
+    thickener_height: float
+
+    @property
+    def is_overloaded(self):
+        """Whether the solids loading exceeds the thickener capacity"""
+        return self.unit_area_solids_loading > self.max_capacity
+
+    @timing.timed('tabulate.classifiers.ThickenerResult.batch_dataframe')
+    def batch_dataframe(self):
+        """Tabulate the batch settling test"""
+        return pd.DataFrame({
+            'Time (min)': self.settling_times,
+            'Interface Height (m)': self.interface_heights,
+            'Settling Rate (m/min)': self.settling_rates
+        })
+
+    @timing.timed('tabulate.classifiers.ThickenerResult.continuous_dataframe')
+    def continuous_dataframe(self):
+        """Tabulate the solids concentration profile in continuous operation"""
+        return pd.DataFrame({
+            'Height from Bottom (m)': self.thickener_height - self.heights,
+            'Solids Concentration (%)': self.solids_conc
+        })
+
+
+def cut_size(params: ConeClassifierParams, upward_velocity_mps):
+    """Stokes cut size (μm), before the non-ideal correction, for the given upward velocity (m/s)"""
+    return np.sqrt((18 * params.fluid_viscosity * np.asarray(upward_velocity_mps)) /
+                   (9.81 * (params.solid_density - params.fluid_density))) * 1e6
+
+
+@memoize
+def simulate_cone_classifier(params: ConeClassifierParams) -> ConeClassifierResult:
+    """
+    Computes the cut size, partition curve and product size distributions of a cone classifier.
+
+    Parameters:
+    -----------
+    params : ConeClassifierParams
+        Geometry, flows and material properties
+
+    Returns:
+    --------
+    ConeClassifierResult
+        Cut sizes, imperfection and size distributions
+    """
+    d_min, d_max = params.d_min, params.d_max
+    overflow_rate = params.feed_rate - params.underflow_rate  # m³/h
+
+    # Calculate cone volume and residence time
+    cone_radius = params.cone_diameter / 2
+    cone_volume = (1/3) * np.pi * cone_radius**2 * params.cone_height  # m³
+    residence_time = cone_volume / params.feed_rate  # h
+
+    # Average cross-sectional area of cone = pi * (cone_radius/2)^2
+    average_area = np.pi * (cone_radius/2)**2  # m²
+    upward_velocity_mps = overflow_rate / average_area / 3600  # m/s
+
+    # Theoretical cut size using simplified Stokes' Law, adjusted for non-ideal conditions
+    cut_size_microns = float(cut_size(params, upward_velocity_mps))
+    actual_cut_size = cut_size_microns * NON_IDEAL_FACTOR
+
+    # Higher flow rates tend to have higher imperfection
+    imperfection = 0.2 + 0.3 * (params.feed_rate / 50)
+
+    # Log-normal feed size distribution
+    size_points = np.logspace(np.log10(d_min), np.log10(d_max), params.num_points)
+    geo_mean = np.sqrt(d_min * d_max)
+    geo_std = np.sqrt(d_max / d_min)
+    cdf_feed = 0.5 + 0.5 * np.tanh(np.log(size_points / geo_mean) / np.log(geo_std))
+
+    # S-shaped partition curve ranging from 0 to 1
+    partition_curve = 1 / (1 + (actual_cut_size / size_points)**2)
+
+    # Differential distribution of feed split between underflow and overflow
+    diff_feed = np.zeros_like(size_points)
+    diff_feed[1:] = np.diff(cdf_feed)
+    underflow_dist = diff_feed * partition_curve
+    overflow_dist = diff_feed * (1 - partition_curve)
+
+    # Normalize to ensure mass balance
+    underflow_dist = underflow_dist / np.sum(underflow_dist) * np.sum(diff_feed)
+    overflow_dist = overflow_dist / np.sum(overflow_dist) * np.sum(diff_feed)
+
+    # Cumulative distributions on a 0-100% scale
+    cum_underflow = np.cumsum(underflow_dist)
+    cum_overflow = np.cumsum(overflow_dist)
+
+    return ConeClassifierResult(
+        cone_volume=cone_volume,
+        residence_time=residence_time,
+        upward_velocity_mps=upward_velocity_mps,
+        cut_size_microns=cut_size_microns,
+        actual_cut_size=actual_cut_size,
+        imperfection=imperfection,
+        d25=actual_cut_size * (1 - imperfection),
+        d75=actual_cut_size * (1 + imperfection),
+        size_points=size_points,
+        cdf_feed=cdf_feed,
+        partition_curve=partition_curve,
+        cum_underflow=cum_underflow / cum_underflow[-1] * 100,
+        cum_overflow=cum_overflow / cum_overflow[-1] * 100
+    )
+
+
+def fish_hook(params: ConeClassifierParams, result: ConeClassifierResult, num_points=100) -> FishHook:
+    """Partition curve with a fish-hook upturn at fine particle sizes"""
+    size_points = np.logspace(np.log10(params.d_min/2), np.log10(params.d_max), num_points)
+    partition_std = 1 / (1 + (result.actual_cut_size / size_points)**2)
+
+    # Fish-hook modification for fine particles, capped at 1.0
+    fh_factor = np.exp(-(np.log(size_points) - np.log(result.actual_cut_size/5))**2 / 2) * 0.2
+    return FishHook(
+        size_points=size_points,
+        partition_std=partition_std,
+        partition_fh=np.minimum(partition_std + fh_factor, 1.0)
+    )
+
+
+def upward_velocity_effect(params: ConeClassifierParams, velocities):
+    """Actual cut size (μm) at each upward velocity (m/s)"""
+    return cut_size(params, velocities) * NON_IDEAL_FACTOR
+
+
+def settling_velocity(params: ThickenerParams, flocculant_dosage=None):
+    """
+    Hindered, flocculated settling velocity in the thickener.
+
+    Parameters:
+    -----------
+    params : ThickenerParams
+        Material properties and feed conditions
+    flocculant_dosage : float or numpy.ndarray, optional
+        Dosage (g/ton) overriding ``params.flocculant_dosage``
+
+    Returns:
+    --------
+    float or numpy.ndarray
+        Settling velocity (m/s)
+    """
+    dosage = params.flocculant_dosage if flocculant_dosage is None else np.asarray(flocculant_dosage)
+    particle_diameter = params.particle_size * 1e-6  # μm to m
+
+    # Base settling velocity from Stokes' Law
+    stokes_velocity = 9.81 * (params.solid_density - params.liquid_density) * particle_diameter**2 / (18 * THICKENER_VISCOSITY)  # m/s
+
+    # Hindered settling (Richardson-Zaki equation), v = v_0 * (1 - C)^n with n = 4.65
+    hindered_factor = (1 - params.feed_solids / 100)**4.65
+
+    # Empirical adjustment for flocculation
+    floc_factor = 1 + 2 * (dosage / 100)**0.5
+
+    return stokes_velocity * hindered_factor * floc_factor
+
+
+@memoize
+def simulate_thickener(params: ThickenerParams) -> ThickenerResult:
+    """
+    Computes thickener capacity, a batch settling test and the steady concentration profile.
+
+    Parameters:
+    -----------
+    params : ThickenerParams
+        Geometry, flows, material properties and flocculant dosage
+
+    Returns:
+    --------
+    ThickenerResult
+        Loading, flows, settling curve and solids concentration profile
+    """
+    feed_rate = params.feed_rate
+    thickener_height = params.thickener_height
+
+    thickener_area = np.pi * (params.thickener_diameter / 2)**2  # m²
+    unit_area_loading = feed_rate / thickener_area  # m³/h/m²
+    residence_time = thickener_area * thickener_height / feed_rate  # h
+
+    # Convert concentrations to fractions
+    feed_solids_fraction = params.feed_solids / 100
+    overflow_solids_fraction = params.overflow_solids / 1e6  # ppm to fraction
+    underflow_solids_target_fraction = params.underflow_solids_target / 100
+
+    velocity = float(settling_velocity(params))  # m/s
+
+    # Underflow rate from the solids balance, assuming Qo ≈ Qf as typically Qu << Qf
+    feed_solids_flow = feed_rate * feed_solids_fraction
+    overflow_solids_flow = feed_rate * overflow_solids_fraction
+    underflow_rate = (feed_solids_flow - overflow_solids_flow) / underflow_solids_target_fraction  # m³/h
+
+    # Thickener capacity; typical maximum for gravity thickeners increases with flocculant
+    solids_loading = feed_rate * feed_solids_fraction * params.solid_density  # kg/h
+    unit_area_solids_loading = solids_loading / thickener_area  # kg/h/m²
+    max_capacity = 100 + params.flocculant_dosage  # kg/m²/h
+
+    # Batch settling test: free settling, then asymptotic compression towards the final height
+    settling_times = np.linspace(0, 60, params.num_points)  # minutes
+    settling_rate_initial = velocity * 60  # m/min
+    final_height = INITIAL_HEIGHT * (1 - 0.9*feed_solids_fraction / underflow_solids_target_fraction)
+    free_heights = np.maximum(INITIAL_HEIGHT - settling_rate_initial * settling_times, final_height)
+    compression_height = max(INITIAL_HEIGHT - settling_rate_initial * COMPRESSION_TIME, final_height)
+    interface_heights = np.where(
+        settling_times <= COMPRESSION_TIME,
+        free_heights,
+        final_height + (compression_height - final_height) * np.exp(-(settling_times - COMPRESSION_TIME) / 10)
+    )
+
+    settling_rates = np.zeros_like(settling_times)
+    settling_rates[1:] = (interface_heights[:-1] - interface_heights[1:]) / np.diff(settling_times)  # m/min
+
+    # Concentration increases towards the bottom through the thickener zones
+    heights = np.linspace(0, thickener_height, 20)
+    overflow_pct = overflow_solids_fraction * 100
+    solids_conc = np.select(
+        [heights < 0.1 * thickener_height,
+         heights < 0.3 * thickener_height,
+         heights < 0.7 * thickener_height],
+        [overflow_pct,
+         overflow_pct + (heights - 0.1*thickener_height) / (0.2*thickener_height) * (params.feed_solids - overflow_pct),
+         params.feed_solids + (heights - 0.3*thickener_height) / (0.4*thickener_height) * (params.underflow_solids_target - params.feed_solids)],
+        default=params.underflow_solids_target
+    )
+
+    return ThickenerResult(
+        thickener_area=thickener_area,
+        unit_area_loading=unit_area_loading,
+        unit_area_solids_loading=unit_area_solids_loading,
+        max_capacity=max_capacity,
+        settling_velocity_mh=velocity * 3600,
+        underflow_rate=underflow_rate,
+        overflow_rate=feed_rate - underflow_rate,
+        residence_time=residence_time,
+        compression_time=COMPRESSION_TIME,
+        settling_times=settling_times,
+        interface_heights=interface_heights,
+        settling_rates=settling_rates,
+        heights=heights,
+        solids_conc=solids_conc,
+        thickener_height=thickener_height
+    )
+
+
+def flocculant_effect(params: ThickenerParams, dosages):
+    """Settling velocity (m/h) at each flocculant dosage (g/ton)"""
+    return settling_velocity(params, flocculant_dosage=dosages) * 3600
@@ -0,0 +1,816 @@
+"""
+Isothermal CSTR Model
+=====================
+
+Steady-state operation and heat balance of a continuous stirred tank reactor for the
+saponification of ethyl acetate.  The steady state of the single second-order step is the
+closed-form root of its design equation, which :func:`steady_state_conversion` evaluates for
+whole arrays of residence times, feeds and temperatures; any other
+:mod:`~chemengsim.core.reactions` network is solved by Newton iterations with its analytic
+Jacobian.
+
+:func:`simulate_transient` integrates the unsteady material (and optionally energy) balances
+for start-up, step changes and disturbances of the inputs, given as :class:`Signal` objects,
+and samples the solution at display resolution from its dense output.
+
+A real tank is not perfectly mixed.  The compartment model splits it into a well-mixed
+active zone, a dead zone that exchanges fluid with it and a bypass of part of the feed
+straight to the outlet.  Its tracer balances are linear, so :func:`compartment_response`
+solves them by closed-form matrix exponentials for whole batches of parameter sets at once,
+:func:`fit_compartments` fits the three parameters to the tracer runs of a sheet, and
+:func:`compartment_conversion` gives the conversion of the non-ideal tank.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from chemengsim.core import kinetics, reactions, rtd
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+# Saponification heat of reaction (approximation)
+HEAT_OF_REACTION = kinetics.HEAT_OF_REACTION  # J/mol (exothermic)
+
+# Largest exchange flow of a fitted dead zone relative to the feed flow; a zone exchanging
+# faster is mixed, and a tiny active zone feeding it fits the same tracer curve
+MAX_EXCHANGE_RATIO = 1.0
+
+
+@dataclass(frozen=True)
+class Params:
+    """Feed, reactor and heat-exchange parameters of the CSTR"""
+    feed_flow_rate: float = 2.0              # L/min
+    feed_conc_naoh: float = 0.01             # mol/L
+    feed_conc_ea: float = 0.01               # mol/L
+    reactor_volume: float = 20.0             # L
+    temperature: float = 35.0                # °C
+    coolant_temp: float = 25.0               # °C
+    overall_heat_transfer: float = 200.0     # W/m²·K
+    heat_transfer_area: float = 1.0          # m² (jacket or coil)
+    num_points: int = 100
+    network: reactions.Network = reactions.SAPONIFICATION
+
+
+@dataclass(frozen=True)
+class Signal:
+    """
+    Time course of a CSTR input, linear between tabulated points and constant beyond them.
+
+    A time listed twice is a step from the first of its values to the second, so steps,
+    pulses, ramps and sampled (e.g. noisy or measured) signals are all one type.
+    """
+    times: tuple      # minutes, nondecreasing
+    values: tuple
+
+    def __post_init__(self):
+        times = np.asarray(self.times, dtype=float)
+        if len(times) == 0 or len(times) != len(self.values):
+            raise ValueError("a signal needs the same, nonzero number of times and values")
+        if np.any(np.diff(times) < 0) or np.any((times[2:] == times[1:-1]) & (times[1:-1] == times[:-2])):
+            raise ValueError("signal times must be nondecreasing, with at most two equal times per step")
+
+    @classmethod
+    def constant(cls, value):
+        return cls((0.0,), (float(value),))
+
+    @classmethod
+    def step(cls, before, after, time):
+        return cls((float(time), float(time)), (float(before), float(after)))
+
+    @classmethod
+    def pulse(cls, base, height, start, duration):
+        """Rectangular pulse of ``height`` above ``base`` from ``start`` for ``duration``"""
+        top = float(base) + float(height)
+        return cls((float(start), float(start), float(start) + duration, float(start) + duration),
+                   (float(base), top, top, float(base)))
+
+    @classmethod
+    def ramp(cls, before, after, start, end):
+        return cls((float(start), float(end)), (float(before), float(after)))
+
+    @classmethod
+    def sine(cls, base, amplitude, period, start, end, points_per_period=200):
+        """Sinusoid between ``start`` and ``end``, tabulated finely enough to look smooth"""
+        times = np.linspace(start, end, max(int(np.ceil((end - start) / period * points_per_period)), 1) + 1)
+        return cls(tuple(times), tuple(base + amplitude * np.sin(2 * np.pi * (times - start) / period)))
+
+    @property
+    def steps(self):
+        """Times at which the signal jumps"""
+        times = np.asarray(self.times, dtype=float)
+        return times[1:][times[1:] == times[:-1]]
+
+    def __call__(self, t):
+        """Values at the times ``t``, taking the value after a step at the step itself"""
+        times, values = np.asarray(self.times, dtype=float), np.asarray(self.values, dtype=float)
+        t = np.asarray(t, dtype=float)
+        # Interpolate on the segment that starts at or before t, so a step takes its new value
+        start = np.clip(np.searchsorted(times, t, side='right') - 1, 0, len(times) - 1)
+        stop = np.minimum(start + 1, len(times) - 1)
+        span = times[stop] - times[start]
+        fraction = np.clip(np.divide(t - times[start], span, out=np.zeros(t.shape), where=span > 0), 0, 1)
+        return values[start] + fraction * (values[stop] - values[start])
+
+    def knots(self, start, stop):
+        """Knots of the continuous piece of the signal between two consecutive steps"""
+        times, values = np.asarray(self.times, dtype=float), np.asarray(self.values, dtype=float)
+        inside = (times > start) & (times < stop)
+        # The value just after the step at ``start`` and just before the one at ``stop``
+        before_stop = np.searchsorted(times, stop, side='left')
+        last = np.interp(stop, times[:before_stop + 1], values[:before_stop + 1])
+        return np.concatenate([[start], times[inside], [stop]]), np.concatenate([[self(start)], values[inside], [last]])
+
+
+@dataclass(frozen=True)
+class TransientParams:
+    """Initial state, input signals and output resolution of :func:`simulate_transient`"""
+    duration: float = 60.0                      # minutes
+    startup: bool = False                       # start full of water instead of at steady state
+    initial_perturbation: float = 0.0           # % change of the initial NaOH concentration
+    feed_flow_rate: Optional[Signal] = None     # L/min; None holds the value of Params
+    feed_conc_naoh: Optional[Signal] = None     # mol/L
+    feed_conc_ea: Optional[Signal] = None       # mol/L
+    energy_balance: bool = False                # integrate the reactor temperature
+    feed_temp: Optional[Signal] = None          # °C; the reaction temperature by default
+    coolant_temp: Optional[Signal] = None       # °C; the value of Params by default
+    heat_capacity: float = 4184.0               # J/(L·K) (water)
+    num_points: int = 500                       # output points
+    rtol: float = 1e-6                          # integration tolerances; tabulated signals have
+    atol: float = 1e-10                         # kinks that tight tolerances resolve step by step
+
+
+@dataclass(frozen=True)
+class Transient:
+    """Input and response profiles computed by :func:`simulate_transient`"""
+    time_points: np.ndarray
+    feed_flow_rate: np.ndarray
+    feed_conc_naoh: np.ndarray
+    feed_conc_ea: np.ndarray
+    coolant_temp: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray             # % of the NaOH fed into the tank that has reacted
+    temperature: np.ndarray            # °C
+    concentrations: np.ndarray         # every species of the network, shape (n_species, num_points)
+    steps: int                         # integrator steps over all pieces
+
+    @timing.timed('tabulate.cstr.Transient.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the inputs and the response"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'Feed Flow Rate (L/min)': self.feed_flow_rate,
+            'Feed NaOH (mol/L)': self.feed_conc_naoh,
+            'Feed Ethyl Acetate (mol/L)': self.feed_conc_ea,
+            'Coolant Temperature (°C)': self.coolant_temp,
+            'NaOH Concentration (mol/L)': self.conc_naoh,
+            'Ethyl Acetate Concentration (mol/L)': self.conc_ea,
+            'Products Concentration (mol/L)': self.conc_products,
+            'Conversion (%)': self.conversion,
+            'Temperature (°C)': self.temperature
+        })
+
+
+@dataclass(frozen=True)
+class Result:
+    """Steady-state, heat balance and residence-time results computed by :func:`simulate`"""
+    k: float
+    residence_time: float
+    conversion: float
+    exit_conc_naoh: float
+    exit_conc_ea: float
+    exit_conc_products: float
+    heat_of_reaction: float
+    heat_generation: float
+    heat_transfer: float
+    operating_time: np.ndarray
+    transient_conc_naoh: np.ndarray
+    transient_conversion: np.ndarray
+    residence_times: np.ndarray
+    conversions: np.ndarray
+    exit_naoh: np.ndarray
+    exit_ea: np.ndarray
+    exit_products: np.ndarray
+    exit_concentrations: np.ndarray          # every species of the network at steady state
+
+    @property
+    def heat_balance(self):
+        """Net heat accumulation rate (J/min)"""
+        return self.heat_generation - self.heat_transfer
+
+    @timing.timed('tabulate.cstr.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the transient response"""
+        return pd.DataFrame({
+            'Time (minutes)': self.operating_time,
+            'NaOH Concentration (mol/L)': self.transient_conc_naoh,
+            'Conversion (%)': self.transient_conversion
+        })
+
+
+@dataclass(frozen=True)
+class CompartmentParams:
+    """Active zone, dead zone and bypass of a non-ideal CSTR"""
+    active_fraction: float = 0.8     # of the reactor volume that is well mixed
+    bypass_fraction: float = 0.1     # of the feed that flows straight to the outlet
+    exchange_ratio: float = 0.0      # flow between the active and the dead zone / feed flow
+    num_points: int = 500
+
+
+@dataclass(frozen=True)
+class Compartments:
+    """Tracer response and conversion of the compartment model computed by :func:`simulate_compartments`"""
+    time_points: np.ndarray
+    exit_age: np.ndarray               # E(t) (1/min) without the bypass spike of area bypass_fraction at t = 0
+    cumulative: np.ndarray             # F(t), starting at bypass_fraction
+    ideal_exit_age: np.ndarray         # E(t) of the ideal CSTR (1/min)
+    ideal_cumulative: np.ndarray
+    mean_residence_time: float         # minutes, of the fluid reaching the outlet
+    conversion: float                  # %
+    ideal_conversion: float            # %
+    active_conc_naoh: float            # mol/L
+    dead_conc_naoh: float              # mol/L
+    exit_conc_naoh: float              # mol/L
+
+    @timing.timed('tabulate.cstr.Compartments.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the tracer response of the compartment model and of the ideal CSTR"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'E(t) (1/min)': self.exit_age,
+            'F(t)': self.cumulative,
+            'Ideal CSTR E(t) (1/min)': self.ideal_exit_age,
+            'Ideal CSTR F(t)': self.ideal_cumulative
+        })
+
+
+@dataclass(frozen=True)
+class CompartmentFit:
+    """Compartment model fitted to every run of a tracer sheet by :func:`fit_compartments`"""
+    labels: tuple
+    injection: str
+    residence_time: np.ndarray         # nominal τ = V/Q (minutes)
+    active_fraction: np.ndarray
+    bypass_fraction: np.ndarray        # zero when it cannot be identified
+    exchange_ratio: np.ndarray         # at most MAX_EXCHANGE_RATIO
+    active_fraction_stderr: np.ndarray
+    bypass_fraction_stderr: np.ndarray
+    exchange_ratio_stderr: np.ndarray
+    residual_std: np.ndarray           # of the normalized curve, E (1/min) or F
+    converged: np.ndarray
+    iterations: int
+
+    def curves(self, times):
+        """Fitted E(t) (pulse) or F(t) (step) of every run, at times shared by all runs or per run"""
+        times = np.atleast_2d(np.asarray(times, dtype=float))
+        exit_age, cumulative = compartment_response(times, self.residence_time[:, None],
+                                                    self.active_fraction[:, None], self.bypass_fraction[:, None],
+                                                    self.exchange_ratio[:, None])
+        return exit_age if self.injection == rtd.PULSE else cumulative
+
+    def conversions(self, params):
+        """Ideal and compartment-model NaOH conversions (%) of every run at the feed and temperature of ``params``"""
+        ideal = steady_state_conversion(self.residence_time, params.feed_conc_naoh, params.feed_conc_ea,
+                                        params.temperature)
+        non_ideal = compartment_conversion(self.residence_time, self.active_fraction, self.bypass_fraction,
+                                           self.exchange_ratio, params.feed_conc_naoh, params.feed_conc_ea,
+                                           params.temperature)[0]
+        return ideal * 100, non_ideal * 100
+
+    def to_dataframe(self):
+        """Tabulate the estimates of every run with their standard errors"""
+        return pd.DataFrame({
+            rtd.RUN: list(self.labels),
+            'Active Volume Fraction': self.active_fraction,
+            'Active Std. Error': self.active_fraction_stderr,
+            'Bypass Fraction': self.bypass_fraction,
+            'Bypass Std. Error': self.bypass_fraction_stderr,
+            'Exchange Flow Ratio': self.exchange_ratio,
+            'Exchange Std. Error': self.exchange_ratio_stderr,
+            'Residual Std.': self.residual_std,
+            'Converged': self.converged
+        })
+
+
+def steady_state_conversion(residence_time, feed_conc_naoh, feed_conc_ea, temperature):
+    """
+    Steady-state NaOH conversions of many CSTR operating points in one vectorized call.
+
+    Solves the second-order design equation exactly in closed form (see
+    :func:`~chemengsim.core.kinetics.second_order_cstr_conversion`), for equal and unequal
+    feed concentrations alike.
+
+    Parameters:
+    -----------
+    residence_time : float or numpy.ndarray
+        Residence times (minutes)
+    feed_conc_naoh : float or numpy.ndarray
+        NaOH concentrations in the feed (mol/L)
+    feed_conc_ea : float or numpy.ndarray
+        Ethyl acetate concentrations in the feed (mol/L)
+    temperature : float or numpy.ndarray
+        Reaction temperatures (°C)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Fractional conversions of NaOH of the broadcast shape of the arguments
+    """
+    k = kinetics.rate_constant(np.asarray(temperature, dtype=float))
+    return kinetics.second_order_cstr_conversion(feed_conc_naoh, feed_conc_ea, k, residence_time)
+
+
+@memoize
+def simulate_transient(params: Params, transient: TransientParams) -> Transient:
+    """
+    Integrates the unsteady CSTR balances under time-varying inputs.
+
+    The reactor starts at the steady state of the inputs at t = 0 (optionally with its NaOH
+    concentration perturbed) or, for start-up, full of water.  The integration is split at
+    the steps of the input signals, each piece continuing from the end state and step size
+    of the previous one, and the dense output of every piece is sampled at ``num_points``
+    output times however finely the signals are tabulated.  The conversion refers to the
+    NaOH fed into the tank, traced by an inert copy of it, so it is meaningful during
+    start-up as well.
+
+    Parameters:
+    -----------
+    params : Params
+        Reactor volume, reaction and coolant temperatures, heat exchange and the constant
+        inputs not overridden by signals
+    transient : TransientParams
+        Initial state, input signals, energy balance switch and output resolution
+
+    Returns:
+    --------
+    Transient
+        Sampled inputs, concentrations, conversion and temperature
+    """
+    base = params.network
+    # NaOH fed into the tank, traced as an inert species appended to the network
+    network = reactions.Network(species=base.species + ('NaOH fed',), reactions=base.reactions)
+    n_species = len(network.species)
+    naoh, ea, fed = network.index('NaOH'), network.index('EtOAc'), n_species - 1
+    unit_naoh, unit_ea = network.vector({'NaOH': 1.0, 'NaOH fed': 1.0}), network.vector({'EtOAc': 1.0})
+    signals = (transient.feed_flow_rate or Signal.constant(params.feed_flow_rate),
+               transient.feed_conc_naoh or Signal.constant(params.feed_conc_naoh),
+               transient.feed_conc_ea or Signal.constant(params.feed_conc_ea),
+               transient.feed_temp or Signal.constant(params.temperature),
+               transient.coolant_temp or Signal.constant(params.coolant_temp))
+
+    flow_rate, conc_naoh, conc_ea = (float(signal(0.0)) for signal in signals[:3])
+    if transient.startup:
+        y = np.zeros(n_species)
+    else:
+        y = reactions.stirred_tank(network, unit_naoh * conc_naoh + unit_ea * conc_ea,
+                                   params.reactor_volume / flow_rate, params.temperature)
+        y[naoh] *= 1 + transient.initial_perturbation / 100
+    heat_capacity = transient.heat_capacity if transient.energy_balance else None
+    if heat_capacity is not None:
+        y = np.append(y, params.temperature)
+    ua = params.overall_heat_transfer * params.heat_transfer_area * 60  # J/(min·K)
+
+    steps = sorted({float(t) for signal in signals for t in signal.steps if 0 < t < transient.duration})
+    bounds = [0.0] + steps + [float(transient.duration)]
+    pieces, step, n_steps = [], None, 0
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        # All inputs tabulated on the union of their knots, so one lookup serves every input
+        knots = [signal.knots(start, stop) for signal in signals]
+        grid = np.unique(np.concatenate([times for times, _ in knots]))
+        table = np.array([np.interp(grid, *knot) for knot in knots])
+        slopes = np.diff(table, axis=1) / np.diff(grid)
+
+        def inputs(t, grid=grid, table=table, slopes=slopes):
+            i = min(max(grid.searchsorted(t, side='right') - 1, 0), len(grid) - 2)
+            flow_rate, conc_naoh, conc_ea, feed_temp, coolant_temp = table[:, i] + slopes[:, i] * (t - grid[i])
+            return flow_rate, unit_naoh * conc_naoh + unit_ea * conc_ea, feed_temp, coolant_temp
+
+        solution = reactions.stirred_tank_transient(
+            network,
+            y[:n_species],
+            params.reactor_volume,
+            (start, stop),
+            inputs,
+            params.temperature if heat_capacity is None else y[n_species],
+            heat_capacity=heat_capacity,
+            ua=ua,
+            first_step=None if step is None else min(step, stop - start),
+            rtol=transient.rtol,
+            atol=transient.atol
+        )
+        y = solution.y[:, -1]
+        if len(solution.t) > 2:
+            step = solution.t[-2] - solution.t[-3]
+        n_steps += len(solution.t) - 1
+        pieces.append((start, stop, solution.sol))
+
+    # Dense output of each piece at the output times inside it
+    time_points = np.linspace(0, transient.duration, transient.num_points)
+    states = np.empty((len(y), len(time_points)))
+    for start, stop, sol in pieces:
+        inside = (time_points >= start) & (time_points <= stop)
+        states[:, inside] = sol(time_points[inside])
+    concentrations = np.maximum(states[:n_species], 0)
+    temperature = states[n_species] if heat_capacity is not None else np.full(len(time_points), params.temperature)
+    reacted = concentrations[fed] - concentrations[naoh]
+    conversion = 100 * np.divide(reacted, concentrations[fed], out=np.zeros(len(time_points)),
+                                 where=concentrations[fed] > 0)
+    feed_flow_rate, feed_conc_naoh, feed_conc_ea, _, coolant_temp = (signal(time_points) for signal in signals)
+
+    return Transient(
+        time_points=time_points,
+        feed_flow_rate=feed_flow_rate,
+        feed_conc_naoh=feed_conc_naoh,
+        feed_conc_ea=feed_conc_ea,
+        coolant_temp=coolant_temp,
+        conc_naoh=concentrations[naoh],
+        conc_ea=concentrations[ea],
+        conc_products=reacted,
+        conversion=conversion,
+        temperature=temperature,
+        concentrations=concentrations[:fed],
+        steps=n_steps
+    )
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Computes the CSTR steady state, heat balance and residence-time curves.
+
+    Parameters:
+    -----------
+    params : Params
+        Feed, reactor and heat-exchange parameters
+
+    Returns:
+    --------
+    Result
+        Steady-state operating point and derived profiles
+    """
+    feed_conc_naoh = params.feed_conc_naoh
+    feed_conc_ea = params.feed_conc_ea
+
+    residence_time = params.reactor_volume / params.feed_flow_rate  # minutes
+    network = params.network
+    k = float(network.rate_constants(params.temperature)[0][0])
+
+    # Exit concentrations at the residence times of the curves and, last, at the operating point
+    residence_times = np.linspace(0.1, residence_time*2, params.num_points)
+    all_residence_times = np.append(residence_times, residence_time)
+    if network == reactions.SAPONIFICATION:
+        # Closed-form root of the second-order design equation
+        X = steady_state_conversion(all_residence_times, feed_conc_naoh, feed_conc_ea, params.temperature)
+        concentrations = np.stack([feed_conc_naoh * (1 - X), feed_conc_ea - feed_conc_naoh * X,
+                                   feed_conc_naoh * X, feed_conc_naoh * X])
+    else:
+        feed_conc = network.vector({'NaOH': feed_conc_naoh, 'EtOAc': feed_conc_ea})
+        concentrations = reactions.stirred_tank(network, feed_conc, all_residence_times, params.temperature)
+    exit_naoh = concentrations[network.index('NaOH')]
+    exit_ea = concentrations[network.index('EtOAc')]
+    X = 1 - exit_naoh / feed_conc_naoh
+
+    exit_concentrations = concentrations[:, -1]
+    exit_conc_naoh = float(exit_naoh[-1])
+    exit_conc_ea = float(exit_ea[-1])
+    X_solution = float(X[-1])
+    exit_conc_products = feed_conc_naoh * X_solution
+
+    # Rate of heat generation and removal
+    heat_generation = -HEAT_OF_REACTION * feed_conc_naoh * params.feed_flow_rate * X_solution  # J/min
+    ua = params.overall_heat_transfer * params.heat_transfer_area * 60  # J/(min·K)
+    heat_transfer = ua * (params.temperature - params.coolant_temp)  # J/min
+
+    # Recovery from a 10% perturbation of the NaOH concentration over five residence times
+    recovery = simulate_transient(params, TransientParams(duration=5 * residence_time, initial_perturbation=10.0,
+                                                          num_points=params.num_points))
+
+    return Result(
+        k=k,
+        residence_time=residence_time,
+        conversion=X_solution,
+        exit_conc_naoh=exit_conc_naoh,
+        exit_conc_ea=exit_conc_ea,
+        exit_conc_products=exit_conc_products,
+        heat_of_reaction=HEAT_OF_REACTION,
+        heat_generation=heat_generation,
+        heat_transfer=heat_transfer,
+        operating_time=recovery.time_points,
+        transient_conc_naoh=recovery.conc_naoh,
+        transient_conversion=(feed_conc_naoh - recovery.conc_naoh) / feed_conc_naoh * 100,
+        residence_times=residence_times,
+        conversions=X[:-1] * 100,
+        exit_naoh=exit_naoh[:-1],
+        exit_ea=exit_ea[:-1],
+        exit_products=feed_conc_naoh * X[:-1],
+        exit_concentrations=exit_concentrations
+    )
+
+
+def _compartment_modes(residence_time, active_fraction, bypass_fraction, exchange_ratio):
+    """
+    Eigenvalues λᵢ of the zone balance matrix A and the weights of e^(λᵢ·t) in the active
+    zone's impulse response, both of shape (..., 2)
+    """
+    tau, active, bypass, exchange = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (
+        residence_time, active_fraction, bypass_fraction, exchange_ratio)))
+    # Without exchange the dead zone is cut off, whatever its volume
+    dead = np.maximum(1 - active, 1e-12)
+    a11 = -(1 - bypass + exchange) / (active * tau)
+    a22 = -exchange / (dead * tau)
+    coupling = exchange**2 / (active * dead * tau**2)    # a12·a21
+    # The off-diagonal entries have the same sign, so the eigenvalues are real and distinct
+    mean, half_gap = (a11 + a22) / 2, np.sqrt(((a11 - a22) / 2)**2 + coupling)
+    eigenvalues = np.stack([mean + half_gap, mean - half_gap], axis=-1)
+    inflow = (1 - bypass) / (active * tau)
+    # Sylvester's formula: expm(A·t) = Σ e^(λᵢ·t)·(A - λⱼ·I)/(λᵢ - λⱼ); its (0, 0) entry times the inflow
+    weights = inflow[..., None] * (a11[..., None] - eigenvalues[..., ::-1]) / (
+        np.stack([2 * half_gap, -2 * half_gap], axis=-1))
+    return eigenvalues, weights
+
+
+def compartment_response(times, residence_time, active_fraction, bypass_fraction, exchange_ratio):
+    """
+    Tracer response of the compartment model for whole batches of parameter sets.
+
+    With the active zone of volume αV fed by (1 - β)·Q and exchanging ε·Q with the dead zone
+    of volume (1 - α)·V, the zone concentrations x obey dx/dt = A·x + b·C_in.  The matrix
+    exponential of the 2×2 matrix A is evaluated in closed form from its eigenvalues by
+    Sylvester's formula, so the impulse response expm(A·t)·b and the step response
+    ∫₀ᵗ expm(A·s) ds·b cost a few array operations for any number of parameter sets and
+    times, also where A is singular (no exchange).
+
+    Parameters:
+    -----------
+    times : float or numpy.ndarray
+        Time since the injection (minutes)
+    residence_time : float or numpy.ndarray
+        Nominal space time τ = V/Q (minutes)
+    active_fraction : float or numpy.ndarray
+        Fraction α of the volume in the active zone (0 < α ≤ 1)
+    bypass_fraction : float or numpy.ndarray
+        Fraction β of the feed bypassing the tank (0 ≤ β < 1)
+    exchange_ratio : float or numpy.ndarray
+        Exchange flow between the zones relative to the feed flow, ε ≥ 0
+
+    Returns:
+    --------
+    tuple of numpy.ndarray
+        E(t) (1/min), without the spike of area β at t = 0 from the bypass, and F(t), both of
+        the broadcast shape of the arguments
+    """
+    eigenvalues, weights = _compartment_modes(residence_time, active_fraction, bypass_fraction, exchange_ratio)
+    times = np.asarray(times, dtype=float)[..., None]
+    z = eigenvalues * times
+    # ∫₀ᵗ e^(λs) ds = t·expm1(λt)/(λt), which is t at λ = 0
+    small = np.abs(z) < 1e-8
+    integral = times * np.where(small, 1 + z / 2, np.expm1(z) / np.where(small, 1.0, z))
+    bypass = np.asarray(bypass_fraction, dtype=float)
+    # The outlet carries the active zone's concentration in (1 - β)·Q and the bypassed feed in β·Q
+    exit_age = (1 - bypass) * (weights * np.exp(z)).sum(axis=-1)
+    cumulative = bypass + (1 - bypass) * (weights * integral).sum(axis=-1)
+    return exit_age, cumulative
+
+
+def compartment_conversion(residence_time, active_fraction, bypass_fraction, exchange_ratio, feed_conc_naoh,
+                           feed_conc_ea, temperature, iterations=60):
+    """
+    Steady-state NaOH conversion of the compartment model for whole batches of parameter sets.
+
+    Both zones keep the feed difference Δ = C_B0 - C_A0 between the ethyl acetate and NaOH
+    concentrations, so each zone balance is a quadratic in its NaOH concentration.  The dead
+    zone concentration follows from the active one in closed form, and the active zone
+    balance, which decreases monotonically in C_A between max(0, -Δ) and C_A0, is solved by
+    bisection for all parameter sets together.
+
+    Parameters:
+    -----------
+    residence_time : float or numpy.ndarray
+        Nominal space time τ = V/Q (minutes)
+    active_fraction, bypass_fraction, exchange_ratio : float or numpy.ndarray
+        Compartment parameters α, β and ε (see :func:`compartment_response`)
+    feed_conc_naoh : float or numpy.ndarray
+        NaOH concentration in the feed (mol/L)
+    feed_conc_ea : float or numpy.ndarray
+        Ethyl acetate concentration in the feed (mol/L)
+    temperature : float or numpy.ndarray
+        Reaction temperature (°C)
+    iterations : int
+        Bisection steps; 60 halve the bracket to machine precision
+
+    Returns:
+    --------
+    tuple of numpy.ndarray
+        Fractional conversion of NaOH and the NaOH concentrations (mol/L) of the active zone,
+        the dead zone and the outlet, all of the broadcast shape of the arguments
+    """
+    tau, active, bypass, exchange, conc_a0, conc_b0, temperature = np.broadcast_arrays(*(
+        np.asarray(value, dtype=float) for value in (residence_time, active_fraction, bypass_fraction,
+                                                     exchange_ratio, feed_conc_naoh, feed_conc_ea, temperature)))
+    k = kinetics.rate_constant(temperature)
+    excess = conc_b0 - conc_a0
+    dead_damkoehler = np.maximum(1 - active, 0) * tau * k
+
+    def dead_conc(active_conc):
+        # Positive root of Da_d·C² + (Da_d·Δ + ε)·C - ε·C_active = 0, cancellation-free for either sign
+        b = dead_damkoehler * excess + exchange
+        root = np.sqrt(b**2 + 4 * dead_damkoehler * exchange * active_conc)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            conc = np.where(b >= 0, 2 * exchange * active_conc / (b + root), (root - b) / (2 * dead_damkoehler))
+        return np.where(exchange > 0, conc, np.maximum(-excess, 0))
+
+    def active_balance(active_conc):
+        return ((1 - bypass) * (conc_a0 - active_conc) + exchange * (dead_conc(active_conc) - active_conc)
+                - active * tau * k * active_conc * (active_conc + excess))
+
+    low, high = np.maximum(-excess, 0), conc_a0.copy()
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        positive = active_balance(middle) > 0
+        low, high = np.where(positive, middle, low), np.where(positive, high, middle)
+    active_conc = (low + high) / 2
+    exit_conc = bypass * conc_a0 + (1 - bypass) * active_conc
+    return 1 - exit_conc / conc_a0, active_conc, dead_conc(active_conc), exit_conc
+
+
+@memoize
+def simulate_compartments(params: Params, compartments: CompartmentParams) -> Compartments:
+    """
+    Computes the tracer response and conversion of the non-ideal CSTR against the ideal one.
+
+    Parameters:
+    -----------
+    params : Params
+        Feed, reactor volume and temperature
+    compartments : CompartmentParams
+        Active volume fraction, bypass fraction and exchange flow ratio
+
+    Returns:
+    --------
+    Compartments
+        E(t), F(t) and conversions of the compartment model and of the ideal CSTR
+    """
+    tau = params.reactor_volume / params.feed_flow_rate
+    active, bypass, exchange = (compartments.active_fraction, compartments.bypass_fraction,
+                                compartments.exchange_ratio)
+    time_points = np.linspace(0, 5 * tau, compartments.num_points)
+    exit_age, cumulative = compartment_response(time_points, tau, active, bypass, exchange)
+    ideal_exit_age, ideal_cumulative = compartment_response(time_points, tau, 1.0, 0.0, 0.0)
+    conversion, active_conc, dead_conc, exit_conc = compartment_conversion(
+        tau, active, bypass, exchange, params.feed_conc_naoh, params.feed_conc_ea, params.temperature)
+    # The dead zone holds fluid only if it exchanges with the active zone
+    accessible = active + (1 - active) * (exchange > 0)
+
+    return Compartments(
+        time_points=time_points,
+        exit_age=exit_age,
+        cumulative=cumulative,
+        ideal_exit_age=ideal_exit_age,
+        ideal_cumulative=ideal_cumulative,
+        mean_residence_time=accessible * tau,
+        conversion=float(conversion) * 100,
+        ideal_conversion=float(steady_state_conversion(tau, params.feed_conc_naoh, params.feed_conc_ea,
+                                                       params.temperature)) * 100,
+        active_conc_naoh=float(active_conc),
+        dead_conc_naoh=float(dead_conc),
+        exit_conc_naoh=float(exit_conc)
+    )
+
+
+def fit_compartments(runs, residence_time, injection=rtd.STEP, scale=None, max_iter=100,
+                     tol=1e-10) -> CompartmentFit:
+    """
+    Fits the compartment model to every run of a tracer sheet in one pass.
+
+    Readings are scaled to F(t) (step) or E(t) (pulse) by ``scale``: the tracer
+    concentration of the feed after a step, or the injected tracer over the feed flow of a
+    pulse.  Without it, step readings are scaled by their last value and pulse readings by
+    their own area; the area cannot tell bypassing from a smaller active zone, so the bypass
+    of an unscaled pulse is fixed at zero.  A step reading at t = 0 holds the bypassed feed.
+
+    All runs are fitted together by :func:`~chemengsim.core.rtd.batched_least_squares`, with
+    α, β and ε/:data:`MAX_EXCHANGE_RATIO` through logistic transforms that keep them in
+    range.  The dead zone can be fast or slow, so every run is started from a small and a
+    large active zone, each with weak and strong exchange, and the best of the four fits is
+    kept.
+
+    Parameters:
+    -----------
+    runs : rtd.TracerRuns
+        Outlet tracer readings above the baseline of one or more runs
+    residence_time : float or numpy.ndarray
+        Nominal space time τ = V/Q (minutes), shared by the runs or one per run
+    injection : str
+        :data:`~chemengsim.core.rtd.STEP` or :data:`~chemengsim.core.rtd.PULSE`
+    scale : float, optional
+        Feed tracer concentration of a step, or injected tracer over the feed flow of a pulse
+        (reading units × minutes)
+    max_iter : int
+        Maximum number of Levenberg-Marquardt iterations
+    tol : float
+        Convergence tolerance on the step in the transformed parameters
+
+    Returns:
+    --------
+    CompartmentFit
+        Estimates and standard errors of every run
+
+    Raises:
+    -------
+    ValueError
+        If the injection is unknown
+    """
+    if injection not in rtd.INJECTIONS:
+        raise ValueError(f"unknown tracer injection {injection!r}; expected one of {', '.join(rtd.INJECTIONS)}")
+    curve = runs.normalized(injection) if scale is None else runs.reading / scale
+    fit_bypass = injection == rtd.STEP or scale is not None
+    starts = np.array([[special.logit(active)] + ([special.logit(0.05)] if fit_bypass else [])
+                       + [special.logit(exchange / MAX_EXCHANGE_RATIO)]
+                       for active in (0.5, 0.9) for exchange in (0.05, 0.5)])
+    n_runs, n_starts = len(runs), len(starts)
+    # Every run once per start
+    tau = np.repeat(np.broadcast_to(np.asarray(residence_time, dtype=float), (n_runs,)), n_starts)[:, None]
+    time, mask, curve = (np.repeat(values, n_starts, axis=0) for values in (runs.time, runs.mask, curve))
+
+    def parameters(x):
+        x = np.clip(x, -30, 30)
+        active, exchange = special.expit(x[:, :1]), MAX_EXCHANGE_RATIO * special.expit(x[:, -1:])
+        bypass = special.expit(x[:, 1:2]) if fit_bypass else np.zeros_like(active)
+        return active, bypass, exchange
+
+    def residuals(x):
+        exit_age, cumulative = compartment_response(time, tau, *parameters(x))
+        predicted = cumulative if injection == rtd.STEP else exit_age
+        return np.where(mask, np.nan_to_num(predicted - curve, nan=1e6, posinf=1e6, neginf=-1e6), 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        x, inverse, cost, converged, iterations = rtd.batched_least_squares(
+            residuals, np.tile(starts, (n_runs, 1)), max_iter=max_iter, tol=tol)
+    best = np.arange(n_runs) * n_starts + cost.reshape(n_runs, n_starts).argmin(axis=1)
+    x, inverse, cost, converged = x[best], inverse[best], cost[best], converged[best]
+
+    residual_var = cost / np.maximum(runs.mask.sum(axis=1) - x.shape[1], 1)
+    stderr = np.sqrt(residual_var[:, None] * np.abs(np.einsum('ipp->ip', inverse)))
+    active, bypass, exchange = (value[:, 0] for value in parameters(x))
+    # Delta method through the logistic transforms: dα/dx = α(1 - α)
+    return CompartmentFit(
+        labels=runs.labels,
+        injection=injection,
+        residence_time=tau[best, 0],
+        active_fraction=active,
+        bypass_fraction=bypass,
+        exchange_ratio=exchange,
+        active_fraction_stderr=active * (1 - active) * stderr[:, 0],
+        bypass_fraction_stderr=bypass * (1 - bypass) * stderr[:, 1] if fit_bypass else np.full(n_runs, np.nan),
+        # An estimate at the bound has no meaningful standard error
+        exchange_ratio_stderr=np.where(exchange < 0.999 * MAX_EXCHANGE_RATIO,
+                                       exchange * (1 - exchange / MAX_EXCHANGE_RATIO) * stderr[:, -1], np.nan),
+        residual_std=np.sqrt(residual_var),
+        converged=converged,
+        iterations=iterations
+    )
+
+
+def example_tracer_runs(residence_time=10.0, active_fractions=(0.6, 0.75, 0.9), bypass_fractions=(0.05, 0.15),
+                        exchange_ratio=0.2, num_points=31, noise=0.01, seed=0):
+    """
+    Synthetic step-tracer sheet from the compartment model, one run for every combination of
+    active and bypass fraction, used as the template of the upload form.
+
+    Parameters:
+    -----------
+    residence_time : float
+        Nominal space time τ = V/Q (minutes)
+    active_fractions, bypass_fractions : sequence of float
+        Compartment parameters of the runs
+    exchange_ratio : float
+        Exchange flow ratio of every run
+    num_points : int
+        Readings per run, up to six space times
+    noise : float
+        Standard deviation of the reading error relative to the final reading
+    seed : int
+        Random seed
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Sheet with the :data:`~chemengsim.core.rtd.REQUIRED_COLUMNS`, readings in mg/L for a
+        100 mg/L step
+    """
+    rng = np.random.default_rng(seed)
+    active, bypass = (grid.ravel() for grid in np.meshgrid(active_fractions, bypass_fractions, indexing='ij'))
+    time = np.linspace(0, 6 * residence_time, num_points)
+    _, cumulative = compartment_response(time[None, :], residence_time, active[:, None], bypass[:, None],
+                                         exchange_ratio)
+    reading = np.maximum(100 * (cumulative + noise * rng.standard_normal(cumulative.shape)), 0)
+    return pd.DataFrame({
+        rtd.RUN: np.repeat([f'α = {a:g}, β = {b:g}' for a, b in zip(active, bypass)], num_points),
+        rtd.TIME: np.tile(np.round(time, 3), len(active)),
+        rtd.TRACER: np.round(reading.ravel(), 3)
+    })
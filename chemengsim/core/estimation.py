@@ -0,0 +1,387 @@
+"""
+Kinetic Parameter Estimation
+============================
+
+Fits the saponification rate constant to measured batch reactor runs.
+
+A sheet of observations holds one row per measurement, with the run label, its
+temperature and initial concentrations, the sampling time and either the titrated NaOH
+concentration or the conductivity reading.  :func:`fit_arrhenius` jointly estimates
+``k_ref`` (at :data:`~chemengsim.core.kinetics.T_REF`) and ``E/R`` from all runs by
+nonlinear least squares on the integrated second-order model, with analytic Jacobians
+and confidence intervals from the linearized covariance.  :func:`fit_rate_constants`
+estimates ``k`` of each run on its own for the classic Arrhenius plot.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, stats
+
+from chemengsim.core import kinetics
+
+# Column names of an observation sheet
+RUN = 'Run'
+TEMPERATURE = 'Temperature (°C)'
+INITIAL_CONC_NAOH = 'Initial NaOH (mol/L)'
+INITIAL_CONC_EA = 'Initial Ethyl Acetate (mol/L)'
+TIME = 'Time (min)'
+CONC_NAOH = 'NaOH Concentration (mol/L)'
+CONDUCTIVITY = 'Conductivity (mS/cm)'
+FINAL_CONDUCTIVITY = 'Final Conductivity (mS/cm)'
+
+REQUIRED_COLUMNS = (RUN, TEMPERATURE, INITIAL_CONC_NAOH, INITIAL_CONC_EA, TIME)
+
+
+@dataclass(frozen=True)
+class Runs:
+    """Observations of one or more batch runs, one entry per measurement"""
+    run: np.ndarray                # run label of each measurement
+    temperature: np.ndarray        # °C
+    initial_conc_naoh: np.ndarray  # mol/L
+    initial_conc_ea: np.ndarray    # mol/L
+    time: np.ndarray               # minutes
+    conc_naoh: np.ndarray          # mol/L
+
+    @property
+    def labels(self):
+        """Run labels in order of first appearance"""
+        return list(pd.unique(self.run))
+
+    def __len__(self):
+        return len(self.time)
+
+    def select(self, mask):
+        """Measurements selected by a boolean mask or index array"""
+        return Runs(self.run[mask], self.temperature[mask], self.initial_conc_naoh[mask],
+                    self.initial_conc_ea[mask], self.time[mask], self.conc_naoh[mask])
+
+    def to_dataframe(self):
+        """Tabulate the observations with the sheet column names"""
+        return pd.DataFrame({
+            RUN: self.run,
+            TEMPERATURE: self.temperature,
+            INITIAL_CONC_NAOH: self.initial_conc_naoh,
+            INITIAL_CONC_EA: self.initial_conc_ea,
+            TIME: self.time,
+            CONC_NAOH: self.conc_naoh
+        })
+
+
+@dataclass(frozen=True)
+class ArrheniusFit:
+    """Joint least-squares estimate of the Arrhenius parameters"""
+    k_ref: float               # L/(mol·min) at T_REF
+    e_r: float                 # K
+    covariance: np.ndarray     # of (k_ref, e_r)
+    confidence: float
+    k_ref_ci: tuple
+    e_r_ci: tuple
+    residual_std: float        # mol/L
+    n_observations: int
+    n_runs: int
+
+    @property
+    def stderr(self):
+        """Standard errors of ``(k_ref, e_r)``"""
+        return np.sqrt(np.diag(self.covariance))
+
+    @property
+    def correlation(self):
+        """Correlation coefficient between the ``k_ref`` and ``e_r`` estimates"""
+        return self.covariance[0, 1] / np.prod(self.stderr)
+
+    @property
+    def activation_energy(self):
+        """Activation energy (kJ/mol)"""
+        return self.e_r * 8.314 / 1000
+
+    @property
+    def activation_energy_ci(self):
+        """Confidence interval of the activation energy (kJ/mol)"""
+        return tuple(value * 8.314 / 1000 for value in self.e_r_ci)
+
+    def rate_constant(self, temperature):
+        """Fitted rate constant (L/(mol·min)) at a temperature (°C)"""
+        return kinetics.rate_constant(temperature, self.k_ref, self.e_r)
+
+    def predict(self, runs):
+        """Fitted NaOH concentration (mol/L) at every measurement of ``runs``"""
+        return _model(runs, self.k_ref, self.e_r)
+
+    def to_dataframe(self):
+        """Tabulate the estimates with their standard errors and confidence intervals"""
+        level = f'{self.confidence:.0%}'
+        return pd.DataFrame({
+            'Parameter': ['k_ref (L/(mol·min))', 'E/R (K)', 'E (kJ/mol)'],
+            'Estimate': [self.k_ref, self.e_r, self.activation_energy],
+            'Std. Error': [self.stderr[0], self.stderr[1], self.stderr[1] * 8.314 / 1000],
+            f'{level} CI Lower': [self.k_ref_ci[0], self.e_r_ci[0], self.activation_energy_ci[0]],
+            f'{level} CI Upper': [self.k_ref_ci[1], self.e_r_ci[1], self.activation_energy_ci[1]]
+        })
+
+
+@dataclass(frozen=True)
+class RateConstants:
+    """Rate constant of each run fitted on its own"""
+    runs: list
+    temperatures: np.ndarray   # °C
+    k_values: np.ndarray       # L/(mol·min)
+    k_stderr: np.ndarray
+
+    def to_dataframe(self):
+        """Tabulate the rate constant of every run"""
+        return pd.DataFrame({
+            RUN: self.runs,
+            TEMPERATURE: self.temperatures,
+            'k (L/(mol·min))': self.k_values,
+            'Std. Error': self.k_stderr
+        })
+
+
+def conductivity_to_conc(conductivity, initial_conductivity, final_conductivity, initial_conc_naoh,
+                         initial_conc_ea):
+    """
+    Converts conductivity readings to NaOH concentrations.
+
+    Conductivity falls linearly with conversion as mobile OH⁻ ions are replaced by
+    acetate, from the initial reading to the reading at completion, where the NaOH left
+    is max(C_A0 - C_B0, 0).
+
+    Parameters:
+    -----------
+    conductivity : float or numpy.ndarray
+        Readings (mS/cm)
+    initial_conductivity, final_conductivity : float or numpy.ndarray
+        Readings at t = 0 and at completion (mS/cm)
+    initial_conc_naoh, initial_conc_ea : float or numpy.ndarray
+        Initial concentrations (mol/L)
+
+    Returns:
+    --------
+    numpy.ndarray
+        NaOH concentration (mol/L)
+    """
+    final_conc = np.maximum(np.subtract(initial_conc_naoh, initial_conc_ea), 0)
+    fraction = np.divide(np.subtract(initial_conductivity, conductivity),
+                         np.subtract(initial_conductivity, final_conductivity))
+    return initial_conc_naoh - (initial_conc_naoh - final_conc) * fraction
+
+
+def runs_from_dataframe(df):
+    """
+    Reads the observations of a sheet.
+
+    NaOH concentrations are taken from the ``CONC_NAOH`` column, or converted from the
+    ``CONDUCTIVITY`` column using each run's reading at t = 0 and its
+    ``FINAL_CONDUCTIVITY``.  Rows with missing values are dropped.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Sheet with the :data:`REQUIRED_COLUMNS` and a concentration or conductivity column
+
+    Returns:
+    --------
+    Runs
+        Observations sorted by run and time
+
+    Raises:
+    -------
+    ValueError
+        If required columns are missing or a conductivity run has no t = 0 reading
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if CONC_NAOH not in df.columns and CONDUCTIVITY not in df.columns:
+        missing.append(f'{CONC_NAOH} or {CONDUCTIVITY}')
+    if CONC_NAOH not in df.columns and FINAL_CONDUCTIVITY not in df.columns:
+        missing.append(FINAL_CONDUCTIVITY)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    values = df.copy()
+    values[RUN] = values[RUN].astype(str)
+    numeric = [column for column in df.columns if column != RUN]
+    values[numeric] = values[numeric].apply(pd.to_numeric, errors='coerce')
+
+    if CONC_NAOH not in values.columns:
+        values = values.dropna(subset=list(REQUIRED_COLUMNS) + [CONDUCTIVITY, FINAL_CONDUCTIVITY])
+        initial = values[values[TIME] == 0].groupby(RUN)[CONDUCTIVITY].first()
+        without_initial = sorted(set(values[RUN]) - set(initial.index))
+        if without_initial:
+            raise ValueError(f"Runs without a conductivity reading at t = 0: {', '.join(without_initial)}")
+        values[CONC_NAOH] = conductivity_to_conc(values[CONDUCTIVITY], values[RUN].map(initial),
+                                                 values[FINAL_CONDUCTIVITY], values[INITIAL_CONC_NAOH],
+                                                 values[INITIAL_CONC_EA])
+    values = values.dropna(subset=list(REQUIRED_COLUMNS) + [CONC_NAOH])
+    values = values.sort_values([RUN, TIME], kind='stable')
+    return Runs(*(values[column].to_numpy(dtype=object if column == RUN else float) for column in
+                  (RUN, TEMPERATURE, INITIAL_CONC_NAOH, INITIAL_CONC_EA, TIME, CONC_NAOH)))
+
+
+def _model(runs, k_ref, e_r, jacobian=False):
+    """
+    Integrated second-order model at every measurement and, optionally, its derivatives
+    with respect to ``(k_ref, e_r)``
+    """
+    k = kinetics.rate_constant(runs.temperature, k_ref, e_r)
+    conc = kinetics.second_order_conc(runs.initial_conc_naoh, runs.initial_conc_ea, k, runs.time)
+    if not jacobian:
+        return conc
+    # With D = 1 + C_B0·k·t·φ(x): dD/dk = C_B0·t·exp(x), so dC_A/dk = -C_A²·C_B0·t·exp(x) / C_A0
+    x = (runs.initial_conc_ea - runs.initial_conc_naoh) * k * runs.time
+    dconc_dk = -conc * conc * runs.initial_conc_ea * runs.time * np.exp(np.minimum(x, 700.0)) / runs.initial_conc_naoh
+    dk_de_r = k * (1 / kinetics.T_REF - 1 / (runs.temperature + 273.15))
+    return conc, np.column_stack([dconc_dk * k / k_ref, dconc_dk * dk_de_r])
+
+
+def _confidence_interval(estimate, stderr, dof, confidence):
+    half_width = stats.t.ppf(0.5 + confidence / 2, dof) * stderr
+    return (estimate - half_width, estimate + half_width)
+
+
+def fit_arrhenius(runs, k_ref=kinetics.K_REF, e_r=kinetics.E_R, confidence=0.95) -> ArrheniusFit:
+    """
+    Jointly fits ``k_ref`` and ``E/R`` to the NaOH concentrations of all runs.
+
+    Parameters:
+    -----------
+    runs : Runs
+        Observations at two or more temperatures
+    k_ref, e_r : float
+        Initial guesses
+    confidence : float
+        Confidence level of the intervals
+
+    Returns:
+    --------
+    ArrheniusFit
+        Estimates, covariance and confidence intervals
+
+    Raises:
+    -------
+    ValueError
+        If the runs span fewer than two temperatures or there are too few measurements
+    """
+    if len(np.unique(runs.temperature)) < 2:
+        raise ValueError("E/R cannot be estimated from runs at a single temperature")
+    dof = len(runs) - 2
+    if dof < 1:
+        raise ValueError("At least three measurements are needed")
+
+    def residuals(theta):
+        return _model(runs, *theta) - runs.conc_naoh
+
+    def jacobian(theta):
+        return _model(runs, *theta, jacobian=True)[1]
+
+    solution = optimize.least_squares(residuals, [k_ref, e_r], jac=jacobian, bounds=([0, -np.inf], np.inf),
+                                      x_scale='jac', method='trf')
+    residual_var = 2 * solution.cost / dof
+    covariance = residual_var * np.linalg.pinv(solution.jac.T @ solution.jac)
+    stderr = np.sqrt(np.diag(covariance))
+    return ArrheniusFit(
+        k_ref=float(solution.x[0]),
+        e_r=float(solution.x[1]),
+        covariance=covariance,
+        confidence=confidence,
+        k_ref_ci=_confidence_interval(solution.x[0], stderr[0], dof, confidence),
+        e_r_ci=_confidence_interval(solution.x[1], stderr[1], dof, confidence),
+        residual_std=float(np.sqrt(residual_var)),
+        n_observations=len(runs),
+        n_runs=len(runs.labels)
+    )
+
+
+def fit_rate_constants(runs, k=kinetics.K_REF, max_iter=50, rtol=1e-10) -> RateConstants:
+    """
+    Fits the rate constant of every run separately.
+
+    All runs are solved together by Gauss-Newton iterations on the one-parameter model of
+    each run, so a full lab section costs a few array passes rather than one optimizer
+    call per run.
+
+    Parameters:
+    -----------
+    runs : Runs
+        Observations
+    k : float
+        Initial guess (L/(mol·min))
+    max_iter : int
+        Maximum number of iterations
+    rtol : float
+        Relative step size at which a run has converged
+
+    Returns:
+    --------
+    RateConstants
+        ``k`` and its standard error per run; NaN where a run has fewer than two measurements
+    """
+    codes, labels = pd.factorize(runs.run)
+    n_runs = len(labels)
+    counts = np.bincount(codes, minlength=n_runs)
+    first = np.unique(codes, return_index=True)[1]
+
+    # With E/R = 0 the reference rate constant is the rate constant of each measurement
+    k_values = np.full(n_runs, float(k))
+    for _ in range(max_iter):
+        conc, jacobian = _model(runs, k_values[codes], 0.0, jacobian=True)
+        gradient = jacobian[:, 0]
+        jtr = np.bincount(codes, weights=gradient * (conc - runs.conc_naoh), minlength=n_runs)
+        jtj = np.bincount(codes, weights=gradient * gradient, minlength=n_runs)
+        updated = k_values - np.divide(jtr, jtj, out=np.zeros(n_runs), where=jtj > 0)
+        updated = np.where(updated > 0, updated, k_values / 2)
+        converged = np.abs(updated - k_values) <= rtol * k_values
+        k_values = updated
+        if converged.all():
+            break
+
+    conc, jacobian = _model(runs, k_values[codes], 0.0, jacobian=True)
+    sse = np.bincount(codes, weights=(conc - runs.conc_naoh) ** 2, minlength=n_runs)
+    jtj = np.bincount(codes, weights=jacobian[:, 0] ** 2, minlength=n_runs)
+    valid = (counts > 1) & (jtj > 0)
+    k_stderr = np.full(n_runs, np.nan)
+    k_stderr[valid] = np.sqrt(sse[valid] / (counts[valid] - 1) / jtj[valid])
+    return RateConstants(runs=list(labels), temperatures=runs.temperature[first],
+                         k_values=np.where(counts > 1, k_values, np.nan), k_stderr=k_stderr)
+
+
+def example_runs(temperatures=(25, 30, 35, 40, 45), times=(0, 5, 10, 20, 30, 45, 60), initial_conc_naoh=0.05,
+                 initial_conc_ea=0.05, noise=0.005, seed=0):
+    """
+    Synthetic observation sheet generated from the default kinetics, used as the
+    template of the upload form.
+
+    Parameters:
+    -----------
+    temperatures : sequence of float
+        Temperature of each run (°C)
+    times : sequence of float
+        Sampling times (minutes)
+    initial_conc_naoh, initial_conc_ea : float
+        Initial concentrations (mol/L)
+    noise : float
+        Relative standard deviation of the titration error
+    seed : int
+        Random seed
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Sheet with the :data:`REQUIRED_COLUMNS` and ``CONC_NAOH``
+    """
+    rng = np.random.default_rng(seed)
+    run, time = (grid.ravel() for grid in np.meshgrid(np.arange(len(temperatures)), times, indexing='ij'))
+    temperature = np.asarray(temperatures, dtype=float)[run]
+    k = kinetics.rate_constant(temperature)
+    conc = kinetics.second_order_conc(initial_conc_naoh, initial_conc_ea, k, time)
+    conc = conc * (1 + noise * rng.standard_normal(conc.shape))
+    return pd.DataFrame({
+        RUN: [f'Run {i + 1}' for i in run],
+        TEMPERATURE: temperature,
+        INITIAL_CONC_NAOH: initial_conc_naoh,
+        INITIAL_CONC_EA: initial_conc_ea,
+        TIME: time,
+        CONC_NAOH: np.round(conc, 5)
+    })
@@ -0,0 +1,254 @@
+"""
+Optimal Semi-batch Feed Profiles
+================================
+
+Finds the feed-rate profile of the semi-batch reactor that maximizes the NaOH conversion
+at the end of ``total_time``.
+
+The feed rate is piecewise constant over equal intervals.  The total feed volume (the
+reactant charge) is either fixed or left free up to the reactor volume limit, and the
+volume may never exceed that limit.  The conversion and its exact gradient with respect
+to every interval's feed rate come from one integration of the material balances
+together with their forward sensitivities, so SLSQP needs no finite differences.
+Several starting profiles are optimized in parallel worker processes, and every solve is
+cached on the profile, so the objective and gradient evaluations of an SLSQP iteration
+share one integration.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from scipy import linalg, optimize
+from scipy.integrate import solve_ivp
+
+from chemengsim.core import semi_batch_reactor
+from chemengsim.core.cache import memoize
+
+
+@dataclass(frozen=True)
+class OptimizationParams:
+    """Feed parameterization, constraints and solver settings of :func:`optimize_feed`"""
+    num_intervals: int = 12
+    max_flow_rate: float = 0.5              # L/min, pump limit
+    max_volume: float = 5.0                 # L
+    charge_volume: Optional[float] = 3.0    # L of feed; None leaves it free up to max_volume
+    num_starts: int = 4                     # starting profiles optimized independently
+    workers: Optional[int] = None           # processes for the starts; CPU count by default
+    max_iter: int = 100
+    tol: float = 1e-9
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class OptimalFeed:
+    """Optimized feed profile computed by :func:`optimize_feed`"""
+    interval_times: np.ndarray        # boundaries of the feed intervals (minutes)
+    flow_rates: np.ndarray            # L/min in each interval
+    conversion: float                 # final NaOH conversion (%)
+    constant_conversion: float        # final conversion with the same charge fed at a constant rate (%)
+    start_conversions: np.ndarray     # final conversion reached from each starting profile (%)
+    iterations: int                   # SLSQP iterations over all starts
+    evaluations: int                  # integrations over all starts
+    elapsed: float                    # seconds
+    profile: semi_batch_reactor.ScheduleResult
+
+    @property
+    def schedule(self):
+        """The optimized profile as a feed schedule"""
+        return tuple(semi_batch_reactor.FeedSegment(stop - start, float(rate))
+                     for start, stop, rate in zip(self.interval_times[:-1], self.interval_times[1:], self.flow_rates))
+
+
+class _FeedProblem:
+    """
+    Final conversion of a piecewise-constant feed profile and its gradient.
+
+    Results are cached on the profile, so SLSQP's separate objective and gradient calls
+    at the same point cost one integration.
+    """
+
+    def __init__(self, params, num_intervals):
+        self.params = params
+        self.network = params.network
+        self.n_species = len(self.network.species)
+        self.naoh = self.network.index('NaOH')
+        self.interval = params.total_time / num_intervals
+        self.num_intervals = num_intervals
+        self.k = self.network.rate_constants(params.temperature)
+        self.feed_conc = self.network.vector({'EtOAc': params.feed_conc_ea})
+        self.initial_moles = params.initial_conc_naoh * params.initial_vol_reactor
+        self.y0 = np.append(self.network.vector({'NaOH': params.initial_conc_naoh, 'EtOAc': params.initial_conc_ea}),
+                            params.initial_vol_reactor)
+        self.evaluations = 0
+        self._cache = {}
+
+    def _equations(self, flow_rate, interval):
+        """
+        Right-hand side and Jacobian of the balances and their sensitivities in one interval.
+
+        The sensitivities to the feed rates of later intervals are still zero, so only the
+        columns up to ``interval`` are integrated.
+        """
+        n, size, m = self.n_species, self.n_species + 1, interval + 1
+        network, k, feed_conc = self.network, self.k, self.feed_conc
+
+        def state_jacobian(y):
+            conc, volume = y[:n], y[n]
+            matrix = np.zeros((size, size))
+            matrix[:n, :n] = network.jacobian(conc, k=k) - flow_rate / volume * np.eye(n)
+            matrix[:n, n] = -flow_rate / volume**2 * (feed_conc - conc)
+            return matrix
+
+        def rhs(t, z):
+            y, sensitivities = z[:size], z[size:].reshape(size, m)
+            conc, volume = y[:n], y[n]
+            derivative = np.append(network.production(conc, k=k) + flow_rate / volume * (feed_conc - conc), flow_rate)
+            # dS/dt = J·S + ∂f/∂q, the forcing acting only on this interval's feed rate
+            sensitivity_derivative = state_jacobian(y) @ sensitivities
+            sensitivity_derivative[:n, interval] += (feed_conc - conc) / volume
+            sensitivity_derivative[n, interval] += 1.0
+            return np.concatenate([derivative, sensitivity_derivative.ravel()])
+
+        def jacobian(t, z):
+            # J for the states and J ⊗ I for the row-major sensitivities; the second-derivative
+            # coupling of S to the states is left out, it only affects the Newton iterations
+            matrix = state_jacobian(z[:size])
+            return linalg.block_diag(matrix, np.kron(matrix, np.eye(m)))
+
+        return rhs, jacobian
+
+    def evaluate(self, flow_rates):
+        """Final conversion (fraction) and its gradient with respect to the feed rates"""
+        key = np.asarray(flow_rates, dtype=float).tobytes()
+        if key not in self._cache:
+            self.evaluations += 1
+            size = self.n_species + 1
+            y, sensitivities = self.y0, np.zeros((size, 0))
+            for interval, flow_rate in enumerate(flow_rates):
+                rhs, jacobian = self._equations(float(flow_rate), interval)
+                start = interval * self.interval
+                z = np.concatenate([y, np.column_stack([sensitivities, np.zeros(size)]).ravel()])
+                solution = solve_ivp(rhs, (start, start + self.interval), z, method='LSODA', jac=jacobian,
+                                     rtol=1e-8, atol=1e-12)
+                y, sensitivities = solution.y[:size, -1], solution.y[size:, -1].reshape(size, interval + 1)
+            conc_naoh, volume = y[self.naoh], y[self.n_species]
+            conversion = 1 - conc_naoh * volume / self.initial_moles
+            gradient = -(sensitivities[self.naoh] * volume + conc_naoh * sensitivities[self.n_species]) / self.initial_moles
+            self._cache[key] = (conversion, gradient)
+        return self._cache[key]
+
+    def objective(self, flow_rates):
+        return -self.evaluate(flow_rates)[0]
+
+    def gradient(self, flow_rates):
+        return -self.evaluate(flow_rates)[1]
+
+
+def _constraints(params, options, interval):
+    """SLSQP constraints: the fixed charge and the volume limit after every interval"""
+    cumulative = interval * np.tril(np.ones((options.num_intervals, options.num_intervals)))
+    headroom = options.max_volume - params.initial_vol_reactor
+    constraints = [{'type': 'ineq', 'fun': lambda q: headroom - cumulative @ q, 'jac': lambda q: -cumulative}]
+    if options.charge_volume is not None:
+        constraints.append({'type': 'eq', 'fun': lambda q: interval * q.sum() - options.charge_volume,
+                            'jac': lambda q: np.full(len(q), interval)})
+    return constraints
+
+
+def _starting_profiles(params, options, charge):
+    """Constant, front-loaded, back-loaded and random profiles delivering ``charge``"""
+    n = options.num_intervals
+    ramp = np.linspace(1, 0, n) + 0.1
+    shapes = [np.ones(n), ramp, ramp[::-1]]
+    rng = np.random.default_rng(options.seed)
+    while len(shapes) < options.num_starts:
+        shapes.append(rng.uniform(0.1, 1.0, n))
+    interval = params.total_time / n
+    profiles = []
+    for shape in shapes[:options.num_starts]:
+        profile = shape * charge / (interval * shape.sum())
+        # Spread any excess over the pump limit to the intervals below it
+        for _ in range(n):
+            excess = np.maximum(profile - options.max_flow_rate, 0).sum()
+            profile = np.minimum(profile, options.max_flow_rate)
+            if excess <= 0:
+                break
+            free = profile < options.max_flow_rate
+            profile[free] += excess / free.sum()
+        profiles.append(profile)
+    return profiles
+
+
+def _optimize_from(params, options, start):
+    """Run SLSQP from one starting profile; returns (flow rates, conversion, iterations, integrations)"""
+    problem = _FeedProblem(params, options.num_intervals)
+    solution = optimize.minimize(problem.objective, start, jac=problem.gradient, method='SLSQP',
+                                 bounds=[(0, options.max_flow_rate)] * options.num_intervals,
+                                 constraints=_constraints(params, options, problem.interval),
+                                 options={'maxiter': options.max_iter, 'ftol': options.tol})
+    flow_rates = np.clip(solution.x, 0, options.max_flow_rate)
+    return flow_rates, problem.evaluate(flow_rates)[0], solution.nit, problem.evaluations
+
+
+@memoize
+def optimize_feed(params: semi_batch_reactor.Params, options: OptimizationParams) -> OptimalFeed:
+    """
+    Optimizes the feed-rate profile for the final NaOH conversion.
+
+    Parameters:
+    -----------
+    params : semi_batch_reactor.Params
+        Initial charge, feed concentration, temperature and ``total_time``; the constant
+        ``feed_flow_rate`` is replaced by the optimized profile
+    options : OptimizationParams
+        Number of feed intervals, constraints and solver settings
+
+    Returns:
+    --------
+    OptimalFeed
+        Best profile over all starts, its simulated profiles and the constant-feed baseline
+
+    Raises:
+    -------
+    ValueError
+        If the charge cannot be fed within the pump and volume limits
+    """
+    start_time = time.perf_counter()
+    headroom = options.max_volume - params.initial_vol_reactor
+    charge = headroom if options.charge_volume is None else options.charge_volume
+    if charge < 0 or charge > headroom + 1e-12:
+        raise ValueError("a charge of %.3g L does not fit between the initial volume and the %.3g L limit"
+                         % (charge, options.max_volume))
+    if charge > options.max_flow_rate * params.total_time * (1 + 1e-12):
+        raise ValueError("a charge of %.3g L cannot be fed in %g minutes at up to %.3g L/min"
+                         % (charge, params.total_time, options.max_flow_rate))
+
+    starts = _starting_profiles(params, options, charge)
+    workers = min(options.workers or os.cpu_count() or 1, len(starts))
+    if workers <= 1:
+        outcomes = [_optimize_from(params, options, start) for start in starts]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_optimize_from, [params] * len(starts), [options] * len(starts), starts))
+
+    best_rates, best_conversion, _, _ = max(outcomes, key=lambda outcome: outcome[1])
+    problem = _FeedProblem(params, options.num_intervals)
+    constant_conversion = problem.evaluate(np.full(options.num_intervals, charge / params.total_time))[0]
+    interval_times = np.linspace(0, params.total_time, options.num_intervals + 1)
+    schedule = tuple(semi_batch_reactor.FeedSegment(problem.interval, float(rate)) for rate in best_rates)
+
+    return OptimalFeed(
+        interval_times=interval_times,
+        flow_rates=best_rates,
+        conversion=float(best_conversion) * 100,
+        constant_conversion=float(constant_conversion) * 100,
+        start_conversions=np.array([outcome[1] for outcome in outcomes]) * 100,
+        iterations=sum(outcome[2] for outcome in outcomes),
+        evaluations=sum(outcome[3] for outcome in outcomes),
+        elapsed=time.perf_counter() - start_time,
+        profile=semi_batch_reactor.simulate_schedule(params, schedule)
+    )
@@ -0,0 +1,228 @@
+"""
+Plate and Frame Filter Press Model
+==================================
+
+Constant-pressure cake filtration in a plate and frame filter press.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import curve_fit
+
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+MEDIUM_RESISTANCE = 1e10  # 1/m
+
+
+@dataclass(frozen=True)
+class Params:
+    """Operating conditions, slurry properties and press geometry"""
+    filtration_pressure: float = 300.0     # kPa
+    slurry_concentration: float = 200.0    # kg/m³
+    filter_area: float = 1.0               # m²
+    filtrate_viscosity: float = 0.001      # Pa·s
+    num_plates: int = 20
+    frame_thickness: float = 25.0          # mm
+    max_time: float = 3600.0               # seconds, 1 hour maximum filtration time
+    num_points: int = 100
+
+
+@dataclass(frozen=True)
+class Result:
+    """Filtration curves computed by :func:`simulate`"""
+    specific_cake_resistance: float
+    medium_resistance: float
+    total_frame_volume: float
+    time_points: np.ndarray
+    filtrate_volumes: np.ndarray
+    t_over_v: np.ndarray
+    filtration_rates: np.ndarray
+    cake_thicknesses_mm: np.ndarray
+    fill_time_index: int
+    fill_time: float
+    fill_volume: float
+
+    @property
+    def frames_filled(self):
+        """Whether the cake fills the frames within the simulated time"""
+        return self.fill_time_index > 0
+
+    @timing.timed('tabulate.filter_press.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the filtration data, truncated at the frame fill time"""
+        df = pd.DataFrame({
+            'Time (s)': self.time_points,
+            'Filtrate Volume (m³)': self.filtrate_volumes,
+            't/V (s/m³)': self.t_over_v,
+            'Filtration Rate (m³/s)': self.filtration_rates,
+            'Cake Thickness (mm)': self.cake_thicknesses_mm
+        })
+        if self.frames_filled:
+            df = df.iloc[:self.fill_time_index+1].copy()
+        return df
+
+
+@dataclass(frozen=True)
+class RuthFit:
+    """Straight-line fit of the Ruth plot and the resistances recovered from it"""
+    slope: float
+    intercept: float
+    specific_cake_resistance: float
+    medium_resistance: float
+
+
+def cake_resistance(filtration_pressure):
+    """Pressure-dependent specific cake resistance (m/kg) of a compressible cake"""
+    return 1e11 * (np.asarray(filtration_pressure) / 300)**0.5
+
+
+def filtrate_volume(params: Params, time, filtration_pressure=None, slurry_concentration=None,
+                    specific_cake_resistance=None):
+    """
+    Filtrate volume from the integrated Ruth equation t = k1·V² + k2·V.
+
+    Parameters:
+    -----------
+    params : Params
+        Operating conditions and slurry properties
+    time : float or numpy.ndarray
+        Filtration time (s)
+    filtration_pressure : float or numpy.ndarray, optional
+        Pressure (kPa) overriding ``params.filtration_pressure``
+    slurry_concentration : float or numpy.ndarray, optional
+        Slurry concentration (kg/m³) overriding ``params.slurry_concentration``
+    specific_cake_resistance : float or numpy.ndarray, optional
+        Cake resistance (m/kg); defaults to the value at the filtration pressure
+
+    Returns:
+    --------
+    float or numpy.ndarray
+        Filtrate volume (m³)
+    """
+    pressure = params.filtration_pressure if filtration_pressure is None else np.asarray(filtration_pressure)
+    concentration = (params.slurry_concentration if slurry_concentration is None
+                     else np.asarray(slurry_concentration))
+    if specific_cake_resistance is None:
+        specific_cake_resistance = cake_resistance(pressure)
+
+    k1 = (params.filtrate_viscosity * specific_cake_resistance * concentration) / (2 * params.filter_area**2 * (pressure * 1000))
+    k2 = (params.filtrate_viscosity * MEDIUM_RESISTANCE) / (params.filter_area * (pressure * 1000))
+
+    # V = (-k2 + sqrt(k2² + 4*k1*t)) / (2*k1)
+    return (-k2 + np.sqrt(k2**2 + 4*k1*np.asarray(time))) / (2*k1)
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Simulates constant-pressure filtration until the frames fill or the time limit is reached.
+
+    Parameters:
+    -----------
+    params : Params
+        Operating conditions, slurry properties and press geometry
+
+    Returns:
+    --------
+    Result
+        Filtrate volume, rate and cake thickness histories
+    """
+    # Calculated total frame volume
+    frame_area = params.filter_area / params.num_plates  # m²
+    frame_volume = frame_area * (params.frame_thickness / 1000)  # m³
+    total_frame_volume = frame_volume * params.num_plates  # m³
+
+    specific_cake_resistance = float(cake_resistance(params.filtration_pressure))
+
+    time_points = np.linspace(0, params.max_time, params.num_points)
+    filtrate_volumes = filtrate_volume(params, time_points, specific_cake_resistance=specific_cake_resistance)
+
+    # t/V for the Ruth plot
+    t_over_v = np.divide(time_points, filtrate_volumes, out=np.zeros_like(time_points),
+                         where=filtrate_volumes > 0)
+
+    # Filtration rate by finite differences
+    filtration_rates = np.zeros_like(time_points)
+    filtration_rates[1:] = np.diff(filtrate_volumes) / np.diff(time_points)
+
+    # Cake thickness = Concentration * Filtrate volume / (Cake density * Filter area)
+    # Assume cake density is 2.5 times the slurry concentration (dry basis)
+    cake_density = 2.5 * params.slurry_concentration  # kg/m³
+    cake_thicknesses = params.slurry_concentration * filtrate_volumes / (cake_density * params.filter_area)  # m
+    cake_thicknesses_mm = cake_thicknesses * 1000  # mm
+
+    # Find the time when cake fills the frame
+    fill_time_index = int(np.argmax(cake_thicknesses_mm >= params.frame_thickness))
+    if fill_time_index > 0:
+        fill_time = time_points[fill_time_index]
+        fill_volume = filtrate_volumes[fill_time_index]
+    else:
+        fill_time = params.max_time
+        fill_volume = filtrate_volumes[-1]
+
+    return Result(
+        specific_cake_resistance=specific_cake_resistance,
+        medium_resistance=MEDIUM_RESISTANCE,
+        total_frame_volume=total_frame_volume,
+        time_points=time_points,
+        filtrate_volumes=filtrate_volumes,
+        t_over_v=t_over_v,
+        filtration_rates=filtration_rates,
+        cake_thicknesses_mm=cake_thicknesses_mm,
+        fill_time_index=fill_time_index,
+        fill_time=fill_time,
+        fill_volume=fill_volume
+    )
+
+
+def cake_porosity(params: Params, num_points):
+    """Estimated cake porosity over the filtration, decreasing as the cake compresses"""
+    initial_porosity = 0.7
+    porosity_factor = 0.5 + 0.5 * (300 / params.filtration_pressure)
+    return np.linspace(initial_porosity, initial_porosity * porosity_factor, num_points)
+
+
+def ruth_fit(params: Params, volumes, t_over_v) -> RuthFit:
+    """
+    Fits a straight line to the Ruth plot and recovers the filtration resistances.
+
+    Parameters:
+    -----------
+    params : Params
+        Operating conditions and slurry properties
+    volumes : array-like
+        Filtrate volumes (m³), all positive
+    t_over_v : array-like
+        t/V values (s/m³)
+
+    Returns:
+    --------
+    RuthFit
+        Slope, intercept and the calculated cake and medium resistances
+    """
+    def linear_func(x, a, b):
+        return a * x + b
+
+    popt, _ = curve_fit(linear_func, volumes, t_over_v)
+    slope, intercept = popt
+    pressure_pa = params.filtration_pressure * 1000
+    return RuthFit(
+        slope=slope,
+        intercept=intercept,
+        specific_cake_resistance=2 * slope * params.filter_area**2 * pressure_pa / (params.filtrate_viscosity * params.slurry_concentration),
+        medium_resistance=intercept * params.filter_area * pressure_pa / params.filtrate_viscosity
+    )
+
+
+def pressure_effect(params: Params, pressures, test_time):
+    """Filtrate volume (m³) after ``test_time`` seconds at each filtration pressure (kPa)"""
+    return filtrate_volume(params, test_time, filtration_pressure=pressures)
+
+
+def concentration_effect(params: Params, concentrations, test_time):
+    """Filtrate volume (m³) after ``test_time`` seconds for each slurry concentration (kg/m³)"""
+    return filtrate_volume(params, test_time, slurry_concentration=concentrations,
+                           specific_cake_resistance=cake_resistance(params.filtration_pressure))
@@ -0,0 +1,145 @@
+"""
+Saponification Kinetics
+=======================
+
+Rate constant model shared by the reactor experiments for the reaction
+NaOH + CH₃COOC₂H₅ → CH₃COONa + C₂H₅OH.
+"""
+
+import numpy as np
+
+# Approximate values for educational purposes, based on the saponification of ethyl acetate
+K_REF = 0.11      # L/(mol·min) at the reference temperature
+E_R = 4500.0      # E/R value in Kelvin, where E is activation energy and R is gas constant
+T_REF = 308.15    # K (35°C)
+HEAT_OF_REACTION = -55000.0  # J/mol (exothermic)
+
+
+def rate_constant(temperature, k_ref=K_REF, e_r=E_R):
+    """
+    Calculates the rate constant using the Arrhenius equation.
+
+    Parameters:
+    -----------
+    temperature : float or numpy.ndarray
+        Reaction temperature (°C)
+    k_ref : float
+        Rate constant at the reference temperature (L/(mol·min))
+    e_r : float
+        Activation energy divided by the gas constant (K)
+
+    Returns:
+    --------
+    float or numpy.ndarray
+        Rate constant k (L/(mol·min))
+    """
+    temp_kelvin = np.add(temperature, 273.15)
+    return k_ref * np.exp(e_r * (1 / T_REF - 1 / temp_kelvin))
+
+
+def second_order_conc(conc_a0, conc_b0, k, t):
+    """
+    Concentration of A for the second-order reaction A + B → products, -dC_A/dt = k·C_A·C_B.
+
+    Uses the form C_A = C_A0 / (1 + C_B0·k·t·φ(x)) with x = (C_B0 - C_A0)·k·t and
+    φ(x) = expm1(x)/x, which is exact for equal feeds (φ = 1), continuous across
+    C_A0 = C_B0 and free of overflow: for large x, φ → inf and C_A → 0; for large -x,
+    C_A → C_A0 - C_B0.  All arguments broadcast against each other.
+
+    Parameters:
+    -----------
+    conc_a0 : float or numpy.ndarray
+        Initial concentration of A (mol/L)
+    conc_b0 : float or numpy.ndarray
+        Initial concentration of B (mol/L)
+    k : float or numpy.ndarray
+        Rate constant (L/(mol·min))
+    t : float or numpy.ndarray
+        Time (minutes)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Concentration of A (mol/L)
+    """
+    conc_a0, conc_b0, kt = np.broadcast_arrays(*(np.asarray(value, dtype=float)
+                                                 for value in (conc_a0, conc_b0, np.multiply(k, t))))
+    x = (conc_b0 - conc_a0) * kt
+    # expm1(x)/x loses nothing for small nonzero x; the series covers x = 0
+    small = np.abs(x) < 1e-8
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        phi = np.where(small, 1 + x / 2, np.expm1(x) / np.where(small, 1.0, x))
+    return conc_a0 / (1 + conc_b0 * kt * phi)
+
+
+def second_order_time(conc_a0, conc_b0, k, conversion):
+    """
+    Time for A to reach a fractional conversion in the second-order reaction A + B → products.
+
+    Inverts :func:`second_order_conc`: t = X / (k·C_B0·(1 - X))·ψ(y) with
+    y = X·(C_B0 - C_A0) / (C_B0·(1 - X)) and ψ(y) = log1p(y)/y, which is exact for equal
+    feeds (ψ = 1) and continuous across C_A0 = C_B0.  Zero conversion gives 0; conversions at
+    or beyond the stoichiometric limit min(1, C_B0/C_A0), including any with no B, are never
+    reached and give inf.  All arguments broadcast against each other.
+
+    Parameters:
+    -----------
+    conc_a0 : float or numpy.ndarray
+        Initial concentration of A (mol/L)
+    conc_b0 : float or numpy.ndarray
+        Initial concentration of B (mol/L)
+    k : float or numpy.ndarray
+        Rate constant (L/(mol·min))
+    conversion : float or numpy.ndarray
+        Target conversion of A (fraction, 0 to 1)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Time (minutes)
+    """
+    conc_a0, conc_b0, k, conversion = np.broadcast_arrays(*(np.asarray(value, dtype=float)
+                                                          for value in (conc_a0, conc_b0, k, conversion)))
+    # No conversion takes no time; without B (or beyond its supply) the target is never reached
+    started = conversion > 0
+    reachable = started & (conversion < 1) & (conversion * conc_a0 < conc_b0)
+    conversion = np.where(reachable, conversion, 0.5)
+    conc_b0 = np.where(reachable, conc_b0, 1.0)
+    y = conversion * (conc_b0 - conc_a0) / (conc_b0 * (1 - conversion))
+    # log1p(y)/y loses nothing for small nonzero y; the series covers y = 0
+    small = np.abs(y) < 1e-8
+    with np.errstate(divide='ignore', invalid='ignore'):
+        psi = np.where(small, 1 - y / 2, np.log1p(y) / np.where(small, 1.0, y))
+        time = conversion / (k * conc_b0 * (1 - conversion)) * psi
+    return np.where(reachable, time, np.where(started, np.inf, 0.0))
+
+
+def second_order_cstr_conversion(conc_a0, conc_b0, k, residence_time):
+    """
+    Steady-state conversion of A in a CSTR for the second-order reaction A + B → products.
+
+    The design equation X = k·τ·C_A0·(1 - X)·(M - X) with M = C_B0/C_A0 is a quadratic in X
+    whose physical root is X = 2q / (b + √(b² - 4pq)) with p = k·τ·C_A0, q = k·τ·C_B0 and
+    b = 1 + p + q.  The discriminant is evaluated as (p - q)² + 2(p + q) + 1, so neither
+    form suffers cancellation, and the result is exact for equal feeds and for τ → 0.  All
+    arguments broadcast against each other.
+
+    Parameters:
+    -----------
+    conc_a0 : float or numpy.ndarray
+        Feed concentration of A (mol/L)
+    conc_b0 : float or numpy.ndarray
+        Feed concentration of B (mol/L)
+    k : float or numpy.ndarray
+        Rate constant (L/(mol·min))
+    residence_time : float or numpy.ndarray
+        Residence time τ (minutes)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Fractional conversion of A
+    """
+    ktau = np.multiply(k, residence_time)
+    p, q = np.multiply(ktau, conc_a0), np.multiply(ktau, conc_b0)
+    return 2 * q / (1 + p + q + np.sqrt((p - q)**2 + 2 * (p + q) + 1))
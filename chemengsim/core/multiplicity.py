@@ -0,0 +1,379 @@
+"""
+Steady-State Multiplicity of the Non-isothermal CSTR
+====================================================
+
+Steady states, their stability and their branches for the cooled CSTR, whose temperature
+follows from the coupled material and energy balances
+
+    0 = (C_feed - C)/τ + S·r(C, T)
+    0 = (T_feed - T)/τ - ΔH·r(C, T)/(ρc_p) - UA·(T - T_c)/(V·ρc_p)
+
+:func:`steady_states` finds every steady state at one operating point from the van Heerden
+diagram: the heat generated by the reaction and the heat removed by the outflow and the
+coolant, both as functions of the reactor temperature, cross at the steady states.  Each
+crossing is refined by Newton iterations on the full balances and classified by the
+eigenvalues of their Jacobian, which is also the Jacobian of the dynamic balances.
+
+:func:`continuation` follows the steady states as the coolant temperature, the residence
+time or the feed concentration (both reactants in proportion) varies, by pseudo-arclength
+continuation, so the branches turn around limit points (ignition and extinction) instead
+of stopping there.  Branches
+are cached independently of the current value of the varied parameter, so moving it only
+moves the operating point along the cached curves.
+"""
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from chemengsim.core import reactions
+from chemengsim.core.cache import memoize
+from chemengsim.core.cstr import Params
+
+# Parameters continuation() can vary -> axis label
+CONTINUATION_PARAMETERS = {
+    'coolant_temp': 'Coolant Temperature (°C)',
+    'residence_time': 'Residence Time (minutes)',
+    'feed_conc': 'NaOH Feed Concentration (mol/L), Ethyl Acetate in Proportion',
+}
+
+
+@dataclass(frozen=True)
+class ThermalParams:
+    """Feed temperature, heat capacity and temperature sensitivity of the non-isothermal CSTR"""
+    feed_temp: float = 25.0            # °C
+    heat_capacity: float = 4184.0      # J/(L·K) of the mixture and the feed (water)
+    activation_factor: float = 1.0     # multiplies every activation energy, for more sensitive reactions
+
+
+@dataclass(frozen=True)
+class SteadyStates:
+    """van Heerden diagram and steady states computed by :func:`steady_states`"""
+    temperatures: np.ndarray           # °C, temperature axis of the diagram
+    heat_generation: np.ndarray        # J/min, with the material balance solved at each temperature
+    heat_removal: np.ndarray           # J/min, by the outflow and the coolant
+    temperature: np.ndarray            # °C, one entry per steady state in increasing order
+    conversion: np.ndarray             # % of NaOH
+    concentrations: np.ndarray         # every species of the network, shape (n_species, n_states)
+    stable: np.ndarray                 # bool
+    max_real_eigenvalue: np.ndarray    # 1/min; negative when stable
+
+
+@dataclass(frozen=True)
+class Branches:
+    """
+    Steady-state branches computed by :func:`continuation`.
+
+    The points of all branches are concatenated; ``branch`` numbers the branch of each
+    point.  Limit and Hopf points are indices into the point arrays.
+    """
+    values: np.ndarray                 # of the varied parameter
+    temperature: np.ndarray            # °C
+    conversion: np.ndarray             # % of NaOH
+    stable: np.ndarray                 # bool
+    max_real_eigenvalue: np.ndarray    # 1/min
+    branch: np.ndarray                 # int
+    limit_points: np.ndarray           # int, turning points of the parameter (ignition, extinction)
+    hopf_points: np.ndarray            # int, stability changes through a complex eigenvalue pair
+
+
+class _Balances:
+    """Steady-state residual of the coupled balances, its Jacobian and its parameter derivative"""
+
+    def __init__(self, params, thermal, parameter=None):
+        self.network = params.network.activation_scaled(thermal.activation_factor)
+        self.n_species = len(self.network.species)
+        self.naoh = self.network.index('NaOH')
+        self.volume = params.reactor_volume
+        self.feed_temp = thermal.feed_temp
+        self.heat_capacity = thermal.heat_capacity
+        self.ua = params.overall_heat_transfer * params.heat_transfer_area * 60  # J/(min·K)
+        self.heats = self.network.heats_of_reaction
+        self.params = params
+        self.parameter = parameter
+
+    def conditions(self, value=None):
+        """Residence time, feed concentrations and coolant temperature, with the parameter at ``value``"""
+        params = self.params if value is None else _with_parameter(self.params, self.parameter, value)
+        feed = self.network.vector({'NaOH': params.feed_conc_naoh, 'EtOAc': params.feed_conc_ea})
+        return self.volume / params.feed_flow_rate, feed, params.coolant_temp
+
+    def residual(self, state, value=None):
+        conc, temperature = state[:self.n_species], state[self.n_species]
+        tau, feed, coolant_temp = self.conditions(value)
+        rates = self.network.rates(conc, temperature)
+        heating = -(self.heats @ rates) - self.ua / self.volume * (temperature - coolant_temp)
+        return np.append((feed - conc) / tau + self.network.stoichiometry @ rates,
+                         (self.feed_temp - temperature) / tau + heating / self.heat_capacity)
+
+    def jacobian(self, state, value=None):
+        """Derivatives of :meth:`residual` with respect to the state"""
+        n = self.n_species
+        conc, temperature = state[:n], state[n]
+        tau = self.conditions(value)[0]
+        rate_jacobian = self.network.rate_jacobian(conc, temperature)
+        rate_derivative = self.network.rate_temperature_derivative(conc, temperature)
+        matrix = np.empty((n + 1, n + 1))
+        matrix[:n, :n] = self.network.stoichiometry @ rate_jacobian - np.eye(n) / tau
+        matrix[:n, n] = self.network.stoichiometry @ rate_derivative
+        matrix[n, :n] = -(self.heats @ rate_jacobian) / self.heat_capacity
+        matrix[n, n] = -1 / tau + (-(self.heats @ rate_derivative) - self.ua / self.volume) / self.heat_capacity
+        return matrix
+
+    def parameter_derivative(self, state, value):
+        """Derivative of :meth:`residual` with respect to the varied parameter"""
+        n = self.n_species
+        tau, feed, _ = self.conditions(value)
+        derivative = np.zeros(n + 1)
+        if self.parameter == 'coolant_temp':
+            derivative[n] = self.ua / (self.volume * self.heat_capacity)
+        elif self.parameter == 'residence_time':
+            derivative[:n] = -(feed - state[:n]) / tau**2
+            derivative[n] = -(self.feed_temp - state[n]) / tau**2
+        else:
+            # Both feeds scale with the NaOH feed concentration
+            derivative[:n] = feed / (feed[self.naoh] * tau)
+        return derivative
+
+    def newton(self, state, value=None, tol=1e-10, max_iter=50):
+        """Steady state near ``state`` with the parameter held at ``value``; None if not converged"""
+        scale = self.scale()
+        for _ in range(max_iter):
+            step = np.linalg.solve(self.jacobian(state, value), -self.residual(state, value))
+            state = state + step
+            if np.all(np.abs(step) <= tol * scale):
+                return state
+        return None
+
+    def scale(self, value=None):
+        """Typical magnitudes of the concentrations and the temperature"""
+        feed = self.conditions(value)[1]
+        return np.append(np.full(self.n_species, max(feed.max(), 1e-12)), 10.0)
+
+    def classify(self, state, value=None):
+        """Largest real part of the eigenvalues of the Jacobian (1/min)"""
+        return np.linalg.eigvals(self.jacobian(state, value)).real.max()
+
+    def conversion(self, state, value=None):
+        feed = self.conditions(value)[1]
+        return 100 * (1 - state[self.naoh] / feed[self.naoh])
+
+
+@memoize
+def steady_states(params: Params, thermal: ThermalParams, num_points=2000) -> SteadyStates:
+    """
+    Finds every steady state of the cooled CSTR and its stability.
+
+    Every steady state lies between the lower of the feed and coolant temperatures and
+    the higher one plus the adiabatic temperature rise, where the heat generation and
+    removal curves are sampled; their crossings are refined by Newton iterations on the
+    coupled balances.
+
+    Parameters:
+    -----------
+    params : Params
+        Feed, reactor and heat-exchange parameters; ``temperature`` is not used, since the
+        reactor temperature follows from the energy balance
+    thermal : ThermalParams
+        Feed temperature, heat capacity and activation energy factor
+    num_points : int
+        Number of temperatures in the van Heerden diagram
+
+    Returns:
+    --------
+    SteadyStates
+        Heat generation and removal curves and the steady states in increasing temperature
+    """
+    balances = _Balances(params, thermal)
+    network = balances.network
+    tau, feed, coolant_temp = balances.conditions()
+    flow_rate = params.feed_flow_rate
+
+    low = min(thermal.feed_temp, coolant_temp)
+    rise = np.maximum(-network.heats_of_reaction, 0).sum() * feed.max() / thermal.heat_capacity
+    temperatures = np.linspace(low - 1, max(thermal.feed_temp, coolant_temp) + rise + 1, num_points)
+
+    # Material balance at every temperature of the diagram at once
+    concentrations = reactions.stirred_tank(network, feed, tau, temperatures)
+    heat_generation = -(network.heats_of_reaction @ network.rates(concentrations, temperatures)) * params.reactor_volume
+    heat_removal = (thermal.heat_capacity * flow_rate * (temperatures - thermal.feed_temp)
+                    + balances.ua * (temperatures - coolant_temp))
+
+    # Crossings of the two curves, refined on the full balances
+    excess = heat_generation - heat_removal
+    crossings = np.nonzero(np.sign(excess[:-1]) * np.sign(excess[1:]) <= 0)[0]
+    states = []
+    for i in crossings:
+        fraction = excess[i] / (excess[i] - excess[i + 1]) if excess[i] != excess[i + 1] else 0.0
+        guess = np.append(concentrations[:, i] + fraction * (concentrations[:, i + 1] - concentrations[:, i]),
+                          temperatures[i] + fraction * (temperatures[i + 1] - temperatures[i]))
+        state = balances.newton(guess)
+        if state is not None and not any(np.allclose(state, other, rtol=1e-8, atol=1e-8) for other in states):
+            states.append(state)
+    states = np.array(sorted(states, key=lambda state: state[-1])).reshape(-1, balances.n_species + 1).T
+    max_real = np.array([balances.classify(state) for state in states.T])
+
+    return SteadyStates(
+        temperatures=temperatures,
+        heat_generation=heat_generation,
+        heat_removal=heat_removal,
+        temperature=states[-1],
+        conversion=np.array([balances.conversion(state) for state in states.T]),
+        concentrations=states[:-1],
+        stable=max_real < 0,
+        max_real_eigenvalue=max_real
+    )
+
+
+def continuation(params: Params, thermal: ThermalParams, parameter, low, high, max_points=2000) -> Branches:
+    """
+    Follows the steady states of the cooled CSTR over a range of one parameter.
+
+    Every steady state at either end of the range starts a branch, traced by
+    pseudo-arclength continuation into the range; branches that come back to a starting
+    state are traced once.  Branches that touch neither end (isolas) are not found.  The
+    value of ``parameter`` in ``params`` is ignored, so the branches are computed once for
+    the whole range.
+
+    Parameters:
+    -----------
+    params : Params
+        Feed, reactor and heat-exchange parameters
+    thermal : ThermalParams
+        Feed temperature, heat capacity and activation energy factor
+    parameter : str
+        One of :data:`CONTINUATION_PARAMETERS`
+    low, high : float
+        Range of the parameter
+    max_points : int
+        Maximum number of points over all branches
+
+    Returns:
+    --------
+    Branches
+        Temperature, conversion and stability along every branch
+
+    Raises:
+    -------
+    ValueError
+        If ``parameter`` cannot be varied or the range is empty
+    """
+    if parameter not in CONTINUATION_PARAMETERS:
+        raise ValueError("cannot vary %r; choose one of %s" % (parameter, ', '.join(CONTINUATION_PARAMETERS)))
+    if not low < high:
+        raise ValueError("empty parameter range [%g, %g]" % (low, high))
+    # Branches over the range do not depend on the current value of the varied parameter
+    params = _with_parameter(params, parameter, low)
+    return _trace_branches(params, thermal, parameter, float(low), float(high), max_points)
+
+
+@memoize
+def _trace_branches(params, thermal, parameter, low, high, max_points):
+    """Pseudo-arclength continuation from the steady states at both ends of the range"""
+    balances = _Balances(params, thermal, parameter)
+    # Arclength is measured in scaled variables, the parameter range mapping to 1
+    scale = np.append(np.maximum(balances.scale(low), balances.scale(high)), high - low)
+    size = len(scale)
+
+    def augmented_jacobian(x):
+        state, value = x[:-1], x[-1]
+        return np.column_stack([balances.jacobian(state, value), balances.parameter_derivative(state, value)])
+
+    def tangent(x, previous):
+        # Null vector of [F_x F_λ] in scaled variables, oriented along the previous tangent
+        matrix = np.vstack([augmented_jacobian(x) * scale, previous])
+        direction = np.linalg.solve(matrix, np.append(np.zeros(size - 1), 1.0))
+        return direction / np.linalg.norm(direction)
+
+    def corrector(predicted, direction):
+        # Newton on F = 0 and the hyperplane through the prediction normal to the tangent
+        z = predicted.copy()
+        for iteration in range(8):
+            x = z * scale
+            residual = np.append(balances.residual(x[:-1], x[-1]), direction @ (z - predicted))
+            matrix = np.vstack([augmented_jacobian(x) * scale, direction])
+            step = np.linalg.solve(matrix, -residual)
+            z = z + step
+            if np.abs(step).max() < 1e-10:
+                return z, iteration + 1
+        return None, None
+
+    def trace(start, value, sign):
+        """Points of one branch from a steady state at an end of the range"""
+        z = np.append(start, value) / scale
+        previous = np.zeros(size)
+        previous[-1] = sign
+        direction = tangent(z * scale, previous)
+        points, step = [z], 0.01
+        while len(points) < max_points:
+            candidate, iterations = corrector(points[-1] + step * direction, direction)
+            if candidate is None:
+                step /= 2
+                if step < 1e-7:
+                    break
+                continue
+            value = candidate[-1] * scale[-1]
+            if not low <= value <= high:
+                # Finish on the end of the range
+                boundary = high if value > high else low
+                fraction = (boundary / scale[-1] - points[-1][-1]) / (candidate[-1] - points[-1][-1])
+                state = balances.newton((points[-1] + fraction * (candidate - points[-1]))[:-1] * scale[:-1], boundary)
+                if state is not None:
+                    points.append(np.append(state, boundary) / scale)
+                break
+            points.append(candidate)
+            direction = tangent(candidate * scale, direction)
+            step = min(step * (1.5 if iterations <= 3 else 1.0), 0.05)
+        return np.array(points) * scale
+
+    starts = [(state, low, 1.0) for state in _end_states(params, thermal, parameter, low)]
+    starts += [(state, high, -1.0) for state in _end_states(params, thermal, parameter, high)]
+    traced, branches = [], []
+    for state, value, sign in starts:
+        if any(np.allclose(np.append(state, value), end, rtol=1e-6, atol=1e-9) for end in traced):
+            continue
+        points = trace(state, value, sign)
+        branches.append(points)
+        traced.append(points[-1])
+        if len(points) >= max_points:
+            break
+
+    points = np.concatenate(branches) if branches else np.empty((0, size))
+    branch = np.concatenate([np.full(len(points), i) for i, points in enumerate(branches)]).astype(int)
+    max_real = np.array([balances.classify(x[:-1], x[-1]) for x in points])
+    stable = max_real < 0
+
+    # Limit points where the parameter turns, Hopf points where stability changes elsewhere
+    same = branch[1:] == branch[:-1]
+    change = np.diff(points[:, -1])
+    turns = same[1:] & same[:-1] & (change[1:] * change[:-1] < 0)
+    limit_points = np.nonzero(turns)[0] + 1
+    hopf = same & (stable[1:] != stable[:-1])
+    hopf[limit_points] = hopf[limit_points - 1] = False
+    hopf_points = np.nonzero(hopf)[0]
+
+    return Branches(
+        values=points[:, -1],
+        temperature=points[:, -2],
+        conversion=np.array([balances.conversion(x[:-1], x[-1]) for x in points]),
+        stable=stable,
+        max_real_eigenvalue=max_real,
+        branch=branch,
+        limit_points=limit_points,
+        hopf_points=hopf_points
+    )
+
+
+def _with_parameter(params, parameter, value):
+    """CSTR parameters with a continuation parameter set to ``value``"""
+    if parameter == 'residence_time':
+        return replace(params, feed_flow_rate=params.reactor_volume / value)
+    if parameter == 'feed_conc':
+        return replace(params, feed_conc_naoh=value, feed_conc_ea=value * params.feed_conc_ea / params.feed_conc_naoh)
+    return replace(params, **{parameter: value})
+
+
+def _end_states(params, thermal, parameter, value):
+    """Steady states with the parameter at ``value``, as concentrations followed by the temperature"""
+    states = steady_states(_with_parameter(params, parameter, value), thermal)
+    return list(np.vstack([states.concentrations, states.temperature]).T)
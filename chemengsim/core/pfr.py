@@ -0,0 +1,198 @@
+"""
+Isothermal PFR Model
+====================
+
+Conversion and concentration profiles along a straight or coiled plug flow reactor for the
+saponification of ethyl acetate.  The isothermal constant-density PFR is integrated as a
+:mod:`~chemengsim.core.reactions` batch reactor in space time.
+
+Earlier versions divided dX/dz by the tube length although z is dimensionless, which
+understated the conversion by that factor (0.035 % instead of 0.172 % for the default
+straight tube); the space-time integration has no such factor.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from chemengsim.core import kinetics, reactions
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+STRAIGHT_TUBE = "Straight Tube"
+COILED_TUBE = "Coiled Tube"
+
+
+@dataclass(frozen=True)
+class Params:
+    """Feed, tube geometry and operating conditions of the PFR"""
+    pfr_type: str = STRAIGHT_TUBE
+    feed_flow_rate: float = 1.0      # L/min
+    feed_conc_naoh: float = 0.01     # mol/L
+    feed_conc_ea: float = 0.01       # mol/L
+    tube_diameter: float = 2.0       # cm
+    tube_length: float = 5.0         # m
+    coil_diameter: float = 20.0      # cm (coiled tube only)
+    number_of_turns: int = 10        # coiled tube only
+    temperature: float = 35.0        # °C
+    num_points: int = 100
+    network: reactions.Network = reactions.SAPONIFICATION
+
+
+@dataclass(frozen=True)
+class Result:
+    """Axial profiles computed by :func:`simulate`"""
+    k: float
+    reactor_volume: float
+    residence_time: float
+    z_points: np.ndarray
+    length_points: np.ndarray
+    conversion: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    reaction_rates: np.ndarray
+    concentrations: np.ndarray       # every species of the network, shape (n_species, num_points)
+    dean: Optional[float] = None
+    mixing_enhancement: Optional[float] = None
+
+    @property
+    def final_conversion(self):
+        """Fractional conversion at the reactor outlet"""
+        return self.conversion[-1]
+
+    @timing.timed('tabulate.pfr.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the profiles with the column names used for CSV download"""
+        return pd.DataFrame({
+            'Length (m)': self.length_points,
+            'Position (dimensionless)': self.z_points,
+            'Conversion': self.conversion,
+            'NaOH Concentration (mol/L)': self.conc_naoh,
+            'Ethyl Acetate Concentration (mol/L)': self.conc_ea,
+            'Products Concentration (mol/L)': self.conc_products
+        })
+
+
+@dataclass(frozen=True)
+class CstrComparison:
+    """PFR and CSTR conversions of the same volume over a residence-time range"""
+    cstr_conversion: float
+    residence_times: np.ndarray
+    pfr_conversions: np.ndarray
+    cstr_conversions: np.ndarray
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Integrates the PFR design equation along the tube.
+
+    Parameters:
+    -----------
+    params : Params
+        Feed, tube geometry and operating conditions
+
+    Returns:
+    --------
+    Result
+        Rate constant, reactor volume and axial profiles
+    """
+    feed_conc_naoh = params.feed_conc_naoh
+    feed_conc_ea = params.feed_conc_ea
+    tube_length = params.tube_length
+
+    # Calculate reactor volume
+    tube_radius = params.tube_diameter / 2 / 100  # convert cm to m
+    tube_cross_area = np.pi * tube_radius**2  # m²
+    reactor_volume = tube_cross_area * tube_length * 1000  # L
+    residence_time = reactor_volume / params.feed_flow_rate  # minutes
+
+    network = params.network
+    k = float(network.rate_constants(params.temperature)[0][0])
+
+    dean = None
+    mixing_enhancement = None
+    if params.pfr_type == COILED_TUBE:
+        # Calculate Dean number for flow characterization
+        density = 1000  # kg/m³ (water approximation)
+        viscosity = 0.001  # Pa·s (water approximation)
+        velocity = params.feed_flow_rate / (60 * tube_cross_area)  # m/s
+        reynolds = density * velocity * (params.tube_diameter/100) / viscosity
+        dean = reynolds * np.sqrt((params.tube_diameter/100) / (params.coil_diameter/100))
+
+        # Secondary flows in coiled tubes enhance mixing
+        if dean < 100:
+            mixing_enhancement = 1.0
+        else:
+            mixing_enhancement = 1.0 + 0.1 * np.log10(dean/100)
+        k = k * mixing_enhancement
+        network = network.scaled(mixing_enhancement)
+
+    # Integrate along the dimensionless length z = τ/τ_total from the feed at the inlet; the
+    # space time already carries the tube length, so dX/dz is not divided by it again
+    z_points = np.linspace(0, 1, params.num_points)
+    feed_conc = network.vector({'NaOH': feed_conc_naoh, 'EtOAc': feed_conc_ea})
+    solution = reactions.batch(network, feed_conc, z_points * residence_time, params.temperature)
+    concentrations = solution.conc
+
+    # Conversion and consumption rate of the limiting reactant
+    limiting = network.index('NaOH' if feed_conc_naoh <= feed_conc_ea else 'EtOAc')
+    conversion = 1 - concentrations[limiting] / feed_conc[limiting]
+    reaction_rates = -network.production(concentrations, params.temperature)[limiting]
+
+    return Result(
+        k=k,
+        reactor_volume=reactor_volume,
+        residence_time=residence_time,
+        z_points=z_points,
+        length_points=z_points * tube_length,
+        conversion=conversion,
+        conc_naoh=concentrations[network.index('NaOH')],
+        conc_ea=concentrations[network.index('EtOAc')],
+        # Products formed from the limiting reactant consumed
+        conc_products=feed_conc[limiting] * conversion,
+        reaction_rates=reaction_rates,
+        concentrations=concentrations,
+        dean=dean,
+        mixing_enhancement=mixing_enhancement
+    )
+
+
+def compare_with_cstr(params: Params, result: Result, num_points=50) -> CstrComparison:
+    """
+    Compares PFR conversion with a CSTR of the same volume.
+
+    Parameters:
+    -----------
+    params : Params
+        Feed and operating conditions
+    result : Result
+        PFR simulation result for ``params``
+    num_points : int
+        Number of residence times in the comparison curve
+
+    Returns:
+    --------
+    CstrComparison
+        CSTR conversion at the current residence time and comparison curves
+    """
+    k = result.k
+    feed_conc_naoh = params.feed_conc_naoh
+    feed_conc_ea = params.feed_conc_ea
+    residence_time = result.residence_time
+
+    # Exact second-order conversions of both ideal reactors
+    X_cstr = float(kinetics.second_order_cstr_conversion(feed_conc_naoh, feed_conc_ea, k, residence_time))
+    residence_times = np.linspace(0.1, residence_time*2, num_points)
+    cstr_conversions = kinetics.second_order_cstr_conversion(feed_conc_naoh, feed_conc_ea, k, residence_times)
+    pfr_conversions = 1 - kinetics.second_order_conc(feed_conc_naoh, feed_conc_ea, k, residence_times) / feed_conc_naoh
+
+    return CstrComparison(
+        cstr_conversion=X_cstr,
+        residence_times=residence_times,
+        pfr_conversions=pfr_conversions * 100,
+        cstr_conversions=cstr_conversions * 100
+    )
@@ -0,0 +1,793 @@
+"""
+Reaction Networks
+=================
+
+Mass-action reaction networks shared by the reactor models.
+
+A :class:`Network` lists its species and :class:`Reaction` steps; the stoichiometric
+matrix and reaction orders are assembled once, so rates, net production rates and their
+analytic Jacobians are dense array operations over any number of states.  Concentration
+arrays have the species on the first axis, shape (n_species, ...), and every trailing axis
+is broadcast, e.g. a whole grid of states is evaluated at once.
+
+Reversible, series and parallel schemes need no new ODE code::
+
+    series = Network(species=('A', 'B', 'C'), reactions=(
+        Reaction({'A': 1}, {'B': 1}, k_ref=0.5),
+        Reaction({'B': 1}, {'C': 1}, k_ref=0.2)))
+
+The reactor solvers (:func:`batch`, :func:`jacketed_batch`, :func:`semi_batch`,
+:func:`feed_segment`, :func:`stacked_semi_batch`, :func:`stacked_cooled_semi_batch`,
+:func:`stirred_tank`, :func:`stirred_tank_transient`) pass the analytic Jacobian to
+implicit (or stiffness-switching) methods, so stiff networks solve efficiently.  An
+isothermal constant-density PFR is a batch reactor in space time.
+"""
+
+from dataclasses import dataclass, replace
+from functools import cached_property
+from typing import Optional
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from chemengsim.core import kinetics
+
+
+@dataclass(frozen=True)
+class Reaction:
+    """One reaction step with mass-action kinetics, optionally reversible"""
+    reactants: dict                  # species -> stoichiometric coefficient
+    products: dict
+    k_ref: float                     # forward rate constant at T_REF
+    e_r: float = 0.0                 # forward E/R (K)
+    k_ref_reverse: float = 0.0       # reverse rate constant at T_REF; 0 if irreversible
+    e_r_reverse: float = 0.0         # reverse E/R (K)
+    orders: Optional[dict] = None    # forward orders; the reactant coefficients by default
+    heat_of_reaction: float = 0.0    # J/mol of reaction (negative if exothermic)
+
+
+@dataclass(frozen=True)
+class Network:
+    """Species and reaction steps of a mass-action network"""
+    species: tuple
+    reactions: tuple
+
+    def __post_init__(self):
+        unknown = {name for reaction in self.reactions
+                   for name in (*reaction.reactants, *reaction.products, *(reaction.orders or {}))} - set(self.species)
+        if unknown:
+            raise ValueError(f"Reactions use undeclared species: {', '.join(sorted(unknown))}")
+
+    def index(self, species):
+        """Row of a species in concentration arrays"""
+        return self.species.index(species)
+
+    def vector(self, concentrations):
+        """Concentration array from a mapping of species to values; other species are 0"""
+        conc = np.zeros(len(self.species))
+        for name, value in concentrations.items():
+            conc[self.index(name)] = value
+        return conc
+
+    def _matrix(self, attribute):
+        matrix = np.zeros((len(self.reactions), len(self.species)))
+        for j, reaction in enumerate(self.reactions):
+            for name, value in attribute(reaction).items():
+                matrix[j, self.index(name)] = value
+        return matrix
+
+    @cached_property
+    def stoichiometry(self):
+        """Stoichiometric matrix of shape (n_species, n_reactions)"""
+        return (self._matrix(lambda reaction: reaction.products)
+                - self._matrix(lambda reaction: reaction.reactants)).T
+
+    @cached_property
+    def forward_orders(self):
+        """Reaction orders of the forward steps, shape (n_reactions, n_species)"""
+        return self._matrix(lambda reaction: reaction.reactants if reaction.orders is None else reaction.orders)
+
+    @cached_property
+    def reverse_orders(self):
+        """Reaction orders of the reverse steps, shape (n_reactions, n_species)"""
+        return self._matrix(lambda reaction: reaction.products)
+
+    @cached_property
+    def _orders(self):
+        """Forward and reverse orders stacked, shape (2, n_reactions, n_species)"""
+        return np.stack([self.forward_orders, self.reverse_orders])
+
+    def rate_constants(self, temperature):
+        """
+        Forward and reverse rate constants.
+
+        Parameters:
+        -----------
+        temperature : float or numpy.ndarray
+            Temperature (°C)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Rate constants of shape (2, n_reactions) + temperature shape; the reverse
+            constants of irreversible steps are 0
+        """
+        temperature = np.asarray(temperature, dtype=float)
+        k_ref, e_r = (np.array([[getattr(reaction, name + suffix) for reaction in self.reactions]
+                                for suffix in ('', '_reverse')]).reshape((2, -1) + (1,) * temperature.ndim)
+                      for name in ('k_ref', 'e_r'))
+        return kinetics.rate_constant(temperature, k_ref, e_r)
+
+    def scaled(self, factor):
+        """Network with every rate constant multiplied by ``factor``"""
+        return replace(self, reactions=tuple(replace(reaction, k_ref=reaction.k_ref * factor,
+                                                     k_ref_reverse=reaction.k_ref_reverse * factor)
+                                             for reaction in self.reactions))
+
+    def activation_scaled(self, factor):
+        """Network with every activation energy multiplied by ``factor``, the rate constants at T_REF unchanged"""
+        return replace(self, reactions=tuple(replace(reaction, e_r=reaction.e_r * factor,
+                                                     e_r_reverse=reaction.e_r_reverse * factor)
+                                             for reaction in self.reactions))
+
+    def _mass_action(self, conc, temperature, k):
+        """
+        Concentrations, rate constants and orders shaped to broadcast against each other,
+        and the factors C_i^order of shape (2, n_reactions, n_species, ...)
+        """
+        conc = np.asarray(conc, dtype=float)
+        if k is None:
+            k = self.rate_constants(temperature)
+        # Rate constants get singleton axes where the states have more axes than the temperature
+        ndim = max(conc.ndim - 1, k.ndim - 2)
+        k = k.reshape(k.shape[:2] + (1,) * (ndim - k.ndim + 2) + k.shape[2:])
+        orders = self._orders.reshape(self._orders.shape + (1,) * (conc.ndim - 1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors = conc ** orders
+        return conc, k, orders, factors
+
+    def rates(self, conc, temperature=None, k=None):
+        """
+        Net rates of every reaction step.
+
+        Parameters:
+        -----------
+        conc : numpy.ndarray
+            Concentrations (mol/L) of shape (n_species, ...)
+        temperature : float or numpy.ndarray
+            Temperature (°C), broadcast with the trailing axes of ``conc``
+        k : numpy.ndarray, optional
+            Rate constants from :meth:`rate_constants`, used instead of ``temperature`` so
+            solvers at a fixed temperature evaluate them only once
+
+        Returns:
+        --------
+        numpy.ndarray
+            Rates (mol/(L·min)) of shape (n_reactions, ...)
+        """
+        _, k, _, factors = self._mass_action(conc, temperature, k)
+        forward, reverse = k * factors.prod(axis=2)
+        return forward - reverse
+
+    def rate_jacobian(self, conc, temperature=None, k=None):
+        """Derivatives of :meth:`rates` with respect to ``conc``, shape (n_reactions, n_species, ...)"""
+        conc, k, orders, factors = self._mass_action(conc, temperature, k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            derivatives = np.where(orders == 0, 0.0, orders * conc ** (orders - 1))
+        # Products over the species before and after each one, so zero factors are never divided by
+        ones = np.ones_like(factors[:, :, :1])
+        before = np.cumprod(np.concatenate([ones, factors[:, :, :-1]], axis=2), axis=2)
+        after = np.cumprod(np.concatenate([ones, factors[:, :, :0:-1]], axis=2), axis=2)[:, :, ::-1]
+        forward, reverse = k[:, :, np.newaxis] * derivatives * before * after
+        return forward - reverse
+
+    def production(self, conc, temperature=None, k=None):
+        """Net production rate of every species, shape (n_species, ...)"""
+        return np.tensordot(self.stoichiometry, self.rates(conc, temperature, k), axes=1)
+
+    def jacobian(self, conc, temperature=None, k=None):
+        """Derivatives of :meth:`production` with respect to ``conc``, shape (n_species, n_species, ...)"""
+        return np.tensordot(self.stoichiometry, self.rate_jacobian(conc, temperature, k), axes=1)
+
+    def rate_temperature_derivative(self, conc, temperature):
+        """Derivatives of :meth:`rates` with respect to temperature, shape (n_reactions, ...)"""
+        _, k, _, factors = self._mass_action(conc, temperature, None)
+        e_r = np.array([[reaction.e_r for reaction in self.reactions],
+                        [reaction.e_r_reverse for reaction in self.reactions]])
+        # dk/dT = k·(E/R)/T²
+        dk = k * e_r.reshape(e_r.shape + (1,) * (k.ndim - 2)) / np.add(temperature, 273.15) ** 2
+        forward, reverse = dk * factors.prod(axis=2)
+        return forward - reverse
+
+    @cached_property
+    def heats_of_reaction(self):
+        """Heat of reaction of every step (J/mol), shape (n_reactions,)"""
+        return np.array([reaction.heat_of_reaction for reaction in self.reactions], dtype=float)
+
+
+SAPONIFICATION = Network(
+    species=('NaOH', 'EtOAc', 'NaOAc', 'EtOH'),
+    reactions=(Reaction({'NaOH': 1, 'EtOAc': 1}, {'NaOAc': 1, 'EtOH': 1}, k_ref=kinetics.K_REF, e_r=kinetics.E_R,
+                        heat_of_reaction=kinetics.HEAT_OF_REACTION),)
+)
+
+
+@dataclass(frozen=True)
+class Solution:
+    """Concentration (and volume) profiles computed by the reactor solvers"""
+    network: Network
+    t: np.ndarray                         # minutes
+    conc: np.ndarray                      # mol/L, shape (n_species, len(t))
+    volume: Optional[np.ndarray] = None   # L (semi-batch only)
+    temperature: Optional[np.ndarray] = None   # °C (non-isothermal only)
+    t_events: Optional[np.ndarray] = None      # times of the event (temperature maxima when non-isothermal)
+    temperature_events: Optional[np.ndarray] = None   # temperatures at the maxima (non-isothermal only)
+
+    def __getitem__(self, species):
+        return self.conc[self.network.index(species)]
+
+
+def batch(network, initial_conc, t_eval, temperature, event=None, method='LSODA', rtol=1e-8,
+          atol=1e-12) -> Solution:
+    """
+    Integrates an isothermal constant-volume batch reactor, dC/dt = S·r(C).
+
+    With ``t_eval`` in space time (V/Q) this is also the isothermal constant-density PFR.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network
+    initial_conc : numpy.ndarray
+        Initial concentrations (mol/L) of shape (n_species,)
+    t_eval : numpy.ndarray
+        Increasing output times (minutes), starting at the initial time
+    temperature : float
+        Temperature (°C)
+    event : callable, optional
+        ``solve_ivp`` event function of (t, conc); its zero crossings are located on the
+        dense output during the same integration
+    method : str
+        ``solve_ivp`` method given the analytic Jacobian: 'LSODA' switches to BDF when the
+        network turns stiff; 'BDF' and 'Radau' are implicit throughout
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    Solution
+        Concentrations at ``t_eval`` and the times of the event
+    """
+    t_eval = np.asarray(t_eval, dtype=float)
+    k = network.rate_constants(temperature)
+    solution = solve_ivp(lambda t, conc: network.production(conc, k=k), (t_eval[0], t_eval[-1]),
+                         np.asarray(initial_conc, dtype=float), method=method, t_eval=t_eval,
+                         jac=lambda t, conc: network.jacobian(conc, k=k), events=event, rtol=rtol, atol=atol)
+    return Solution(network=network, t=solution.t, conc=solution.y,
+                    t_events=None if event is None else solution.t_events[0])
+
+
+def jacketed_batch(network, initial_conc, initial_temperature, volume, heat_capacity, ua, jacket_temperature,
+                   t_eval, method='Radau', rtol=1e-8, atol=1e-12) -> Solution:
+    """
+    Integrates a non-isothermal batch reactor with a cooling (or heating) jacket.
+
+    dC/dt = S·r(C, T), ρc_p·dT/dt = -ΔH·r(C, T) - UA·(T - T_j)/V
+
+    The Jacobian of the coupled balances, including the Arrhenius temperature
+    sensitivity, is supplied to the implicit integrator, so the stiff runaway-like
+    regimes at high concentrations do not collapse the step size.  Temperature maxima are
+    located by event detection where dT/dt changes sign from positive to negative.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network with heats of reaction
+    initial_conc : numpy.ndarray
+        Initial concentrations (mol/L) of shape (n_species,)
+    initial_temperature : float
+        Initial temperature (°C)
+    volume : float
+        Reaction volume (L)
+    heat_capacity : float
+        Volumetric heat capacity ρc_p of the mixture (J/(L·K))
+    ua : float
+        Jacket heat transfer coefficient times area (J/(min·K)); 0 for adiabatic operation
+    jacket_temperature : float
+        Jacket temperature (°C)
+    t_eval : numpy.ndarray
+        Increasing output times (minutes), starting at the initial time
+    method : str
+        Implicit ``solve_ivp`` method ('Radau' or 'BDF')
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    Solution
+        Concentrations and temperature at ``t_eval``, and the times and temperatures of the
+        temperature maxima
+    """
+    n_species = len(network.species)
+    heats = network.heats_of_reaction
+    ua_per_volume = ua / volume
+
+    def rhs(t, y):
+        conc, temperature = y[:n_species], y[n_species]
+        rates = network.rates(conc, temperature)
+        heating = -(heats @ rates) - ua_per_volume * (temperature - jacket_temperature)
+        return np.append(network.stoichiometry @ rates, heating / heat_capacity)
+
+    def jacobian(t, y):
+        conc, temperature = y[:n_species], y[n_species]
+        rate_jacobian = network.rate_jacobian(conc, temperature)
+        rate_derivative = network.rate_temperature_derivative(conc, temperature)
+        matrix = np.empty((n_species + 1, n_species + 1))
+        matrix[:n_species, :n_species] = network.stoichiometry @ rate_jacobian
+        matrix[:n_species, n_species] = network.stoichiometry @ rate_derivative
+        matrix[n_species, :n_species] = -(heats @ rate_jacobian) / heat_capacity
+        matrix[n_species, n_species] = (-(heats @ rate_derivative) - ua_per_volume) / heat_capacity
+        return matrix
+
+    def temperature_maximum(t, y):
+        return rhs(t, y)[n_species]
+
+    temperature_maximum.direction = -1
+
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.append(np.asarray(initial_conc, dtype=float), initial_temperature)
+    solution = solve_ivp(rhs, (t_eval[0], t_eval[-1]), y0, method=method, t_eval=t_eval, jac=jacobian,
+                         events=temperature_maximum, rtol=rtol, atol=atol)
+    return Solution(network=network, t=solution.t, conc=solution.y[:n_species], temperature=solution.y[n_species],
+                    t_events=solution.t_events[0], temperature_events=solution.y_events[0].reshape(-1, n_species + 1)[:, n_species])
+
+
+def semi_batch(network, initial_conc, initial_volume, feed_flow_rate, feed_conc, t_eval, temperature,
+               event=None, method='LSODA', rtol=1e-8, atol=1e-12) -> Solution:
+    """
+    Integrates an isothermal semi-batch reactor with a constant feed and no outflow.
+
+    dC/dt = S·r(C) + Q/V·(C_feed - C), dV/dt = Q
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network
+    initial_conc : numpy.ndarray
+        Concentrations of the initial charge (mol/L) of shape (n_species,)
+    initial_volume : float
+        Volume of the initial charge (L)
+    feed_flow_rate : float
+        Volumetric feed rate Q (L/min)
+    feed_conc : numpy.ndarray
+        Feed concentrations (mol/L) of shape (n_species,)
+    t_eval : numpy.ndarray
+        Increasing output times (minutes), starting at the initial time
+    temperature : float
+        Temperature (°C)
+    event : callable, optional
+        ``solve_ivp`` event function of (t, y) with y the concentrations followed by the
+        volume; its zero crossings are located on the dense output during the same integration
+    method : str
+        ``solve_ivp`` method given the analytic Jacobian: 'LSODA' switches to BDF when the
+        network turns stiff; 'BDF' and 'Radau' are implicit throughout
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    Solution
+        Concentrations and volume at ``t_eval`` and the times of the event
+    """
+    n_species = len(network.species)
+    rhs, jacobian = _semi_batch_equations(network, feed_flow_rate, feed_conc, temperature)
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.append(np.asarray(initial_conc, dtype=float), initial_volume)
+    solution = solve_ivp(rhs, (t_eval[0], t_eval[-1]), y0, method=method, t_eval=t_eval, jac=jacobian,
+                         events=event, rtol=rtol, atol=atol)
+    return Solution(network=network, t=solution.t, conc=solution.y[:n_species], volume=solution.y[n_species],
+                    t_events=None if event is None else solution.t_events[0])
+
+
+def feed_segment(network, initial_conc, initial_volume, t_span, feed_flow_rate, feed_conc, temperature,
+                 flow_ramp=0.0, events=None, first_step=None, method='LSODA', rtol=1e-8, atol=1e-12):
+    """
+    Integrates one segment of a semi-batch feed schedule with dense output.
+
+    The feed rate is Q(t) = Q_0 + ramp·(t - t_0) over the segment, so constant feeds,
+    pauses (Q = 0) and linear ramps are all one segment type.  Schedules chain segments,
+    each starting from the final state of the previous one; ``first_step`` carries the
+    last step size over so the solver does not restart from a tiny probing step.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network
+    initial_conc : numpy.ndarray
+        Concentrations at the start of the segment (mol/L) of shape (n_species,)
+    initial_volume : float
+        Volume at the start of the segment (L)
+    t_span : tuple of float
+        Start and end times t_0, t_1 of the segment (minutes)
+    feed_flow_rate : float
+        Feed rate Q_0 at the start of the segment (L/min)
+    feed_conc : numpy.ndarray
+        Feed concentrations (mol/L) of shape (n_species,)
+    temperature : float
+        Temperature (°C)
+    flow_ramp : float
+        Rate of change of the feed rate (L/min²)
+    events : callable or list of callable, optional
+        ``solve_ivp`` event functions of (t, y), y being the concentrations followed by the
+        volume; terminal events end the segment early
+    first_step : float, optional
+        Initial step size (minutes)
+    method : str
+        ``solve_ivp`` method given the analytic Jacobian
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    scipy.integrate.OdeResult
+        ``solve_ivp`` result whose ``sol`` is the dense output over the integrated part of
+        the segment
+    """
+    rhs, jacobian = _semi_batch_equations(network, feed_flow_rate, feed_conc, temperature, flow_ramp, t_span[0])
+    y0 = np.append(np.asarray(initial_conc, dtype=float), initial_volume)
+    return solve_ivp(rhs, t_span, y0, method=method, jac=jacobian, events=events, dense_output=True,
+                     first_step=first_step, rtol=rtol, atol=atol)
+
+
+def _semi_batch_equations(network, feed_flow_rate, feed_conc, temperature, flow_ramp=0.0, start_time=0.0):
+    """Right-hand side and Jacobian of the semi-batch balances with the feed rate Q_0 + ramp·(t - t_0)"""
+    n_species = len(network.species)
+    feed_conc = np.asarray(feed_conc, dtype=float)
+    k = network.rate_constants(temperature)
+    identity = np.eye(n_species)
+
+    def rhs(t, y):
+        conc, volume = y[:n_species], y[n_species]
+        flow = feed_flow_rate + flow_ramp * (t - start_time)
+        return np.append(network.production(conc, k=k) + flow / volume * (feed_conc - conc), flow)
+
+    def jacobian(t, y):
+        conc, volume = y[:n_species], y[n_species]
+        flow = feed_flow_rate + flow_ramp * (t - start_time)
+        matrix = np.zeros((n_species + 1, n_species + 1))
+        matrix[:n_species, :n_species] = network.jacobian(conc, k=k) - flow / volume * identity
+        matrix[:n_species, n_species] = -flow / volume**2 * (feed_conc - conc)
+        return matrix
+
+    return rhs, jacobian
+
+
+def stacked_semi_batch(network, initial_conc, initial_volume, feed_flow_rate, feed_conc, t_eval, temperature,
+                       rtol=1e-8, atol=1e-12) -> Solution:
+    """
+    Integrates many isothermal semi-batch scenarios as one stacked ODE system.
+
+    The states of all N scenarios form one array, evaluated by a vectorized right-hand
+    side, so a whole sweep is a single ``solve_ivp`` call instead of N.  The states are
+    ordered scenario by scenario, which makes the Jacobian banded with the width of one
+    scenario; LSODA gets it in packed banded form, so its implicit steps cost O(N) when
+    any scenario turns stiff.  LSODA controls the error in a weighted max norm, so every
+    scenario is as accurate as a separate :func:`semi_batch` solve.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network
+    initial_conc : numpy.ndarray
+        Concentrations of the initial charges (mol/L) of shape (n_species, N)
+    initial_volume : float or numpy.ndarray
+        Volumes of the initial charges (L), broadcast to (N,)
+    feed_flow_rate : float or numpy.ndarray
+        Volumetric feed rates Q (L/min), broadcast to (N,)
+    feed_conc : numpy.ndarray
+        Feed concentrations (mol/L) of shape (n_species, N) or (n_species,)
+    t_eval : numpy.ndarray
+        Increasing output times (minutes), starting at the initial time
+    temperature : float or numpy.ndarray
+        Temperatures (°C), broadcast to (N,)
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    Solution
+        Concentrations of shape (n_species, N, len(t_eval)) and volumes of shape
+        (N, len(t_eval))
+    """
+    n_species = len(network.species)
+    size = n_species + 1
+    initial_conc = np.asarray(initial_conc, dtype=float)
+    n = initial_conc.shape[1]
+    feed_conc = np.broadcast_to(np.asarray(feed_conc, dtype=float).reshape(n_species, -1), (n_species, n))
+    initial_volume, feed_flow_rate, temperature = (np.broadcast_to(np.asarray(value, dtype=float), (n,))
+                                                   for value in (initial_volume, feed_flow_rate, temperature))
+    k = network.rate_constants(temperature)
+
+    def rhs(t, y):
+        # Scenario-major states of shape (N, n_species + 1, m), m = 1 unless evaluated in batches
+        states = y.reshape(n, size, -1).transpose(1, 0, 2)
+        conc, volume = states[:n_species], states[n_species]
+        derivatives = np.empty_like(states)
+        derivatives[:n_species] = (network.production(conc, k=k[..., np.newaxis])
+                                   + feed_flow_rate[:, np.newaxis] / volume * (feed_conc[..., np.newaxis] - conc))
+        derivatives[n_species] = feed_flow_rate[:, np.newaxis]
+        return derivatives.transpose(1, 0, 2).reshape(y.shape)
+
+    packed_rows, packed_cols = _banded_blocks(size, n)
+    identity = np.eye(n_species)[:, :, np.newaxis]
+
+    def jacobian(t, y):
+        states = y.reshape(n, size).T
+        conc, volume = states[:n_species], states[n_species]
+        blocks = np.zeros((size, size, n))
+        blocks[:n_species, :n_species] = network.jacobian(conc, k=k) - feed_flow_rate / volume * identity
+        blocks[:n_species, n_species] = -feed_flow_rate / volume**2 * (feed_conc - conc)
+        packed = np.zeros((2 * size - 1, n * size))
+        packed[packed_rows, packed_cols] = blocks
+        return packed
+
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.concatenate([initial_conc, initial_volume[np.newaxis]]).T.ravel()
+    solution = solve_ivp(rhs, (t_eval[0], t_eval[-1]), y0, method='LSODA', t_eval=t_eval, jac=jacobian,
+                         lband=size - 1, uband=size - 1, vectorized=True, rtol=rtol, atol=atol)
+    states = solution.y.reshape(n, size, -1).transpose(1, 0, 2)
+    return Solution(network=network, t=solution.t, conc=states[:n_species], volume=states[n_species])
+
+
+def stacked_cooled_semi_batch(network, initial_conc, initial_volume, initial_temperature, feed_flow_rate, feed_conc,
+                              feed_temperature, heat_capacity, ua, jacket_temperature, t_eval, rtol=1e-8,
+                              atol=1e-10) -> Solution:
+    """
+    Integrates the material and energy balances of many cooled semi-batch scenarios at once.
+
+    dC/dt = S·r(C, T) + Q/V·(C_feed - C), dV/dt = Q,
+    ρc_p·dT/dt = -ΔH·r(C, T) - UA·(T - T_j)/V - ρc_p·Q/V·(T - T_feed)
+
+    As in :func:`stacked_semi_batch`, the scenarios are stacked scenario by scenario into
+    one vectorized system whose banded Jacobian, including the Arrhenius temperature
+    sensitivity, goes to LSODA in packed form.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network with heats of reaction
+    initial_conc : numpy.ndarray
+        Concentrations of the initial charges (mol/L) of shape (n_species, N)
+    initial_volume, initial_temperature : float or numpy.ndarray
+        Volumes (L) and temperatures (°C) of the initial charges, broadcast to (N,)
+    feed_flow_rate : float or numpy.ndarray
+        Volumetric feed rates Q (L/min), broadcast to (N,)
+    feed_conc : numpy.ndarray
+        Feed concentrations (mol/L) of shape (n_species, N) or (n_species,)
+    feed_temperature : float or numpy.ndarray
+        Feed temperatures (°C), broadcast to (N,)
+    heat_capacity : float
+        Volumetric heat capacity ρc_p of the mixture and the feed (J/(L·K))
+    ua : float or numpy.ndarray
+        Jacket heat transfer coefficients times area (J/(min·K)), broadcast to (N,)
+    jacket_temperature : float or numpy.ndarray
+        Jacket temperatures (°C), broadcast to (N,)
+    t_eval : numpy.ndarray
+        Increasing output times (minutes), starting at the initial time
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    Solution
+        Concentrations of shape (n_species, N, len(t_eval)), and volumes and temperatures of
+        shape (N, len(t_eval))
+    """
+    n_species = len(network.species)
+    size = n_species + 2
+    initial_conc = np.asarray(initial_conc, dtype=float)
+    n = initial_conc.shape[1]
+    feed_conc = np.broadcast_to(np.asarray(feed_conc, dtype=float).reshape(n_species, -1), (n_species, n))
+    initial_volume, initial_temperature, flow, feed_temperature, ua, jacket_temperature = (
+        np.broadcast_to(np.asarray(value, dtype=float), (n,))
+        for value in (initial_volume, initial_temperature, feed_flow_rate, feed_temperature, ua, jacket_temperature))
+    heats = network.heats_of_reaction
+    stoichiometry = network.stoichiometry
+
+    def rhs(t, y):
+        # Scenario-major states of shape (N, n_species + 2, m), m = 1 unless evaluated in batches
+        states = y.reshape(n, size, -1).transpose(1, 0, 2)
+        conc, volume, temperature = states[:n_species], states[n_species], states[n_species + 1]
+        q = flow[:, np.newaxis]
+        rates = network.rates(conc, temperature)
+        derivatives = np.empty_like(states)
+        derivatives[:n_species] = np.tensordot(stoichiometry, rates, axes=1) + q / volume * (feed_conc[..., np.newaxis]
+                                                                                            - conc)
+        derivatives[n_species] = q
+        derivatives[n_species + 1] = (-np.tensordot(heats, rates, axes=1) / heat_capacity
+                                      - ua[:, np.newaxis] * (temperature - jacket_temperature[:, np.newaxis])
+                                      / (heat_capacity * volume)
+                                      - q / volume * (temperature - feed_temperature[:, np.newaxis]))
+        return derivatives.transpose(1, 0, 2).reshape(y.shape)
+
+    packed_rows, packed_cols = _banded_blocks(size, n)
+    identity = np.eye(n_species)[:, :, np.newaxis]
+
+    def jacobian(t, y):
+        states = y.reshape(n, size).T
+        conc, volume, temperature = states[:n_species], states[n_species], states[n_species + 1]
+        rate_jacobian = network.rate_jacobian(conc, temperature)
+        rate_derivative = network.rate_temperature_derivative(conc, temperature)
+        blocks = np.zeros((size, size, n))
+        blocks[:n_species, :n_species] = np.tensordot(stoichiometry, rate_jacobian, axes=1) - flow / volume * identity
+        blocks[:n_species, n_species] = -flow / volume**2 * (feed_conc - conc)
+        blocks[:n_species, n_species + 1] = stoichiometry @ rate_derivative
+        blocks[n_species + 1, :n_species] = -np.tensordot(heats, rate_jacobian, axes=1) / heat_capacity
+        blocks[n_species + 1, n_species] = (ua * (temperature - jacket_temperature) / (heat_capacity * volume**2)
+                                            + flow / volume**2 * (temperature - feed_temperature))
+        blocks[n_species + 1, n_species + 1] = (-(heats @ rate_derivative) / heat_capacity
+                                                - ua / (heat_capacity * volume) - flow / volume)
+        packed = np.zeros((2 * size - 1, n * size))
+        packed[packed_rows, packed_cols] = blocks
+        return packed
+
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.concatenate([initial_conc, initial_volume[np.newaxis], initial_temperature[np.newaxis]]).T.ravel()
+    solution = solve_ivp(rhs, (t_eval[0], t_eval[-1]), y0, method='LSODA', t_eval=t_eval, jac=jacobian,
+                         lband=size - 1, uband=size - 1, vectorized=True, rtol=rtol, atol=atol)
+    states = solution.y.reshape(n, size, -1).transpose(1, 0, 2)
+    return Solution(network=network, t=solution.t, conc=states[:n_species], volume=states[n_species],
+                    temperature=states[n_species + 1])
+
+
+def _banded_blocks(size, n):
+    """
+    Packed banded positions of N diagonal blocks of shape (size, size): entry (a, b) of
+    block j goes to row size - 1 + a - b, column j·size + b
+    """
+    block_rows, block_cols = np.meshgrid(np.arange(size), np.arange(size), indexing='ij')
+    packed_rows = np.repeat((size - 1 + block_rows - block_cols)[:, :, np.newaxis], n, axis=2)
+    packed_cols = np.arange(n) * size + block_cols[:, :, np.newaxis]
+    return packed_rows, packed_cols
+
+
+def stirred_tank(network, feed_conc, residence_time, temperature, tol=1e-12, max_iter=100):
+    """
+    Steady states of isothermal CSTRs, C_feed - C + τ·S·r(C) = 0.
+
+    All residence times are solved together by Newton iterations with the analytic
+    Jacobian, started from the feed.  Steps that would make a concentration negative are
+    cut back to a tenth of the current value, so the iterations stay on the physical root.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network
+    feed_conc : numpy.ndarray
+        Feed concentrations (mol/L) of shape (n_species,)
+    residence_time : float or numpy.ndarray
+        Residence times τ (minutes)
+    temperature : float or numpy.ndarray
+        Temperature (°C), broadcast with ``residence_time``
+    tol : float
+        Convergence tolerance on the residual, relative to the largest feed concentration
+    max_iter : int
+        Maximum number of Newton iterations
+
+    Returns:
+    --------
+    numpy.ndarray
+        Exit concentrations (mol/L) of shape (n_species,) + broadcast shape of the
+        residence times and temperatures
+
+    Raises:
+    -------
+    RuntimeError
+        If the iterations do not converge
+    """
+    tau, temperature = np.broadcast_arrays(np.asarray(residence_time, dtype=float),
+                                           np.asarray(temperature, dtype=float))
+    shape = tau.shape
+    tau, temperature = tau.ravel(), temperature.ravel()
+    feed = np.asarray(feed_conc, dtype=float)[:, np.newaxis]
+    conc = np.repeat(feed, len(tau), axis=1)
+    identity = np.eye(len(network.species))[:, :, np.newaxis]
+    scale = max(feed.max(), np.finfo(float).tiny)
+
+    for _ in range(max_iter):
+        residual = feed - conc + tau * network.production(conc, temperature)
+        if np.abs(residual).max(initial=0) <= tol * scale:
+            return conc.reshape((-1,) + shape)
+        jacobian = tau * network.jacobian(conc, temperature) - identity
+        step = -np.linalg.solve(jacobian.transpose(2, 0, 1), residual.T[:, :, np.newaxis])[:, :, 0].T
+        conc = np.where(conc + step < 0, conc / 10, conc + step)
+    raise RuntimeError("CSTR steady state did not converge")
+
+
+def stirred_tank_transient(network, initial_conc, volume, t_span, inputs, temperature, heat_capacity=None, ua=0.0,
+                           first_step=None, method='LSODA', rtol=1e-8, atol=1e-12):
+    """
+    Integrates the unsteady balances of a constant-volume CSTR over one smooth stretch of its inputs.
+
+    dC/dt = Q/V·(C_feed - C) + S·r(C, T) and, when ``heat_capacity`` is given,
+    ρc_p·dT/dt = ρc_p·Q/V·(T_feed - T) - ΔH·r(C, T) - UA·(T - T_c)/V
+
+    The inputs may vary in time but must be continuous over ``t_span``; callers split
+    steps into separate stretches, chaining them with ``first_step`` as for
+    :func:`feed_segment`.
+
+    Parameters:
+    -----------
+    network : Network
+        Reaction network (with heats of reaction for the energy balance)
+    initial_conc : numpy.ndarray
+        Concentrations at the start of the stretch (mol/L) of shape (n_species,)
+    volume : float
+        Reactor volume V (L)
+    t_span : tuple of float
+        Start and end times (minutes)
+    inputs : callable
+        ``inputs(t)`` returns the feed rate Q (L/min), the feed concentrations (mol/L) of
+        shape (n_species,), the feed temperature and the coolant temperature (°C) at time t
+    temperature : float
+        Reactor temperature (°C); the temperature at the start of the stretch when the
+        energy balance is integrated
+    heat_capacity : float, optional
+        Volumetric heat capacity ρc_p (J/(L·K)); None keeps the reactor isothermal
+    ua : float
+        Heat transfer coefficient times area to the coolant (J/(min·K))
+    first_step : float, optional
+        Initial step size (minutes)
+    method : str
+        ``solve_ivp`` method given the analytic Jacobian
+    rtol, atol : float
+        Integration tolerances
+
+    Returns:
+    --------
+    scipy.integrate.OdeResult
+        ``solve_ivp`` result with dense output; the state is the concentrations, followed by
+        the temperature when the energy balance is integrated
+    """
+    n_species = len(network.species)
+    identity = np.eye(n_species)
+    y0 = np.asarray(initial_conc, dtype=float)
+
+    if heat_capacity is None:
+        k = network.rate_constants(temperature)
+
+        def rhs(t, y):
+            flow_rate, feed_conc, _, _ = inputs(t)
+            return flow_rate / volume * (feed_conc - y) + network.stoichiometry @ network.rates(y, k=k)
+
+        def jacobian(t, y):
+            flow_rate = inputs(t)[0]
+            return network.jacobian(y, k=k) - flow_rate / volume * identity
+    else:
+        heats = network.heats_of_reaction
+        ua_per_volume = ua / volume
+        y0 = np.append(y0, temperature)
+
+        def rhs(t, y):
+            conc, temperature = y[:n_species], y[n_species]
+            flow_rate, feed_conc, feed_temperature, coolant_temperature = inputs(t)
+            dilution = flow_rate / volume
+            rates = network.rates(conc, temperature)
+            heating = (-(heats @ rates) - ua_per_volume * (temperature - coolant_temperature)) / heat_capacity
+            return np.append(dilution * (feed_conc - conc) + network.stoichiometry @ rates,
+                             dilution * (feed_temperature - temperature) + heating)
+
+        def jacobian(t, y):
+            conc, temperature = y[:n_species], y[n_species]
+            dilution = inputs(t)[0] / volume
+            rate_jacobian = network.rate_jacobian(conc, temperature)
+            rate_derivative = network.rate_temperature_derivative(conc, temperature)
+            matrix = np.empty((n_species + 1, n_species + 1))
+            matrix[:n_species, :n_species] = network.stoichiometry @ rate_jacobian - dilution * identity
+            matrix[:n_species, n_species] = network.stoichiometry @ rate_derivative
+            matrix[n_species, :n_species] = -(heats @ rate_jacobian) / heat_capacity
+            matrix[n_species, n_species] = -dilution + (-(heats @ rate_derivative) - ua_per_volume) / heat_capacity
+            return matrix
+
+    return solve_ivp(rhs, t_span, y0, method=method, jac=jacobian, dense_output=True, first_step=first_step,
+                     rtol=rtol, atol=atol)
@@ -0,0 +1,212 @@
+"""
+Rotary Vacuum Filter Model
+==========================
+
+Cake formation, drying and production rate over one revolution of a rotary vacuum drum filter.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+MEDIUM_RESISTANCE = 1e10  # 1/m
+DISCHARGE_ANGLE = 330     # degrees, start of the discharge zone
+INITIAL_MOISTURE = 0.8
+FINAL_MOISTURE = 0.3
+
+
+@dataclass(frozen=True)
+class Params:
+    """Drum geometry, operating conditions and slurry properties"""
+    drum_diameter: float = 2.0            # m
+    drum_length: float = 2.5              # m
+    drum_speed: float = 1.0               # rpm
+    submergence: float = 30.0             # %
+    vacuum_pressure: float = 50.0         # kPa
+    slurry_concentration: float = 200.0   # kg/m³
+    filtrate_viscosity: float = 0.001     # Pa·s
+    num_points: int = 100
+
+
+@dataclass(frozen=True)
+class Result:
+    """Profiles around the drum computed by :func:`simulate`"""
+    drum_surface_area: float
+    specific_cake_resistance: float
+    medium_resistance: float
+    rotation_period: float
+    submergence_angle: float
+    submergence_time: float
+    time_points: np.ndarray
+    angles: np.ndarray
+    filtration_times: np.ndarray
+    filtrate_volumes: np.ndarray
+    filtration_rates: np.ndarray
+    cake_thicknesses_mm: np.ndarray
+    moisture_content: np.ndarray
+    final_moisture: float
+    production_rate: float
+
+    @property
+    def max_cake_thickness_mm(self):
+        """Maximum cake thickness around the drum (mm)"""
+        return np.max(self.cake_thicknesses_mm)
+
+    def zones(self):
+        """Name of the filter cycle zone at each angular position"""
+        zones = np.full(self.angles.shape, 'Discharge', dtype=object)
+        zones[self.angles <= self.submergence_angle] = 'Pickup/Cake Formation'
+        zones[(self.angles > self.submergence_angle) & (self.angles <= 180)] = 'Washing'
+        zones[(self.angles > 180) & (self.angles <= DISCHARGE_ANGLE)] = 'Drying'
+        return zones
+
+    @timing.timed('tabulate.rotary_vacuum_filter.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the profiles, labelling each point with its zone"""
+        df = pd.DataFrame({
+            'Time (s)': self.time_points,
+            'Angle (degrees)': self.angles,
+            'Filtration Time (s)': self.filtration_times,
+            'Filtrate Volume (m³)': self.filtrate_volumes,
+            'Cake Thickness (mm)': self.cake_thicknesses_mm,
+            'Moisture Content (fraction)': self.moisture_content
+        })
+        df['Zone'] = self.zones()
+        return df
+
+
+def cake_resistance(vacuum_pressure):
+    """Pressure-dependent specific cake resistance (m/kg)"""
+    return 5e10 * (np.asarray(vacuum_pressure) / 50)**0.5
+
+
+def filtrate_volume(params: Params, filtration_time, vacuum_pressure=None):
+    """
+    Filtrate volume collected over the drum surface after a given filtration time.
+
+    Parameters:
+    -----------
+    params : Params
+        Drum geometry and slurry properties
+    filtration_time : float or numpy.ndarray
+        Time the drum surface has spent submerged (s)
+    vacuum_pressure : float or numpy.ndarray, optional
+        Vacuum (kPa) overriding ``params.vacuum_pressure``
+
+    Returns:
+    --------
+    float or numpy.ndarray
+        Filtrate volume (m³)
+    """
+    pressure = params.vacuum_pressure if vacuum_pressure is None else np.asarray(vacuum_pressure)
+    area = np.pi * params.drum_diameter * params.drum_length
+
+    k1 = (params.filtrate_viscosity * cake_resistance(pressure) * params.slurry_concentration) / (2 * area**2 * (pressure * 1000))
+    k2 = (params.filtrate_viscosity * MEDIUM_RESISTANCE) / (area * (pressure * 1000))
+
+    filtration_time = np.asarray(filtration_time)
+    volume = (-k2 + np.sqrt(k2**2 + 4*k1*filtration_time)) / (2*k1)
+    return np.where(filtration_time > 0, volume, 0.0)
+
+
+def cake_thickness(params: Params, volume):
+    """Cake thickness (m) deposited with the given filtrate volume"""
+    # Assume cake density is 2.5 times the slurry concentration (dry basis)
+    cake_density = 2.5 * params.slurry_concentration  # kg/m³
+    area = np.pi * params.drum_diameter * params.drum_length
+    return params.slurry_concentration * volume / (cake_density * area)
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Simulates one revolution of the rotary vacuum filter.
+
+    Parameters:
+    -----------
+    params : Params
+        Drum geometry, operating conditions and slurry properties
+
+    Returns:
+    --------
+    Result
+        Filtration, cake thickness and moisture profiles and the production rate
+    """
+    drum_surface_area = np.pi * params.drum_diameter * params.drum_length  # m²
+    specific_cake_resistance = float(cake_resistance(params.vacuum_pressure))
+
+    # Time for one complete rotation
+    rotation_period = 60 / params.drum_speed  # seconds
+    submergence_angle = params.submergence * 360 / 100  # degrees
+    submergence_time = rotation_period * submergence_angle / 360  # seconds
+
+    time_points = np.linspace(0, rotation_period, params.num_points)
+    angles = time_points * 360 / rotation_period
+    is_submerged = angles <= submergence_angle
+
+    # Filtration only proceeds while the drum surface is submerged
+    filtration_times = np.where(is_submerged, time_points, submergence_time)
+    filtrate_volumes = filtrate_volume(params, filtration_times)
+
+    # Cake grows while submerged, is held until discharge and is then scraped off
+    cake_thicknesses = np.where(is_submerged, cake_thickness(params, filtrate_volumes), 0.0)
+    cake_thicknesses[0] = 0
+    held = ~is_submerged & (angles < DISCHARGE_ANGLE)
+    cake_thicknesses[held] = cake_thicknesses[np.argmax(angles >= submergence_angle) - 1]
+    cake_thicknesses_mm = cake_thicknesses * 1000  # mm
+
+    # Moisture decreases linearly through the drying zone
+    fraction_dried = np.minimum(1.0, (angles - submergence_angle) / (DISCHARGE_ANGLE - submergence_angle))
+    moisture_content = np.where(angles > submergence_angle,
+                                INITIAL_MOISTURE - fraction_dried * (INITIAL_MOISTURE - FINAL_MOISTURE),
+                                INITIAL_MOISTURE)
+
+    # Filtration rate during submergence
+    formation = np.flatnonzero(is_submerged)
+    filtration_rates = np.zeros_like(time_points)
+    dt = np.diff(filtration_times[formation])
+    dv = np.diff(filtrate_volumes[formation])
+    filtration_rates[formation[1:]] = np.divide(dv, dt, out=np.zeros_like(dv), where=dt > 0)
+
+    # Production rate from the cake discharged each rotation
+    cake_density = 2.5 * params.slurry_concentration  # kg/m³
+    cake_volume_per_rotation = np.max(cake_thicknesses) * drum_surface_area  # m³/rotation
+    cake_mass_per_rotation = cake_volume_per_rotation * cake_density  # kg/rotation
+    production_rate = cake_mass_per_rotation * params.drum_speed * 60  # kg/h
+
+    return Result(
+        drum_surface_area=drum_surface_area,
+        specific_cake_resistance=specific_cake_resistance,
+        medium_resistance=MEDIUM_RESISTANCE,
+        rotation_period=rotation_period,
+        submergence_angle=submergence_angle,
+        submergence_time=submergence_time,
+        time_points=time_points,
+        angles=angles,
+        filtration_times=filtration_times,
+        filtrate_volumes=filtrate_volumes,
+        filtration_rates=filtration_rates,
+        cake_thicknesses_mm=cake_thicknesses_mm,
+        moisture_content=moisture_content,
+        final_moisture=FINAL_MOISTURE,
+        production_rate=production_rate
+    )
+
+
+def drum_speed_effect(params: Params, speeds):
+    """Production rate (kg/h) at each drum speed (rpm)"""
+    speeds = np.asarray(speeds, dtype=float)
+    submergence_time = 60 / speeds * params.submergence / 100
+    thickness = cake_thickness(params, filtrate_volume(params, submergence_time))
+    area = np.pi * params.drum_diameter * params.drum_length
+    return thickness * area * 2.5 * params.slurry_concentration * speeds * 60
+
+
+def vacuum_pressure_effect(params: Params, pressures):
+    """Maximum cake thickness (mm) at each vacuum pressure (kPa)"""
+    submergence_time = 60 / params.drum_speed * params.submergence / 100
+    return cake_thickness(params, filtrate_volume(params, submergence_time, vacuum_pressure=pressures)) * 1000
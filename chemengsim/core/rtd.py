@@ -0,0 +1,599 @@
+"""
+Residence Time Distribution
+===========================
+
+Tracer experiments on non-ideal reactors described by one-parameter flow models:
+
+    tanks in series:   E(t) = (N/τ)^N · t^(N-1) · exp(-N·t/τ) / Γ(N)
+    dispersed PFR:     E(t) = (1/τ) · √(Pe/(4πθ)) · exp(-Pe·(1 - θ)²/(4θ)),   θ = t/τ
+
+with the space time τ = V/Q, the number of tanks N (not restricted to integers) and the
+Péclet number Pe = uL/D_a.  The dispersed PFR has open-open boundaries, whose E(t) and
+F(t) are closed-form; its mean residence time is τ·(1 + 2/Pe).
+
+:func:`simulate` tabulates E(t) and F(t) over a long uniform grid that covers the tail of
+the distribution, the outlet response to a finite pulse or a step of tracer, the moments of
+E(t) and the segregation-model conversion of saponification, X̄ = ∫ X_batch(t)·E(t) dt.
+Outlet responses are convolutions of the inlet with the probability of each residence time
+step, evaluated by FFT.
+
+:func:`fit_tracer` fits τ and N or Pe to every run of an outlet tracer sheet at once: the
+runs are padded to a common length and Levenberg-Marquardt steps are taken for all of them
+together by :func:`batched_least_squares`.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, signal, special
+from scipy.integrate import trapezoid
+
+from chemengsim import timing
+from chemengsim.core import kinetics
+from chemengsim.core.cache import memoize
+
+TANKS = 'tanks'
+DISPERSION = 'dispersion'
+# Flow model -> (name, parameter symbol)
+MODELS = {
+    TANKS: ('Tanks in Series', 'N'),
+    DISPERSION: ('Dispersed PFR', 'Pe'),
+}
+
+PULSE = 'pulse'
+STEP = 'step'
+INJECTIONS = (PULSE, STEP)
+
+# Fraction of the tracer left in the tail beyond the end of the simulated grid
+TAIL = 1e-8
+
+# Column names of a tracer sheet
+RUN = 'Run'
+TIME = 'Time (min)'
+TRACER = 'Tracer Concentration'
+
+REQUIRED_COLUMNS = (RUN, TIME, TRACER)
+
+
+@dataclass(frozen=True)
+class Params:
+    """Flow model, tracer injection and reaction conditions"""
+    model: str = TANKS
+    residence_time: float = 10.0     # minutes, space time τ = V/Q
+    tanks: float = 3.0               # N of the tanks-in-series model
+    peclet: float = 10.0             # Pe of the dispersed PFR model
+    injection: str = PULSE
+    pulse_width: float = 0.0         # minutes; 0 for an ideal (Dirac) pulse
+    feed_conc_naoh: float = 0.1      # mol/L
+    feed_conc_ea: float = 0.1        # mol/L
+    temperature: float = 35.0        # °C
+    num_points: int = 8192
+
+    @property
+    def parameter(self):
+        """N or Pe of the selected model"""
+        return self.tanks if self.model == TANKS else self.peclet
+
+
+@dataclass(frozen=True)
+class Result:
+    """RTD curves, tracer response, moments and conversions computed by :func:`simulate`"""
+    time_points: np.ndarray
+    exit_age: np.ndarray               # E(t), 1/min
+    cumulative: np.ndarray             # F(t)
+    inlet: np.ndarray                  # injected tracer, 1/min per unit pulse or fraction of a step
+    response: np.ndarray               # outlet tracer on the same scale as the inlet
+    outlet_conversion: np.ndarray      # % of the NaOH leaving that reacted, for a reactant fed like the tracer
+    mean_residence_time: float         # minutes
+    variance: float                    # min²
+    skewness: float
+    equivalent_tanks: float            # N with the same dimensionless variance
+    equivalent_peclet: float           # Pe with the same dimensionless variance (inf if none)
+    segregation_conversion: float      # %
+    cstr_conversion: float             # % in an ideal CSTR with the same τ
+    pfr_conversion: float              # % in an ideal PFR with the same τ
+
+    @timing.timed('tabulate.rtd.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the RTD curves and the tracer response"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'E(t) (1/min)': self.exit_age,
+            'F(t)': self.cumulative,
+            'Inlet Tracer': self.inlet,
+            'Outlet Tracer': self.response,
+            'Outlet Conversion (%)': self.outlet_conversion
+        })
+
+
+@dataclass(frozen=True)
+class TracerRuns:
+    """Outlet tracer readings of one or more runs, padded to a common length"""
+    labels: tuple
+    time: np.ndarray       # minutes, shape (n_runs, max_points), padded with each run's last time
+    reading: np.ndarray    # tracer concentration (any unit), padded with each run's last reading
+    mask: np.ndarray       # True at the measured points
+
+    def __len__(self):
+        return len(self.labels)
+
+    def normalized(self, injection):
+        """
+        Readings above the baseline scaled to E(t) (1/min) after a pulse or to F(t) after a
+        step; a step is taken to be complete at the last reading, and an instant rise at the
+        first reading (e.g. by bypassing) is kept
+        """
+        if injection == PULSE:
+            return self.reading / trapezoid(self.reading, self.time, axis=1)[:, None]
+        return self.reading / self.reading[:, -1:]
+
+    def to_dataframe(self):
+        """Tabulate the measured points with the sheet column names"""
+        run = np.broadcast_to(np.asarray(self.labels, dtype=object)[:, None], self.time.shape)
+        return pd.DataFrame({RUN: run[self.mask], TIME: self.time[self.mask], TRACER: self.reading[self.mask]})
+
+
+@dataclass(frozen=True)
+class TracerFit:
+    """Flow model fitted to every run of a tracer sheet by :func:`fit_tracer`"""
+    labels: tuple
+    model: str
+    injection: str
+    residence_time: np.ndarray         # τ (minutes)
+    parameter: np.ndarray              # N or Pe
+    residence_time_stderr: np.ndarray
+    parameter_stderr: np.ndarray
+    residual_std: np.ndarray           # of the normalized curve, E (1/min) or F
+    mean_residence_time: np.ndarray    # minutes, from the moments of the data
+    variance: np.ndarray               # min², from the moments of the data
+    skewness: np.ndarray
+    moment_parameter: np.ndarray       # N or Pe with the dimensionless variance of the data
+    converged: np.ndarray
+    iterations: int
+
+    def curves(self, times):
+        """
+        Fitted E(t) (pulse) or F(t) (step) of every run, shape (n_runs, n_times), at ``times``
+        shared by all runs or given per run as an (n_runs, n_times) array
+        """
+        curve = exit_age if self.injection == PULSE else cumulative
+        return curve(self.model, np.atleast_2d(np.asarray(times, dtype=float)), self.residence_time[:, None],
+                     self.parameter[:, None])
+
+    def to_dataframe(self):
+        """Tabulate the fitted and the moment estimates of every run"""
+        symbol = MODELS[self.model][1]
+        return pd.DataFrame({
+            RUN: list(self.labels),
+            'τ (min)': self.residence_time,
+            'τ Std. Error': self.residence_time_stderr,
+            symbol: self.parameter,
+            f'{symbol} Std. Error': self.parameter_stderr,
+            'Residual Std.': self.residual_std,
+            't_m (min)': self.mean_residence_time,
+            'σ² (min²)': self.variance,
+            'Skewness': self.skewness,
+            f'{symbol} from Moments': self.moment_parameter,
+            'Converged': self.converged
+        })
+
+
+def _check(model, injection=PULSE):
+    if model not in MODELS:
+        raise ValueError(f"unknown flow model {model!r}; expected one of {', '.join(MODELS)}")
+    if injection not in INJECTIONS:
+        raise ValueError(f"unknown tracer injection {injection!r}; expected one of {', '.join(INJECTIONS)}")
+
+
+def exit_age(model, t, residence_time, parameter):
+    """
+    Exit-age distribution E(t) of a flow model.
+
+    Parameters:
+    -----------
+    model : str
+        :data:`TANKS` or :data:`DISPERSION`
+    t : float or numpy.ndarray
+        Time (minutes)
+    residence_time : float or numpy.ndarray
+        Space time τ (minutes)
+    parameter : float or numpy.ndarray
+        Number of tanks N or Péclet number Pe
+
+    Returns:
+    --------
+    numpy.ndarray
+        E(t) (1/min) of the broadcast shape of the arguments
+    """
+    t, tau, parameter = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (t, residence_time, parameter)))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if model == TANKS:
+            # xlogy keeps the t = 0 value of a single tank finite
+            log_e = (parameter * np.log(parameter / tau) + special.xlogy(parameter - 1, t)
+                     - special.gammaln(parameter) - parameter * t / tau)
+            return np.exp(log_e)
+        theta = t / tau
+        e = np.sqrt(parameter / (4 * np.pi * theta)) * np.exp(-parameter * (1 - theta)**2 / (4 * theta)) / tau
+        return np.where(theta > 0, e, 0.0)
+
+
+def cumulative(model, t, residence_time, parameter):
+    """
+    Cumulative distribution F(t) = ∫ E dt of a flow model; arguments as for :func:`exit_age`.
+
+    The dispersed PFR term e^Pe·erfc(·) is evaluated with the scaled erfcx, so it neither
+    overflows nor cancels at large Pe.
+    """
+    t, tau, parameter = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (t, residence_time, parameter)))
+    if model == TANKS:
+        return special.gammainc(parameter, parameter * np.maximum(t, 0) / tau)
+    theta = np.maximum(t / tau, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.sqrt(parameter / (4 * theta))
+        f = (special.erfc(a * (1 - theta))
+             - special.erfcx(a * (1 + theta)) * np.exp(-parameter * (1 - theta)**2 / (4 * theta))) / 2
+    return np.where(theta > 0, f, 0.0)
+
+
+def moments(model, residence_time, parameter):
+    """Mean residence time (minutes) and variance (min²) of a flow model"""
+    tau, parameter = np.asarray(residence_time, dtype=float), np.asarray(parameter, dtype=float)
+    if model == TANKS:
+        return tau, tau**2 / parameter
+    return tau * (1 + 2 / parameter), tau**2 * (2 / parameter + 8 / parameter**2)
+
+
+def parameter_from_moments(model, mean_residence_time, variance):
+    """
+    τ and N or Pe of a flow model with the given mean and variance.
+
+    For the dispersed PFR, σ²/t_m² = (2/Pe + 8/Pe²)/(1 + 2/Pe)² is a quadratic in 1/Pe with
+    one positive root when σ²/t_m² < 2; larger spreads give Pe = nan.
+    """
+    mean = np.asarray(mean_residence_time, dtype=float)
+    s = np.asarray(variance, dtype=float) / mean**2
+    if model == TANKS:
+        return mean, 1 / s
+    a, b = 4 * s - 8, 4 * s - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        inverse = np.where(s < 2, (-b - np.sqrt(b**2 - 4 * a * s)) / (2 * a), np.nan)
+        return mean / (1 + 2 * inverse), 1 / inverse
+
+
+def convolve(inlet, masses):
+    """
+    Outlet signal of a linear flow system by FFT convolution.
+
+    ``masses[j]`` is the fraction of the fluid with a residence time in step ``j`` of the
+    uniform grid of ``inlet``; the result covers the same steps as ``inlet``.
+    """
+    return signal.fftconvolve(inlet, masses)[..., :np.shape(inlet)[-1]]
+
+
+def _grid_end(model, residence_time, parameter):
+    """Time by which all but :data:`TAIL` of the tracer has left"""
+    end = residence_time
+    while cumulative(model, end, residence_time, parameter) < 1 - TAIL:
+        end *= 2
+    return optimize.brentq(lambda t: cumulative(model, t, residence_time, parameter) - (1 - TAIL), end / 2, end)
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Tabulates the RTD of a flow model and its tracer response and predicts the segregated-flow conversion.
+
+    The grid extends until all but :data:`TAIL` of the tracer has left (and past the end of
+    a finite pulse), and each grid step carries the exact fraction of the fluid leaving in it,
+    ΔF, so moments and convolutions conserve the tracer even where E(t) is steep.
+
+    Parameters:
+    -----------
+    params : Params
+        Flow model and its parameter, tracer injection, feed and temperature
+
+    Returns:
+    --------
+    Result
+        E(t), F(t), tracer response, moments and conversions
+
+    Raises:
+    -------
+    ValueError
+        If the model or the injection is unknown
+    """
+    _check(params.model, params.injection)
+    tau, parameter = params.residence_time, params.parameter
+    end = _grid_end(params.model, tau, parameter) + params.pulse_width
+    time_points = np.linspace(0, end, params.num_points)
+    step = time_points[1]
+    cumulative_curve = cumulative(params.model, time_points, tau, parameter)
+    masses = np.diff(cumulative_curve)
+    midpoints = time_points[:-1] + step / 2
+
+    # Moments over the grid steps, normalized by the tracer inside the grid
+    total = masses.sum()
+    mean = masses @ midpoints / total
+    variance = masses @ (midpoints - mean)**2 / total
+    skewness = masses @ (midpoints - mean)**3 / total / variance**1.5
+    _, equivalent_peclet = parameter_from_moments(DISPERSION, mean, variance)
+
+    # The tracer (and a reactant fed the same way) enters over whole grid steps
+    if params.injection == STEP:
+        inlet = np.ones(params.num_points)
+    else:
+        steps = max(int(round(params.pulse_width / step)), 1)
+        inlet = np.where(np.arange(params.num_points) < steps, 1 / (steps * step), 0.0)
+    response = np.concatenate([[0.0], convolve(inlet[:-1], masses)])
+
+    # Segregated flow: every element reacts as a batch for its residence time
+    k = kinetics.rate_constant(params.temperature)
+    batch_conc = kinetics.second_order_conc(params.feed_conc_naoh, params.feed_conc_ea, k, midpoints)
+    unreacted = np.concatenate([[0.0], convolve(inlet[:-1], batch_conc * masses)])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        outlet_conversion = np.where(response > 1e-12 * response.max(),
+                                     (1 - unreacted / (params.feed_conc_naoh * response)) * 100, np.nan)
+    segregation = 1 - batch_conc @ masses / (params.feed_conc_naoh * total)
+
+    return Result(
+        time_points=time_points,
+        exit_age=exit_age(params.model, time_points, tau, parameter),
+        cumulative=cumulative_curve,
+        inlet=inlet,
+        response=response,
+        outlet_conversion=outlet_conversion,
+        mean_residence_time=float(mean),
+        variance=float(variance),
+        skewness=float(skewness),
+        equivalent_tanks=float(mean**2 / variance),
+        equivalent_peclet=float(np.nan_to_num(equivalent_peclet, nan=np.inf)),
+        segregation_conversion=float(segregation) * 100,
+        cstr_conversion=float(kinetics.second_order_cstr_conversion(params.feed_conc_naoh, params.feed_conc_ea,
+                                                                    k, tau)) * 100,
+        pfr_conversion=float(1 - kinetics.second_order_conc(params.feed_conc_naoh, params.feed_conc_ea, k, tau)
+                             / params.feed_conc_naoh) * 100
+    )
+
+
+def runs_from_dataframe(df):
+    """
+    Reads the outlet tracer readings of a sheet.
+
+    Rows with missing values are dropped and every run is sorted by time and padded to the
+    length of the longest run, so all runs can be processed as one array.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Sheet with the :data:`REQUIRED_COLUMNS`
+
+    Returns:
+    --------
+    TracerRuns
+        Runs in order of first appearance
+
+    Raises:
+    -------
+    ValueError
+        If required columns are missing or a run has fewer than three readings
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    values = df[list(REQUIRED_COLUMNS)].copy()
+    values[RUN] = values[RUN].astype(str)
+    values[[TIME, TRACER]] = values[[TIME, TRACER]].apply(pd.to_numeric, errors='coerce')
+    values = values.dropna()
+    labels = tuple(pd.unique(values[RUN]))
+    if not labels:
+        raise ValueError("The sheet has no complete readings")
+
+    codes = pd.Categorical(values[RUN], categories=labels).codes
+    time, reading = values[TIME].to_numpy(dtype=float), values[TRACER].to_numpy(dtype=float)
+    order = np.lexsort((time, codes))
+    codes, time, reading = codes[order], time[order], reading[order]
+    counts = np.bincount(codes, minlength=len(labels))
+    short = [label for label, count in zip(labels, counts) if count < 3]
+    if short:
+        raise ValueError(f"Runs with fewer than three readings: {', '.join(short)}")
+
+    # Position of every reading within its run; padding repeats the last reading
+    position = np.arange(len(codes)) - np.repeat(np.cumsum(counts) - counts, counts)
+    last = np.cumsum(counts) - 1
+    padded_time = np.repeat(time[last][:, None], counts.max(), axis=1)
+    padded_reading = np.repeat(reading[last][:, None], counts.max(), axis=1)
+    padded_time[codes, position] = time
+    padded_reading[codes, position] = reading
+    return TracerRuns(labels=labels, time=padded_time, reading=padded_reading,
+                      mask=np.arange(counts.max()) < counts[:, None])
+
+
+def batched_least_squares(residuals, x0, max_iter=100, tol=1e-10, step=1e-7):
+    """
+    Levenberg-Marquardt fits of many independent problems with the same parameters at once.
+
+    Every iteration evaluates the residuals of all problems together, with a forward-difference
+    Jacobian, and solves all the damped normal equations in one batched call; each problem
+    keeps its own damping and stops when its step is below ``tol``.
+
+    Parameters:
+    -----------
+    residuals : callable
+        ``residuals(x)`` with ``x`` of shape (n_problems, n_parameters) returns an array of
+        shape (n_problems, n_residuals), zero at padded positions
+    x0 : numpy.ndarray
+        Initial guesses, shape (n_problems, n_parameters)
+    max_iter : int
+        Maximum number of iterations
+    tol : float
+        Convergence tolerance on the largest parameter step
+    step : float
+        Relative forward-difference step
+
+    Returns:
+    --------
+    tuple
+        Estimates, the inverse of JᵀJ at the estimates (n_problems, n_parameters,
+        n_parameters), the residual sums of squares, the convergence flags and the number of
+        iterations
+    """
+    x = np.array(x0, dtype=float)
+    n_problems, n_parameters = x.shape
+    damping = np.full(n_problems, 1e-3)
+    converged = np.zeros(n_problems, dtype=bool)
+    r = residuals(x)
+    cost = np.einsum('ij,ij->i', r, r)
+    iterations = 0
+
+    def jacobian(x, r):
+        h = step * np.maximum(np.abs(x), 1.0)
+        columns = [(residuals(x + h[:, [i]] * np.eye(n_parameters)[i]) - r) / h[:, [i]]
+                   for i in range(n_parameters)]
+        return np.stack(columns, axis=-1)
+
+    for iterations in range(1, max_iter + 1):
+        j = jacobian(x, r)
+        jtj = np.einsum('imp,imq->ipq', j, j)
+        gradient = np.einsum('imp,im->ip', j, r)
+        diagonal = np.einsum('ipp->ip', jtj)
+        damped = jtj + (damping[:, None] * (diagonal + 1e-12))[:, :, None] * np.eye(n_parameters)
+        delta = -np.linalg.solve(damped, gradient[:, :, None])[:, :, 0]
+        delta[converged] = 0
+        trial = x + delta
+        trial_r = residuals(trial)
+        trial_cost = np.einsum('ij,ij->i', trial_r, trial_r)
+        better = np.isfinite(trial_cost) & (trial_cost <= cost) & ~converged
+        small = (np.abs(delta).max(axis=1) < tol) | (cost - trial_cost <= tol * cost)
+        x[better], r[better], cost[better] = trial[better], trial_r[better], trial_cost[better]
+        damping = np.where(converged, damping, np.where(better, damping / 3, damping * 4))
+        # Without a downhill step even at heavy damping the gradient vanishes to working precision
+        converged |= (better & small) | (damping > 1e10)
+        if converged.all():
+            break
+
+    j = jacobian(x, r)
+    inverse = np.linalg.pinv(np.einsum('imp,imq->ipq', j, j))
+    return x, inverse, cost, converged, iterations
+
+
+def _data_moments(runs, curve, injection):
+    """Mean, variance and skewness of the measured curves; padding adds nothing to the integrals"""
+    t = runs.time
+    if injection == PULSE:
+        raw = [trapezoid(t**power * curve, t, axis=1) for power in (1, 2, 3)]
+    else:
+        # ∫ tⁿ E dt = n ∫ tⁿ⁻¹ (1 - F) dt
+        raw = [power * trapezoid(t**(power - 1) * (1 - curve), t, axis=1) for power in (1, 2, 3)]
+    mean = raw[0]
+    variance = raw[1] - mean**2
+    skewness = (raw[2] - 3 * mean * raw[1] + 2 * mean**3) / variance**1.5
+    return mean, variance, skewness
+
+
+def fit_tracer(runs, model=TANKS, injection=PULSE, max_iter=100, tol=1e-10) -> TracerFit:
+    """
+    Fits τ and N or Pe of a flow model to every run of a tracer sheet in one pass.
+
+    Pulse readings are normalized by their area to E(t) and step readings by their last
+    value to F(t).  The moments of every run give the starting values, and all runs are
+    fitted together by :func:`batched_least_squares` in log(τ) and log(N or Pe), which keeps
+    both positive.
+
+    Parameters:
+    -----------
+    runs : TracerRuns
+        Outlet readings of one or more runs
+    model : str
+        :data:`TANKS` or :data:`DISPERSION`
+    injection : str
+        :data:`PULSE` or :data:`STEP`
+    max_iter : int
+        Maximum number of Levenberg-Marquardt iterations
+    tol : float
+        Convergence tolerance on the step in the log parameters
+
+    Returns:
+    --------
+    TracerFit
+        Estimates, standard errors and moments of every run
+
+    Raises:
+    -------
+    ValueError
+        If the model or the injection is unknown
+    """
+    _check(model, injection)
+    curve = runs.normalized(injection)
+    mean, variance, skewness = _data_moments(runs, curve, injection)
+    tau0, parameter0 = parameter_from_moments(model, mean, variance)
+    # Runs whose moments admit no model value start from a well-mixed guess
+    parameter0 = np.where(np.isfinite(parameter0) & (parameter0 > 0), parameter0, 1.0)
+    tau0 = np.where(np.isfinite(tau0) & (tau0 > 0), tau0, mean)
+    model_curve = exit_age if injection == PULSE else cumulative
+
+    def residuals(x):
+        predicted = model_curve(model, runs.time, np.exp(x[:, :1]), np.exp(x[:, 1:]))
+        return np.where(runs.mask, np.nan_to_num(predicted - curve, nan=1e6, posinf=1e6, neginf=-1e6), 0.0)
+
+    x, inverse, cost, converged, iterations = batched_least_squares(
+        residuals, np.log(np.column_stack([tau0, parameter0])), max_iter=max_iter, tol=tol)
+    dof = np.maximum(runs.mask.sum(axis=1) - 2, 1)
+    residual_var = cost / dof
+    # Standard errors of the log parameters are relative errors of the parameters
+    relative_stderr = np.sqrt(residual_var[:, None] * np.einsum('ipp->ip', inverse))
+    estimates = np.exp(x)
+    return TracerFit(
+        labels=runs.labels,
+        model=model,
+        injection=injection,
+        residence_time=estimates[:, 0],
+        parameter=estimates[:, 1],
+        residence_time_stderr=estimates[:, 0] * relative_stderr[:, 0],
+        parameter_stderr=estimates[:, 1] * relative_stderr[:, 1],
+        residual_std=np.sqrt(residual_var),
+        mean_residence_time=mean,
+        variance=variance,
+        skewness=skewness,
+        moment_parameter=parameter_from_moments(model, mean, variance)[1],
+        converged=converged,
+        iterations=iterations
+    )
+
+
+def example_runs(residence_times=(5.0, 10.0, 20.0), tanks=(1.0, 2.5, 5.0), num_points=25, noise=0.02, seed=0):
+    """
+    Synthetic pulse-tracer sheet from the tanks-in-series model, one run for every
+    combination of residence time and number of tanks, used as the template of the
+    upload form.
+
+    Parameters:
+    -----------
+    residence_times : sequence of float
+        Space times (minutes)
+    tanks : sequence of float
+        Numbers of tanks
+    num_points : int
+        Readings per run, up to three space times
+    noise : float
+        Standard deviation of the reading error relative to the peak of the run
+    seed : int
+        Random seed
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Sheet with the :data:`REQUIRED_COLUMNS`, readings in mg/L for 100 mg·min/L of tracer
+    """
+    rng = np.random.default_rng(seed)
+    tau, n = (grid.ravel() for grid in np.meshgrid(residence_times, tanks, indexing='ij'))
+    time = np.linspace(0, 3, num_points)[None, :] * tau[:, None]
+    reading = 100 * exit_age(TANKS, time, tau[:, None], n[:, None])
+    peak = np.nanmax(np.where(np.isfinite(reading), reading, np.nan), axis=1, keepdims=True)
+    reading = np.maximum(reading + noise * peak * rng.standard_normal(reading.shape), 0)
+    return pd.DataFrame({
+        RUN: np.repeat([f'τ = {t:g} min, N = {k:g}' for t, k in zip(tau, n)], num_points),
+        TIME: np.round(time.ravel(), 3),
+        TRACER: np.round(reading.ravel(), 4)
+    })
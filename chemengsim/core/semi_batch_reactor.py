@@ -0,0 +1,640 @@
+"""
+Isothermal Semi-batch Reactor Model
+===================================
+
+Saponification of ethyl acetate with ethyl acetate fed continuously into an initial charge of NaOH.
+The material balances of the :mod:`~chemengsim.core.reactions` network are integrated with an
+implicit method and its analytic Jacobian.  :func:`simulate` locates the time at which the
+NaOH conversion of one run reaches a target by event detection during the same integration.
+:func:`profiles` sweeps any of the operating conditions with all scenarios stacked into a
+single ODE solve, and :func:`time_to_conversion` brackets the target crossings of arrays of
+conditions on the grid of one such solve and refines them all at once.
+
+Feed schedules replace the constant feed with a sequence of :class:`FeedSegment` stages:
+constant feeds, linear ramps and pauses, each optionally ended early by a volume limit or
+a conversion target.  :func:`simulate_schedule` integrates one schedule segment by segment
+with dense output; :func:`compare_schedules` evaluates several at once and integrates the
+segments they share at the start only once.
+
+:func:`screen_runaway` adds the energy balance for thermal-runaway screening: the maximum
+temperature of the synthesis reaction (MTSR) and the accumulation of unreacted feed over a
+grid of feed rates and cooling capacities, all integrated in one stacked solve.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from chemengsim.core import reactions
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+
+# Operating conditions that profiles() can vary across scenarios
+SWEEPABLE = ('initial_vol_reactor', 'initial_conc_naoh', 'initial_conc_ea', 'feed_flow_rate', 'feed_conc_ea',
+             'temperature')
+
+# Minimum number of time points on which screen_runaway() looks for the MTSR
+MTSR_POINTS = 2000
+
+# Minimum number of time points on which time_to_conversion() brackets the target crossings
+CROSSING_POINTS = 501
+# Newton steps refining each bracketed crossing on its cubic Hermite interpolant
+CROSSING_NEWTON_STEPS = 4
+
+
+@dataclass(frozen=True)
+class Params:
+    """Initial charge, feed stream and operating conditions of the semi-batch reactor"""
+    initial_vol_reactor: float = 1.0   # L
+    initial_conc_naoh: float = 0.01    # mol/L
+    initial_conc_ea: float = 0.0       # mol/L
+    feed_flow_rate: float = 0.1        # L/min
+    feed_conc_ea: float = 0.05         # mol/L
+    temperature: float = 35.0          # °C
+    total_time: float = 30.0           # minutes
+    num_points: int = 100
+    network: reactions.Network = reactions.SAPONIFICATION
+    target_conversion: float = 90.0    # % of NaOH, for Result.time_to_target
+
+
+@dataclass(frozen=True)
+class Result:
+    """Concentration, volume and conversion profiles computed by :func:`simulate`"""
+    k: float
+    time_points: np.ndarray
+    volume: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray
+    concentrations: np.ndarray         # every species of the network, shape (n_species, num_points)
+    time_to_target: float              # minutes to the target conversion; inf if not within total_time
+
+    @timing.timed('tabulate.semi_batch_reactor.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the profiles with the column names used for CSV download"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'Volume (L)': self.volume,
+            'NaOH Concentration (mol/L)': self.conc_naoh,
+            'Ethyl Acetate Concentration (mol/L)': self.conc_ea,
+            'Products Concentration (mol/L)': self.conc_products,
+            'NaOH Conversion (%)': self.conversion
+        })
+
+
+@dataclass(frozen=True)
+class FeedSegment:
+    """One stage of a feed schedule: a constant feed, a linear ramp or a pause (zero flow)"""
+    duration: float                           # minutes, unless a stop condition ends the stage first
+    flow_rate: float                          # L/min at the start of the stage
+    final_flow_rate: Optional[float] = None   # L/min at the planned end for a ramp; constant if None
+    feed_conc_ea: Optional[float] = None      # mol/L; Params.feed_conc_ea if None
+    max_volume: Optional[float] = None        # L; the stage ends when the volume reaches it
+    stop_conversion: Optional[float] = None   # % of NaOH; the stage ends when the conversion reaches it
+
+    def __post_init__(self):
+        if self.duration < 0:
+            raise ValueError("segment duration must not be negative, got %r" % self.duration)
+        if min(self.flow_rate, self.end_flow_rate) < 0:
+            raise ValueError("feed rates must not be negative, got %r to %r" % (self.flow_rate, self.end_flow_rate))
+
+    @property
+    def end_flow_rate(self):
+        """Feed rate at the planned end of the stage (L/min)"""
+        return self.flow_rate if self.final_flow_rate is None else self.final_flow_rate
+
+    @property
+    def ramp(self):
+        """Rate of change of the feed rate (L/min²)"""
+        return (self.end_flow_rate - self.flow_rate) / self.duration if self.duration > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class ScheduleResult:
+    """Profiles of one feed schedule computed by :func:`simulate_schedule`"""
+    time_points: np.ndarray
+    feed_flow_rate: np.ndarray
+    volume: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray
+    concentrations: np.ndarray         # every species of the network, shape (n_species, num_points)
+    segment_times: np.ndarray          # start of every stage and end of the last one (minutes)
+    segment_flow_rates: np.ndarray     # feed rates at the start and actual end of every stage, shape (n, 2)
+
+    @timing.timed('tabulate.semi_batch_reactor.ScheduleResult.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the profiles with the column names used for CSV download"""
+        return pd.DataFrame({
+            'Time (minutes)': self.time_points,
+            'Feed Flow Rate (L/min)': self.feed_flow_rate,
+            'Volume (L)': self.volume,
+            'NaOH Concentration (mol/L)': self.conc_naoh,
+            'Ethyl Acetate Concentration (mol/L)': self.conc_ea,
+            'Products Concentration (mol/L)': self.conc_products,
+            'NaOH Conversion (%)': self.conversion
+        })
+
+
+@dataclass(frozen=True)
+class ScheduleComparison:
+    """Results of several feed schedules computed by :func:`compare_schedules`"""
+    results: tuple                     # one ScheduleResult per schedule
+    segments: int                      # stages over all schedules
+    integrated_segments: int           # stages actually integrated; shared prefixes count once
+
+
+@dataclass(frozen=True)
+class RunawayParams:
+    """Thermal data of the runaway screening by :func:`screen_runaway`"""
+    jacket_temp: float = 25.0            # °C
+    feed_temp: float = 25.0              # °C
+    heat_capacity: float = 4184.0        # J/(L·K) of the mixture and the feed (water)
+    max_technical_temp: float = 77.0     # °C, MTT; boiling point of ethyl acetate
+
+
+@dataclass(frozen=True)
+class RunawayScreening:
+    """
+    Thermal profiles and safety indices of a scenario grid computed by :func:`screen_runaway`.
+
+    Grid arrays have shape (len(feed_flow_rates), len(ua_values)); profiles add the time axis.
+    """
+    feed_flow_rates: np.ndarray           # L/min
+    ua_values: np.ndarray                 # W/K
+    time_points: np.ndarray
+    temperature: np.ndarray               # °C
+    accumulation: np.ndarray              # % of the limiting charge fed but not yet reacted
+    max_temperature: np.ndarray           # °C
+    mtsr: np.ndarray                      # °C, maximum temperature of the synthesis reaction
+    adiabatic_temperature_rise: np.ndarray   # K, of the whole charge
+    final_conversion: np.ndarray          # % of NaOH
+    max_technical_temp: float             # °C
+
+    @property
+    def unsafe(self):
+        """Scenarios whose temperature could reach the MTT, by cooling failure or in normal operation"""
+        return (self.mtsr >= self.max_technical_temp) | (self.max_temperature >= self.max_technical_temp)
+
+
+@dataclass(frozen=True)
+class Profiles:
+    """
+    Profiles of many semi-batch scenarios computed by :func:`profiles`.
+
+    The arrays have the broadcast shape S of the swept conditions followed by the time axis.
+    """
+    time_points: np.ndarray
+    volume: np.ndarray
+    conc_naoh: np.ndarray
+    conc_ea: np.ndarray
+    conc_products: np.ndarray
+    conversion: np.ndarray
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Integrates the semi-batch material balances.
+
+    Parameters:
+    -----------
+    params : Params
+        Reactor charge, feed and operating conditions
+
+    Returns:
+    --------
+    Result
+        Rate constant and concentration/volume/conversion profiles
+    """
+    network = params.network
+    k = float(network.rate_constants(params.temperature)[0][0])
+
+    t_eval = np.linspace(0, params.total_time, params.num_points)
+    solution = _solve(params, t_eval, terminal=False)
+
+    conc_naoh = solution['NaOH']
+    conc_ea = solution['EtOAc']
+    volume = solution.volume
+
+    # Products formed from the NaOH consumed
+    initial_naoh_moles = params.initial_conc_naoh * params.initial_vol_reactor
+    products_moles = initial_naoh_moles - conc_naoh * volume
+    conc_products = products_moles / volume
+    conversion = (1 - (conc_naoh * volume) / initial_naoh_moles) * 100
+
+    return Result(
+        k=k,
+        time_points=solution.t,
+        volume=volume,
+        conc_naoh=conc_naoh,
+        conc_ea=conc_ea,
+        conc_products=conc_products,
+        conversion=conversion,
+        concentrations=solution.conc,
+        time_to_target=_first_event(solution)
+    )
+
+
+@memoize
+def profiles(params: Params, **conditions) -> Profiles:
+    """
+    Integrates many semi-batch scenarios in one stacked ODE solve.
+
+    Parameters:
+    -----------
+    params : Params
+        Base conditions, including the time grid
+    **conditions : float or numpy.ndarray
+        Any of ``initial_vol_reactor``, ``initial_conc_naoh``, ``initial_conc_ea``,
+        ``feed_flow_rate``, ``feed_conc_ea`` and ``temperature`` to vary, broadcast with each
+        other to the scenario shape S, e.g. ``feed_flow_rate=np.linspace(0.05, 0.5, 200)``
+
+    Returns:
+    --------
+    Profiles
+        Volume, concentration and conversion profiles of shape S + (num_points,)
+    """
+    t_eval = np.linspace(0, params.total_time, params.num_points)
+    shape, initial_naoh_moles, _, solution = _solve_stacked(params, t_eval, conditions)
+
+    naoh, ea = params.network.index('NaOH'), params.network.index('EtOAc')
+    volume = solution.volume
+    conc_naoh = solution.conc[naoh]
+    initial_naoh_moles = initial_naoh_moles[:, np.newaxis]
+    products_moles = initial_naoh_moles - conc_naoh * volume
+    return Profiles(
+        time_points=solution.t,
+        volume=volume.reshape(shape + (-1,)),
+        conc_naoh=conc_naoh.reshape(shape + (-1,)),
+        conc_ea=solution.conc[ea].reshape(shape + (-1,)),
+        conc_products=(products_moles / volume).reshape(shape + (-1,)),
+        conversion=((1 - conc_naoh * volume / initial_naoh_moles) * 100).reshape(shape + (-1,))
+    )
+
+
+@memoize
+def simulate_schedule(params: Params, schedule) -> ScheduleResult:
+    """
+    Integrates the semi-batch reactor under a feed schedule.
+
+    Parameters:
+    -----------
+    params : Params
+        Initial charge, temperature and default feed concentration; ``feed_flow_rate`` and
+        ``total_time`` are replaced by the schedule
+    schedule : sequence of FeedSegment
+        Stages of the feed, in order
+
+    Returns:
+    --------
+    ScheduleResult
+        Profiles on ``num_points`` times spanning the schedule, and the stage boundaries
+    """
+    return compare_schedules.__wrapped__(params, (tuple(schedule),)).results[0]
+
+
+@memoize
+def compare_schedules(params: Params, schedules) -> ScheduleComparison:
+    """
+    Integrates several feed schedules in one run, sharing common prefixes.
+
+    The schedules form a prefix tree: a stage is integrated once for all schedules that
+    start with the same stages, from the state its parent stage ended in, so e.g. variants
+    that only differ after a common start-up cost one start-up.  Every stage keeps the
+    dense output of its integration, and the profiles of each schedule are evaluated from
+    the dense outputs along its path.
+
+    Parameters:
+    -----------
+    params : Params
+        Initial charge, temperature and default feed concentration
+    schedules : sequence of sequence of FeedSegment
+        Feed schedules to compare
+
+    Returns:
+    --------
+    ScheduleComparison
+        One :class:`ScheduleResult` per schedule and the number of stages integrated
+
+    Raises:
+    -------
+    ValueError
+        If a schedule has no stages
+    """
+    if any(len(schedule) == 0 for schedule in schedules):
+        raise ValueError("a feed schedule needs at least one segment")
+    network = params.network
+    n_species = len(network.species)
+    naoh, ea = network.index('NaOH'), network.index('EtOAc')
+    initial_moles = params.initial_conc_naoh * params.initial_vol_reactor
+    y0 = np.append(network.vector({'NaOH': params.initial_conc_naoh, 'EtOAc': params.initial_conc_ea}),
+                   params.initial_vol_reactor)
+
+    # Prefix of stages -> (final time, final state, last step size, stages along the path)
+    nodes = {(): (0.0, y0, None, ())}
+    for schedule in schedules:
+        schedule = tuple(schedule)
+        for i in range(len(schedule)):
+            if schedule[:i + 1] not in nodes:
+                nodes[schedule[:i + 1]] = _integrate_segment(params, schedule[i], nodes[schedule[:i]],
+                                                             n_species, naoh, initial_moles)
+
+    results = []
+    for schedule in schedules:
+        _, _, _, pieces = nodes[tuple(schedule)]
+        results.append(_schedule_result(params, pieces, n_species, naoh, ea, initial_moles))
+
+    return ScheduleComparison(
+        results=tuple(results),
+        segments=sum(len(schedule) for schedule in schedules),
+        integrated_segments=len(nodes) - 1
+    )
+
+
+def _integrate_segment(params, segment, parent, n_species, naoh, initial_moles):
+    """Integrate one stage from the end of its parent, returning the node of the prefix tree"""
+    t0, y0, step, pieces = parent
+    network = params.network
+    target_moles = None if segment.stop_conversion is None else initial_moles * (1 - segment.stop_conversion / 100)
+
+    def volume_reached(t, y):
+        return y[n_species] - segment.max_volume
+
+    def conversion_reached(t, y):
+        return y[naoh] * y[n_species] - target_moles
+
+    volume_reached.terminal = conversion_reached.terminal = True
+    events = []
+    if segment.max_volume is not None:
+        events.append(volume_reached)
+    if target_moles is not None:
+        events.append(conversion_reached)
+
+    # A stop condition already met, or nothing to integrate, ends the stage where it starts
+    if segment.duration == 0 or any(event(t0, y0) >= 0 if event is volume_reached else event(t0, y0) <= 0
+                                    for event in events):
+        return t0, y0, step, pieces + ((segment, t0, t0, None),)
+
+    t1 = t0 + segment.duration
+    solution = reactions.feed_segment(
+        network,
+        y0[:n_species],
+        y0[n_species],
+        (t0, t1),
+        segment.flow_rate,
+        network.vector({'EtOAc': params.feed_conc_ea if segment.feed_conc_ea is None else segment.feed_conc_ea}),
+        params.temperature,
+        flow_ramp=segment.ramp,
+        events=events or None,
+        first_step=None if step is None else min(step, segment.duration)
+    )
+    # The last full step size seeds the next stage
+    if len(solution.t) > 2:
+        step = solution.t[-2] - solution.t[-3]
+    return solution.t[-1], solution.y[:, -1], step, pieces + ((segment, t0, solution.t[-1], solution.sol),)
+
+
+def _schedule_result(params, pieces, n_species, naoh, ea, initial_moles):
+    """Evaluate the dense outputs of the stages of one schedule on its time grid"""
+    time_points = np.linspace(0, pieces[-1][2], params.num_points)
+    states = np.empty((n_species + 1, len(time_points)))
+    states[:] = np.append(params.network.vector({'NaOH': params.initial_conc_naoh, 'EtOAc': params.initial_conc_ea}),
+                          params.initial_vol_reactor)[:, np.newaxis]
+    flow = np.zeros(len(time_points))
+    for segment, start, stop, sol in pieces:
+        if sol is None:
+            continue
+        inside = (time_points >= start) & (time_points <= stop)
+        states[:, inside] = sol(time_points[inside])
+        flow[inside] = segment.flow_rate + segment.ramp * (time_points[inside] - start)
+
+    volume = states[n_species]
+    conc_naoh = states[naoh]
+    moles_naoh = conc_naoh * volume
+    return ScheduleResult(
+        time_points=time_points,
+        feed_flow_rate=flow,
+        volume=volume,
+        conc_naoh=conc_naoh,
+        conc_ea=states[ea],
+        conc_products=(initial_moles - moles_naoh) / volume,
+        conversion=(1 - moles_naoh / initial_moles) * 100,
+        concentrations=states[:n_species],
+        segment_times=np.array([0.0] + [stop for _, _, stop, _ in pieces]),
+        segment_flow_rates=np.array([(segment.flow_rate, segment.flow_rate + segment.ramp * (stop - start))
+                                     for segment, start, stop, _ in pieces]).reshape(-1, 2)
+    )
+
+
+@memoize
+def screen_runaway(params: Params, runaway_params: RunawayParams, feed_flow_rates, ua_values) -> RunawayScreening:
+    """
+    Screens a grid of feed rates and cooling capacities for thermal runaway.
+
+    Every scenario starts at the reaction temperature of ``params`` and is fed for the whole
+    ``total_time``.  Should the cooling fail at time t, the reactant fed but not yet reacted
+    (the accumulation) would react adiabatically, so the temperature could reach
+    T(t) + (-ΔH)·n_acc(t) / (ρc_p·V(t)); the MTSR is the largest such value over the run.
+    A scenario is unsafe when the MTSR or the temperature itself reaches the MTT.
+
+    Parameters:
+    -----------
+    params : Params
+        Initial charge, feed concentration, reaction temperature and time grid
+    runaway_params : RunawayParams
+        Jacket and feed temperatures, heat capacity and MTT
+    feed_flow_rates : numpy.ndarray
+        Feed rates of the grid (L/min)
+    ua_values : numpy.ndarray
+        Jacket heat transfer coefficients times area of the grid (W/K)
+
+    Returns:
+    --------
+    RunawayScreening
+        Temperature and accumulation profiles, MTSR and adiabatic rise of every scenario
+    """
+    network = params.network
+    naoh, ea = network.index('NaOH'), network.index('EtOAc')
+    feed_flow_rates = np.asarray(feed_flow_rates, dtype=float)
+    ua_values = np.asarray(ua_values, dtype=float)
+    flow, ua = (values.ravel() for values in np.meshgrid(feed_flow_rates, ua_values, indexing='ij'))
+    shape = (len(feed_flow_rates), len(ua_values))
+    heat_capacity = runaway_params.heat_capacity
+
+    initial_conc = np.repeat(network.vector({'NaOH': params.initial_conc_naoh,
+                                             'EtOAc': params.initial_conc_ea})[:, np.newaxis], len(flow), axis=1)
+    # The accumulation peaks sharply once the feed matches the NaOH charge, so the MTSR is taken
+    # on a finer grid that contains the output points
+    refine = -(-MTSR_POINTS // (params.num_points - 1))
+    t_eval = np.linspace(0, params.total_time, (params.num_points - 1) * refine + 1)
+    solution = reactions.stacked_cooled_semi_batch(
+        network,
+        initial_conc,
+        params.initial_vol_reactor,
+        params.temperature,
+        flow,
+        network.vector({'EtOAc': params.feed_conc_ea}),
+        runaway_params.feed_temp,
+        heat_capacity,
+        ua * 60,  # J/(min·K)
+        runaway_params.jacket_temp,
+        t_eval
+    )
+    volume, temperature = solution.volume, solution.temperature
+    moles_naoh, moles_ea = solution.conc[naoh] * volume, solution.conc[ea] * volume
+
+    # Reactant that could still react if the cooling failed, and the whole charge
+    heat_of_reaction = -network.heats_of_reaction[0]
+    accumulated = np.minimum(moles_naoh, moles_ea)
+    initial_naoh = params.initial_conc_naoh * params.initial_vol_reactor
+    charge = np.minimum(initial_naoh, params.initial_conc_ea * params.initial_vol_reactor
+                        + params.feed_conc_ea * flow * params.total_time)
+    mtsr = (temperature + heat_of_reaction * accumulated / (heat_capacity * volume)).max(axis=1)
+    max_temperature = temperature.max(axis=1)
+    accumulation = 100 * accumulated[:, ::refine] / np.maximum(charge, np.finfo(float).tiny)[:, np.newaxis]
+
+    return RunawayScreening(
+        feed_flow_rates=feed_flow_rates,
+        ua_values=ua_values,
+        time_points=solution.t[::refine],
+        temperature=temperature[:, ::refine].reshape(shape + (-1,)),
+        accumulation=accumulation.reshape(shape + (-1,)),
+        max_temperature=max_temperature.reshape(shape),
+        mtsr=mtsr.reshape(shape),
+        adiabatic_temperature_rise=(heat_of_reaction * charge / (heat_capacity * volume[:, -1])).reshape(shape),
+        final_conversion=(100 * (1 - moles_naoh[:, -1] / initial_naoh)).reshape(shape),
+        max_technical_temp=runaway_params.max_technical_temp
+    )
+
+
+def time_to_conversion(target_conversion, params: Params = Params(), **conditions):
+    """
+    Times to reach target NaOH conversions for arrays of semi-batch conditions.
+
+    The distinct conditions are integrated together in one stacked solve on a grid of at
+    least :data:`CROSSING_POINTS` times.  NaOH is never fed, so its moles only fall and the
+    first grid point at or below each target brackets the crossing; all brackets are then
+    refined at once by Newton steps on the cubic Hermite interpolant of the NaOH moles,
+    whose end slopes are the reaction rates at the bracket ends.
+
+    Parameters:
+    -----------
+    target_conversion : float or numpy.ndarray
+        Target NaOH conversions (%)
+    params : Params
+        Base conditions; ``total_time`` is the longest time searched
+    **conditions : float or numpy.ndarray
+        Any of :data:`SWEEPABLE` to vary, e.g. ``feed_flow_rate=[0.05, 0.1, 0.2]``; broadcast
+        with each other and with ``target_conversion``
+
+    Returns:
+    --------
+    numpy.ndarray
+        Times (minutes) of the broadcast shape of the arguments; inf where the target is not
+        reached within ``params.total_time``
+
+    Raises:
+    -------
+    ValueError
+        If a condition is not one of :data:`SWEEPABLE`
+    """
+    names = list(conditions)
+    target, *values = np.broadcast_arrays(np.asarray(target_conversion, dtype=float),
+                                          *(np.asarray(conditions[name], dtype=float) for name in names))
+    shape = target.shape
+    target = target.ravel()
+
+    # Targets sharing their conditions share one scenario of the stacked solve
+    points = np.column_stack([value.ravel() for value in values]) if names else np.zeros((target.size, 0))
+    scenarios, inverse = np.unique(points, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    t_eval = np.linspace(0, params.total_time, max(params.num_points, CROSSING_POINTS))
+    _, initial_moles, temperature, solution = _solve_stacked(
+        params, t_eval, {name: scenarios[:, column] for column, name in enumerate(names)})
+
+    network = params.network
+    naoh = network.index('NaOH')
+    moles = (solution.conc[naoh] * solution.volume)[inverse]
+    rates = (network.production(solution.conc, k=network.rate_constants(temperature)[..., np.newaxis])[naoh]
+             * solution.volume)[inverse]
+    goal = initial_moles[inverse] * (1 - target / 100)
+
+    # Bracket [t_0, t_1] ending at the first grid point at or below the goal
+    below = moles <= goal[:, np.newaxis]
+    rows = np.arange(target.size)
+    first = below.argmax(axis=1)
+    reached = below[rows, first]
+    end = np.maximum(first, 1)
+    t0, t1 = t_eval[end - 1], t_eval[end]
+    h = t1 - t0
+    m0, m1 = moles[rows, end - 1], moles[rows, end]
+    d0, d1 = h * rates[rows, end - 1], h * rates[rows, end]
+
+    # Newton steps in s = (t - t_0)/h on the Hermite cubic, from the secant estimate
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.clip(np.nan_to_num((m0 - goal) / (m0 - m1)), 0.0, 1.0)
+        for _ in range(CROSSING_NEWTON_STEPS):
+            value = ((2 * s**3 - 3 * s**2 + 1) * m0 + (s**3 - 2 * s**2 + s) * d0
+                     + (3 * s**2 - 2 * s**3) * m1 + (s**3 - s**2) * d1 - goal)
+            slope = (6 * s**2 - 6 * s) * (m0 - m1) + (3 * s**2 - 4 * s + 1) * d0 + (3 * s**2 - 2 * s) * d1
+            s = np.clip(s - np.where(slope < 0, value / slope, 0.0), 0.0, 1.0)
+    times = np.where(first == 0, 0.0, t0 + s * h)
+    return np.where(reached, times, np.inf).reshape(shape)
+
+
+def _solve_stacked(params, t_eval, conditions):
+    """
+    Stacked solve of the scenarios of ``conditions`` around ``params``, returning their
+    shape, initial NaOH moles, temperatures and the solution
+    """
+    unknown = set(conditions) - set(SWEEPABLE)
+    if unknown:
+        raise ValueError("cannot sweep %s, expected any of %s" % (', '.join(sorted(unknown)), ', '.join(SWEEPABLE)))
+    values = np.broadcast_arrays(*(np.asarray(conditions.get(name, getattr(params, name)), dtype=float)
+                                   for name in SWEEPABLE))
+    shape = values[0].shape
+    volume0, naoh0, ea0, flow, feed_ea, temperature = (value.ravel() for value in values)
+
+    network = params.network
+    naoh, ea = network.index('NaOH'), network.index('EtOAc')
+    initial_conc = np.zeros((len(network.species), len(naoh0)))
+    initial_conc[naoh], initial_conc[ea] = naoh0, ea0
+    feed_conc = np.zeros_like(initial_conc)
+    feed_conc[ea] = feed_ea
+    solution = reactions.stacked_semi_batch(network, initial_conc, volume0, flow, feed_conc, t_eval, temperature)
+    return shape, naoh0 * volume0, temperature, solution
+
+
+def _solve(params, t_eval, terminal):
+    """Integrate the material balances with an event at the target conversion"""
+    network = params.network
+    naoh = network.index('NaOH')
+    n_species = len(network.species)
+    target_moles = params.initial_conc_naoh * params.initial_vol_reactor * (1 - params.target_conversion / 100)
+
+    def target_reached(t, y):
+        return y[naoh] * y[n_species] - target_moles
+
+    target_reached.terminal = terminal
+    return reactions.semi_batch(
+        network,
+        network.vector({'NaOH': params.initial_conc_naoh, 'EtOAc': params.initial_conc_ea}),
+        params.initial_vol_reactor,
+        params.feed_flow_rate,
+        network.vector({'EtOAc': params.feed_conc_ea}),
+        t_eval,
+        params.temperature,
+        event=target_reached
+    )
+
+
+def _first_event(solution):
+    """Time of the first target crossing, or inf if there is none"""
+    return float(solution.t_events[0]) if len(solution.t_events) else np.inf
+
@@ -0,0 +1,328 @@
+"""
+Shared Result Store
+===================
+
+Persistent, content-addressed store of simulation results shared by every Streamlit
+session, worker process and restart on a machine.
+
+Results are kept in a SQLite database keyed by experiment, model version and a hash of
+the normalized parameters.  The model version is a digest of the source of the model
+module and of every ``chemengsim`` module it uses, directly or through other modules,
+so editing a model or a shared helper such as :mod:`~chemengsim.core.kinetics`
+invalidates the stored results automatically.  Each result
+is serialized as a small JSON header followed by the raw bytes of its arrays, and
+lookups rebuild the arrays with ``np.frombuffer`` over the stored blob without copying
+or parsing them.  Entries are written in a single transaction and the least recently
+used entries are evicted once the database exceeds its size cap; each process keeps a
+running total of the stored bytes and recounts the table only when the total crosses
+the cap or every :data:`SYNC_WRITES` writes, to pick up other processes' entries.
+
+The database path is taken from the ``CHEMENGSIM_STORE`` environment variable (an empty
+value, ``0``, ``false`` or ``off`` disables the store) and defaults to ``chemengsim/results.sqlite`` in the system
+temporary directory; ``CHEMENGSIM_STORE_MAX_MB`` sets the size cap.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'chemengsim', 'results.sqlite')
+DEFAULT_MAX_MB = 256.0
+ALIGNMENT = 16  # bytes, alignment of each array in a payload
+DISABLED = ('', '0', 'false', 'off', 'no')  # CHEMENGSIM_STORE values that disable the store
+SYNC_WRITES = 100  # writes between exact recounts of the stored bytes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    experiment TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    param_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (experiment, model_version, param_hash)
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+"""
+
+
+def _dependencies(module):
+    """Names of the ``chemengsim`` modules used by ``module``, directly or transitively, and itself"""
+    names, pending = set(), [module.__name__]
+    while pending:
+        name = pending.pop()
+        if name in names or name not in sys.modules:
+            continue
+        names.add(name)
+        for value in vars(sys.modules[name]).values():
+            used = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if isinstance(used, str) and used.startswith('chemengsim.'):
+                pending.append(used)
+    return sorted(names)
+
+
+@functools.lru_cache(maxsize=None)
+def model_version(func):
+    """Digest of the source of the module defining ``func`` and of the modules it depends on"""
+    digest = hashlib.sha256()
+    for name in _dependencies(sys.modules[func.__module__]):
+        try:
+            source = inspect.getsource(sys.modules[name])
+        except (OSError, TypeError):
+            source = name
+        digest.update(name.encode() + b'\0' + source.encode() + b'\0')
+    return digest.hexdigest()[:16]
+
+
+def param_hash(key):
+    """Stable digest of a normalized cache key"""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+def _encode_scalar(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic) and value.dtype.kind in 'biuf':
+        return value.item()
+    raise TypeError("unsupported value %r" % type(value))
+
+
+def encode(result):
+    """
+    Serializes a result dataclass to a compact binary payload.
+
+    Parameters:
+    -----------
+    result : dataclass
+        Frozen result of a ``chemengsim.core`` model whose fields are scalars or
+        numeric NumPy arrays
+
+    Returns:
+    --------
+    bytes
+        Length-prefixed JSON header followed by the aligned raw array data
+
+    Raises:
+    -------
+    TypeError
+        If the result holds values that cannot be stored
+    """
+    cls = type(result)
+    if not dataclasses.is_dataclass(result) or not cls.__module__.startswith('chemengsim.'):
+        raise TypeError("unsupported result %r" % cls)
+
+    scalars, arrays, chunks, offset = {}, {}, [], 0
+    for field in dataclasses.fields(result):
+        value = getattr(result, field.name)
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind not in 'biuf':
+                raise TypeError("unsupported array dtype %s" % value.dtype)
+            data = np.ascontiguousarray(value).tobytes()
+            padding = -offset % ALIGNMENT
+            chunks.append(b'\0' * padding)
+            offset += padding
+            arrays[field.name] = [value.dtype.str, list(value.shape), offset]
+            chunks.append(data)
+            offset += len(data)
+        else:
+            scalars[field.name] = _encode_scalar(value)
+
+    header = json.dumps({'type': [cls.__module__, cls.__qualname__], 'scalars': scalars,
+                         'arrays': arrays}).encode()
+    header += b' ' * (-(len(header) + 4) % ALIGNMENT)
+    return struct.pack('<I', len(header)) + header + b''.join(chunks)
+
+
+def decode(payload):
+    """Rebuilds a result from :func:`encode` output, viewing its arrays in ``payload``"""
+    (header_length,) = struct.unpack_from('<I', payload)
+    header = json.loads(bytes(payload[4:4 + header_length]))
+    base = 4 + header_length
+
+    module_name, qualname = header['type']
+    if not module_name.startswith('chemengsim.'):
+        raise TypeError("unsupported result type %s" % module_name)
+    cls = importlib.import_module(module_name)
+    for name in qualname.split('.'):
+        cls = getattr(cls, name)
+
+    values = dict(header['scalars'])
+    for name, (dtype, shape, offset) in header['arrays'].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        array = np.frombuffer(payload, dtype=dtype, count=count, offset=base + offset).reshape(shape)
+        array.flags.writeable = False
+        values[name] = array
+    return cls(**values)
+
+
+class ResultStore:
+    """
+    SQLite-backed store of encoded results with a size cap.
+
+    Parameters:
+    -----------
+    path : str
+        Database file, created on first use
+    max_bytes : int
+        Maximum total payload size; least recently used entries are evicted beyond it
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=int(DEFAULT_MAX_MB * 2**20)):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._disabled = False
+        self._total = None  # running estimate of the stored bytes
+        self._writes = 0
+
+    @classmethod
+    def from_env(cls):
+        """Store configured from ``CHEMENGSIM_STORE``/``CHEMENGSIM_STORE_MAX_MB``, or None if disabled"""
+        path = os.environ.get('CHEMENGSIM_STORE', DEFAULT_PATH)
+        if path.strip().lower() in DISABLED:
+            return None
+        max_mb = float(os.environ.get('CHEMENGSIM_STORE_MAX_MB', DEFAULT_MAX_MB))
+        return cls(path, max_bytes=int(max_mb * 2**20))
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _fail(self):
+        # A read-only or corrupt location must never break the app; fall back to computing
+        with self._lock:
+            self.errors += 1
+            self._disabled = True
+
+    def get(self, experiment, version, digest):
+        """Return ``(True, result)`` if stored, else ``(False, None)``"""
+        if self._disabled:
+            return False, None
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT payload FROM results WHERE experiment=? AND model_version=? '
+                               'AND param_hash=?', (experiment, version, digest)).fetchone()
+            if row is not None:
+                conn.execute('UPDATE results SET accessed=? WHERE experiment=? AND model_version=? '
+                             'AND param_hash=?', (time.time(), experiment, version, digest))
+                result = decode(row[0])
+        except (sqlite3.Error, OSError):
+            self._fail()
+            return False, None
+        except (TypeError, ValueError, KeyError, AttributeError, ImportError, struct.error):
+            row = None  # stale or unreadable entry, recompute and overwrite it
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, result
+
+    def put(self, experiment, version, digest, result):
+        """Atomically store a result and evict old entries beyond the size cap"""
+        if self._disabled:
+            return
+        try:
+            payload = encode(result)
+        except TypeError:
+            return
+        if len(payload) > self.max_bytes:
+            return
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                             (experiment, version, digest, len(payload), time.time(), sqlite3.Binary(payload)))
+                self._evict(conn, len(payload))
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        except (sqlite3.Error, OSError):
+            self._fail()
+
+    def _evict(self, conn, added):
+        with self._lock:
+            self._writes += 1
+            estimate = None if self._total is None or self._writes % SYNC_WRITES == 0 else self._total + added
+            if estimate is not None and estimate <= self.max_bytes:
+                self._total = estimate
+                return
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total > self.max_bytes:
+            for rowid, size in conn.execute('SELECT rowid, size FROM results ORDER BY accessed').fetchall():
+                conn.execute('DELETE FROM results WHERE rowid=?', (rowid,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._total = total
+
+    def get_or_compute(self, func, key, compute):
+        """Stored result of ``func`` for the normalized ``key``, calling ``compute()`` on a miss"""
+        experiment = '%s.%s' % (func.__module__.rsplit('.', 1)[-1], func.__qualname__)
+        version = model_version(func)
+        digest = param_hash(key)
+        hit, result = self.get(experiment, version, digest)
+        if hit:
+            return result
+        result = compute()
+        self.put(experiment, version, digest, result)
+        return result
+
+    def clear(self):
+        """Delete every stored result"""
+        try:
+            self._connection().execute('DELETE FROM results')
+        except (sqlite3.Error, OSError):
+            self._fail()
+        with self._lock:
+            self._total = None
+
+    def stats(self):
+        """Hit/miss counters, number of entries and stored bytes"""
+        entries = size = 0
+        if not self._disabled:
+            try:
+                entries, size = self._connection().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+            except (sqlite3.Error, OSError):
+                self._fail()
+        with self._lock:
+            return {
+                'path': self.path,
+                'enabled': not self._disabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes
+            }
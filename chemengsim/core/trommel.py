@@ -0,0 +1,238 @@
+"""
+Trommel Screen Model
+====================
+
+Screening efficiency, partition curve and product split of a rotating trommel screen.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from chemengsim import timing
+from chemengsim.core.cache import memoize
+
+G = 9.81       # m/s²
+K_RESIDENCE = 0.2  # empirical constant of the residence time correlation (typically 0.15-0.25)
+
+
+@dataclass(frozen=True)
+class Params:
+    """Trommel geometry, screen, operating conditions and feed size range"""
+    trommel_diameter: float = 1.5      # m
+    trommel_length: float = 4.0        # m
+    inclination_angle: float = 5.0     # degrees
+    aperture_size: float = 10.0        # mm
+    open_area: float = 40.0            # %
+    rotation_speed: float = 15.0       # rpm
+    feed_rate: float = 50.0            # tons/h
+    bulk_density: float = 1500.0       # kg/m³
+    moisture_content: float = 5.0      # %
+    d_min: float = 1.0                 # mm
+    d_max: float = 50.0                # mm
+    num_points: int = 50
+
+
+@dataclass(frozen=True)
+class Result:
+    """Screening performance computed by :func:`simulate`"""
+    critical_speed: float
+    relative_speed: float
+    residence_time: float
+    material_mass: float
+    screen_area: float
+    effective_area: float
+    unit_capacity: float
+    size_points: np.ndarray
+    mass_fractions: np.ndarray
+    cumulative_distribution: np.ndarray
+    efficiencies: np.ndarray
+    feed_size_masses: np.ndarray
+    undersize_size_masses: np.ndarray
+    oversize_size_masses: np.ndarray
+    actual_cut_size: float
+    theoretical_cut_size: float
+    screening_efficiency: float
+
+    @property
+    def total_undersize_mass(self):
+        """Undersize production (tons/h)"""
+        return np.sum(self.undersize_size_masses)
+
+    @property
+    def total_oversize_mass(self):
+        """Oversize production (tons/h)"""
+        return np.sum(self.oversize_size_masses)
+
+    @property
+    def partition_numbers(self):
+        """Percent of each size fraction reporting to oversize"""
+        return 100 * (1 - self.efficiencies)
+
+    @timing.timed('tabulate.trommel.Result.to_dataframe')
+    def to_dataframe(self):
+        """Tabulate the size-by-size screening results"""
+        return pd.DataFrame({
+            'Particle Size (mm)': self.size_points,
+            'Mass Fraction': self.mass_fractions,
+            'Cumulative Distribution (%)': self.cumulative_distribution * 100,
+            'Screening Efficiency (%)': self.efficiencies * 100,
+            'Partition Number (%)': self.partition_numbers,
+            'Feed (tons/h)': self.feed_size_masses,
+            'Undersize (tons/h)': self.undersize_size_masses,
+            'Oversize (tons/h)': self.oversize_size_masses
+        })
+
+
+def critical_speed(trommel_diameter):
+    """Speed (rpm) at which centrifugal force equals gravity at the drum periphery"""
+    return np.sqrt(G / (trommel_diameter/2)) * 60 / (2 * np.pi)
+
+
+def residence_time(params: Params, rotation_speed=None, inclination_angle=None):
+    """
+    Material residence time from the correlation t = K·L / (N·D·sin(α)).
+
+    Parameters:
+    -----------
+    params : Params
+        Trommel geometry and operating conditions
+    rotation_speed : float or numpy.ndarray, optional
+        Speed (rpm) overriding ``params.rotation_speed``
+    inclination_angle : float or numpy.ndarray, optional
+        Angle (degrees) overriding ``params.inclination_angle``
+
+    Returns:
+    --------
+    float or numpy.ndarray
+        Residence time (min)
+    """
+    speed = params.rotation_speed if rotation_speed is None else np.asarray(rotation_speed)
+    angle = params.inclination_angle if inclination_angle is None else np.asarray(inclination_angle)
+    return K_RESIDENCE * params.trommel_length / (speed * params.trommel_diameter * np.sin(np.radians(angle)))
+
+
+def base_efficiency(size_ratio):
+    """Passage probability of particles by particle size to aperture ratio"""
+    size_ratio = np.asarray(size_ratio, dtype=float)
+    return np.select(
+        [size_ratio < 0.5, size_ratio < 0.8, size_ratio < 1.0, size_ratio < 1.3],
+        [0.99,                                            # Fine particles - high passage probability
+         0.95 - 0.3 * (size_ratio - 0.5) / 0.3,           # Intermediate sizes - some hindrance
+         0.65 - 0.65 * (size_ratio - 0.8) / 0.2,          # Near-aperture sizes - transition zone
+         np.maximum(0, 0.05 * (1.3 - size_ratio) / 0.3)],  # Elongated oversize particles
+        default=0.0
+    )
+
+
+def time_factor(residence_time):
+    """More time increases chances of presentation to the aperture"""
+    return np.minimum(1, np.asarray(residence_time) / 2)
+
+
+def speed_factor(relative_speed):
+    """Too slow gives insufficient presentations, too fast pins material to the screen"""
+    return 1 - 0.5 * np.abs(np.asarray(relative_speed) - 40) / 40
+
+
+def moisture_factor(moisture_content):
+    """High moisture reduces screening efficiency"""
+    return 1 - 0.5 * (np.asarray(moisture_content) / 30)
+
+
+@memoize
+def simulate(params: Params) -> Result:
+    """
+    Computes size-by-size screening efficiency and the product split of the trommel.
+
+    Parameters:
+    -----------
+    params : Params
+        Trommel geometry, screen, operating conditions and feed size range
+
+    Returns:
+    --------
+    Result
+        Speeds, residence time, size distributions and efficiencies
+    """
+    d_min, d_max = params.d_min, params.d_max
+    feed_rate = params.feed_rate
+
+    crit_speed = critical_speed(params.trommel_diameter)  # rpm
+    relative_speed = params.rotation_speed / crit_speed * 100  # %
+    res_time = residence_time(params)  # min
+
+    # Material hold-up, increasing with feed rate and limited between 5% and 30% of drum volume
+    trommel_volume = np.pi * (params.trommel_diameter/2)**2 * params.trommel_length  # m³
+    fill_percentage = min(30, max(5, 10 + 5 * (feed_rate / 100)))
+    material_mass = trommel_volume * fill_percentage / 100 * params.bulk_density / 1000  # tons
+
+    screen_area = np.pi * params.trommel_diameter * params.trommel_length  # m²
+    effective_area = screen_area * params.open_area / 100  # m²
+
+    # Log-normal feed size distribution
+    size_points = np.logspace(np.log10(d_min), np.log10(d_max), params.num_points)
+    log_mu = np.log(np.sqrt(d_min * d_max))
+    log_sigma = np.log((d_max / d_min)**(1/4))
+    pdf_values = (1 / (size_points * log_sigma * np.sqrt(2*np.pi))) * np.exp(-(np.log(size_points) - log_mu)**2 / (2 * log_sigma**2))
+    mass_fractions = pdf_values / np.sum(pdf_values)
+
+    # Size-by-size efficiency modified by residence time, moisture and speed
+    efficiencies = (base_efficiency(size_points / params.aperture_size) * time_factor(res_time)
+                    * moisture_factor(params.moisture_content) * speed_factor(relative_speed))
+
+    feed_size_masses = mass_fractions * feed_rate
+    undersize_size_masses = feed_size_masses * efficiencies
+    oversize_size_masses = feed_size_masses - undersize_size_masses
+
+    # Actual cut size is where the efficiency is closest to 0.5
+    actual_cut_size = size_points[np.argmin(np.abs(efficiencies - 0.5))]
+
+    # Screening efficiency relative to the theoretical undersize (everything below the aperture)
+    theoretical_undersize = size_points <= params.aperture_size
+    theoretical_undersize_mass = np.sum(feed_size_masses[theoretical_undersize])
+    if theoretical_undersize_mass > 0:
+        screening_efficiency = np.sum(undersize_size_masses[theoretical_undersize]) / theoretical_undersize_mass * 100
+    else:
+        screening_efficiency = 0
+
+    return Result(
+        critical_speed=crit_speed,
+        relative_speed=relative_speed,
+        residence_time=res_time,
+        material_mass=material_mass,
+        screen_area=screen_area,
+        effective_area=effective_area,
+        unit_capacity=feed_rate / effective_area,
+        size_points=size_points,
+        mass_fractions=mass_fractions,
+        cumulative_distribution=np.cumsum(mass_fractions),
+        efficiencies=efficiencies,
+        feed_size_masses=feed_size_masses,
+        undersize_size_masses=undersize_size_masses,
+        oversize_size_masses=oversize_size_masses,
+        actual_cut_size=actual_cut_size,
+        theoretical_cut_size=params.aperture_size,
+        screening_efficiency=screening_efficiency
+    )
+
+
+def rotation_speed_effect(params: Params, result: Result, speeds):
+    """Overall efficiency (%) at each rotation speed (rpm), rescaling the current efficiencies"""
+    speeds = np.asarray(speeds, dtype=float)
+    modified_efficiency = np.mean(result.efficiencies / (result.residence_time / 2) / speed_factor(result.relative_speed))
+    return (modified_efficiency * time_factor(residence_time(params, rotation_speed=speeds))
+            * speed_factor(speeds / result.critical_speed * 100) * 100)
+
+
+def inclination_effect(params: Params, result: Result, angles):
+    """Overall efficiency (%) at each inclination angle (degrees)"""
+    modified_efficiency = np.mean(result.efficiencies / (result.residence_time / 2))
+    return modified_efficiency * time_factor(residence_time(params, inclination_angle=angles)) * 100
+
+
+def moisture_effect(params: Params, result: Result, moistures):
+    """Overall efficiency (%) at each moisture content (%)"""
+    modified_efficiency = np.mean(result.efficiencies / moisture_factor(params.moisture_content))
+    return modified_efficiency * moisture_factor(moistures) * 100
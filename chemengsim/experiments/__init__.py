@@ -3,15 +3,20 @@ Experiments Module
 =================
 
 This module contains all the experiment simulations for the Chemical Engineering Lab Simulator.
+
+Experiment modules are imported on first access (``chemengsim.experiments.pfr`` or
+:meth:`chemengsim.registry.Experiment.load`) rather than when the package is imported,
+so selecting one page does not pay for importing the other nine.
 """
 
-from . import batch_reactor
-from . import semi_batch_reactor
-from . import cstr
-from . import pfr
-from . import crushers
-from . import filter_press
-from . import rotary_vacuum_filter
-from . import centrifuge_flotation
-from . import classifiers
-from . import trommel
\ No newline at end of file
+import importlib
+
+from chemengsim.registry import EXPERIMENTS
+
+__all__ = [experiment.slug for experiment in EXPERIMENTS]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
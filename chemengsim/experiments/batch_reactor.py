@@ -1,11 +1,105 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils import create_download_link, set_plot_style
+from utils import create_download_link
+from chemengsim import figures, timing
+from chemengsim.core import batch_reactor as model
+
+
+def draw_band(ax, time_points, band, percentiles, color, name=''):
+    ax.fill_between(time_points, band[0], band[-1], color=color, alpha=0.2,
+                    label=f'{name}P{percentiles[0]:g}–P{percentiles[-1]:g}')
+    ax.plot(time_points, band[len(band) // 2], color=color, linestyle=':',
+            label=f'{name}P{percentiles[len(band) // 2]:g}')
+
+
+def draw_concentrations(ax, time_points, conc_naoh, conc_ea, conc_products, naoh_band=None, percentiles=None):
+    ax.plot(time_points, conc_naoh, 'b-', label='NaOH')
+    if naoh_band is not None:
+        draw_band(ax, time_points, naoh_band, percentiles, 'b', 'NaOH ')
+    ax.plot(time_points, conc_ea, 'r-', label='Ethyl Acetate')
+    ax.plot(time_points, conc_products, 'g-', label='Products')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Concentration (mol/L)')
+    ax.set_title('Concentration Profiles')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_time_to_target(ax, time_points, target_conversion, time_to_target):
+    if time_to_target <= time_points[-1]:
+        ax.axhline(target_conversion, color='gray', linestyle='--', linewidth=1)
+        ax.axvline(time_to_target, color='gray', linestyle='--', linewidth=1)
+        ax.plot([time_to_target], [target_conversion], 'ko',
+                label=f'{target_conversion:g}% at {time_to_target:.1f} min')
+
+
+def draw_conversion(ax, time_points, conversion, band=None, percentiles=None, target_conversion=None,
+                    time_to_target=None):
+    ax.plot(time_points, conversion, 'b-')
+    if band is not None:
+        draw_band(ax, time_points, band, percentiles, 'b')
+    if target_conversion is not None:
+        draw_time_to_target(ax, time_points, target_conversion, time_to_target)
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend(frameon=True, fancybox=True, shadow=True)
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Conversion (%)')
+    ax.set_title('Conversion vs Time')
+    ax.grid(True, alpha=0.3)
+
+
+def draw_kinetic_test(ax, time_points, linearized, fmt, ylabel, title):
+    ax.plot(time_points, linearized, fmt)
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+
+
+def draw_arrhenius(ax, temp_kelvin, k_values, slope, intercept):
+    ax.plot(1000/temp_kelvin, np.log(k_values), 'ro-')
+    ax.set_xlabel('1000/T (K^-1)')
+    ax.set_ylabel('ln(k)')
+    ax.set_title('Arrhenius Plot')
+    ax.grid(True, alpha=0.3)
+    ax.plot(1000/temp_kelvin, slope*(1000/temp_kelvin) + intercept, 'b--',
+            label=f'Slope = {slope:.2f} → E = {-slope*8.314/1000:.1f} kJ/mol')
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_jacketed_temperature(ax, time_points, temperature, jacket_temp, time_of_max, max_temperature):
+    ax.plot(time_points, temperature, 'r-', label='Reactor')
+    ax.axhline(jacket_temp, color='b', linestyle='--', label='Jacket')
+    ax.plot([time_of_max], [max_temperature], 'k^', markersize=10,
+            label=f'Peak {max_temperature:.2f} °C at {time_of_max:.1f} min')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Temperature (°C)')
+    ax.set_title('Reactor Temperature')
+    ax.ticklabel_format(axis='y', useOffset=False)
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_heat_flows(ax, time_points, heat_generation, heat_removal):
+    ax.plot(time_points, heat_generation, 'r-', label='Heat generation')
+    ax.plot(time_points, heat_removal, 'b-', label='Heat removal (jacket)')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Heat Flow (J/min)')
+    ax.set_title('Heat Balance')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_conversion_comparison(ax, time_points, isothermal, jacketed):
+    ax.plot(time_points, isothermal, 'b--', label='Isothermal')
+    ax.plot(time_points, jacketed, 'r-', label='Jacketed (non-isothermal)')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Conversion (%)')
+    ax.set_title('Conversion vs Time')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 1: Isothermal Batch Reactor")
@@ -68,47 +162,33 @@ def app():
                                             min_value=0.001, max_value=1.0, value=0.01, step=0.001, format="%.4f")
     temperature = st.sidebar.slider("Reaction Temperature (°C)", 25, 60, 35, 1)
     reaction_time = st.sidebar.slider("Reaction Time (minutes)", 5, 120, 30, 5)
+    target_conversion = st.sidebar.slider("Target Conversion (%)", 1, 99, 90, 1)
+
+    st.sidebar.header("Measurement Uncertainty")
+    show_uncertainty = st.sidebar.checkbox("Show uncertainty bands", value=False)
+    if show_uncertainty:
+        temperature_std = st.sidebar.slider("Temperature reading std. dev. (°C)", 0.0, 5.0, 1.0, 0.1)
+        conc_rel_std = st.sidebar.slider("Concentration reading std. dev. (%)", 0.0, 10.0, 2.0, 0.5)
     
-    # Convert temperature to Kelvin for rate constant calculation
-    temp_kelvin = temperature + 273.15
-    
-    # Define rate constants for different temperatures (based on experimental data)
-    # Values based on the saponification reaction of ethyl acetate
-    # These are approximate values for educational purposes
-    k_ref = 0.11  # L/(mol·min) at 35°C
-    E_R = 4500    # E/R value in Kelvin, where E is activation energy and R is gas constant
-    
-    # Calculate rate constant using Arrhenius equation
-    k = k_ref * np.exp(E_R * (1/308.15 - 1/temp_kelvin))  # 308.15 K = 35°C (reference temperature)
-    
-    # Generate time points for the simulation
-    time_points = np.linspace(0, reaction_time, 100)
-    
-    # For equal initial concentrations, special case
-    if abs(initial_conc_naoh - initial_conc_ea) < 1e-6:
-        # Equal initial concentrations case
-        conc_naoh = initial_conc_naoh / (1 + initial_conc_naoh * k * time_points)
-        reaction_order = "Second-order (equal concentrations)"
-    else:
-        # Different initial concentrations
-        conc_naoh = (initial_conc_naoh * initial_conc_ea * 
-                     (np.exp((initial_conc_naoh - initial_conc_ea) * k * time_points) - 1)) / \
-                    (initial_conc_naoh * np.exp((initial_conc_naoh - initial_conc_ea) * k * time_points) - 
-                     initial_conc_ea)
-        reaction_order = "Second-order (different concentrations)"
-    
-    # Calculate concentration of ethyl acetate, products
-    conc_ea = conc_naoh - initial_conc_naoh + initial_conc_ea
-    conc_products = initial_conc_naoh - conc_naoh  # Same for both products
-    
-    # Create dataframe for results
-    df = pd.DataFrame({
-        'Time (minutes)': time_points,
-        'NaOH Concentration (mol/L)': conc_naoh,
-        'Ethyl Acetate Concentration (mol/L)': conc_ea,
-        'Sodium Acetate Concentration (mol/L)': conc_products,
-        'Ethanol Concentration (mol/L)': conc_products
-    })
+    # Run the simulation
+    params = model.Params(
+        initial_conc_naoh=initial_conc_naoh,
+        initial_conc_ea=initial_conc_ea,
+        temperature=temperature,
+        reaction_time=reaction_time,
+        target_conversion=target_conversion
+    )
+    result = model.simulate(params)
+    if show_uncertainty:
+        uncertainty = model.uncertainty(params, model.UncertaintyParams(temperature_std=temperature_std,
+                                                                        conc_rel_std=conc_rel_std))
+    
+    k = result.k
+    reaction_order = result.reaction_order
+    time_points = result.time_points
+    conc_naoh = result.conc_naoh
+    conc_ea = result.conc_ea
+    conc_products = result.conc_products
     
     # Main experiment area
     st.header("Simulation Results")
@@ -117,63 +197,45 @@ def app():
     st.write(f"**Reaction rate constant (k):** {k:.6f} L/(mol·min) at {temperature}°C")
     st.write(f"**Reaction order:** {reaction_order}")
     
-    # Create conversion column for data table display
-    df_display = df.copy()
-    df_display['Conversion (%)'] = (1 - df_display['NaOH Concentration (mol/L)'] / initial_conc_naoh) * 100
+    # Create dataframe for data table display
+    df_display = result.to_dataframe()
     
     # Create tabs for different displays
     tab1, tab2, tab3 = st.tabs(["Concentration Profiles", "Conversion Plot", "Data Table"])
     
     with tab1:
         # Concentration profile plot
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        ax.plot(time_points, conc_naoh, 'b-', label='NaOH')
-        ax.plot(time_points, conc_ea, 'r-', label='Ethyl Acetate')
-        ax.plot(time_points, conc_products, 'g-', label='Products')
-        ax.set_xlabel('Time (minutes)')
-        ax.set_ylabel('Concentration (mol/L)')
-        ax.set_title('Concentration Profiles')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        if show_uncertainty:
+            figures.image(draw_concentrations, time_points, conc_naoh, conc_ea, conc_products,
+                          uncertainty.conc_naoh, uncertainty.percentiles)
+            st.caption(f"Bands from {uncertainty.n_samples:,} Monte Carlo draws of the temperature and "
+                       f"initial concentration readings")
+        else:
+            figures.image(draw_concentrations, time_points, conc_naoh, conc_ea, conc_products)
     
     with tab2:
         # Conversion plot
-        conversion = (1 - conc_naoh / initial_conc_naoh) * 100
-        
-        fig2, ax2 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax2.plot(time_points, conversion, 'b-')
-        ax2.set_xlabel('Time (minutes)')
-        ax2.set_ylabel('Conversion (%)')
-        ax2.set_title('Conversion vs Time')
-        ax2.grid(True, alpha=0.3)
-        fig2.tight_layout()
-        st.pyplot(fig2)
+        if show_uncertainty:
+            figures.image(draw_conversion, time_points, result.conversion, uncertainty.conversion,
+                          uncertainty.percentiles, target_conversion, result.time_to_target)
+        else:
+            figures.image(draw_conversion, time_points, result.conversion, None, None,
+                          target_conversion, result.time_to_target)
+        if np.isinf(result.time_to_target):
+            st.write(f"**Time to {target_conversion}% conversion:** never reached, the ethyl acetate "
+                     f"charge limits the NaOH conversion to {100 * initial_conc_ea / initial_conc_naoh:.1f}%")
+        else:
+            st.write(f"**Time to {target_conversion}% conversion:** {result.time_to_target:.1f} minutes")
         
         # First order kinetic test
         first_order_test = np.log(conc_naoh / initial_conc_naoh)
-        
-        fig3, ax3 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax3.plot(time_points, first_order_test, 'r-')
-        ax3.set_xlabel('Time (minutes)')
-        ax3.set_ylabel('ln(CA/CA0)')
-        ax3.set_title('First-Order Kinetic Test')
-        ax3.grid(True, alpha=0.3)
-        fig3.tight_layout()
-        st.pyplot(fig3)
+        figures.image(draw_kinetic_test, time_points, first_order_test, 'r-', 'ln(CA/CA0)',
+                      'First-Order Kinetic Test')
         
         # Second order kinetic test
         second_order_test = 1/conc_naoh - 1/initial_conc_naoh
-        
-        fig4, ax4 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax4.plot(time_points, second_order_test, 'g-')
-        ax4.set_xlabel('Time (minutes)')
-        ax4.set_ylabel('1/CA - 1/CA0')
-        ax4.set_title('Second-Order Kinetic Test')
-        ax4.grid(True, alpha=0.3)
-        fig4.tight_layout()
-        st.pyplot(fig4)
+        figures.image(draw_kinetic_test, time_points, second_order_test, 'g-', '1/CA - 1/CA0',
+                      'Second-Order Kinetic Test')
     
     with tab3:
         # Display data table with selected time points
@@ -182,7 +244,8 @@ def app():
         st.dataframe(df_display.iloc[sample_indices].reset_index(drop=True))
         
         # Download link for full data
-        csv = df_display.to_csv(index=False)
+        with timing.span('export.csv'):
+            csv = df_display.to_csv(index=False)
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -191,13 +254,56 @@ def app():
             key='download-csv'
         )
     
+    # Non-isothermal operation with a jacket energy balance
+    with st.expander("Non-Isothermal Operation"):
+        st.write("### Jacketed Batch Reactor with Energy Balance")
+        st.markdown("""
+        The saponification is exothermic (ΔH ≈ -55 kJ/mol). Starting at the reaction temperature above,
+        the reactor temperature follows the energy balance
+        $\\rho c_p \\frac{dT}{dt} = (-\\Delta H) k(T) C_A C_B - \\frac{UA}{V}(T - T_j)$.
+        """)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            jacket_temp = st.slider("Jacket Temperature (°C)", 10, 60, int(temperature), 1)
+            volume = st.number_input("Reaction Volume (L)", min_value=0.1, max_value=100.0, value=1.0, step=0.1)
+        with col2:
+            adiabatic = st.checkbox("Adiabatic (no jacket)", value=False)
+            overall_heat_transfer = st.slider("Overall Heat Transfer Coefficient (W/m²·K)", 10, 1000, 200, 10)
+            heat_transfer_area = st.number_input("Jacket Area (m²)", min_value=0.001, max_value=5.0, value=0.05,
+                                                 step=0.01, format="%.3f")
+
+        jacketed = model.simulate_jacketed(model.JacketedParams(
+            initial_conc_naoh=initial_conc_naoh,
+            initial_conc_ea=initial_conc_ea,
+            initial_temperature=temperature,
+            jacket_temp=jacket_temp,
+            reaction_time=reaction_time,
+            volume=volume,
+            overall_heat_transfer=0.0 if adiabatic else overall_heat_transfer,
+            heat_transfer_area=heat_transfer_area
+        ))
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Adiabatic Temperature Rise", f"{jacketed.adiabatic_temperature_rise:.2f} K")
+        col2.metric("Peak Temperature", f"{jacketed.max_temperature:.2f} °C",
+                    f"at {jacketed.time_of_max_temperature:.1f} min", delta_color="off")
+        col3.metric("Final Conversion", f"{jacketed.conversion[-1]:.2f} %",
+                    f"{jacketed.conversion[-1] - result.conversion[-1]:+.2f} vs isothermal")
+
+        figures.image(draw_jacketed_temperature, jacketed.time_points, jacketed.temperature, jacket_temp,
+                      jacketed.time_of_max_temperature, jacketed.max_temperature)
+        figures.image(draw_heat_flows, jacketed.time_points, jacketed.heat_generation, jacketed.heat_removal)
+        figures.image(draw_conversion_comparison, time_points, result.conversion, jacketed.conversion)
+
     # Temperature effect analysis
     with st.expander("Temperature Effect Analysis"):
         st.write("### Effect of Temperature on Reaction Rate Constant")
         
-        temperatures = [25, 30, 35, 40, 45, 50]
-        temp_kelvin_array = np.array(temperatures) + 273.15
-        k_values = k_ref * np.exp(E_R * (1/308.15 - 1/temp_kelvin_array))
+        temp_effect = model.temperature_effect()
+        temperatures = temp_effect.temperatures
+        temp_kelvin_array = temp_effect.temp_kelvin
+        k_values = temp_effect.k_values
         
         temp_df = pd.DataFrame({
             'Temperature (°C)': temperatures,
@@ -207,20 +313,7 @@ def app():
         
         st.dataframe(temp_df)
         
-        # Arrhenius plot
-        fig5, ax5 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax5.plot(1000/temp_kelvin_array, np.log(k_values), 'ro-')
-        ax5.set_xlabel('1000/T (K^-1)')
-        ax5.set_ylabel('ln(k)')
-        ax5.set_title('Arrhenius Plot')
-        ax5.grid(True, alpha=0.3)
-        
-        # Calculate activation energy from slope
-        slope, intercept = np.polyfit(1000/temp_kelvin_array, np.log(k_values), 1)
-        ax5.plot(1000/temp_kelvin_array, slope*(1000/temp_kelvin_array) + intercept, 'b--', 
-                 label=f'Slope = {slope:.2f} → E = {-slope*8.314/1000:.1f} kJ/mol')
-        ax5.legend(frameon=True, fancybox=True, shadow=True)
-        fig5.tight_layout()
-        
-        st.pyplot(fig5)
+        # Arrhenius plot with the activation energy from its slope
+        slope, intercept = temp_effect.slope, temp_effect.intercept
+        figures.image(draw_arrhenius, temp_kelvin_array, k_values, slope, intercept)
         st.write(f"Estimated Activation Energy: {-slope*8.314/1000:.2f} kJ/mol")
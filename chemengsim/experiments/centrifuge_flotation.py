@@ -1,12 +1,8 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from utils import set_plot_style
-from scipy.optimize import curve_fit
+from chemengsim import figures, timing
+from chemengsim.core import centrifuge_flotation as model
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 8: Centrifuge and Flotation")
@@ -105,108 +101,36 @@ def centrifuge_app():
     
     spinning_time = st.sidebar.slider("Spinning time (s)", 60, 600, 300, 30)
     
-    # Calculate parameters
-    # Convert rpm to rad/s
-    omega = rotation_speed * 2 * np.pi / 60  # rad/s
-    
-    # Calculate basket volume and area
-    basket_radius = basket_diameter / 2
-    basket_volume = np.pi * basket_radius**2 * basket_height  # m³
-    basket_area = 2 * np.pi * basket_radius * basket_height  # m² (side area only)
-    
-    # Calculate relative centrifugal force (RCF) or "g-force"
-    rcf = omega**2 * basket_radius / 9.81
-    
-    # Calculate particle settling velocity using modified Stokes' Law
-    particle_diameter = particle_size * 1e-6  # convert μm to m
-    settling_velocity = (particle_diameter**2 * (solid_density - liquid_density) * omega**2 * basket_radius) / (18 * liquid_viscosity)  # m/s
-    
-    # Estimate cake properties
-    # Convert slurry concentration from wt% to volume fraction
-    volume_fraction = (slurry_concentration / 100) / ((slurry_concentration / 100) + ((100 - slurry_concentration) / 100) * (solid_density / liquid_density))
-    
-    # Maximum cake thickness (assuming all solids in slurry form the cake)
-    total_slurry_volume = basket_volume * 0.8  # 80% fill
-    solids_volume = total_slurry_volume * volume_fraction
-    
-    # Cake porosity decreases with spinning time and RCF
-    initial_porosity = 0.6
-    final_porosity = 0.3 - 0.1 * (rcf / 1000)  # Higher RCF leads to lower final porosity
-    final_porosity = max(0.1, min(0.5, final_porosity))  # Keep within reasonable bounds
-    
-    # Cake volume with porosity
-    cake_volume = solids_volume / (1 - final_porosity)
-    cake_thickness = cake_volume / basket_area  # m
-    
-    # Calculate moisture content
-    # Moisture content decreases with spinning time
-    initial_moisture = 0.8
-    final_moisture = 0.2 + 0.2 * np.exp(-spinning_time / 200)  # Exponential decrease with spinning time
-    final_moisture = max(0.05, min(0.5, final_moisture))  # Keep within reasonable bounds
-    
-    # Simulate the centrifugation process
-    # Time points
-    time_points = np.linspace(0, feeding_time + spinning_time, 100)
-    
-    # Initialize arrays
-    cake_thickness_arr = np.zeros_like(time_points)
-    moisture_content = np.ones_like(time_points) * initial_moisture
-    filtrate_volume = np.zeros_like(time_points)
-    
-    for i, t in enumerate(time_points):
-        if t <= feeding_time:
-            # During feeding, cake thickness increases linearly
-            cake_thickness_arr[i] = (t / feeding_time) * cake_thickness
-            
-            # During feeding, moisture content stays high
-            moisture_content[i] = initial_moisture - (initial_moisture - final_moisture) * 0.1 * (t / feeding_time)
-            
-            # Filtrate volume increases with cake formation
-            filtrate_volume[i] = total_slurry_volume * (t / feeding_time) * (1 - volume_fraction)
-            
-        else:
-            # After feeding, cake thickness is constant
-            cake_thickness_arr[i] = cake_thickness
-            
-            # Moisture content decreases during spinning
-            spin_t = t - feeding_time
-            moisture_content[i] = initial_moisture - (initial_moisture - final_moisture) * (1 - np.exp(-spin_t / (spinning_time / 3)))
-            
-            # Additional filtrate from cake dewatering
-            cake_volume_water_initial = cake_volume * initial_porosity
-            cake_volume_water_current = cake_volume * moisture_content[i] / (1 - moisture_content[i])
-            additional_filtrate = cake_volume_water_initial - cake_volume_water_current
-            
-            filtrate_volume[i] = total_slurry_volume * (1 - volume_fraction) + additional_filtrate
-    
-    # Convert units for display
-    cake_thickness_mm = cake_thickness_arr * 1000  # mm
-    
-    # Calculate filtration rate
-    filtration_rate = np.zeros_like(time_points)
-    for i in range(1, len(time_points)):
-        dt = time_points[i] - time_points[i-1]
-        dv = filtrate_volume[i] - filtrate_volume[i-1]
-        if dt > 0:
-            filtration_rate[i] = dv / dt
-    
-    # Calculate yields and efficiencies
-    total_solids_in = total_slurry_volume * volume_fraction * solid_density
-    solids_in_cake = total_solids_in  # Assume all solids are captured
-    solids_recovery = 100.0  # Percentage
-    
-    # Create dataframe for results
-    df = pd.DataFrame({
-        'Time (s)': time_points,
-        'Cake Thickness (mm)': cake_thickness_mm,
-        'Moisture Content (fraction)': moisture_content,
-        'Filtrate Volume (m³)': filtrate_volume,
-        'Filtration Rate (m³/s)': filtration_rate
-    })
-    
-    # Add process stage
-    df['Stage'] = 'Spinning'
-    df.loc[df['Time (s)'] <= feeding_time, 'Stage'] = 'Feeding'
+    # Run the simulation
+    params = model.CentrifugeParams(
+        basket_diameter=basket_diameter,
+        basket_height=basket_height,
+        rotation_speed=rotation_speed,
+        solid_density=solid_density,
+        liquid_density=liquid_density,
+        slurry_concentration=slurry_concentration,
+        particle_size=particle_size,
+        liquid_viscosity=liquid_viscosity,
+        feeding_time=feeding_time,
+        spinning_time=spinning_time
+    )
+    result = model.simulate_centrifuge(params)
+    
+    rcf = result.rcf
+    basket_area = result.basket_area
+    settling_velocity = result.settling_velocity
+    cake_thickness = result.cake_thickness
+    final_moisture = result.final_moisture
+    final_porosity = result.final_porosity
+    solids_recovery = result.solids_recovery
+    time_points = result.time_points
+    cake_thickness_mm = result.cake_thickness_mm
+    moisture_content = result.moisture_content
+    filtrate_volume = result.filtrate_volume
+    filtration_rate = result.filtration_rate
+    
+    # Create dataframe for results, labelled by process stage
+    df = result.to_dataframe()
     
     # Main experiment area
     st.header("Simulation Results")
@@ -231,78 +155,67 @@ def centrifuge_app():
     
     with tab1:
         # Process performance visualization
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        
-        # Plot cake thickness
-        ax.plot(time_points, cake_thickness_mm, 'b-', label='Cake Thickness (mm)')
-        
-        # Add vertical line at feeding time
-        ax.axvline(x=feeding_time, color='r', linestyle='--', label=f'End of Feeding ({feeding_time} s)')
-        
-        ax.set_xlabel('Time (s)')
-        ax.set_ylabel('Cake Thickness (mm)')
-        ax.set_title('Cake Formation in Basket Centrifuge')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+            
+            # Plot cake thickness
+            ax.plot(time_points, cake_thickness_mm, 'b-', label='Cake Thickness (mm)')
+            
+            # Add vertical line at feeding time
+            ax.axvline(x=feeding_time, color='r', linestyle='--', label=f'End of Feeding ({feeding_time} s)')
+            
+            ax.set_xlabel('Time (s)')
+            ax.set_ylabel('Cake Thickness (mm)')
+            ax.set_title('Cake Formation in Basket Centrifuge')
+            ax.grid(True, alpha=0.3)
+            ax.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig)
         
         # RCF effect visualization
         speeds = np.linspace(500, 3000, 6)
-        final_moistures = []
-        
-        for speed in speeds:
-            omega_test = speed * 2 * np.pi / 60
-            rcf_test = omega_test**2 * basket_radius / 9.81
-            moisture = 0.2 + 0.2 * np.exp(-spinning_time / 200) - 0.05 * (rcf_test / 1000)
-            moisture = max(0.05, min(0.5, moisture))
-            final_moistures.append(moisture * 100)  # Percentage
-        
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        ax2.plot(speeds, final_moistures, 'g-o')
-        ax2.axvline(x=rotation_speed, color='r', linestyle='--', 
-                   label=f'Current Speed: {rotation_speed} rpm')
-        
-        ax2.set_xlabel('Rotation Speed (rpm)')
-        ax2.set_ylabel('Final Moisture Content (%)')
-        ax2.set_title('Effect of Rotation Speed on Moisture Content')
-        ax2.grid(True)
-        ax2.legend()
-        fig.tight_layout()
-        st.pyplot(fig2)
+        final_moistures = model.rotation_speed_effect(params, speeds)
+        
+        with figures.subplots(figsize=(10, 6)) as (fig2, ax2):
+            ax2.plot(speeds, final_moistures, 'g-o')
+            ax2.axvline(x=rotation_speed, color='r', linestyle='--', 
+                       label=f'Current Speed: {rotation_speed} rpm')
+            
+            ax2.set_xlabel('Rotation Speed (rpm)')
+            ax2.set_ylabel('Final Moisture Content (%)')
+            ax2.set_title('Effect of Rotation Speed on Moisture Content')
+            ax2.grid(True)
+            ax2.legend()
+            figures.show(fig2)
     
     with tab2:
         # Moisture content and filtration rate
-        fig3, ax3 = plt.subplots(figsize=(10, 6))
-        
-        # Plot moisture content
-        ax3.plot(time_points, moisture_content * 100, 'b-', label='Moisture Content (%)')
-        
-        # Add vertical line at feeding time
-        ax3.axvline(x=feeding_time, color='r', linestyle='--', label=f'End of Feeding ({feeding_time} s)')
-        
-        ax3.set_xlabel('Time (s)')
-        ax3.set_ylabel('Moisture Content (%)')
-        ax3.set_title('Moisture Content vs Time')
-        ax3.grid(True)
-        ax3.legend()
-        fig.tight_layout()
-        st.pyplot(fig3)
+        with figures.subplots(figsize=(10, 6)) as (fig3, ax3):
+            
+            # Plot moisture content
+            ax3.plot(time_points, moisture_content * 100, 'b-', label='Moisture Content (%)')
+            
+            # Add vertical line at feeding time
+            ax3.axvline(x=feeding_time, color='r', linestyle='--', label=f'End of Feeding ({feeding_time} s)')
+            
+            ax3.set_xlabel('Time (s)')
+            ax3.set_ylabel('Moisture Content (%)')
+            ax3.set_title('Moisture Content vs Time')
+            ax3.grid(True)
+            ax3.legend()
+            figures.show(fig3)
         
         # Filtration rate
-        fig4, ax4 = plt.subplots(figsize=(10, 6))
-        ax4.plot(time_points, filtration_rate * 1000, 'g-', label='Filtration Rate (L/s)')
-        
-        # Add vertical line at feeding time
-        ax4.axvline(x=feeding_time, color='r', linestyle='--', label=f'End of Feeding ({feeding_time} s)')
-        
-        ax4.set_xlabel('Time (s)')
-        ax4.set_ylabel('Filtration Rate (L/s)')
-        ax4.set_title('Filtration Rate vs Time')
-        ax4.grid(True)
-        ax4.legend()
-        fig.tight_layout()
-        st.pyplot(fig4)
+        with figures.subplots(figsize=(10, 6)) as (fig4, ax4):
+            ax4.plot(time_points, filtration_rate * 1000, 'g-', label='Filtration Rate (L/s)')
+            
+            # Add vertical line at feeding time
+            ax4.axvline(x=feeding_time, color='r', linestyle='--', label=f'End of Feeding ({feeding_time} s)')
+            
+            ax4.set_xlabel('Time (s)')
+            ax4.set_ylabel('Filtration Rate (L/s)')
+            ax4.set_title('Filtration Rate vs Time')
+            ax4.grid(True)
+            ax4.legend()
+            figures.show(fig4)
     
     with tab3:
         # Display data table with selected points
@@ -311,7 +224,8 @@ def centrifuge_app():
         st.dataframe(df.iloc[sample_indices].reset_index(drop=True))
         
         # Download link for full data
-        csv = df.to_csv(index=False)
+        with timing.span('export.csv'):
+            csv = df.to_csv(index=False)
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -443,101 +357,31 @@ def flotation_app():
     # Flotation time
     flotation_time = st.sidebar.slider("Flotation time (min)", 1, 30, 10, 1)
     
-    # Calculate parameters
-    # Calculate pulp volume
-    pulp_volume = cell_volume * 0.8  # 80% of cell volume
-    
-    # Calculate solids mass in the cell
-    solids_density = 2700  # kg/m³ (typical for many minerals)
-    water_density = 1000  # kg/m³
-    
-    # Calculate mass of solids in the pulp
-    pulp_density_frac = pulp_density / 100
-    pulp_mass = pulp_volume * ((pulp_density_frac * solids_density) + ((1 - pulp_density_frac) * water_density))
-    solids_mass = pulp_mass * pulp_density_frac
-    
-    # Calculate residence time
-    residence_time = solids_mass / feed_rate  # h
-    residence_time_min = residence_time * 60  # min
-    
-    # Calculate recovery model parameters
-    # Use a first-order kinetic model: R = R_max * (1 - exp(-k*t))
-    # Where R is recovery, R_max is maximum possible recovery, k is rate constant, t is time
-    
-    # Model parameters dependent on operational variables
-    k_base = 0.2  # Base rate constant (min^-1)
-    
-    # Influence of particle size on rate constant
-    # Finer particles typically float faster up to a point, then very fine particles may be slower
-    size_factor = np.exp(-(particle_size - 75)**2 / 2500)
-    
-    # Influence of reagent dosages
-    collector_factor = 0.5 + 0.5 * np.tanh((collector_dosage - 50) / 100)
-    frother_factor = 0.5 + 0.5 * np.tanh((frother_dosage - 25) / 50)
-    
-    # Influence of aeration and impeller speed
-    aeration_factor = 0.5 + 0.5 * np.tanh((aeration_rate - 0.5) / 1)
-    impeller_factor = 0.5 + 0.5 * np.tanh((impeller_speed - 400) / 400)
-    
-    # Combined rate constant
-    k = k_base * size_factor * collector_factor * frother_factor * aeration_factor * impeller_factor
-    
-    # Maximum possible recovery (dependent on mineral liberation, etc.)
-    R_max = 95  # Maximum recovery percentage
-    
-    # Simulate the flotation process
-    # Time points
-    time_points = np.linspace(0, flotation_time, 100)
-    
-    # Calculate recovery at each time point
-    recovery = R_max * (1 - np.exp(-k * time_points))
-    
-    # Calculate concentrate grade
-    # In reality, grade would depend on many factors, but we'll use a simplified model
-    # Grade typically decreases with increasing recovery
-    initial_grade_factor = 5  # Initial enrichment ratio
-    
-    # Maximum theoretical grade (assuming perfect separation)
-    max_grade = 100  # Assuming pure mineral can be achieved theoretically
-    
-    # Calculate grade at each time point
-    # Use a model where grade decreases with increasing recovery
-    # Grade = (max_grade * recovery/100) / (recovery/100 + (100-recovery)/100 * feed_grade/100 * initial_grade_factor)
-    grade = max_grade * feed_grade / (feed_grade + (100 - recovery) * (max_grade - feed_grade) / 100)
-    
-    # Calculate mass of concentrate
-    # From the recovery formula: Recovery = (c * mc) / (f * mf) * 100%
-    # Where c is concentrate grade (fraction), mc is concentrate mass
-    # f is feed grade (fraction), mf is feed mass
-    # For mass balance: mc = (Recovery * f * mf) / (c * 100)
-    feed_grade_frac = feed_grade / 100
-    
-    concentrate_mass = np.zeros_like(time_points)
-    for i, (r, g) in enumerate(zip(recovery, grade)):
-        if g > 0:
-            concentrate_mass[i] = (r * feed_grade_frac * feed_rate * time_points[i] / 60) / (g / 100)
-    
-    # Calculate tailing grade
-    # Mass balance: f * mf = c * mc + t * mt
-    # Where t is tailing grade, mt is tailing mass
-    # mt = mf - mc
-    feed_mass = feed_rate * time_points / 60  # kg
-    tailing_mass = feed_mass - concentrate_mass
-    
-    tailing_grade = np.zeros_like(time_points)
-    for i, (fm, cm, tm) in enumerate(zip(feed_mass, concentrate_mass, tailing_mass)):
-        if tm > 0:
-            tailing_grade[i] = ((feed_grade_frac * fm) - (grade[i] / 100 * cm)) / tm * 100
+    # Run the simulation
+    params = model.FlotationParams(
+        feed_rate=feed_rate,
+        feed_grade=feed_grade,
+        pulp_density=pulp_density,
+        particle_size=particle_size,
+        cell_volume=cell_volume,
+        aeration_rate=aeration_rate,
+        impeller_speed=impeller_speed,
+        collector_dosage=collector_dosage,
+        frother_dosage=frother_dosage,
+        flotation_time=flotation_time
+    )
+    result = model.simulate_flotation(params)
+    
+    k = result.k
+    R_max = result.r_max
+    residence_time_min = result.residence_time_min
+    time_points = result.time_points
+    recovery = result.recovery
+    grade = result.grade
+    tailing_grade = result.tailing_grade
     
     # Create dataframe for results
-    df = pd.DataFrame({
-        'Time (min)': time_points,
-        'Recovery (%)': recovery,
-        'Concentrate Grade (%)': grade,
-        'Tailing Grade (%)': tailing_grade,
-        'Concentrate Mass (kg)': concentrate_mass,
-        'Tailing Mass (kg)': tailing_mass
-    })
+    df = result.to_dataframe()
     
     # Main experiment area
     st.header("Simulation Results")
@@ -562,54 +406,51 @@ def flotation_app():
     
     with tab1:
         # Recovery and grade visualization
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        
-        # Plot recovery and grade
-        ax.plot(time_points, recovery, 'b-', label='Recovery (%)')
-        ax.plot(time_points, grade, 'r-', label='Concentrate Grade (%)')
-        
-        ax.set_xlabel('Flotation Time (min)')
-        ax.set_ylabel('Percentage (%)')
-        ax.set_title('Recovery and Grade vs Flotation Time')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+            
+            # Plot recovery and grade
+            ax.plot(time_points, recovery, 'b-', label='Recovery (%)')
+            ax.plot(time_points, grade, 'r-', label='Concentrate Grade (%)')
+            
+            ax.set_xlabel('Flotation Time (min)')
+            ax.set_ylabel('Percentage (%)')
+            ax.set_title('Recovery and Grade vs Flotation Time')
+            ax.grid(True, alpha=0.3)
+            ax.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig)
         
         # Recovery-grade relationship
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        ax2.plot(recovery, grade, 'g-')
-        
-        # Mark the final point
-        ax2.plot(recovery[-1], grade[-1], 'ro', label=f'Final Point ({recovery[-1]:.1f}%, {grade[-1]:.1f}%)')
-        
-        ax2.set_xlabel('Recovery (%)')
-        ax2.set_ylabel('Concentrate Grade (%)')
-        ax2.set_title('Grade-Recovery Curve')
-        ax2.grid(True)
-        ax2.legend()
-        fig.tight_layout()
-        st.pyplot(fig2)
+        with figures.subplots(figsize=(10, 6)) as (fig2, ax2):
+            ax2.plot(recovery, grade, 'g-')
+            
+            # Mark the final point
+            ax2.plot(recovery[-1], grade[-1], 'ro', label=f'Final Point ({recovery[-1]:.1f}%, {grade[-1]:.1f}%)')
+            
+            ax2.set_xlabel('Recovery (%)')
+            ax2.set_ylabel('Concentrate Grade (%)')
+            ax2.set_title('Grade-Recovery Curve')
+            ax2.grid(True)
+            ax2.legend()
+            figures.show(fig2)
     
     with tab2:
         # Flotation kinetics visualization
-        fig3, ax3 = plt.subplots(figsize=(10, 6))
-        
-        # Plot experimental data
-        ax3.plot(time_points, recovery, 'bo', label='Simulated Data')
-        
-        # Plot model fit
-        model_time = np.linspace(0, flotation_time * 1.5, 100)
-        model_recovery = R_max * (1 - np.exp(-k * model_time))
-        ax3.plot(model_time, model_recovery, 'r-', label=f'Model: R = {R_max:.1f}*(1-exp(-{k:.3f}*t))')
-        
-        ax3.set_xlabel('Flotation Time (min)')
-        ax3.set_ylabel('Recovery (%)')
-        ax3.set_title('Flotation Kinetics')
-        ax3.grid(True)
-        ax3.legend()
-        fig.tight_layout()
-        st.pyplot(fig3)
+        with figures.subplots(figsize=(10, 6)) as (fig3, ax3):
+            
+            # Plot experimental data
+            ax3.plot(time_points, recovery, 'bo', label='Simulated Data')
+            
+            # Plot model fit
+            model_time = np.linspace(0, flotation_time * 1.5, 100)
+            model_recovery = result.recovery_at(model_time)
+            ax3.plot(model_time, model_recovery, 'r-', label=f'Model: R = {R_max:.1f}*(1-exp(-{k:.3f}*t))')
+            
+            ax3.set_xlabel('Flotation Time (min)')
+            ax3.set_ylabel('Recovery (%)')
+            ax3.set_title('Flotation Kinetics')
+            ax3.grid(True)
+            ax3.legend()
+            figures.show(fig3)
         
         # Parameter sensitivity analysis
         st.write("### Parameter Sensitivity Analysis")
@@ -619,53 +460,39 @@ def flotation_app():
         
         # Collector dosage effect
         collector_range = np.linspace(10, 300, 10)
-        recovery_collector = []
-        
-        for dosage in collector_range:
-            coll_factor = 0.5 + 0.5 * np.tanh((dosage - 50) / 100)
-            k_test = k_base * size_factor * coll_factor * frother_factor * aeration_factor * impeller_factor
-            rec = R_max * (1 - np.exp(-k_test * fixed_time))
-            recovery_collector.append(rec)
+        recovery_collector = model.collector_dosage_effect(params, collector_range)
         
         # Frother dosage effect
         frother_range = np.linspace(10, 150, 10)
-        recovery_frother = []
-        
-        for dosage in frother_range:
-            fro_factor = 0.5 + 0.5 * np.tanh((dosage - 25) / 50)
-            k_test = k_base * size_factor * collector_factor * fro_factor * aeration_factor * impeller_factor
-            rec = R_max * (1 - np.exp(-k_test * fixed_time))
-            recovery_frother.append(rec)
+        recovery_frother = model.frother_dosage_effect(params, frother_range)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            fig4, ax4 = plt.subplots(figsize=(8, 5))
-            ax4.plot(collector_range, recovery_collector, 'g-o')
-            ax4.axvline(x=collector_dosage, color='r', linestyle='--', 
-                        label=f'Current: {collector_dosage} g/ton')
-            
-            ax4.set_xlabel('Collector Dosage (g/ton)')
-            ax4.set_ylabel(f'Recovery at {fixed_time} min (%)')
-            ax4.set_title('Effect of Collector Dosage on Recovery')
-            ax4.grid(True)
-            ax4.legend()
-            fig.tight_layout()
-        st.pyplot(fig4)
+            with figures.subplots(figsize=(8, 5)) as (fig4, ax4):
+                ax4.plot(collector_range, recovery_collector, 'g-o')
+                ax4.axvline(x=collector_dosage, color='r', linestyle='--', 
+                            label=f'Current: {collector_dosage} g/ton')
+                
+                ax4.set_xlabel('Collector Dosage (g/ton)')
+                ax4.set_ylabel(f'Recovery at {fixed_time} min (%)')
+                ax4.set_title('Effect of Collector Dosage on Recovery')
+                ax4.grid(True)
+                ax4.legend()
+                figures.show(fig4)
         
         with col2:
-            fig5, ax5 = plt.subplots(figsize=(8, 5))
-            ax5.plot(frother_range, recovery_frother, 'b-o')
-            ax5.axvline(x=frother_dosage, color='r', linestyle='--', 
-                        label=f'Current: {frother_dosage} g/ton')
-            
-            ax5.set_xlabel('Frother Dosage (g/ton)')
-            ax5.set_ylabel(f'Recovery at {fixed_time} min (%)')
-            ax5.set_title('Effect of Frother Dosage on Recovery')
-            ax5.grid(True)
-            ax5.legend()
-            fig.tight_layout()
-        st.pyplot(fig5)
+            with figures.subplots(figsize=(8, 5)) as (fig5, ax5):
+                ax5.plot(frother_range, recovery_frother, 'b-o')
+                ax5.axvline(x=frother_dosage, color='r', linestyle='--', 
+                            label=f'Current: {frother_dosage} g/ton')
+                
+                ax5.set_xlabel('Frother Dosage (g/ton)')
+                ax5.set_ylabel(f'Recovery at {fixed_time} min (%)')
+                ax5.set_title('Effect of Frother Dosage on Recovery')
+                ax5.grid(True)
+                ax5.legend()
+                figures.show(fig5)
     
     with tab3:
         # Display data table with selected points
@@ -674,7 +501,8 @@ def flotation_app():
         st.dataframe(df.iloc[sample_indices].reset_index(drop=True))
         
         # Download link for full data
-        csv = df.to_csv(index=False)
+        with timing.span('export.csv'):
+            csv = df.to_csv(index=False)
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -1,12 +1,9 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils import set_plot_style
-from scipy.optimize import curve_fit
+from chemengsim import figures
+from chemengsim.core import crushers as model
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 5: Crushers and Ball Mill")
@@ -108,9 +105,6 @@ def app():
     
     material_hardness = st.sidebar.slider("Material hardness (Mohs scale)", 1, 10, 5, 1)
     
-    # Bond Work Index - higher for harder materials
-    bond_work_index = material_hardness * 5  # Approximate value based on hardness
-    
     # Specific parameters for each crusher type
     if crusher_type == "Jaw Crusher":
         feed_size = st.sidebar.slider("Maximum feed size (mm)", 50, 500, 200, 10)
@@ -122,26 +116,12 @@ def app():
         motor_power = st.sidebar.slider("Motor power (kW)", 5, 100, 30, 5)
         eccentric_speed = st.sidebar.slider("Eccentric shaft speed (rpm)", 100, 400, 250, 10)
         
-        # Approximation for product size
-        product_size = jaw_opening * 0.8  # A common approximation for jaw crushers
-        
-        # Reduction ratio
-        reduction_ratio = feed_size / product_size
-        
-        # Energy calculation using Bond's law
-        specific_energy = bond_work_index * (1/np.sqrt(product_size/1000) - 1/np.sqrt(feed_size/1000))  # kWh/ton
-        
-        # Theoretical power requirement
-        theoretical_power = specific_energy * feed_rate / 1000  # kW
-        
-        # Efficiency
-        efficiency = (theoretical_power / motor_power) * 100
-        
-        # Capacity calculation
-        capacity = feed_rate / 1000  # tons/h
-        
-        # Calculate crusher throughput
-        throughput = jaw_length * jaw_width * eccentric_speed * jaw_opening / 1e6  # Approximate throughput formula
+        params = model.Params(
+            crusher_type=crusher_type, feed_rate=feed_rate, material_density=material_density,
+            material_hardness=material_hardness, feed_size=feed_size, motor_power=motor_power,
+            jaw_opening=jaw_opening, jaw_length=jaw_length, jaw_width=jaw_width,
+            eccentric_speed=eccentric_speed
+        )
         
     elif crusher_type == "Roll Crusher":
         feed_size = st.sidebar.slider("Maximum feed size (mm)", 10, 100, 40, 5)
@@ -152,27 +132,12 @@ def app():
         roll_speed = st.sidebar.slider("Roll speed (rpm)", 50, 300, 150, 10)
         motor_power = st.sidebar.slider("Motor power (kW)", 5, 80, 20, 5)
         
-        # Approximation for product size
-        product_size = roll_gap * 1.2  # A common approximation for roll crushers
-        
-        # Reduction ratio
-        reduction_ratio = feed_size / product_size
-        
-        # Energy calculation using Bond's law
-        specific_energy = bond_work_index * (1/np.sqrt(product_size/1000) - 1/np.sqrt(feed_size/1000))  # kWh/ton
-        
-        # Theoretical power requirement
-        theoretical_power = specific_energy * feed_rate / 1000  # kW
-        
-        # Efficiency
-        efficiency = (theoretical_power / motor_power) * 100
-        
-        # Capacity calculation
-        capacity = feed_rate / 1000  # tons/h
-        
-        # Calculate crusher throughput
-        nip_angle = np.arccos(1 - feed_size / roll_diameter) * (180 / np.pi)
-        throughput = roll_length * roll_speed * roll_gap * material_density / 60 / 1e6  # tons/h
+        params = model.Params(
+            crusher_type=crusher_type, feed_rate=feed_rate, material_density=material_density,
+            material_hardness=material_hardness, feed_size=feed_size, motor_power=motor_power,
+            roll_diameter=roll_diameter, roll_length=roll_length, roll_gap=roll_gap,
+            roll_speed=roll_speed
+        )
         
     else:  # Ball Mill
         feed_size = st.sidebar.slider("Maximum feed size (mm)", 1, 20, 5, 1)
@@ -183,33 +148,22 @@ def app():
         mill_fill_percent = st.sidebar.slider("Mill filling (%)", 30, 45, 35, 1)
         motor_power = st.sidebar.slider("Motor power (kW)", 10, 500, 150, 10)
         
-        # Critical speed calculation
-        critical_speed = 42.3 / np.sqrt(mill_diameter - ball_size/1000)  # rpm
-        mill_speed = mill_speed_percent * critical_speed / 100  # rpm
-        
-        # Approximation for product size
-        # Ball mill can achieve very fine grinding
-        product_size = feed_size * 0.05  # An approximation for ball mills
-        
-        # Reduction ratio
-        reduction_ratio = feed_size / product_size
-        
-        # Energy calculation using Bond's law
-        specific_energy = bond_work_index * (1/np.sqrt(product_size/1000) - 1/np.sqrt(feed_size/1000))  # kWh/ton
-        
-        # Theoretical power requirement
-        theoretical_power = specific_energy * feed_rate / 1000  # kW
-        
-        # Efficiency
-        efficiency = (theoretical_power / motor_power) * 100
-        
-        # Capacity calculation
-        capacity = feed_rate / 1000  # tons/h
-        
-        # Calculate mill power using empirical formula
-        mill_volume = np.pi * (mill_diameter/2)**2 * mill_length  # m³
-        mill_filling = mill_fill_percent / 100
-        mill_power = 10.6 * mill_volume * mill_filling * material_density * 0.5 * (mill_speed_percent/100)  # kW
+        params = model.Params(
+            crusher_type=crusher_type, feed_rate=feed_rate, material_density=material_density,
+            material_hardness=material_hardness, feed_size=feed_size, motor_power=motor_power,
+            mill_diameter=mill_diameter, mill_length=mill_length, ball_size=ball_size,
+            mill_speed_percent=mill_speed_percent, mill_fill_percent=mill_fill_percent
+        )
+    
+    # Run the simulation
+    result = model.simulate(params)
+    
+    bond_work_index = result.bond_work_index
+    product_size = result.product_size
+    reduction_ratio = result.reduction_ratio
+    specific_energy = result.specific_energy
+    theoretical_power = result.theoretical_power
+    efficiency = result.efficiency
         
     # Main experiment area
     st.header("Simulation Results")
@@ -233,48 +187,30 @@ def app():
     tab1, tab2, tab3 = st.tabs(["Size Distribution", "Power Analysis", "Performance Curves"])
     
     with tab1:
-        # Generate sample size distribution data
-        # Feed size distribution (log-normal)
-        size_range = np.logspace(np.log10(product_size/10), np.log10(feed_size*1.5), 50)
-        
-        # Feed cumulative distribution (assumed log-normal)
-        def log_normal_cdf(x, mu, sigma):
-            return 0.5 + 0.5 * np.tanh((np.log(x) - mu) / (sigma * np.sqrt(2)))
+        # Feed and product size distributions (assumed log-normal)
+        size_range = result.size_range
+        feed_cumulative = result.feed_cumulative
+        product_cumulative = result.product_cumulative
         
-        # Fit parameters for feed
-        feed_mu = np.log(feed_size/2)
-        feed_sigma = 0.5
-        
-        # Fit parameters for product
-        product_mu = np.log(product_size/2)
-        product_sigma = 0.6  # Product usually has wider distribution
-        
-        # Generate distributions
-        feed_cumulative = log_normal_cdf(size_range, feed_mu, feed_sigma) * 100
-        product_cumulative = log_normal_cdf(size_range, product_mu, product_sigma) * 100
-        
-        # Find D80 values
-        feed_d80 = np.interp(80, feed_cumulative, size_range)
-        product_d80 = np.interp(80, product_cumulative, size_range)
-        
-        # Calculate actual reduction ratio using D80
-        actual_reduction_ratio = feed_d80 / product_d80
+        # D80 values and the actual reduction ratio using D80
+        feed_d80 = result.feed_d80
+        product_d80 = result.product_d80
+        actual_reduction_ratio = result.actual_reduction_ratio
         
         # Size distribution plot
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        ax.semilogx(size_range, feed_cumulative, 'b-', label='Feed')
-        ax.semilogx(size_range, product_cumulative, 'r-', label='Product')
-        ax.axhline(y=80, color='g', linestyle='--')
-        ax.axvline(x=feed_d80, color='b', linestyle='--')
-        ax.axvline(x=product_d80, color='r', linestyle='--')
-        
-        ax.set_xlabel('Particle Size (mm)')
-        ax.set_ylabel('Cumulative Passing (%)')
-        ax.set_title('Size Distribution Analysis')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+            ax.semilogx(size_range, feed_cumulative, 'b-', label='Feed')
+            ax.semilogx(size_range, product_cumulative, 'r-', label='Product')
+            ax.axhline(y=80, color='g', linestyle='--')
+            ax.axvline(x=feed_d80, color='b', linestyle='--')
+            ax.axvline(x=product_d80, color='r', linestyle='--')
+            
+            ax.set_xlabel('Particle Size (mm)')
+            ax.set_ylabel('Cumulative Passing (%)')
+            ax.set_title('Size Distribution Analysis')
+            ax.grid(True, alpha=0.3)
+            ax.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig)
         
         st.write(f"**Feed D80:** {feed_d80:.2f} mm")
         st.write(f"**Product D80:** {product_d80:.2f} mm")
@@ -284,93 +220,70 @@ def app():
         # Power analysis and energy consumption
         # Create data for different feed rates
         feed_rates = np.linspace(feed_rate * 0.5, feed_rate * 1.5, 10)
-        power_requirements = []
+        power_requirements = model.power_requirements(result, feed_rates)
         
-        for rate in feed_rates:
-            power_req = specific_energy * rate / 1000  # kW
-            power_requirements.append(power_req)
-        
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        ax2.plot(feed_rates, power_requirements, 'b-')
-        ax2.axhline(y=motor_power, color='r', linestyle='--', label=f'Available Power: {motor_power} kW')
-        ax2.axvline(x=feed_rate, color='g', linestyle='--', label=f'Design Feed Rate: {feed_rate} kg/h')
-        
-        ax2.set_xlabel('Feed Rate (kg/h)')
-        ax2.set_ylabel('Power Requirement (kW)')
-        ax2.set_title('Power Requirement vs Feed Rate')
-        ax2.grid(True)
-        ax2.legend()
-        fig2.tight_layout()
-        st.pyplot(fig2)
+        with figures.subplots(figsize=(10, 6)) as (fig2, ax2):
+            ax2.plot(feed_rates, power_requirements, 'b-')
+            ax2.axhline(y=motor_power, color='r', linestyle='--', label=f'Available Power: {motor_power} kW')
+            ax2.axvline(x=feed_rate, color='g', linestyle='--', label=f'Design Feed Rate: {feed_rate} kg/h')
+            
+            ax2.set_xlabel('Feed Rate (kg/h)')
+            ax2.set_ylabel('Power Requirement (kW)')
+            ax2.set_title('Power Requirement vs Feed Rate')
+            ax2.grid(True)
+            ax2.legend()
+            figures.show(fig2)
         
         # Energy consumption vs reduction ratio
         reduction_ratios = np.linspace(1.5, feed_size/product_size * 1.5, 20)
-        energy_consumptions = []
+        energy_consumptions = model.energy_vs_reduction_ratio(result, reduction_ratios)
         
-        for ratio in reduction_ratios:
-            product_size_temp = feed_size / ratio
-            energy = bond_work_index * (1/np.sqrt(product_size_temp/1000) - 1/np.sqrt(feed_size/1000))
-            energy_consumptions.append(energy)
-        
-        fig3, ax3 = plt.subplots(figsize=(10, 6))
-        ax3.plot(reduction_ratios, energy_consumptions, 'r-')
-        ax3.axvline(x=reduction_ratio, color='g', linestyle='--', 
-                   label=f'Current Reduction Ratio: {reduction_ratio:.2f}')
-        
-        ax3.set_xlabel('Reduction Ratio')
-        ax3.set_ylabel('Specific Energy Consumption (kWh/ton)')
-        ax3.set_title('Energy Consumption vs Reduction Ratio')
-        ax3.grid(True)
-        ax3.legend()
-        fig3.tight_layout()
-        st.pyplot(fig3)
+        with figures.subplots(figsize=(10, 6)) as (fig3, ax3):
+            ax3.plot(reduction_ratios, energy_consumptions, 'r-')
+            ax3.axvline(x=reduction_ratio, color='g', linestyle='--', 
+                       label=f'Current Reduction Ratio: {reduction_ratio:.2f}')
+            
+            ax3.set_xlabel('Reduction Ratio')
+            ax3.set_ylabel('Specific Energy Consumption (kWh/ton)')
+            ax3.set_title('Energy Consumption vs Reduction Ratio')
+            ax3.grid(True)
+            ax3.legend()
+            figures.show(fig3)
     
     with tab3:
         # Performance curves specific to each crusher type
         if crusher_type == "Jaw Crusher":
             # Capacity vs feed size
             feed_sizes = np.linspace(feed_size * 0.5, feed_size * 1.5, 10)
-            capacities = []
+            capacities = model.jaw_capacity_vs_feed_size(result, feed_sizes)
             
-            for size in feed_sizes:
-                # Simplified model
-                relative_capacity = 0.6 + 0.4 * size / feed_size  # Relative capacity factor
-                cap = throughput * relative_capacity
-                capacities.append(cap)
-            
-            fig4, ax4 = plt.subplots(figsize=(10, 6))
-            ax4.plot(feed_sizes, capacities, 'b-')
-            ax4.axvline(x=feed_size, color='g', linestyle='--', 
-                       label=f'Design Feed Size: {feed_size} mm')
-            
-            ax4.set_xlabel('Feed Size (mm)')
-            ax4.set_ylabel('Capacity (tons/h)')
-            ax4.set_title('Jaw Crusher: Capacity vs Feed Size')
-            ax4.grid(True)
-            ax4.legend()
-            fig4.tight_layout()
-            st.pyplot(fig4)
+            with figures.subplots(figsize=(10, 6)) as (fig4, ax4):
+                ax4.plot(feed_sizes, capacities, 'b-')
+                ax4.axvline(x=feed_size, color='g', linestyle='--', 
+                           label=f'Design Feed Size: {feed_size} mm')
+                
+                ax4.set_xlabel('Feed Size (mm)')
+                ax4.set_ylabel('Capacity (tons/h)')
+                ax4.set_title('Jaw Crusher: Capacity vs Feed Size')
+                ax4.grid(True)
+                ax4.legend()
+                figures.show(fig4)
             
             # Effect of eccentric speed
             speeds = np.linspace(100, 400, 10)
-            capacities_speed = []
-            
-            for speed in speeds:
-                cap = jaw_length * jaw_width * speed * jaw_opening / 1e6
-                capacities_speed.append(cap)
+            capacities_speed = model.jaw_throughput(params, speeds)
             
-            fig5, ax5 = plt.subplots(figsize=(10, 6))
-            ax5.plot(speeds, capacities_speed, 'r-')
-            ax5.axvline(x=eccentric_speed, color='g', linestyle='--', 
-                       label=f'Current Speed: {eccentric_speed} rpm')
-            
-            ax5.set_xlabel('Eccentric Shaft Speed (rpm)')
-            ax5.set_ylabel('Capacity (theoretical units)')
-            ax5.set_title('Jaw Crusher: Effect of Eccentric Speed')
-            ax5.grid(True)
-            ax5.legend()
-            fig5.tight_layout()
-            st.pyplot(fig5)
+            with figures.subplots(figsize=(10, 6)) as (fig5, ax5):
+                ax5.plot(speeds, capacities_speed, 'r-')
+                ax5.axvline(x=eccentric_speed, color='g', linestyle='--', 
+                           label=f'Current Speed: {eccentric_speed} rpm')
+                
+                ax5.set_xlabel('Eccentric Shaft Speed (rpm)')
+                ax5.set_ylabel('Capacity (theoretical units)')
+                ax5.set_title('Jaw Crusher: Effect of Eccentric Speed')
+                ax5.grid(True)
+                ax5.legend()
+                figures.show(fig5)
             
         elif crusher_type == "Roll Crusher":
             # Effect of roll gap
@@ -378,84 +291,66 @@ def app():
             product_sizes = gaps * 1.2
             reduction_ratios_gap = feed_size / product_sizes
             
-            fig4, ax4 = plt.subplots(figsize=(10, 6))
-            ax4.plot(gaps, reduction_ratios_gap, 'b-')
-            ax4.axvline(x=roll_gap, color='g', linestyle='--', 
-                       label=f'Current Gap: {roll_gap} mm')
-            
-            ax4.set_xlabel('Roll Gap (mm)')
-            ax4.set_ylabel('Reduction Ratio')
-            ax4.set_title('Roll Crusher: Effect of Roll Gap on Reduction Ratio')
-            ax4.grid(True)
-            ax4.legend()
-            fig4.tight_layout()
-            st.pyplot(fig4)
+            with figures.subplots(figsize=(10, 6)) as (fig4, ax4):
+                ax4.plot(gaps, reduction_ratios_gap, 'b-')
+                ax4.axvline(x=roll_gap, color='g', linestyle='--', 
+                           label=f'Current Gap: {roll_gap} mm')
+                
+                ax4.set_xlabel('Roll Gap (mm)')
+                ax4.set_ylabel('Reduction Ratio')
+                ax4.set_title('Roll Crusher: Effect of Roll Gap on Reduction Ratio')
+                ax4.grid(True)
+                ax4.legend()
+                figures.show(fig4)
             
             # Effect of roll speed
             speeds = np.linspace(50, 300, 10)
-            throughputs = []
-            
-            for speed in speeds:
-                throughput_temp = roll_length * speed * roll_gap * material_density / 60 / 1e6
-                throughputs.append(throughput_temp)
+            throughputs = model.roll_throughput(params, speeds)
             
-            fig5, ax5 = plt.subplots(figsize=(10, 6))
-            ax5.plot(speeds, throughputs, 'r-')
-            ax5.axvline(x=roll_speed, color='g', linestyle='--', 
-                       label=f'Current Speed: {roll_speed} rpm')
-            
-            ax5.set_xlabel('Roll Speed (rpm)')
-            ax5.set_ylabel('Throughput (tons/h)')
-            ax5.set_title('Roll Crusher: Effect of Roll Speed on Throughput')
-            ax5.grid(True)
-            ax5.legend()
-            fig5.tight_layout()
-            st.pyplot(fig5)
+            with figures.subplots(figsize=(10, 6)) as (fig5, ax5):
+                ax5.plot(speeds, throughputs, 'r-')
+                ax5.axvline(x=roll_speed, color='g', linestyle='--', 
+                           label=f'Current Speed: {roll_speed} rpm')
+                
+                ax5.set_xlabel('Roll Speed (rpm)')
+                ax5.set_ylabel('Throughput (tons/h)')
+                ax5.set_title('Roll Crusher: Effect of Roll Speed on Throughput')
+                ax5.grid(True)
+                ax5.legend()
+                figures.show(fig5)
             
         else:  # Ball Mill
             # Effect of mill speed
             speed_percents = np.linspace(60, 90, 10)
-            mill_powers = []
-            
-            for speed_pct in speed_percents:
-                relative_factor = -4 * (speed_pct/100 - 0.5)**2 + 1  # Empirical relation
-                power = 10.6 * mill_volume * mill_filling * material_density * 0.5 * (speed_pct/100) * relative_factor
-                mill_powers.append(power)
-            
-            fig4, ax4 = plt.subplots(figsize=(10, 6))
-            ax4.plot(speed_percents, mill_powers, 'b-')
-            ax4.axvline(x=mill_speed_percent, color='g', linestyle='--', 
-                       label=f'Current Speed: {mill_speed_percent}% of critical')
+            mill_powers = model.mill_speed_effect(params, speed_percents)
             
-            ax4.set_xlabel('Mill Speed (% of critical)')
-            ax4.set_ylabel('Mill Power (kW)')
-            ax4.set_title('Ball Mill: Effect of Mill Speed on Power Consumption')
-            ax4.grid(True)
-            ax4.legend()
-            fig4.tight_layout()
-            st.pyplot(fig4)
+            with figures.subplots(figsize=(10, 6)) as (fig4, ax4):
+                ax4.plot(speed_percents, mill_powers, 'b-')
+                ax4.axvline(x=mill_speed_percent, color='g', linestyle='--', 
+                           label=f'Current Speed: {mill_speed_percent}% of critical')
+                
+                ax4.set_xlabel('Mill Speed (% of critical)')
+                ax4.set_ylabel('Mill Power (kW)')
+                ax4.set_title('Ball Mill: Effect of Mill Speed on Power Consumption')
+                ax4.grid(True)
+                ax4.legend()
+                figures.show(fig4)
             
             # Effect of mill filling
             fill_percents = np.linspace(20, 50, 10)
-            mill_powers_fill = []
-            
-            for fill_pct in fill_percents:
-                fill = fill_pct / 100
-                power = 10.6 * mill_volume * fill * material_density * 0.5 * (mill_speed_percent/100)
-                mill_powers_fill.append(power)
-            
-            fig5, ax5 = plt.subplots(figsize=(10, 6))
-            ax5.plot(fill_percents, mill_powers_fill, 'r-')
-            ax5.axvline(x=mill_fill_percent, color='g', linestyle='--', 
-                       label=f'Current Filling: {mill_fill_percent}%')
+            mill_powers_fill = model.mill_power(params, mill_speed_percent, fill_percents)
             
-            ax5.set_xlabel('Mill Filling (%)')
-            ax5.set_ylabel('Mill Power (kW)')
-            ax5.set_title('Ball Mill: Effect of Mill Filling on Power Consumption')
-            ax5.grid(True)
-            ax5.legend()
-            fig5.tight_layout()
-            st.pyplot(fig5)
+            with figures.subplots(figsize=(10, 6)) as (fig5, ax5):
+                ax5.plot(fill_percents, mill_powers_fill, 'r-')
+                ax5.axvline(x=mill_fill_percent, color='g', linestyle='--', 
+                           label=f'Current Filling: {mill_fill_percent}%')
+                
+                ax5.set_xlabel('Mill Filling (%)')
+                ax5.set_ylabel('Mill Power (kW)')
+                ax5.set_title('Ball Mill: Effect of Mill Filling on Power Consumption')
+                ax5.grid(True)
+                ax5.legend()
+                figures.show(fig5)
     
     # Schematic diagram section
     with st.expander("Crusher Schematic"):
@@ -1,13 +1,197 @@
+import io
+
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from scipy.optimize import fsolve
-from scipy import optimize
-from utils import set_plot_style
+from chemengsim import figures
+from chemengsim.core import cstr as model
+from chemengsim.core import multiplicity, rtd
+
+
+# Input label -> (Params field, unit); feed inputs change by %, the coolant by K
+DISTURBED_INPUTS = {
+    'Feed flow rate': ('feed_flow_rate', 'L/min'),
+    'Feed NaOH concentration': ('feed_conc_naoh', 'mol/L'),
+    'Feed ethyl acetate concentration': ('feed_conc_ea', 'mol/L'),
+    'Coolant temperature': ('coolant_temp', '°C'),
+}
+DISTURBANCE_SHAPES = ('Step', 'Pulse', 'Ramp', 'Sinusoid', 'Random')
+
+
+def disturbance_signal(shape, base, change, start, length, duration, seed=0):
+    """Input signal of a disturbance of ``change`` from ``base`` starting at ``start``"""
+    if shape == 'Step':
+        return model.Signal.step(base, base + change, start)
+    if shape == 'Pulse':
+        return model.Signal.pulse(base, change, start, length)
+    if shape == 'Ramp':
+        return model.Signal.ramp(base, base + change, start, start + length)
+    if shape == 'Sinusoid':
+        return model.Signal.sine(base, change, length, start, duration)
+    # Random fluctuations of standard deviation |change|, a new value every ``length`` minutes
+    times = np.append(np.arange(start, duration, length), duration)
+    values = base + abs(change) * np.random.default_rng(seed).standard_normal(len(times))
+    values[0] = base
+    return model.Signal(tuple(times), tuple(values))
+
+
+def draw_transient_concentrations(ax, time_points, conc_naoh, conc_ea, conc_products, steady_conc_naoh, title):
+    ax.plot(time_points, conc_naoh, 'b-', label='NaOH')
+    ax.plot(time_points, conc_ea, 'r-', label='Ethyl Acetate')
+    ax.plot(time_points, conc_products, 'g-', label='Products')
+    ax.axhline(y=steady_conc_naoh, color='b', linestyle=':', label='Initial steady-state NaOH')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Concentration (mol/L)')
+    ax.set_title(title)
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_transient_input(ax, time_points, values, label, unit):
+    ax.plot(time_points, values, 'k-')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel(f'{label} ({unit})')
+    ax.set_title(f'Input: {label}')
+    ax.grid(True, alpha=0.3)
+
+
+def draw_transient_temperature(ax, time_points, temperature, coolant_temp, conversion):
+    ax.plot(time_points, temperature, 'r-', label='Reactor')
+    ax.plot(time_points, coolant_temp, 'c--', label='Coolant')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Temperature (°C)')
+    ax.set_title('Temperature and Conversion')
+    ax.grid(True, alpha=0.3)
+    ax2 = ax.twinx()
+    ax2.plot(time_points, conversion, 'g-', label='Conversion')
+    ax2.set_ylabel('Conversion (%)')
+    lines, labels = ax.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax.legend(lines + lines2, labels + labels2, frameon=True, fancybox=True, shadow=True)
+
+
+def draw_van_heerden(ax, temperatures, heat_generation, heat_removal, steady_temperatures, steady_generation,
+                     stable):
+    ax.plot(temperatures, heat_generation, 'r-', label='Heat generation')
+    ax.plot(temperatures, heat_removal, 'b-', label='Heat removal')
+    for temperature, generation, is_stable in zip(steady_temperatures, steady_generation, stable):
+        ax.plot(temperature, generation, 'o', color='k', markerfacecolor='k' if is_stable else 'w', markersize=9)
+    ax.plot([], [], 'o', color='k', markerfacecolor='k', label='Stable steady state')
+    ax.plot([], [], 'o', color='k', markerfacecolor='w', label='Unstable steady state')
+    ax.set_xlabel('Reactor Temperature (°C)')
+    ax.set_ylabel('Heat Rate (J/min)')
+    ax.set_title('van Heerden Diagram')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_bifurcation(ax, values, temperature, stable, branch, limit_points, hopf_points, current_value,
+                     current_temperatures, label):
+    # Solid where stable, dashed where unstable; consecutive points of one branch and stability form a run
+    breaks = np.nonzero((branch[1:] != branch[:-1]) | (stable[1:] != stable[:-1]))[0] + 1
+    for run in np.split(np.arange(len(values)), breaks):
+        # Extend each run to the next point of its branch so the curve has no gaps
+        if run[-1] + 1 < len(values) and branch[run[-1] + 1] == branch[run[0]]:
+            run = np.append(run, run[-1] + 1)
+        ax.plot(values[run], temperature[run], 'b-' if stable[run[0]] else 'r--')
+    ax.plot([], [], 'b-', label='Stable')
+    ax.plot([], [], 'r--', label='Unstable')
+    if len(limit_points):
+        ax.plot(values[limit_points], temperature[limit_points], 'ks', label='Ignition/extinction point')
+    if len(hopf_points):
+        ax.plot(values[hopf_points], temperature[hopf_points], 'm^', label='Hopf point')
+    ax.axvline(current_value, color='k', linestyle=':', label='Operating point')
+    ax.plot(np.full(len(current_temperatures), current_value), current_temperatures, 'ko', markerfacecolor='none')
+    ax.set_xlabel(label)
+    ax.set_ylabel('Reactor Temperature (°C)')
+    ax.set_title('Steady-State Branches')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def rtd_display_end(time_points, cumulative, response, injection):
+    """Time by which all but 0.1% of the tracer has left, after an ideal or a finite pulse"""
+    left = np.cumsum(response) / response.sum() if injection == rtd.PULSE else cumulative
+    return time_points[min(np.searchsorted(np.minimum(left, cumulative), 0.999) + 1, len(time_points) - 1)]
+
+
+def draw_rtd(ax, time_points, exit_age, cumulative, response, injection, mean_residence_time, end):
+    visible = time_points <= end
+    ax.plot(time_points[visible], exit_age[visible], 'b-', label='E(t)')
+    if injection == rtd.PULSE:
+        ax.plot(time_points[visible], response[visible], 'm--', label='Outlet tracer (pulse)')
+    ax.axvline(mean_residence_time, color='k', linestyle=':', label=f'Mean residence time {mean_residence_time:.2f} min')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('E(t) (1/min)')
+    ax.set_title('Residence Time Distribution')
+    ax.grid(True, alpha=0.3)
+    ax2 = ax.twinx()
+    ax2.plot(time_points[visible], cumulative[visible], 'g-', label='F(t)')
+    if injection == rtd.STEP:
+        ax2.plot(time_points[visible], response[visible], 'm--', label='Outlet tracer (step)')
+    ax2.set_ylabel('F(t)')
+    ax2.set_ylim(0, 1.05)
+    lines, labels = ax.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax.legend(lines + lines2, labels + labels2, frameon=True, fancybox=True, shadow=True)
+
+
+def draw_segregation(ax, time_points, outlet_conversion, segregation, cstr_conversion, pfr_conversion, end):
+    visible = time_points <= end
+    ax.plot(time_points[visible], outlet_conversion[visible], 'b-', label='Outlet (segregated flow)')
+    ax.axhline(segregation, color='b', linestyle=':', label=f'Segregation model {segregation:.2f}%')
+    ax.axhline(cstr_conversion, color='r', linestyle='--', label=f'Ideal CSTR {cstr_conversion:.2f}%')
+    ax.axhline(pfr_conversion, color='g', linestyle='--', label=f'Ideal PFR {pfr_conversion:.2f}%')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Conversion (%)')
+    ax.set_title('Conversion of NaOH Fed Like the Tracer')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def draw_tracer_fits(ax, time, curve, mask, labels, fit_times, fitted, injection, max_runs=10):
+    for i in range(min(len(labels), max_runs)):
+        line, = ax.plot(fit_times[i], fitted[i], '-', label=labels[i])
+        ax.plot(time[i][mask[i]], curve[i][mask[i]], 'o', color=line.get_color(), markersize=4)
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('E(t) (1/min)' if injection == rtd.PULSE else 'F(t)')
+    title = 'Measured (markers) and Fitted (lines) Tracer Curves'
+    ax.set_title(title if len(labels) <= max_runs else f'{title}, First {max_runs} of {len(labels)} Runs')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True, fontsize='small')
+
+
+def draw_compartment_response(ax, time_points, cumulative, ideal_cumulative, bypass_fraction, residence_time):
+    ax.plot(time_points, ideal_cumulative, 'k--', label='Ideal CSTR')
+    ax.plot(time_points, cumulative, 'b-', label='Compartment model')
+    if bypass_fraction > 0:
+        ax.plot([0, 0], [0, bypass_fraction], 'b-')
+        ax.annotate(f'Bypass {bypass_fraction:.0%}', (0, bypass_fraction), xytext=(10, 0),
+                    textcoords='offset points', va='center')
+    ax.axvline(residence_time, color='gray', linestyle=':', label=f'τ = {residence_time:.2f} min')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('F(t)')
+    ax.set_ylim(0, 1.05)
+    ax.set_title('Step Tracer Response of the Non-ideal CSTR')
+    ax.grid(True, alpha=0.3)
+    ax.legend(frameon=True, fancybox=True, shadow=True)
+
+
+def read_tracer_sheets(uploaded_files):
+    """Concatenate uploaded CSV or Excel tracer sheets, prefixing runs with the file name when there are several"""
+    sheets = []
+    for uploaded_file in uploaded_files:
+        if uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+            sheet = pd.read_excel(uploaded_file)
+        else:
+            sheet = pd.read_csv(io.BytesIO(uploaded_file.getvalue()))
+        if rtd.RUN not in sheet.columns:
+            sheet[rtd.RUN] = uploaded_file.name
+        elif len(uploaded_files) > 1:
+            sheet[rtd.RUN] = uploaded_file.name + ': ' + sheet[rtd.RUN].astype(str)
+        sheets.append(sheet)
+    return pd.concat(sheets, ignore_index=True)
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 3: Isothermal CSTR (Continuous Stirred Tank Reactor)")
@@ -105,107 +289,34 @@ def app():
         coil_length = st.sidebar.number_input("Coil Length (m)", 
                                             min_value=1.0, max_value=20.0, value=5.0, step=0.5)
     
-    # Calculate residence time
-    residence_time = reactor_volume / feed_flow_rate  # minutes
-    
-    # Calculated parameters
-    temp_kelvin = temperature + 273.15
-    
-    # Define rate constants for different temperatures (based on experimental data)
-    # Values based on the saponification reaction of ethyl acetate
-    k_ref = 0.11  # L/(mol·min) at 35°C
-    E_R = 4500    # E/R value in Kelvin
-    
-    # Calculate rate constant using Arrhenius equation
-    k = k_ref * np.exp(E_R * (1/308.15 - 1/temp_kelvin))  # 308.15 K = 35°C (reference temperature)
-    
-    # Calculate steady-state conversion and concentrations
-    if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-        # Equal initial concentrations case
-        # For a second-order reaction with equal initial concentrations
-        # Solve X from: τ = X / (k * C_A0 * (1-X)²)
-        
-        def equal_conc_equation(X):
-            return residence_time - X / (k * feed_conc_naoh * (1-X)**2)
-        
-        # Initial guess
-        X_guess = 0.5
-        
-        # Solve the equation
-        X_solution = fsolve(equal_conc_equation, X_guess)[0]
-        
-        # Clamp to valid range
-        X_solution = max(0.0, min(1.0, X_solution))
-        
-        # Calculate exit concentrations
-        exit_conc_naoh = feed_conc_naoh * (1 - X_solution)
-        exit_conc_ea = feed_conc_ea * (1 - X_solution)
-        exit_conc_products = feed_conc_naoh * X_solution
-        
-    else:
-        # Different initial concentrations case
-        # For a second-order reaction with different initial concentrations
-        M = feed_conc_ea / feed_conc_naoh  # ratio of feed concentrations
-        
-        def diff_conc_equation(X):
-            return residence_time - (1 / (k * feed_conc_naoh)) * np.log((M - X) / (M * (1 - X))) / (M - 1)
-        
-        # Initial guess
-        X_guess = 0.5
-        
-        # Solve the equation
-        try:
-            X_solution = fsolve(diff_conc_equation, X_guess)[0]
-            
-            # Clamp to valid range
-            X_solution = max(0.0, min(1.0, X_solution))
-            
-        except:
-            # Fallback calculation if solver fails
-            X_solution = 1.0 / (1.0 + 1.0 / (k * feed_conc_naoh * residence_time))
-        
-        # Calculate exit concentrations
-        exit_conc_naoh = feed_conc_naoh * (1 - X_solution)
-        exit_conc_ea = feed_conc_ea - feed_conc_naoh * X_solution
-        exit_conc_products = feed_conc_naoh * X_solution
-    
-    # Heat generation from reaction
-    # Saponification heat of reaction (approximation)
-    heat_of_reaction = -55000  # J/mol (exothermic)
-    
-    # Rate of heat generation
-    heat_generation = -heat_of_reaction * feed_conc_naoh * feed_flow_rate * X_solution  # J/min
-    
-    # Heat transfer analysis
+    # Heat transfer area of the selected configuration
     if cstr_type == "Jacket Heating":
         heat_transfer_area = jacket_area
     else:  # Coil Heating
         heat_transfer_area = coil_area
     
-    # Heat transfer rate
-    heat_transfer = overall_heat_transfer * heat_transfer_area * (temperature - coolant_temp) / 60  # J/min
-    
-    # Create data for steady-state operation
-    operating_time = np.linspace(0, 60, 100)  # minutes
-    
-    # For plotting stability around steady state (small perturbations)
-    perturbation = 0.1  # 10% perturbation
-    conc_naoh = np.ones_like(operating_time) * exit_conc_naoh
-    conc_naoh[:10] = exit_conc_naoh * (1 + perturbation)  # Initial perturbation
-    
-    # Simple damped response to show stability
-    for i in range(10, len(operating_time)):
-        conc_naoh[i] = exit_conc_naoh + (conc_naoh[i-1] - exit_conc_naoh) * np.exp(-0.2)
-    
-    # Conversion profile
-    conversion = (feed_conc_naoh - conc_naoh) / feed_conc_naoh * 100
-    
-    # Create dataframe
-    df = pd.DataFrame({
-        'Time (minutes)': operating_time,
-        'NaOH Concentration (mol/L)': conc_naoh,
-        'Conversion (%)': conversion
-    })
+    # Run the simulation
+    params = model.Params(
+        feed_flow_rate=feed_flow_rate,
+        feed_conc_naoh=feed_conc_naoh,
+        feed_conc_ea=feed_conc_ea,
+        reactor_volume=reactor_volume,
+        temperature=temperature,
+        coolant_temp=coolant_temp,
+        overall_heat_transfer=overall_heat_transfer,
+        heat_transfer_area=heat_transfer_area
+    )
+    result = model.simulate(params)
+    
+    k = result.k
+    residence_time = result.residence_time
+    X_solution = result.conversion
+    exit_conc_naoh = result.exit_conc_naoh
+    exit_conc_ea = result.exit_conc_ea
+    exit_conc_products = result.exit_conc_products
+    heat_of_reaction = result.heat_of_reaction
+    heat_generation = result.heat_generation
+    heat_transfer = result.heat_transfer
     
     # Main results section
     st.header("Steady-State Results")
@@ -233,7 +344,7 @@ def app():
     
     with col4:
         st.write(f"**Heat transfer rate:** {heat_transfer:.1f} J/min")
-        heat_balance = heat_generation - heat_transfer
+        heat_balance = result.heat_balance
         st.write(f"**Heat balance:** {heat_balance:.1f} J/min")
         
         if abs(heat_balance) < 100:
@@ -247,95 +358,332 @@ def app():
     tab1, tab2, tab3 = st.tabs(["CSTR Stability", "Conversion Analysis", "Residence Time Effect"])
     
     with tab1:
-        # Stability plot
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        ax.plot(operating_time, conc_naoh, 'b-', label='NaOH Concentration')
-        ax.axhline(y=exit_conc_naoh, color='r', linestyle='--', label='Steady-state Concentration')
-        ax.set_xlabel('Time (minutes)')
-        ax.set_ylabel('NaOH Concentration (mol/L)')
-        ax.set_title('CSTR Stability - Response to Perturbation')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
-        
-        st.write("""
-        The graph above shows the stability of the CSTR. A small perturbation in the concentration is 
-        applied at the beginning, and the system returns to the steady-state value, demonstrating 
-        that the CSTR is a self-regulating system.
+        # Dynamic response of the unsteady balances
+        col1, col2 = st.columns(2)
+        with col1:
+            scenario = st.radio("Scenario", ["Perturbation recovery", "Start-up", "Input disturbance"])
+            duration = st.slider("Simulated time (residence times)", 1.0, 20.0, 5.0, 0.5) * residence_time
+            energy_balance = st.checkbox("Include the energy balance (reactor temperature varies)")
+        inputs = {}
+        with col2:
+            if scenario == "Perturbation recovery":
+                perturbation = st.slider("Initial NaOH perturbation (%)", -50, 50, 10, 1)
+            elif scenario == "Input disturbance":
+                disturbed = st.selectbox("Disturbed input", list(DISTURBED_INPUTS))
+                shape = st.selectbox("Disturbance shape", DISTURBANCE_SHAPES)
+                field, unit = DISTURBED_INPUTS[disturbed]
+                base = getattr(params, field)
+                if field == 'coolant_temp':
+                    change = st.slider("Change (K)", -20.0, 20.0, 5.0, 0.5)
+                else:
+                    change = base * st.slider("Change (%)", -90, 100, 20, 5) / 100
+                start = st.slider("Start (minutes)", 0.0, duration, round(min(residence_time, duration / 2), 1))
+                length = st.slider("Duration, period or sampling interval (minutes)", 0.1, duration,
+                                   round(min(residence_time, duration / 4), 1))
+                inputs[field] = disturbance_signal(shape, base, change, start, length, duration)
+                if field == 'coolant_temp' and not energy_balance:
+                    st.info("The coolant temperature only acts through the energy balance.")
+
+        transient = model.simulate_transient(params, model.TransientParams(
+            duration=duration,
+            startup=scenario == "Start-up",
+            initial_perturbation=perturbation if scenario == "Perturbation recovery" else 0.0,
+            energy_balance=energy_balance,
+            **inputs
+        ))
+
+        figures.image(draw_transient_concentrations, transient.time_points, transient.conc_naoh, transient.conc_ea,
+                      transient.conc_products, exit_conc_naoh, f'CSTR Dynamics - {scenario}')
+        if scenario == "Input disturbance":
+            figures.image(draw_transient_input, transient.time_points,
+                          getattr(transient, field), disturbed, unit, figsize=(10, 3))
+        if energy_balance:
+            figures.image(draw_transient_temperature, transient.time_points, transient.temperature,
+                          transient.coolant_temp, transient.conversion)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Final Conversion", f"{transient.conversion[-1]:.2f} %",
+                    f"{transient.conversion[-1] - X_solution * 100:+.2f} vs steady state", delta_color="off")
+        col2.metric("Final NaOH", f"{transient.conc_naoh[-1]:.5f} mol/L")
+        col3.metric("Integrator Steps", f"{transient.steps}")
+
+        st.write(f"""
+        The unsteady material balance V·dC/dt = Q·(C_feed − C) + V·r is integrated from the chosen initial
+        state{", together with the energy balance," if energy_balance else ""} with the actual inputs over time.
+        Without reaction, a disturbance decays with the residence time τ = {residence_time:.2f} min; the reaction
+        speeds up the return of the NaOH concentration, so the CSTR is self-regulating at these conditions.
         """)
-    
+
+        csv = transient.to_dataframe().to_csv(index=False)
+        st.download_button("Download Transient Data as CSV", csv, "cstr_transient.csv", "text/csv",
+                           key='download-transient-csv')
+
     with tab2:
         # Conversion analysis
-        # Calculate conversion for different residence times
-        residence_times = np.linspace(0.1, residence_time*2, 100)
-        conversions = []
+        # Conversion for different residence times
+        residence_times = result.residence_times
+        conversions = result.conversions
         
-        for rt in residence_times:
-            if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-                # Equal initial concentrations
-                X = rt * k * feed_conc_naoh / (1 + rt * k * feed_conc_naoh)
-            else:
-                # Different initial concentrations - simplified approach
-                M = feed_conc_ea / feed_conc_naoh
-                
-                # Approximate solution
-                if M > 1:
-                    X = 1 - np.exp(-k * feed_conc_naoh * rt)
-                else:
-                    X = 1 - np.exp(-k * feed_conc_ea * rt)
-            
-            conversions.append(X * 100)  # Convert to percentage
-        
-        fig2, ax2 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax2.plot(residence_times, conversions, 'g-')
-        ax2.axvline(x=residence_time, color='r', linestyle='--', label=f'Current τ = {residence_time:.2f} min')
-        ax2.axhline(y=X_solution*100, color='b', linestyle='--', label=f'Current X = {X_solution*100:.2f}%')
-        ax2.set_xlabel('Residence Time (minutes)')
-        ax2.set_ylabel('Conversion (%)')
-        ax2.set_title('Effect of Residence Time on Conversion')
-        ax2.grid(True, alpha=0.3)
-        ax2.legend(frameon=True, fancybox=True, shadow=True)
-        fig2.tight_layout()
-        st.pyplot(fig2)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig2, ax2):
+            ax2.plot(residence_times, conversions, 'g-')
+            ax2.axvline(x=residence_time, color='r', linestyle='--', label=f'Current τ = {residence_time:.2f} min')
+            ax2.axhline(y=X_solution*100, color='b', linestyle='--', label=f'Current X = {X_solution*100:.2f}%')
+            ax2.set_xlabel('Residence Time (minutes)')
+            ax2.set_ylabel('Conversion (%)')
+            ax2.set_title('Effect of Residence Time on Conversion')
+            ax2.grid(True, alpha=0.3)
+            ax2.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig2)
     
     with tab3:
         # Residence time effect on exit concentrations
-        exit_naoh = []
-        exit_ea = []
-        exit_prod = []
+        exit_naoh = result.exit_naoh
+        exit_ea = result.exit_ea
+        exit_prod = result.exit_products
         
-        for rt in residence_times:
-            if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-                # Equal initial concentrations
-                X = rt * k * feed_conc_naoh / (1 + rt * k * feed_conc_naoh)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig3, ax3):
+            ax3.plot(residence_times, exit_naoh, 'b-', label='NaOH')
+            ax3.plot(residence_times, exit_ea, 'r-', label='Ethyl Acetate')
+            ax3.plot(residence_times, exit_prod, 'g-', label='Products')
+            ax3.axvline(x=residence_time, color='k', linestyle='--', label=f'Current τ = {residence_time:.2f} min')
+            ax3.set_xlabel('Residence Time (minutes)')
+            ax3.set_ylabel('Exit Concentration (mol/L)')
+            ax3.set_title('Effect of Residence Time on Exit Concentrations')
+            ax3.grid(True, alpha=0.3)
+            ax3.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig3)
+    
+    with st.expander("Multiplicity and Stability (Non-isothermal Operation)"):
+        st.markdown("""
+        Without temperature control, the reactor temperature follows from the energy balance, and an
+        exothermic reaction can have several steady states: the heat generated by the reaction (an S-shaped
+        curve of temperature) can cross the straight heat removal line of the outflow and the coolant more
+        than once.  The middle crossing is unstable.  Each steady state is classified by the eigenvalues of
+        the Jacobian of the dynamic balances, and the branches are followed over a parameter range by
+        arclength continuation, which turns around the ignition and extinction points.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            feed_temp = st.slider("Feed Temperature (°C)", 5, 60, 25, 1)
+            activation_factor = st.slider("Activation energy factor (× saponification)", 1.0, 5.0, 1.0, 0.1,
+                                          help="Saponification is too weakly temperature-sensitive for "
+                                               "multiplicity at lab conditions; a hypothetical reaction with a "
+                                               "higher activation energy shows it, e.g. 4× with τ = 1 min along "
+                                               "the feed concentration axis up to 5 mol/L.")
+        with col2:
+            parameter_label = st.selectbox("Continuation parameter", list(multiplicity.CONTINUATION_PARAMETERS.values()))
+            parameter = next(name for name, label in multiplicity.CONTINUATION_PARAMETERS.items()
+                             if label == parameter_label)
+            current_value = {'residence_time': residence_time, 'feed_conc': feed_conc_naoh}.get(
+                parameter, getattr(params, parameter, None))
+            limits = {'coolant_temp': (-20.0, 100.0), 'residence_time': (0.01, 200.0),
+                      'feed_conc': (0.001, 5.0)}[parameter]
+            if parameter == 'coolant_temp':
+                default = (current_value - 30, current_value + 30)
             else:
-                # Different initial concentrations - simplified approach
-                M = feed_conc_ea / feed_conc_naoh
-                
-                # Approximate solution
-                if M > 1:
-                    X = 1 - np.exp(-k * feed_conc_naoh * rt)
-                else:
-                    X = 1 - np.exp(-k * feed_conc_ea * rt)
-            
-            exit_naoh.append(feed_conc_naoh * (1 - X))
-            exit_ea.append(feed_conc_ea - feed_conc_naoh * X if feed_conc_ea > feed_conc_naoh * X else 0)
-            exit_prod.append(feed_conc_naoh * X)
-        
-        fig3, ax3 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax3.plot(residence_times, exit_naoh, 'b-', label='NaOH')
-        ax3.plot(residence_times, exit_ea, 'r-', label='Ethyl Acetate')
-        ax3.plot(residence_times, exit_prod, 'g-', label='Products')
-        ax3.axvline(x=residence_time, color='k', linestyle='--', label=f'Current τ = {residence_time:.2f} min')
-        ax3.set_xlabel('Residence Time (minutes)')
-        ax3.set_ylabel('Exit Concentration (mol/L)')
-        ax3.set_title('Effect of Residence Time on Exit Concentrations')
-        ax3.grid(True, alpha=0.3)
-        ax3.legend(frameon=True, fancybox=True, shadow=True)
-        fig3.tight_layout()
-        st.pyplot(fig3)
-    
+                default = (current_value / 4, current_value * 4)
+            low, high = st.slider("Parameter range", *limits,
+                                  (float(max(limits[0], default[0])), float(min(limits[1], default[1]))))
+
+        thermal = multiplicity.ThermalParams(feed_temp=feed_temp, activation_factor=activation_factor)
+        states = multiplicity.steady_states(params, thermal)
+        steady_generation = np.interp(states.temperature, states.temperatures, states.heat_generation)
+        figures.image(draw_van_heerden, states.temperatures, states.heat_generation, states.heat_removal,
+                      states.temperature, steady_generation, states.stable)
+        st.dataframe(pd.DataFrame({
+            'Temperature (°C)': states.temperature,
+            'Conversion (%)': states.conversion,
+            'Largest Eigenvalue Real Part (1/min)': states.max_real_eigenvalue,
+            'Stability': np.where(states.stable, 'Stable', 'Unstable')
+        }), hide_index=True)
+
+        if low < high:
+            branches = multiplicity.continuation(params, thermal, parameter, low, high)
+            figures.image(draw_bifurcation, branches.values, branches.temperature, branches.stable, branches.branch,
+                          branches.limit_points, branches.hopf_points, current_value, states.temperature,
+                          parameter_label)
+            if len(branches.limit_points):
+                st.warning("Multiple steady states between "
+                           f"{branches.values[branches.limit_points].min():.3g} and "
+                           f"{branches.values[branches.limit_points].max():.3g}: the reactor may ignite or "
+                           "extinguish abruptly when the parameter crosses these values.")
+            else:
+                st.info("A single steady state over the whole range.")
+
+    with st.expander("Residence Time Distribution (Tracer Experiment)"):
+        st.markdown("""
+        A real stirred tank is not perfectly mixed: a tracer injected into the feed leaves with a spread of
+        residence times described by the exit-age distribution E(t) and its integral F(t).  The tanks-in-series
+        model (N = 1 is the ideal CSTR) and the dispersed plug flow model (Pe → ∞ is the ideal PFR) each describe
+        the spread with one parameter.  In the segregation model every fluid element reacts as a small batch
+        reactor for its own residence time, so the mean conversion is X̄ = ∫ X_batch(t)·E(t) dt.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            rtd_model = st.radio("Flow model", list(rtd.MODELS), format_func=lambda name: rtd.MODELS[name][0],
+                                 horizontal=True, key="rtd_model")
+            if rtd_model == rtd.TANKS:
+                tanks = st.slider("Number of tanks N", 1.0, 20.0, 3.0, 0.5, key="rtd_tanks")
+                peclet = rtd.Params.peclet
+            else:
+                peclet = st.number_input("Péclet number Pe", 0.1, 1000.0, 10.0, key="rtd_peclet")
+                tanks = rtd.Params.tanks
+        with col2:
+            injection = st.radio("Tracer injection", rtd.INJECTIONS, format_func=str.capitalize, horizontal=True,
+                                 key="rtd_injection")
+            pulse_width = st.slider("Pulse duration (minutes)", 0.0, float(max(residence_time, 0.1)), 0.0,
+                                    key="rtd_pulse_width", disabled=injection == rtd.STEP)
+
+        rtd_result = rtd.simulate(rtd.Params(
+            model=rtd_model,
+            residence_time=residence_time,
+            tanks=tanks,
+            peclet=peclet,
+            injection=injection,
+            pulse_width=pulse_width,
+            feed_conc_naoh=feed_conc_naoh,
+            feed_conc_ea=feed_conc_ea,
+            temperature=temperature
+        ))
+        end = rtd_display_end(rtd_result.time_points, rtd_result.cumulative, rtd_result.response, injection)
+        figures.image(draw_rtd, rtd_result.time_points, rtd_result.exit_age, rtd_result.cumulative,
+                      rtd_result.response, injection, rtd_result.mean_residence_time, end)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Mean Residence Time", f"{rtd_result.mean_residence_time:.2f} min")
+        col2.metric("Variance σ²", f"{rtd_result.variance:.2f} min²")
+        col3.metric("Skewness", f"{rtd_result.skewness:.3f}")
+        col4.metric("Equivalent N", f"{rtd_result.equivalent_tanks:.2f}")
+
+        figures.image(draw_segregation, rtd_result.time_points, rtd_result.outlet_conversion,
+                      rtd_result.segregation_conversion, rtd_result.cstr_conversion, rtd_result.pfr_conversion, end)
+        st.write(f"""
+        With segregated flow the mean conversion is **{rtd_result.segregation_conversion:.2f}%**, against
+        {rtd_result.cstr_conversion:.2f}% in an ideal CSTR and {rtd_result.pfr_conversion:.2f}% in an ideal PFR with
+        the same space time τ = {residence_time:.2f} min.  The outlet curve follows NaOH fed the same way as the
+        tracer: after a step it is the start-up of the reactor, after a pulse the fluid leaving later has reacted
+        longer.  With open boundaries, dispersion carries fluid back upstream of the inlet, so the dispersed PFR
+        has a mean residence time τ·(1 + 2/Pe) longer than τ.
+        """)
+
+        st.subheader("Fit Tracer Data")
+        st.markdown(f"""
+        One row per outlet reading with the columns `{rtd.RUN}`, `{rtd.TIME}` and `{rtd.TRACER}` (any unit
+        proportional to the concentration, e.g. conductivity above the baseline).  Sheets of a whole class can
+        be uploaded together and are fitted in one pass.
+        """)
+        uploaded_files = st.file_uploader("Upload tracer sheets (CSV or Excel)", type=['csv', 'xlsx', 'xls'],
+                                          accept_multiple_files=True, key="rtd_upload")
+        if uploaded_files:
+            try:
+                tracer_sheet = read_tracer_sheets(uploaded_files)
+            except Exception as e:
+                st.error(f"Could not read the tracer sheets: {e}")
+                tracer_sheet = None
+        else:
+            st.markdown("Or enter the readings from your experiment (sample data shown):")
+            tracer_sheet = st.data_editor(rtd.example_runs(), use_container_width=True, num_rows="dynamic",
+                                          key="rtd_data")
+
+        col1, col2 = st.columns(2)
+        fit_model = col1.radio("Model to fit", list(rtd.MODELS), format_func=lambda name: rtd.MODELS[name][0],
+                               horizontal=True, key="rtd_fit_model")
+        fit_injection = col2.radio("Injection of the data", rtd.INJECTIONS, format_func=str.capitalize,
+                                   horizontal=True, key="rtd_fit_injection")
+        if tracer_sheet is not None:
+            try:
+                runs = rtd.runs_from_dataframe(tracer_sheet)
+                fit = rtd.fit_tracer(runs, fit_model, fit_injection)
+            except ValueError as e:
+                st.error(f"Cannot fit the tracer data: {e}")
+            else:
+                st.dataframe(fit.to_dataframe(), hide_index=True)
+                fit_times = np.linspace(runs.time.min(axis=1), runs.time.max(axis=1), 200, axis=1)
+                figures.image(draw_tracer_fits, runs.time, runs.normalized(fit_injection), runs.mask, fit.labels,
+                              fit_times, fit.curves(fit_times), fit_injection)
+                if not fit.converged.all():
+                    st.warning("The fit did not converge for: " + ", ".join(
+                        label for label, converged in zip(fit.labels, fit.converged) if not converged))
+                csv = fit.to_dataframe().to_csv(index=False)
+                st.download_button("Download Fitted Parameters as CSV", csv, "tracer_fits.csv", "text/csv",
+                                   key='download-tracer-csv')
+
+    with st.expander("Non-ideal CSTR (Compartment Model)"):
+        st.markdown("""
+        Lab tanks often have stagnant corners and short-circuiting feed.  The compartment model splits the
+        tank into a well-mixed active zone (a fraction α of the volume), a dead zone that exchanges a flow
+        ε·Q with it, and a bypass of a fraction β of the feed straight to the outlet.  The tracer balances
+        are linear and are solved with matrix exponentials; the conversion follows from the second-order
+        balances of both zones.
+        """)
+        col1, col2, col3 = st.columns(3)
+        active_fraction = col1.slider("Active volume fraction α", 0.3, 1.0, 0.8, 0.01, key="compartment_active")
+        bypass_fraction = col2.slider("Bypass fraction β", 0.0, 0.5, 0.1, 0.01, key="compartment_bypass")
+        exchange_ratio = col3.slider("Exchange flow ratio ε", 0.0, float(model.MAX_EXCHANGE_RATIO), 0.0, 0.01,
+                                     key="compartment_exchange")
+        compartments = model.simulate_compartments(params, model.CompartmentParams(
+            active_fraction=active_fraction,
+            bypass_fraction=bypass_fraction,
+            exchange_ratio=exchange_ratio
+        ))
+        figures.image(draw_compartment_response, compartments.time_points, compartments.cumulative,
+                      compartments.ideal_cumulative, bypass_fraction, residence_time)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Ideal CSTR Conversion", f"{compartments.ideal_conversion:.2f} %")
+        col2.metric("Non-ideal Conversion", f"{compartments.conversion:.2f} %",
+                    f"{compartments.conversion - compartments.ideal_conversion:+.2f}", delta_color="off")
+        col3.metric("Mean Residence Time", f"{compartments.mean_residence_time:.2f} min",
+                    f"{compartments.mean_residence_time - residence_time:+.2f} vs τ", delta_color="off")
+
+        st.subheader("Fit the Compartment Model to Tracer Data")
+        st.markdown(f"""
+        Upload outlet readings above the baseline with the columns `{rtd.RUN}`, `{rtd.TIME}` and `{rtd.TRACER}`,
+        taken at the nominal space time τ = {residence_time:.2f} min of the sidebar.  With the feed tracer
+        concentration of a step (or the injected amount over the feed flow of a pulse) the bypass shows as
+        missing tracer; a step reading at t = 0 holds the bypassed feed.
+        """)
+        uploaded_files = st.file_uploader("Upload tracer sheets (CSV or Excel)", type=['csv', 'xlsx', 'xls'],
+                                          accept_multiple_files=True, key="compartment_upload")
+        if uploaded_files:
+            try:
+                tracer_sheet = read_tracer_sheets(uploaded_files)
+            except Exception as e:
+                st.error(f"Could not read the tracer sheets: {e}")
+                tracer_sheet = None
+        else:
+            st.markdown("Or enter the readings from your experiment (sample step data shown):")
+            tracer_sheet = st.data_editor(model.example_tracer_runs(residence_time), use_container_width=True,
+                                          num_rows="dynamic", key="compartment_data")
+
+        col1, col2 = st.columns(2)
+        fit_injection = col1.radio("Injection of the data", (rtd.STEP, rtd.PULSE), format_func=str.capitalize,
+                                   horizontal=True, key="compartment_fit_injection")
+        scale = col2.number_input("Feed tracer concentration of the step, or tracer amount over flow of the "
+                                  "pulse (0 if unknown)", 0.0, value=100.0, key="compartment_scale")
+        if tracer_sheet is not None:
+            try:
+                runs = rtd.runs_from_dataframe(tracer_sheet)
+                fit = model.fit_compartments(runs, residence_time, fit_injection, scale or None)
+            except ValueError as e:
+                st.error(f"Cannot fit the tracer data: {e}")
+            else:
+                ideal, non_ideal = fit.conversions(params)
+                fits = fit.to_dataframe()
+                fits['Ideal Conversion (%)'] = ideal
+                fits['Non-ideal Conversion (%)'] = non_ideal
+                st.dataframe(fits, hide_index=True)
+                fit_times = np.linspace(runs.time.min(axis=1), runs.time.max(axis=1), 200, axis=1)
+                curve = runs.normalized(fit_injection) if not scale else runs.reading / scale
+                figures.image(draw_tracer_fits, runs.time, curve, runs.mask, fit.labels, fit_times,
+                              fit.curves(fit_times), fit_injection)
+                if fit_injection == rtd.PULSE and not scale:
+                    st.info("Without the injected tracer amount the bypass cannot be told apart from a smaller "
+                            "active zone and is taken as zero.")
+                csv = fits.to_csv(index=False)
+                st.download_button("Download Compartment Fits as CSV", csv, "compartment_fits.csv", "text/csv",
+                                   key='download-compartment-csv')
+
     # CSTR Schematic
     with st.expander("CSTR Schematic"):
         if cstr_type == "Jacket Heating":
@@ -1,12 +1,8 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from utils import set_plot_style
-from scipy.integrate import solve_ivp
+from chemengsim import figures, timing
+from chemengsim.core import pfr as model
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 4: Isothermal Plug Flow Reactor (PFR)")
@@ -93,125 +89,34 @@ def app():
     
     temperature = st.sidebar.slider("Reaction Temperature (°C)", 25, 60, 35, 1)
     
-    # Calculate reactor volume
-    tube_radius = tube_diameter / 2 / 100  # convert cm to m
-    tube_cross_area = np.pi * tube_radius**2  # m²
-    reactor_volume = tube_cross_area * tube_length * 1000  # L
-    
-    # Calculate residence time
-    residence_time = reactor_volume / feed_flow_rate  # minutes
-    
-    # Calculated parameters
-    temp_kelvin = temperature + 273.15
-    
-    # Define rate constants for different temperatures (based on experimental data)
-    k_ref = 0.11  # L/(mol·min) at 35°C
-    E_R = 4500    # E/R value in Kelvin
-    
-    # Calculate rate constant using Arrhenius equation
-    k = k_ref * np.exp(E_R * (1/308.15 - 1/temp_kelvin))  # 308.15 K = 35°C (reference temperature)
-    
-    # Additional calculations for coiled tube
-    if pfr_type == "Coiled Tube":
-        # Calculate Dean number for flow characterization
-        density = 1000  # kg/m³ (water approximation)
-        viscosity = 0.001  # Pa·s (water approximation)
-        
-        # Average velocity
-        velocity = feed_flow_rate / (60 * tube_cross_area)  # m/s
-        
-        # Reynolds number
-        reynolds = density * velocity * (tube_diameter/100) / viscosity
-        
-        # Dean number
-        dean = reynolds * np.sqrt((tube_diameter/100) / (coil_diameter/100))
-        
-        # Correction factor for mass transfer in coiled tubes
-        # Enhances mixing due to secondary flows
-        if dean < 100:
-            mixing_enhancement = 1.0
-        else:
-            mixing_enhancement = 1.0 + 0.1 * np.log10(dean/100)
-        
-        # Apply enhancement to rate constant
-        k = k * mixing_enhancement
-    
-    # PFR model differential equation
-    def pfr_ode(z, X):
-        # z is the dimensionless length along the reactor
-        # X is the conversion
-        
-        if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-            # Equal initial concentrations
-            rate = k * feed_conc_naoh**2 * (1 - X)**2
-        else:
-            # Different initial concentrations
-            M = feed_conc_ea / feed_conc_naoh  # ratio of initial concentrations
-            
-            if feed_conc_naoh <= feed_conc_ea:
-                # NaOH is limiting
-                rate = k * feed_conc_naoh * (1 - X) * (feed_conc_ea - feed_conc_naoh * X)
-            else:
-                # Ethyl acetate is limiting
-                rate = k * (feed_conc_naoh - feed_conc_ea * X) * feed_conc_ea * (1 - X)
-        
-        # dX/dz = rate * V / (F_A0 * L)
-        return rate * reactor_volume / (feed_conc_naoh * feed_flow_rate * tube_length)
-    
-    # Solve ODE to get conversion profile along the reactor length
-    z_span = (0, 1)  # dimensionless length (0 to 1)
-    z_eval = np.linspace(0, 1, 100)  # points to evaluate
-    
-    # Initial condition: zero conversion at inlet
-    X0 = 0
-    
-    # Solve ODE
-    solution = solve_ivp(pfr_ode, z_span, [X0], t_eval=z_eval, method='RK45')
-    
-    # Extract results
-    z_points = solution.t
-    conversion = solution.y[0]
-    
-    # Calculate actual length points
-    length_points = z_points * tube_length
-    
-    # Calculate concentrations along the reactor
-    if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-        # Equal initial concentrations
-        conc_naoh = feed_conc_naoh * (1 - conversion)
-        conc_ea = feed_conc_ea * (1 - conversion)
-    else:
-        # Different initial concentrations
-        if feed_conc_naoh <= feed_conc_ea:
-            # NaOH is limiting
-            conc_naoh = feed_conc_naoh * (1 - conversion)
-            conc_ea = feed_conc_ea - feed_conc_naoh * conversion
-        else:
-            # Ethyl acetate is limiting
-            conc_naoh = feed_conc_naoh - feed_conc_ea * conversion
-            conc_ea = feed_conc_ea * (1 - conversion)
-    
-    # Calculate product concentration
-    if feed_conc_naoh <= feed_conc_ea:
-        conc_products = feed_conc_naoh * conversion
-    else:
-        conc_products = feed_conc_ea * conversion
-    
-    # Calculate final conversion and outlet concentrations
-    final_conversion = conversion[-1]
-    outlet_conc_naoh = conc_naoh[-1]
-    outlet_conc_ea = conc_ea[-1]
-    outlet_conc_products = conc_products[-1]
+    # Run the simulation
+    params = model.Params(
+        pfr_type=pfr_type,
+        feed_flow_rate=feed_flow_rate,
+        feed_conc_naoh=feed_conc_naoh,
+        feed_conc_ea=feed_conc_ea,
+        tube_diameter=tube_diameter,
+        tube_length=tube_length,
+        coil_diameter=coil_diameter if pfr_type == "Coiled Tube" else model.Params.coil_diameter,
+        number_of_turns=number_of_turns if pfr_type == "Coiled Tube" else model.Params.number_of_turns,
+        temperature=temperature
+    )
+    result = model.simulate(params)
+    
+    k = result.k
+    reactor_volume = result.reactor_volume
+    residence_time = result.residence_time
+    dean = result.dean
+    mixing_enhancement = result.mixing_enhancement
+    length_points = result.length_points
+    conversion = result.conversion
+    conc_naoh = result.conc_naoh
+    conc_ea = result.conc_ea
+    conc_products = result.conc_products
+    final_conversion = result.final_conversion
     
     # Create dataframe for results
-    df = pd.DataFrame({
-        'Length (m)': length_points,
-        'Position (dimensionless)': z_points,
-        'Conversion': conversion,
-        'NaOH Concentration (mol/L)': conc_naoh,
-        'Ethyl Acetate Concentration (mol/L)': conc_ea,
-        'Products Concentration (mol/L)': conc_products
-    })
+    df = result.to_dataframe()
     
     # Main experiment area
     st.header("Simulation Results")
@@ -236,53 +141,37 @@ def app():
     
     with tab1:
         # Concentration profile plot
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        ax.plot(length_points, conc_naoh, 'b-', label='NaOH')
-        ax.plot(length_points, conc_ea, 'r-', label='Ethyl Acetate')
-        ax.plot(length_points, conc_products, 'g-', label='Products')
-        ax.set_xlabel('Length (m)')
-        ax.set_ylabel('Concentration (mol/L)')
-        ax.set_title('Concentration Profiles Along the Reactor')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+            ax.plot(length_points, conc_naoh, 'b-', label='NaOH')
+            ax.plot(length_points, conc_ea, 'r-', label='Ethyl Acetate')
+            ax.plot(length_points, conc_products, 'g-', label='Products')
+            ax.set_xlabel('Length (m)')
+            ax.set_ylabel('Concentration (mol/L)')
+            ax.set_title('Concentration Profiles Along the Reactor')
+            ax.grid(True, alpha=0.3)
+            ax.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig)
     
     with tab2:
         # Conversion profile plot
-        fig2, ax2 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax2.plot(length_points, conversion * 100, 'b-')
-        ax2.set_xlabel('Length (m)')
-        ax2.set_ylabel('Conversion (%)')
-        ax2.set_title('Conversion Profile Along the Reactor')
-        ax2.grid(True, alpha=0.3)
-        fig2.tight_layout()
-        st.pyplot(fig2)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig2, ax2):
+            ax2.plot(length_points, conversion * 100, 'b-')
+            ax2.set_xlabel('Length (m)')
+            ax2.set_ylabel('Conversion (%)')
+            ax2.set_title('Conversion Profile Along the Reactor')
+            ax2.grid(True, alpha=0.3)
+            figures.show(fig2)
         
         # Reaction rate profile
-        reaction_rates = []
-        for i, X in enumerate(conversion):
-            if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-                # Equal initial concentrations
-                rate = k * feed_conc_naoh**2 * (1 - X)**2
-            else:
-                # Different initial concentrations
-                if feed_conc_naoh <= feed_conc_ea:
-                    # NaOH is limiting
-                    rate = k * feed_conc_naoh * (1 - X) * (feed_conc_ea - feed_conc_naoh * X)
-                else:
-                    # Ethyl acetate is limiting
-                    rate = k * (feed_conc_naoh - feed_conc_ea * X) * feed_conc_ea * (1 - X)
-            reaction_rates.append(rate)
+        reaction_rates = result.reaction_rates
         
-        fig3, ax3 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax3.plot(length_points, reaction_rates, 'r-')
-        ax3.set_xlabel('Length (m)')
-        ax3.set_ylabel('Reaction Rate (mol/L·min)')
-        ax3.set_title('Reaction Rate Profile Along the Reactor')
-        ax3.grid(True, alpha=0.3)
-        fig3.tight_layout()
-        st.pyplot(fig3)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig3, ax3):
+            ax3.plot(length_points, reaction_rates, 'r-')
+            ax3.set_xlabel('Length (m)')
+            ax3.set_ylabel('Reaction Rate (mol/L·min)')
+            ax3.set_title('Reaction Rate Profile Along the Reactor')
+            ax3.grid(True, alpha=0.3)
+            figures.show(fig3)
     
     with tab3:
         # Display data table with selected points
@@ -291,7 +180,8 @@ def app():
         st.dataframe(df.iloc[sample_indices].reset_index(drop=True))
         
         # Download link for full data
-        csv = df.to_csv(index=False)
+        with timing.span('export.csv'):
+            csv = df.to_csv(index=False)
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -305,58 +195,29 @@ def app():
         st.write("### Comparison of PFR with CSTR of the Same Volume")
         
         # Calculate CSTR conversion for the same volume
-        if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-            # Equal initial concentrations in CSTR
-            X_cstr = residence_time * k * feed_conc_naoh / (1 + residence_time * k * feed_conc_naoh)
-        else:
-            # Different initial concentrations in CSTR - simplified approach
-            M = feed_conc_ea / feed_conc_naoh
-            
-            # Approximate solution
-            if M > 1:
-                X_cstr = 1 - np.exp(-k * feed_conc_naoh * residence_time)
-            else:
-                X_cstr = 1 - np.exp(-k * feed_conc_ea * residence_time)
+        comparison = model.compare_with_cstr(params, result)
+        X_cstr = comparison.cstr_conversion
         
         st.write(f"PFR Final Conversion: {final_conversion*100:.2f}%")
         st.write(f"CSTR Conversion (same volume): {X_cstr*100:.2f}%")
         st.write(f"Efficiency Improvement: {(final_conversion - X_cstr) / X_cstr * 100:.2f}%")
         
         # Plot conversion comparison for different residence times
-        residence_times = np.linspace(0.1, residence_time*2, 50)
-        pfr_conversions = []
-        cstr_conversions = []
-        
-        for rt in residence_times:
-            # Simple approximation for educational purposes
-            if abs(feed_conc_naoh - feed_conc_ea) < 1e-6:
-                # Equal initial concentrations
-                X_cstr_rt = rt * k * feed_conc_naoh / (1 + rt * k * feed_conc_naoh)
-                X_pfr_rt = 1 - np.exp(-k * feed_conc_naoh * rt)
-            else:
-                # Different initial concentrations - simplified
-                if feed_conc_naoh <= feed_conc_ea:
-                    X_cstr_rt = rt * k * feed_conc_naoh / (1 + rt * k * feed_conc_naoh)
-                    X_pfr_rt = 1 - np.exp(-k * feed_conc_naoh * rt)
-                else:
-                    X_cstr_rt = rt * k * feed_conc_ea / (1 + rt * k * feed_conc_ea)
-                    X_pfr_rt = 1 - np.exp(-k * feed_conc_ea * rt)
-            
-            pfr_conversions.append(X_pfr_rt * 100)
-            cstr_conversions.append(X_cstr_rt * 100)
+        residence_times = comparison.residence_times
+        pfr_conversions = comparison.pfr_conversions
+        cstr_conversions = comparison.cstr_conversions
         
-        fig4, ax4 = plt.subplots(figsize=(10, 6), dpi=100)
-        ax4.plot(residence_times, pfr_conversions, 'b-', label='PFR')
-        ax4.plot(residence_times, cstr_conversions, 'r-', label='CSTR')
-        ax4.axvline(x=residence_time, color='k', linestyle='--', 
-                   label=f'Current τ = {residence_time:.2f} min')
-        ax4.set_xlabel('Residence Time (minutes)')
-        ax4.set_ylabel('Conversion (%)')
-        ax4.set_title('PFR vs CSTR Conversion Comparison')
-        ax4.grid(True, alpha=0.3)
-        ax4.legend(frameon=True, fancybox=True, shadow=True)
-        fig4.tight_layout()
-        st.pyplot(fig4)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig4, ax4):
+            ax4.plot(residence_times, pfr_conversions, 'b-', label='PFR')
+            ax4.plot(residence_times, cstr_conversions, 'r-', label='CSTR')
+            ax4.axvline(x=residence_time, color='k', linestyle='--', 
+                       label=f'Current τ = {residence_time:.2f} min')
+            ax4.set_xlabel('Residence Time (minutes)')
+            ax4.set_ylabel('Conversion (%)')
+            ax4.set_title('PFR vs CSTR Conversion Comparison')
+            ax4.grid(True, alpha=0.3)
+            ax4.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig4)
         
         st.write("""
         ### Key Differences Between PFR and CSTR:
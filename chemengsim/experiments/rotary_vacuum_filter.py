@@ -1,12 +1,8 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from utils import set_plot_style
-from scipy.optimize import curve_fit
+from chemengsim import figures, timing
+from chemengsim.core import rotary_vacuum_filter as model
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 7: Rotary Vacuum Filter")
@@ -76,110 +72,30 @@ def app():
     filtrate_viscosity = st.sidebar.number_input("Filtrate viscosity (Pa·s)", 
                                               min_value=0.0005, max_value=0.05, value=0.001, step=0.0001, format="%.4f")
     
-    # Calculated parameters
-    # Calculate drum surface area
-    drum_surface_area = np.pi * drum_diameter * drum_length  # m²
-    
-    # Calculate specific cake resistance (pressure dependent)
-    specific_cake_resistance = 5e10 * (vacuum_pressure / 50)**0.5  # m/kg
-    medium_resistance = 1e10  # 1/m
-    
-    # Calculate rotational period
-    rotation_period = 60 / drum_speed  # seconds
-    
-    # Calculate submergence angle and time
-    submergence_angle = submergence * 360 / 100  # degrees
-    submergence_time = rotation_period * submergence_angle / 360  # seconds
-    
-    # Simulation
-    # Define time points for one full rotation
-    time_points = np.linspace(0, rotation_period, 100)
-    
-    # Define angular position at each time point
-    angles = time_points * 360 / rotation_period
-    
-    # Determine if point is submerged
-    is_submerged = angles <= submergence_angle
-    
-    # Calculate filtration time for each position
-    filtration_times = np.zeros_like(time_points)
-    active_filtration_time = 0
-    
-    for i, submerged in enumerate(is_submerged):
-        if submerged:
-            # Point is in submergence zone - cake is forming
-            if i > 0:
-                active_filtration_time += time_points[i] - time_points[i-1]
-            filtration_times[i] = active_filtration_time
-        else:
-            # Point is out of submergence - cake dewatering/discharge
-            filtration_times[i] = submergence_time
-    
-    # Calculate cake thickness at each position
-    # Constants for the filtration equation
-    k1 = (filtrate_viscosity * specific_cake_resistance * slurry_concentration) / (2 * drum_surface_area**2 * (vacuum_pressure * 1000))
-    k2 = (filtrate_viscosity * medium_resistance) / (drum_surface_area * (vacuum_pressure * 1000))
-    
-    # Calculate filtrate volume at each position
-    filtrate_volumes = np.zeros_like(time_points)
-    
-    for i, t in enumerate(filtration_times):
-        if t > 0:
-            filtrate_volumes[i] = (-k2 + np.sqrt(k2**2 + 4*k1*t)) / (2*k1)
-    
-    # Assume cake density is 2.5 times the slurry concentration (dry basis)
-    cake_density = 2.5 * slurry_concentration  # kg/m³
-    
-    # Calculate cake thickness
-    cake_thicknesses = np.zeros_like(time_points)
-    for i, submerged in enumerate(is_submerged):
-        if i > 0:  # Skip first point
-            if submerged:
-                # During submergence, cake continues to form
-                cake_thicknesses[i] = slurry_concentration * filtrate_volumes[i] / (cake_density * drum_surface_area)  # m
-            else:
-                # After submergence, cake thickness remains constant until discharge
-                if angles[i] < 330:  # Before discharge
-                    cake_thicknesses[i] = cake_thicknesses[np.argmax(angles >= submergence_angle) - 1]
-                else:  # Discharge zone
-                    cake_thicknesses[i] = 0
-    
-    # Convert to mm for display
-    cake_thicknesses_mm = cake_thicknesses * 1000  # mm
-    
-    # Calculate cake moisture content
-    # Assume initial moisture is 80% and decreases during drying
-    initial_moisture = 0.8
-    final_moisture = 0.3
-    moisture_content = np.ones_like(time_points) * initial_moisture
-    
-    for i, angle in enumerate(angles):
-        if angle > submergence_angle:
-            # Dewatering occurs after submergence
-            fraction_dried = min(1.0, (angle - submergence_angle) / (330 - submergence_angle))
-            moisture_content[i] = initial_moisture - fraction_dried * (initial_moisture - final_moisture)
-    
-    # Calculate production rate
-    max_cake_thickness = np.max(cake_thicknesses)
-    cake_volume_per_rotation = max_cake_thickness * drum_surface_area  # m³/rotation
-    cake_mass_per_rotation = cake_volume_per_rotation * cake_density  # kg/rotation
-    production_rate = cake_mass_per_rotation * drum_speed * 60  # kg/h
-    
-    # Create dataframe for results
-    df = pd.DataFrame({
-        'Time (s)': time_points,
-        'Angle (degrees)': angles,
-        'Filtration Time (s)': filtration_times,
-        'Filtrate Volume (m³)': filtrate_volumes,
-        'Cake Thickness (mm)': cake_thicknesses_mm,
-        'Moisture Content (fraction)': moisture_content
-    })
-    
-    # Mark different zones
-    df['Zone'] = 'Discharge'
-    df.loc[angles <= submergence_angle, 'Zone'] = 'Pickup/Cake Formation'
-    df.loc[(angles > submergence_angle) & (angles <= 180), 'Zone'] = 'Washing'
-    df.loc[(angles > 180) & (angles <= 330), 'Zone'] = 'Drying'
+    # Run the simulation
+    params = model.Params(
+        drum_diameter=drum_diameter,
+        drum_length=drum_length,
+        drum_speed=drum_speed,
+        submergence=submergence,
+        vacuum_pressure=vacuum_pressure,
+        slurry_concentration=slurry_concentration,
+        filtrate_viscosity=filtrate_viscosity
+    )
+    result = model.simulate(params)
+    
+    drum_surface_area = result.drum_surface_area
+    specific_cake_resistance = result.specific_cake_resistance
+    medium_resistance = result.medium_resistance
+    rotation_period = result.rotation_period
+    submergence_angle = result.submergence_angle
+    submergence_time = result.submergence_time
+    cake_thicknesses_mm = result.cake_thicknesses_mm
+    final_moisture = result.final_moisture
+    production_rate = result.production_rate
+    
+    # Create dataframe for results, labelled by zone
+    df = result.to_dataframe()
     
     # Main experiment area
     st.header("Simulation Results")
@@ -204,102 +120,92 @@ def app():
     
     with tab1:
         # Rotary drum operation visualization
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        
-        # Plot different zones with different colors
-        zone_colors = {
-            'Pickup/Cake Formation': 'blue',
-            'Washing': 'green',
-            'Drying': 'orange',
-            'Discharge': 'red'
-        }
-        
-        for zone in zone_colors:
-            zone_data = df[df['Zone'] == zone]
-            ax.plot(zone_data['Angle (degrees)'], zone_data['Cake Thickness (mm)'], 
-                    color=zone_colors[zone], label=zone)
-        
-        ax.set_xlabel('Angular Position (degrees)')
-        ax.set_ylabel('Cake Thickness (mm)')
-        ax.set_title('Cake Thickness Around Drum Circumference')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        
-        # Add drum schematic
-        theta = np.linspace(0, 2*np.pi, 100)
-        x = np.cos(theta)
-        y = np.sin(theta)
-        ax.plot(x*360/(2*np.pi), y*np.max(cake_thicknesses_mm)*1.5, 'k--', alpha=0.5)
-        
-        # Indicate submergence level
-        submergence_angle_rad = submergence_angle * np.pi / 180
-        ax.fill_between([0, submergence_angle], [-np.max(cake_thicknesses_mm)*2, -np.max(cake_thicknesses_mm)*2], 
-                         [np.max(cake_thicknesses_mm)*2, np.max(cake_thicknesses_mm)*2], 
-                         color='skyblue', alpha=0.3)
-        
-        fig.tight_layout()
-        st.pyplot(fig)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+            
+            # Plot different zones with different colors
+            zone_colors = {
+                'Pickup/Cake Formation': 'blue',
+                'Washing': 'green',
+                'Drying': 'orange',
+                'Discharge': 'red'
+            }
+            
+            for zone in zone_colors:
+                zone_data = df[df['Zone'] == zone]
+                ax.plot(zone_data['Angle (degrees)'], zone_data['Cake Thickness (mm)'], 
+                        color=zone_colors[zone], label=zone)
+            
+            ax.set_xlabel('Angular Position (degrees)')
+            ax.set_ylabel('Cake Thickness (mm)')
+            ax.set_title('Cake Thickness Around Drum Circumference')
+            ax.grid(True, alpha=0.3)
+            ax.legend(frameon=True, fancybox=True, shadow=True)
+            
+            # Add drum schematic
+            theta = np.linspace(0, 2*np.pi, 100)
+            x = np.cos(theta)
+            y = np.sin(theta)
+            ax.plot(x*360/(2*np.pi), y*np.max(cake_thicknesses_mm)*1.5, 'k--', alpha=0.5)
+            
+            # Indicate submergence level
+            submergence_angle_rad = submergence_angle * np.pi / 180
+            ax.fill_between([0, submergence_angle], [-np.max(cake_thicknesses_mm)*2, -np.max(cake_thicknesses_mm)*2], 
+                             [np.max(cake_thicknesses_mm)*2, np.max(cake_thicknesses_mm)*2], 
+                             color='skyblue', alpha=0.3)
+            
+            figures.show(fig)
     
     with tab2:
         # Cake formation visualization
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        
-        # Filter for cake formation zone
-        formation_data = df[df['Zone'] == 'Pickup/Cake Formation']
-        
-        ax2.plot(formation_data['Filtration Time (s)'], formation_data['Cake Thickness (mm)'], 'b-')
-        
-        ax2.set_xlabel('Filtration Time (s)')
-        ax2.set_ylabel('Cake Thickness (mm)')
-        ax2.set_title('Cake Formation During Submergence')
-        ax2.grid(True)
-        fig.tight_layout()
-        st.pyplot(fig2)
+        with figures.subplots(figsize=(10, 6)) as (fig2, ax2):
+            
+            # Filter for cake formation zone
+            formation_data = df[df['Zone'] == 'Pickup/Cake Formation']
+            
+            ax2.plot(formation_data['Filtration Time (s)'], formation_data['Cake Thickness (mm)'], 'b-')
+            
+            ax2.set_xlabel('Filtration Time (s)')
+            ax2.set_ylabel('Cake Thickness (mm)')
+            ax2.set_title('Cake Formation During Submergence')
+            ax2.grid(True)
+            figures.show(fig2)
         
         # Filtration rate
-        fig3, ax3 = plt.subplots(figsize=(10, 6))
-        
-        # Calculate filtration rate
-        filtration_rate = np.zeros_like(time_points)
-        for i in range(1, len(formation_data)):
-            dt = formation_data.iloc[i]['Filtration Time (s)'] - formation_data.iloc[i-1]['Filtration Time (s)']
-            dv = formation_data.iloc[i]['Filtrate Volume (m³)'] - formation_data.iloc[i-1]['Filtrate Volume (m³)']
-            if dt > 0:
-                idx = formation_data.index[i]
-                filtration_rate[idx] = dv / dt
-        
-        # Plot filtration rate
-        ax3.plot(formation_data['Filtration Time (s)'], filtration_rate[formation_data.index], 'g-')
-        
-        ax3.set_xlabel('Filtration Time (s)')
-        ax3.set_ylabel('Filtration Rate (m³/s)')
-        ax3.set_title('Filtration Rate During Submergence')
-        ax3.grid(True)
-        fig.tight_layout()
-        st.pyplot(fig3)
+        with figures.subplots(figsize=(10, 6)) as (fig3, ax3):
+            
+            # Filtration rate during submergence
+            filtration_rate = result.filtration_rates
+            
+            # Plot filtration rate
+            ax3.plot(formation_data['Filtration Time (s)'], filtration_rate[formation_data.index], 'g-')
+            
+            ax3.set_xlabel('Filtration Time (s)')
+            ax3.set_ylabel('Filtration Rate (m³/s)')
+            ax3.set_title('Filtration Rate During Submergence')
+            ax3.grid(True)
+            figures.show(fig3)
     
     with tab3:
         # Moisture profile visualization
-        fig4, ax4 = plt.subplots(figsize=(10, 6))
-        
-        ax4.plot(df['Angle (degrees)'], df['Moisture Content (fraction)'] * 100, 'b-')
-        
-        # Mark different zones
-        zone_boundaries = [0, submergence_angle, 180, 330, 360]
-        zone_names = ['Pickup/Cake Formation', 'Washing', 'Drying', 'Discharge']
-        
-        for i in range(len(zone_names)):
-            ax4.axvspan(zone_boundaries[i], zone_boundaries[i+1], 
-                        alpha=0.2, color=list(zone_colors.values())[i])
-            ax4.text((zone_boundaries[i] + zone_boundaries[i+1])/2, 85, 
-                     zone_names[i], ha='center', alpha=0.7)
-        
-        ax4.set_xlabel('Angular Position (degrees)')
-        ax4.set_ylabel('Moisture Content (%)')
-        ax4.set_title('Moisture Content Profile Around Drum')
-        ax4.grid(True)
-        fig.tight_layout()
-        st.pyplot(fig4)
+        with figures.subplots(figsize=(10, 6)) as (fig4, ax4):
+            
+            ax4.plot(df['Angle (degrees)'], df['Moisture Content (fraction)'] * 100, 'b-')
+            
+            # Mark different zones
+            zone_boundaries = [0, submergence_angle, 180, 330, 360]
+            zone_names = ['Pickup/Cake Formation', 'Washing', 'Drying', 'Discharge']
+            
+            for i in range(len(zone_names)):
+                ax4.axvspan(zone_boundaries[i], zone_boundaries[i+1], 
+                            alpha=0.2, color=list(zone_colors.values())[i])
+                ax4.text((zone_boundaries[i] + zone_boundaries[i+1])/2, 85, 
+                         zone_names[i], ha='center', alpha=0.7)
+            
+            ax4.set_xlabel('Angular Position (degrees)')
+            ax4.set_ylabel('Moisture Content (%)')
+            ax4.set_title('Moisture Content Profile Around Drum')
+            ax4.grid(True)
+            figures.show(fig4)
     
     with tab4:
         # Display data table with selected points
@@ -308,7 +214,8 @@ def app():
         st.dataframe(df.iloc[sample_indices].reset_index(drop=True))
         
         # Download link for full data
-        csv = df.to_csv(index=False)
+        with timing.span('export.csv'):
+            csv = df.to_csv(index=False)
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -328,76 +235,38 @@ def app():
             st.write("**Effect of Drum Speed on Production Rate**")
             
             speeds = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0]
-            production_rates = []
+            production_rates = model.drum_speed_effect(params, speeds)
             
-            for speed in speeds:
-                # Calculate new rotation period
-                rotation_period_new = 60 / speed
-                
-                # Calculate new submergence time
-                submergence_time_new = rotation_period_new * submergence_angle / 360
-                
-                # Calculate new cake thickness (simplified)
-                # Using the cake formation model
-                t_sub = submergence_time_new
-                v_sub = (-k2 + np.sqrt(k2**2 + 4*k1*t_sub)) / (2*k1)
-                thickness_new = slurry_concentration * v_sub / (cake_density * drum_surface_area)
-                
-                # Calculate new production rate
-                cake_volume_new = thickness_new * drum_surface_area
-                cake_mass_new = cake_volume_new * cake_density
-                prod_rate_new = cake_mass_new * speed * 60
+            with figures.subplots(figsize=(8, 5)) as (fig5, ax5):
+                ax5.plot(speeds, production_rates, 'bo-')
+                ax5.axvline(x=drum_speed, color='r', linestyle='--', 
+                           label=f'Current: {drum_speed} rpm')
                 
-                production_rates.append(prod_rate_new)
-            
-            fig5, ax5 = plt.subplots(figsize=(8, 5))
-            ax5.plot(speeds, production_rates, 'bo-')
-            ax5.axvline(x=drum_speed, color='r', linestyle='--', 
-                       label=f'Current: {drum_speed} rpm')
-            
-            ax5.set_xlabel('Drum Speed (rpm)')
-            ax5.set_ylabel('Production Rate (kg/h)')
-            ax5.set_title('Effect of Drum Speed on Production Rate')
-            ax5.grid(True)
-            ax5.legend()
-            fig.tight_layout()
-        st.pyplot(fig5)
+                ax5.set_xlabel('Drum Speed (rpm)')
+                ax5.set_ylabel('Production Rate (kg/h)')
+                ax5.set_title('Effect of Drum Speed on Production Rate')
+                ax5.grid(True)
+                ax5.legend()
+                figures.show(fig5)
         
         with col2:
             # Effect of vacuum pressure
             st.write("**Effect of Vacuum Pressure on Cake Thickness**")
             
             pressures = [20, 30, 40, 50, 60, 70, 80]
-            cake_thicknesses_max = []
+            cake_thicknesses_max = model.vacuum_pressure_effect(params, pressures)
             
-            for pressure in pressures:
-                # Calculate new specific cake resistance
-                resistance_new = 5e10 * (pressure / 50)**0.5
-                
-                # Recalculate constants
-                k1_new = (filtrate_viscosity * resistance_new * slurry_concentration) / (2 * drum_surface_area**2 * (pressure * 1000))
-                k2_new = (filtrate_viscosity * medium_resistance) / (drum_surface_area * (pressure * 1000))
-                
-                # Calculate new filtrate volume
-                v_new = (-k2_new + np.sqrt(k2_new**2 + 4*k1_new*submergence_time)) / (2*k1_new)
+            with figures.subplots(figsize=(8, 5)) as (fig6, ax6):
+                ax6.plot(pressures, cake_thicknesses_max, 'go-')
+                ax6.axvline(x=vacuum_pressure, color='r', linestyle='--', 
+                           label=f'Current: {vacuum_pressure} kPa')
                 
-                # Calculate new cake thickness
-                thickness_new = slurry_concentration * v_new / (cake_density * drum_surface_area) * 1000  # mm
-                
-                cake_thicknesses_max.append(thickness_new)
-            
-            fig6, ax6 = plt.subplots(figsize=(8, 5))
-            ax6.plot(pressures, cake_thicknesses_max, 'go-')
-            ax6.axvline(x=vacuum_pressure, color='r', linestyle='--', 
-                       label=f'Current: {vacuum_pressure} kPa')
-            
-            ax6.set_xlabel('Vacuum Pressure (kPa)')
-            ax6.set_ylabel('Maximum Cake Thickness (mm)')
-            ax6.set_title('Effect of Vacuum Pressure on Cake Thickness')
-            ax6.grid(True)
-            ax6.legend()
-            fig.tight_layout()
-        st.pyplot(fig6)
+                ax6.set_xlabel('Vacuum Pressure (kPa)')
+                ax6.set_ylabel('Maximum Cake Thickness (mm)')
+                ax6.set_title('Effect of Vacuum Pressure on Cake Thickness')
+                ax6.grid(True)
+                ax6.legend()
+                figures.show(fig6)
     
     # Rotary vacuum filter schematic
     with st.expander("Rotary Vacuum Filter Schematic"):
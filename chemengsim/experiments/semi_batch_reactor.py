@@ -1,12 +1,116 @@
 import streamlit as st
 import numpy as np
+import matplotlib
 import pandas as pd
-import matplotlib.pyplot as plt
-from utils import set_plot_style
-from scipy.integrate import solve_ivp
+from chemengsim import figures, timing
+from chemengsim.core import semi_batch_reactor as model
+from chemengsim.core import feed_optimization
+
+# Label -> (Params field, slider minimum, slider maximum, default range)
+SWEEP_AXES = {
+    'Initial volume (L)': ('initial_vol_reactor', 0.1, 10.0, (0.5, 2.0)),
+    'Initial NaOH concentration (mol/L)': ('initial_conc_naoh', 0.001, 1.0, (0.005, 0.05)),
+    'Initial Ethyl Acetate concentration (mol/L)': ('initial_conc_ea', 0.0, 1.0, (0.0, 0.05)),
+    'Feed flow rate (L/min)': ('feed_flow_rate', 0.01, 1.0, (0.05, 0.3)),
+    'Feed Ethyl Acetate concentration (mol/L)': ('feed_conc_ea', 0.001, 1.0, (0.02, 0.2)),
+    'Reaction Temperature (°C)': ('temperature', 25.0, 60.0, (25.0, 60.0)),
+}
+
+MAX_LEGEND_CURVES = 8  # more curves get a colorbar instead of a legend
+
+
+def draw_sweep(ax, time_points, profiles, values, label, ylabel, title):
+    mappable = matplotlib.cm.ScalarMappable(matplotlib.colors.Normalize(values[0], values[-1]), 'viridis')
+    for value, profile, color in zip(values, profiles, mappable.to_rgba(values)):
+        ax.plot(time_points, profile, color=color, linewidth=1.5 if len(values) <= MAX_LEGEND_CURVES else 0.8,
+                label=f'{value:.3g}')
+    if len(values) <= MAX_LEGEND_CURVES:
+        ax.legend(title=label)
+    else:
+        ax.figure.colorbar(mappable, ax=ax, label=label)
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+
+
+def draw_final_conversion(ax, values, final_conversion, label, total_time):
+    ax.plot(values, final_conversion, 'b-', marker='o' if len(values) <= MAX_LEGEND_CURVES else None)
+    ax.set_xlabel(label)
+    ax.set_ylabel('NaOH Conversion (%)')
+    ax.set_title(f'Conversion after {total_time} minutes')
+    ax.grid(True)
+
+
+# Columns of the feed schedule editor; blank stop conditions do not apply
+SCHEDULE_COLUMNS = ('Duration (min)', 'Start Flow (L/min)', 'End Flow (L/min)', 'Feed EA (mol/L)',
+                    'Stop at Volume (L)', 'Stop at Conversion (%)')
+
+
+def schedule_from_table(table):
+    """Feed segments from the rows of the schedule editor"""
+    def optional(value):
+        return None if pd.isna(value) else float(value)
+
+    return tuple(model.FeedSegment(duration=float(row[0]), flow_rate=float(row[1]), final_flow_rate=optional(row[2]),
+                                   feed_conc_ea=optional(row[3]), max_volume=optional(row[4]),
+                                   stop_conversion=optional(row[5]))
+                 for row in table[list(SCHEDULE_COLUMNS)].itertuples(index=False)
+                 if not pd.isna(row[0]) and not pd.isna(row[1]))
+
+
+def draw_schedules(ax, names, time_points, profiles, ylabel, title):
+    for name, t, profile in zip(names, time_points, profiles):
+        ax.plot(t, profile, label=name)
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    ax.legend()
+
+
+def draw_feed_policies(ax, names, segment_times, segment_flow_rates):
+    for name, times, flows in zip(names, segment_times, segment_flow_rates):
+        # Each stage runs from its start flow to its end flow; steps between stages are vertical
+        ax.plot(np.repeat(times, 2)[1:-1], flows.ravel(), label=name)
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Feed Flow Rate (L/min)')
+    ax.set_title('Feed Policies')
+    ax.grid(True)
+    ax.legend()
+
+
+def draw_runaway_map(ax, feed_flow_rates, ua_values, mtsr, unsafe, max_technical_temp):
+    mesh = ax.pcolormesh(ua_values, feed_flow_rates, mtsr, cmap='inferno', shading='nearest')
+    ax.figure.colorbar(mesh, ax=ax, label='MTSR (°C)')
+    if mtsr.min() < max_technical_temp < mtsr.max():
+        ax.contour(ua_values, feed_flow_rates, mtsr, levels=[max_technical_temp], colors='cyan', linewidths=2)
+    rows, cols = np.nonzero(unsafe)
+    ax.plot(ua_values[cols], feed_flow_rates[rows], 'x', color='cyan', markersize=4,
+            label=f'Unsafe (reaches MTT = {max_technical_temp:g} °C)')
+    if len(rows):
+        ax.legend(loc='upper right')
+    if ua_values.min() > 0:
+        ax.set_xscale('log')
+    ax.set_xlabel('Cooling Capacity UA (W/K)')
+    ax.set_ylabel('Feed Flow Rate (L/min)')
+    ax.set_title('Maximum Temperature of the Synthesis Reaction')
+
+
+def draw_runaway_profiles(ax, time_points, temperature, accumulation, max_technical_temp, title):
+    ax.plot(time_points, temperature, 'r-', label='Reactor temperature')
+    ax.axhline(max_technical_temp, color='k', linestyle='--', label='MTT')
+    ax.set_xlabel('Time (minutes)')
+    ax.set_ylabel('Temperature (°C)')
+    ax.set_title(title)
+    ax.grid(True)
+    ax2 = ax.twinx()
+    ax2.plot(time_points, accumulation, 'b-', label='Accumulation')
+    ax2.set_ylabel('Accumulation (% of charge)')
+    lines = ax.get_legend_handles_labels()
+    lines2 = ax2.get_legend_handles_labels()
+    ax.legend(lines[0] + lines2[0], lines[1] + lines2[1])
 
-# Set consistent style for plots
-set_plot_style()
 
 def app():
     st.title("Experiment 2: Isothermal Semi-batch Reactor")
@@ -79,83 +183,30 @@ def app():
     # Reaction parameters
     temperature = st.sidebar.slider("Reaction Temperature (°C)", 25, 60, 35, 1)
     total_time = st.sidebar.slider("Total Reaction Time (minutes)", 5, 120, 30, 5)
+    target_conversion = st.sidebar.slider("Target NaOH Conversion (%)", 1, 99, 90, 1)
     
-    # Calculated parameters
-    temp_kelvin = temperature + 273.15
-    
-    # Define rate constants for different temperatures (based on experimental data)
-    # Values based on the saponification reaction of ethyl acetate
-    k_ref = 0.11  # L/(mol·min) at 35°C
-    E_R = 4500    # E/R value in Kelvin
+    # Run the simulation
+    params = model.Params(
+        initial_vol_reactor=initial_vol_reactor,
+        initial_conc_naoh=initial_conc_naoh,
+        initial_conc_ea=initial_conc_ea,
+        feed_flow_rate=feed_flow_rate,
+        feed_conc_ea=feed_conc_ea,
+        temperature=temperature,
+        total_time=total_time,
+        target_conversion=target_conversion
+    )
+    result = model.simulate(params)
     
-    # Calculate rate constant using Arrhenius equation
-    k = k_ref * np.exp(E_R * (1/308.15 - 1/temp_kelvin))  # 308.15 K = 35°C (reference temp)
-    
-    # Define differential equations for semi-batch reactor
-    def semi_batch_ode(t, y):
-        # y[0] = C_NaOH, y[1] = C_EA, y[2] = V
-        C_NaOH, C_EA, V = y
-        
-        # Molar feed rates
-        F_EA0 = feed_flow_rate * feed_conc_ea  # mol/min of ethyl acetate
-        F_NaOH0 = 0  # No NaOH in feed stream
-        
-        # Reaction rate per unit volume
-        r = k * C_NaOH * C_EA  # mol/(L·min)
-        
-        # Total reaction rate
-        r_total = r * V  # mol/min
-        
-        # Differential equations - more accurate formulation
-        dC_NaOH_dt = (F_NaOH0 - r_total) / V - (C_NaOH * feed_flow_rate) / V
-        dC_EA_dt = (F_EA0 - r_total) / V - (C_EA * feed_flow_rate) / V
-        dV_dt = feed_flow_rate
-        
-        # Ensure concentrations don't go negative
-        if C_NaOH < 0.0001 and dC_NaOH_dt < 0:
-            dC_NaOH_dt = 0
-        if C_EA < 0.0001 and dC_EA_dt < 0:
-            dC_EA_dt = 0
-            
-        return [dC_NaOH_dt, dC_EA_dt, dV_dt]
-    
-    # Initial conditions
-    y0 = [initial_conc_naoh, initial_conc_ea, initial_vol_reactor]
-    
-    # Time points
-    t_span = (0, total_time)
-    t_eval = np.linspace(0, total_time, 100)
-    
-    # Solve ODE
-    solution = solve_ivp(semi_batch_ode, t_span, y0, t_eval=t_eval, method='RK45')
-    
-    time_points = solution.t
-    conc_naoh = solution.y[0]
-    conc_ea = solution.y[1]
-    volume = solution.y[2]
-    
-    # Calculate products concentration
-    # Initial amount of NaOH
-    initial_naoh_moles = initial_conc_naoh * initial_vol_reactor
-    
-    # Current amount of NaOH
-    current_naoh_moles = conc_naoh * volume
-    
-    # Products formed
-    products_moles = initial_naoh_moles - current_naoh_moles
-    conc_products = products_moles / volume
+    k = result.k
+    time_points = result.time_points
+    conc_naoh = result.conc_naoh
+    conc_ea = result.conc_ea
+    volume = result.volume
+    conc_products = result.conc_products
     
     # Create dataframe for results
-    df = pd.DataFrame({
-        'Time (minutes)': time_points,
-        'Volume (L)': volume,
-        'NaOH Concentration (mol/L)': conc_naoh,
-        'Ethyl Acetate Concentration (mol/L)': conc_ea,
-        'Products Concentration (mol/L)': conc_products
-    })
-    
-    # Calculate conversion
-    df['NaOH Conversion (%)'] = (1 - (conc_naoh * volume) / initial_naoh_moles) * 100
+    df = result.to_dataframe()
     
     # Main experiment area
     st.header("Simulation Results")
@@ -168,72 +219,79 @@ def app():
     
     with tab1:
         # Concentration profile plot
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=100)
-        ax.plot(time_points, conc_naoh, 'b-', label='NaOH')
-        ax.plot(time_points, conc_ea, 'r-', label='Ethyl Acetate')
-        ax.plot(time_points, conc_products, 'g-', label='Products')
-        ax.set_xlabel('Time (minutes)')
-        ax.set_ylabel('Concentration (mol/L)')
-        ax.set_title('Concentration Profiles')
-        ax.grid(True, alpha=0.3)
-        ax.legend(frameon=True, fancybox=True, shadow=True)
-        fig.tight_layout()
-        st.pyplot(fig)
+        with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+            ax.plot(time_points, conc_naoh, 'b-', label='NaOH')
+            ax.plot(time_points, conc_ea, 'r-', label='Ethyl Acetate')
+            ax.plot(time_points, conc_products, 'g-', label='Products')
+            ax.set_xlabel('Time (minutes)')
+            ax.set_ylabel('Concentration (mol/L)')
+            ax.set_title('Concentration Profiles')
+            ax.grid(True, alpha=0.3)
+            ax.legend(frameon=True, fancybox=True, shadow=True)
+            figures.show(fig)
     
     with tab2:
         # Conversion and volume plot
-        fig2, ax1 = plt.subplots(figsize=(10, 6))
-        
-        # Conversion plot
-        color = 'tab:blue'
-        ax1.set_xlabel('Time (minutes)')
-        ax1.set_ylabel('NaOH Conversion (%)', color=color)
-        ax1.plot(time_points, df['NaOH Conversion (%)'], color=color)
-        ax1.tick_params(axis='y', labelcolor=color)
-        ax1.grid(True)
-        
-        # Volume plot on secondary y-axis
-        ax2 = ax1.twinx()
-        color = 'tab:red'
-        ax2.set_ylabel('Reactor Volume (L)', color=color)
-        ax2.plot(time_points, volume, color=color, linestyle='--')
-        ax2.tick_params(axis='y', labelcolor=color)
-        
-        fig2.tight_layout()
-        fig.tight_layout()
-        st.pyplot(fig2)
+        with figures.subplots(figsize=(10, 6)) as (fig2, ax1):
+            
+            # Conversion plot
+            color = 'tab:blue'
+            ax1.set_xlabel('Time (minutes)')
+            ax1.set_ylabel('NaOH Conversion (%)', color=color)
+            ax1.plot(time_points, df['NaOH Conversion (%)'], color=color)
+            ax1.tick_params(axis='y', labelcolor=color)
+            ax1.grid(True)
+            if result.time_to_target <= total_time:
+                ax1.axhline(target_conversion, color='gray', linestyle='--', linewidth=1)
+                ax1.axvline(result.time_to_target, color='gray', linestyle='--', linewidth=1)
+                ax1.plot([result.time_to_target], [target_conversion], 'ko',
+                         label=f'{target_conversion}% at {result.time_to_target:.1f} min')
+                ax1.legend(loc='upper left')
+            
+            # Volume plot on secondary y-axis
+            ax2 = ax1.twinx()
+            color = 'tab:red'
+            ax2.set_ylabel('Reactor Volume (L)', color=color)
+            ax2.plot(time_points, volume, color=color, linestyle='--')
+            ax2.tick_params(axis='y', labelcolor=color)
+            
+            figures.show(fig2)
+
+        if np.isinf(result.time_to_target):
+            st.write(f"**Time to {target_conversion}% conversion:** not reached within {total_time} minutes")
+        else:
+            st.write(f"**Time to {target_conversion}% conversion:** {result.time_to_target:.1f} minutes")
     
     with tab3:
         # 3D visualization using line plots instead of surfaces to avoid triangulation issues
         from mpl_toolkits.mplot3d import Axes3D
         
-        fig3 = plt.figure(figsize=(10, 8))
-        ax3 = fig3.add_subplot(111, projection='3d')
-        
-        # Create time and volume arrays
-        # Add small jitter to volume to avoid singular matrix in triangulation
-        jitter = np.random.normal(0, 0.001, len(volume))
-        volume_jitter = volume + jitter
-        
-        # Plot 3D lines
-        ax3.plot(time_points, volume_jitter, conc_naoh, 'b-', linewidth=2, label='NaOH')
-        ax3.plot(time_points, volume_jitter, conc_ea, 'r-', linewidth=2, label='Ethyl Acetate')
-        ax3.plot(time_points, volume_jitter, conc_products, 'g-', linewidth=2, label='Products')
-        
-        # Add scatter points for better visibility
-        ax3.scatter(time_points, volume_jitter, conc_naoh, c='blue', s=10)
-        ax3.scatter(time_points, volume_jitter, conc_ea, c='red', s=10)
-        ax3.scatter(time_points, volume_jitter, conc_products, c='green', s=10)
-        
-        # Set labels and title
-        ax3.set_xlabel('Time (minutes)')
-        ax3.set_ylabel('Volume (L)')
-        ax3.set_zlabel('Concentration (mol/L)')
-        ax3.set_title('3D Visualization of Concentration vs Time and Volume')
-        ax3.legend()
-        
-        fig.tight_layout()
-        st.pyplot(fig3)
+        with figures.figure(figsize=(10, 8)) as fig3:
+            ax3 = fig3.add_subplot(111, projection='3d')
+            
+            # Create time and volume arrays
+            # Add small jitter to volume to avoid singular matrix in triangulation (seeded so every rerun draws the same plot)
+            jitter = np.random.default_rng(0).normal(0, 0.001, len(volume))
+            volume_jitter = volume + jitter
+            
+            # Plot 3D lines
+            ax3.plot(time_points, volume_jitter, conc_naoh, 'b-', linewidth=2, label='NaOH')
+            ax3.plot(time_points, volume_jitter, conc_ea, 'r-', linewidth=2, label='Ethyl Acetate')
+            ax3.plot(time_points, volume_jitter, conc_products, 'g-', linewidth=2, label='Products')
+            
+            # Add scatter points for better visibility
+            ax3.scatter(time_points, volume_jitter, conc_naoh, c='blue', s=10)
+            ax3.scatter(time_points, volume_jitter, conc_ea, c='red', s=10)
+            ax3.scatter(time_points, volume_jitter, conc_products, c='green', s=10)
+            
+            # Set labels and title
+            ax3.set_xlabel('Time (minutes)')
+            ax3.set_ylabel('Volume (L)')
+            ax3.set_zlabel('Concentration (mol/L)')
+            ax3.set_title('3D Visualization of Concentration vs Time and Volume')
+            ax3.legend()
+            
+            figures.show(fig3)
     
     with tab4:
         # Display data table
@@ -242,7 +300,8 @@ def app():
         st.dataframe(df.iloc[sample_indices].reset_index(drop=True))
         
         # Download link for full data
-        csv = df.to_csv(index=False)
+        with timing.span('export.csv'):
+            csv = df.to_csv(index=False)
         st.download_button(
             "Download Data as CSV",
             csv,
@@ -253,100 +312,196 @@ def app():
     
     # Parameter effect analysis
     with st.expander("Parameter Effect Analysis"):
-        st.write("### Effect of Feed Flow Rate on Reactor Performance")
-        
+        st.write("### Effect of Operating Conditions on Reactor Performance")
+
         col1, col2 = st.columns(2)
-        
         with col1:
-            flow_rates = [0.05, 0.1, 0.2, 0.3]
-            fig4, ax4 = plt.subplots(figsize=(8, 5))
-            
-            for flow in flow_rates:
-                # Solve ODE with different flow rate
-                def semi_batch_ode_test(t, y):
-                    # y[0] = C_NaOH, y[1] = C_EA, y[2] = V
-                    C_NaOH, C_EA, V = y
-                    
-                    # Molar feed rates
-                    F_EA0 = flow * feed_conc_ea  # mol/min of ethyl acetate
-                    F_NaOH0 = 0  # No NaOH in feed stream
-                    
-                    # Reaction rate per unit volume
-                    r = k * C_NaOH * C_EA  # mol/(L·min)
-                    
-                    # Total reaction rate
-                    r_total = r * V  # mol/min
-                    
-                    # Differential equations - more accurate formulation
-                    dC_NaOH_dt = (F_NaOH0 - r_total) / V - (C_NaOH * flow) / V
-                    dC_EA_dt = (F_EA0 - r_total) / V - (C_EA * flow) / V
-                    dV_dt = flow
-                    
-                    # Ensure concentrations don't go negative
-                    if C_NaOH < 0.0001 and dC_NaOH_dt < 0:
-                        dC_NaOH_dt = 0
-                    if C_EA < 0.0001 and dC_EA_dt < 0:
-                        dC_EA_dt = 0
-                        
-                    return [dC_NaOH_dt, dC_EA_dt, dV_dt]
-                
-                sol = solve_ivp(semi_batch_ode_test, t_span, y0, t_eval=t_eval, method='RK45')
-                
-                # Calculate conversion
-                naoh_moles = sol.y[0] * sol.y[2]
-                conversion = (1 - naoh_moles / initial_naoh_moles) * 100
-                
-                ax4.plot(sol.t, conversion, label=f'Flow = {flow} L/min')
-            
-            ax4.set_xlabel('Time (minutes)')
-            ax4.set_ylabel('NaOH Conversion (%)')
-            ax4.set_title('Effect of Flow Rate on Conversion')
-            ax4.grid(True)
-            ax4.legend()
-            fig.tight_layout()
-        st.pyplot(fig4)
-        
+            label = st.selectbox("Swept parameter", list(SWEEP_AXES), index=3)
+            name, low, high, default = SWEEP_AXES[label]
+            value_range = st.slider(f"Range of {label}", low, high, default)
         with col2:
-            feed_concs = [0.02, 0.05, 0.1, 0.2]
-            fig5, ax5 = plt.subplots(figsize=(8, 5))
-            
-            for conc in feed_concs:
-                # Solve ODE with different feed concentration
-                def semi_batch_ode_test(t, y):
-                    # y[0] = C_NaOH, y[1] = C_EA, y[2] = V
-                    C_NaOH, C_EA, V = y
-                    
-                    # Molar feed rates
-                    F_EA0 = feed_flow_rate * conc  # mol/min of ethyl acetate
-                    F_NaOH0 = 0  # No NaOH in feed stream
-                    
-                    # Reaction rate per unit volume
-                    r = k * C_NaOH * C_EA  # mol/(L·min)
-                    
-                    # Total reaction rate
-                    r_total = r * V  # mol/min
-                    
-                    # Differential equations - more accurate formulation
-                    dC_NaOH_dt = (F_NaOH0 - r_total) / V - (C_NaOH * feed_flow_rate) / V
-                    dC_EA_dt = (F_EA0 - r_total) / V - (C_EA * feed_flow_rate) / V
-                    dV_dt = feed_flow_rate
-                    
-                    # Ensure concentrations don't go negative
-                    if C_NaOH < 0.0001 and dC_NaOH_dt < 0:
-                        dC_NaOH_dt = 0
-                    if C_EA < 0.0001 and dC_EA_dt < 0:
-                        dC_EA_dt = 0
-                        
-                    return [dC_NaOH_dt, dC_EA_dt, dV_dt]
-                
-                sol = solve_ivp(semi_batch_ode_test, t_span, y0, t_eval=t_eval, method='RK45')
-                
-                ax5.plot(sol.t, sol.y[0], label=f'Feed EA = {conc} mol/L')
-            
-            ax5.set_xlabel('Time (minutes)')
-            ax5.set_ylabel('NaOH Concentration (mol/L)')
-            ax5.set_title('Effect of Feed Concentration on NaOH')
-            ax5.grid(True)
-            ax5.legend()
-            fig.tight_layout()
-        st.pyplot(fig5)
+            num_curves = st.slider("Number of curves", 2, 300, 4)
+            log_spacing = st.checkbox("Logarithmic spacing", value=False)
+
+        spacing = np.geomspace if log_spacing and value_range[0] > 0 else np.linspace
+        values = spacing(value_range[0], value_range[1], num_curves)
+        # All curves come from a single stacked solve
+        swept = model.profiles(params, **{name: values})
+
+        col1, col2 = st.columns(2)
+        with col1:
+            figures.image(draw_sweep, swept.time_points, swept.conversion, values, label,
+                          'NaOH Conversion (%)', 'Effect on Conversion', figsize=(8, 5))
+        with col2:
+            figures.image(draw_sweep, swept.time_points, swept.conc_naoh, values, label,
+                          'NaOH Concentration (mol/L)', 'Effect on NaOH', figsize=(8, 5))
+        figures.image(draw_final_conversion, values, swept.conversion[:, -1], label, total_time, figsize=(10, 4))
+
+    # Feed schedules
+    with st.expander("Feed Schedules"):
+        st.write("### Staged, Ramped and Volume-Limited Feeds")
+        st.markdown("""
+        Each row is one stage of the feed: a constant feed, a linear ramp from the start to the end flow,
+        or a pause (zero flow).  A stage ends after its duration, or earlier when the reactor volume or the
+        NaOH conversion reaches its stop value.  Schedules that begin with the same stages share their
+        integration.
+        """)
+
+        startup = model.FeedSegment(total_time / 3, 2 * feed_flow_rate)
+        presets = {
+            'Constant feed': (model.FeedSegment(total_time, feed_flow_rate),),
+            'Fast start, then hold': (startup, model.FeedSegment(2 * total_time / 3, 0.0)),
+            'Fast start, then half rate': (startup, model.FeedSegment(2 * total_time / 3, feed_flow_rate / 2)),
+            'Fast start, then ramp down': (startup, model.FeedSegment(2 * total_time / 3, 2 * feed_flow_rate,
+                                                                      final_flow_rate=0.0)),
+            'Feed to volume limit, then hold': (
+                model.FeedSegment(total_time, 2 * feed_flow_rate,
+                                  max_volume=initial_vol_reactor + feed_flow_rate * total_time / 2),
+                model.FeedSegment(total_time, 0.0)),
+        }
+
+        custom_table = st.data_editor(
+            pd.DataFrame([[total_time / 4, 2 * feed_flow_rate, None, None, None, None],
+                          [total_time / 4, 0.0, None, None, None, None],
+                          [total_time / 2, feed_flow_rate, 0.0, None, None, None]], columns=SCHEDULE_COLUMNS),
+            num_rows="dynamic",
+            use_container_width=True,
+            key='feed-schedule'
+        )
+        names = st.multiselect("Schedules to compare", ['Custom schedule'] + list(presets),
+                               default=['Custom schedule', 'Constant feed', 'Fast start, then hold',
+                                        'Fast start, then ramp down'])
+
+        try:
+            schedules = {'Custom schedule': schedule_from_table(custom_table), **presets}
+            comparison = model.compare_schedules(params, tuple(schedules[name] for name in names))
+        except ValueError as exc:
+            st.error(f"Invalid feed schedule: {exc}")
+        else:
+            if names:
+                results = comparison.results
+                st.caption(f"{comparison.integrated_segments} of {comparison.segments} stages integrated; "
+                           f"shared start-ups are solved once")
+                figures.image(draw_feed_policies, names, [r.segment_times for r in results],
+                              [r.segment_flow_rates for r in results])
+                col1, col2 = st.columns(2)
+                with col1:
+                    figures.image(draw_schedules, names, [r.time_points for r in results],
+                                  [r.conversion for r in results], 'NaOH Conversion (%)',
+                                  'Conversion under each Feed Policy', figsize=(8, 5))
+                with col2:
+                    figures.image(draw_schedules, names, [r.time_points for r in results],
+                                  [r.volume for r in results], 'Reactor Volume (L)',
+                                  'Volume under each Feed Policy', figsize=(8, 5))
+                st.dataframe(pd.DataFrame({
+                    'Schedule': names,
+                    'Duration (min)': [r.time_points[-1] for r in results],
+                    'Final Volume (L)': [r.volume[-1] for r in results],
+                    'Final NaOH Conversion (%)': [r.conversion[-1] for r in results],
+                }))
+
+    # Optimal feed profile
+    with st.expander("Optimal Feed Profile"):
+        st.write("### Feed Profile Maximizing the Final Conversion")
+        st.markdown(f"""
+        The feed rate is held constant within each of a number of equal intervals of the {total_time} minute run,
+        and the rates are optimized for the NaOH conversion at the end of the run, with exact gradients from
+        the sensitivity equations of the material balances.  The reactor volume may never exceed its limit.
+        """)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            num_intervals = st.slider("Feed intervals", 2, 24, 12)
+            max_flow_rate = st.number_input("Pump limit (L/min)", min_value=0.01, max_value=2.0,
+                                            value=max(0.5, feed_flow_rate), step=0.01)
+        with col2:
+            # The constant feed's final volume reaches 130 L at the sidebar limits
+            full_volume = initial_vol_reactor + feed_flow_rate * total_time
+            max_volume = st.number_input("Reactor volume limit (L)", min_value=initial_vol_reactor,
+                                         max_value=max(50.0, full_volume), value=full_volume, step=0.1)
+            fixed_charge = st.checkbox("Fixed charge (the constant feed's volume)", value=True)
+
+        charge_volume = feed_flow_rate * total_time if fixed_charge else None
+        if st.button("Optimize feed profile"):
+            try:
+                optimal = feed_optimization.optimize_feed(params, feed_optimization.OptimizationParams(
+                    num_intervals=num_intervals,
+                    max_flow_rate=max_flow_rate,
+                    max_volume=max_volume,
+                    charge_volume=charge_volume
+                ))
+            except ValueError as exc:
+                st.error(f"Infeasible feed constraints: {exc}")
+            else:
+                charge = optimal.profile.volume[-1] - initial_vol_reactor
+                constant = model.simulate_schedule(params, (model.FeedSegment(total_time, charge / total_time),))
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Optimal Final Conversion", f"{optimal.conversion:.2f} %",
+                            f"{optimal.conversion - optimal.constant_conversion:+.2f} vs constant feed")
+                col2.metric("Feed Charged", f"{charge:.3f} L")
+                col3.metric("Optimization Time", f"{optimal.elapsed:.1f} s",
+                            f"{optimal.evaluations} integrations", delta_color="off")
+
+                names = ['Optimal profile', 'Constant feed, same charge']
+                results = [optimal.profile, constant]
+                figures.image(draw_feed_policies, names, [r.segment_times for r in results],
+                              [r.segment_flow_rates for r in results])
+                figures.image(draw_schedules, names, [r.time_points for r in results],
+                              [r.conversion for r in results], 'NaOH Conversion (%)',
+                              'Conversion under the Optimal Feed')
+
+    with st.expander("Thermal Runaway Screening"):
+        st.write("### Runaway Risk over Feed Rate and Cooling Capacity")
+        st.markdown("""
+        The reactor is now cooled through a jacket instead of held at the reaction temperature, and a grid of
+        feed rates and cooling capacities is simulated in one solve.  If the cooling failed at any moment, the
+        ethyl acetate fed but not yet reacted (the **accumulation**) would react adiabatically; the highest
+        temperature this could reach over the run is the **MTSR** (maximum temperature of the synthesis
+        reaction).  Scenarios whose MTSR or temperature reaches the maximum technical temperature (**MTT**,
+        here the boiling point of ethyl acetate) are marked unsafe.
+        """)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            flow_range = st.slider("Feed flow range (L/min)", 0.01, 1.0, (0.01, 0.2), 0.01)
+            ua_range = st.slider("Cooling capacity UA range (W/K)", 0.1, 200.0, (0.5, 50.0), 0.1)
+            grid_size = st.slider("Grid points per axis", 3, 40, 20)
+        with col2:
+            jacket_temp = st.slider("Jacket Temperature (°C)", 5, 60, temperature, 1)
+            feed_temp = st.slider("Feed Temperature (°C)", 5, 60, 25, 1)
+            max_technical_temp = st.number_input("Maximum Technical Temperature (°C)", min_value=float(temperature),
+                                                 max_value=200.0, value=77.0, step=1.0)
+
+        screening = model.screen_runaway(
+            params,
+            model.RunawayParams(jacket_temp=jacket_temp, feed_temp=feed_temp, max_technical_temp=max_technical_temp),
+            np.linspace(*flow_range, grid_size),
+            np.geomspace(*ua_range, grid_size)
+        )
+        unsafe = screening.unsafe
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Highest MTSR", f"{screening.mtsr.max():.1f} °C")
+        col2.metric("Adiabatic Temperature Rise", f"{screening.adiabatic_temperature_rise.max():.1f} K",
+                    "whole charge, worst scenario", delta_color="off")
+        col3.metric("Unsafe Scenarios", f"{unsafe.sum()} of {unsafe.size}")
+
+        figures.image(draw_runaway_map, screening.feed_flow_rates, screening.ua_values, screening.mtsr, unsafe,
+                      max_technical_temp)
+
+        st.write("#### Scenario Profiles")
+        worst = np.unravel_index(np.argmax(screening.mtsr), screening.mtsr.shape)
+        col1, col2 = st.columns(2)
+        with col1:
+            row = st.select_slider("Feed flow rate (L/min)", options=list(range(grid_size)), value=int(worst[0]),
+                                   format_func=lambda i: f"{screening.feed_flow_rates[i]:.3f}")
+        with col2:
+            col = st.select_slider("Cooling capacity UA (W/K)", options=list(range(grid_size)), value=int(worst[1]),
+                                   format_func=lambda i: f"{screening.ua_values[i]:.3g}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("MTSR", f"{screening.mtsr[row, col]:.1f} °C")
+        col2.metric("Maximum Temperature", f"{screening.max_temperature[row, col]:.1f} °C")
+        col3.metric("Final Conversion", f"{screening.final_conversion[row, col]:.2f} %")
+        figures.image(draw_runaway_profiles, screening.time_points, screening.temperature[row, col],
+                      screening.accumulation[row, col], max_technical_temp,
+                      f'{screening.feed_flow_rates[row]:.3f} L/min, UA = {screening.ua_values[col]:.3g} W/K'
+                      + (' (unsafe)' if unsafe[row, col] else ''))
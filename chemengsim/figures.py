@@ -0,0 +1,251 @@
+"""
+Figure Lifecycle
+================
+
+Creation, styling, rendering and disposal of the matplotlib figures drawn by the
+experiment pages.
+
+Streamlit reruns each session's script on its own thread, so the pages never touch
+pyplot's global figure registry or current-figure state.  The :func:`subplots` and
+:func:`figure` context managers build explicit :class:`~matplotlib.figure.Figure`
+objects on an Agg canvas under the app plot style, lay them out on draw
+(``tight_layout=True``) and leave nothing registered globally, so a figure is freed as
+soon as the page drops it::
+
+    with figures.subplots(figsize=(10, 6), dpi=100) as (fig, ax):
+        ax.plot(x, y)
+        figures.show(fig)
+
+:func:`show` rasterizes the figure and sends the PNG with ``st.image``.  Figures
+rendered outside a styled block go through a bounded pool of render threads; set
+``CHEMENGSIM_RENDER_WORKERS`` to change the pool size.
+
+The style is entered per call with :func:`style`, instead of being written permanently
+into ``rcParams``.  rcParams are process-wide, so styled blocks are serialized rather
+than isolated: :func:`style` holds a process-wide lock while :data:`STYLE` is applied,
+so figures are built, drawn and rendered by one thread at a time and each sees exactly
+the app style and its own settings.  Code that reads ``rcParams`` without going through
+this module still sees the app style while a styled block runs; every page figure goes
+through it.
+
+Plots that are redrawn unchanged on most reruns are instead described by a module-level
+drawing function and its data and shown with :func:`image`::
+
+    figures.image(draw_arrhenius, inverse_temperature, ln_k, figsize=(10, 6))
+
+The PNG is rasterized once per distinct function, data, figure size and style and
+served from a size-bounded LRU cache on later reruns.  Set ``CHEMENGSIM_PNG_CACHE_MB``
+to change the cache size (0 disables it).
+
+The soak and load tests of the pages live in :mod:`chemengsim.soak`.
+"""
+
+import contextlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+import matplotlib.style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from chemengsim import timing
+from chemengsim.core.cache import ResultCache, normalize
+
+# Style shared by every experiment page: the seaborn dark grid with app-specific overrides
+STYLE = ('seaborn-v0_8-darkgrid', {
+    'figure.facecolor': '#FFFFFF',
+    'axes.facecolor': '#F0F2F6',
+    'font.size': 12,
+    'axes.labelsize': 14,
+    'axes.titlesize': 16,
+    'lines.linewidth': 2.5,
+    'axes.grid': True,
+    'grid.alpha': 0.3
+})
+
+# Keyword arguments st.pyplot passes to savefig, so the images match what it would show
+SAVEFIG_KWARGS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+# Streamlit downsizes wider images (decode, resize, re-encode) every time they are shown
+MAX_IMAGE_WIDTH = 2 * 730
+
+DEFAULT_PNG_CACHE_MB = 32.0
+DEFAULT_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+_style_lock = threading.RLock()
+_style_depth = threading.local()
+
+
+def _styled():
+    """Whether the calling thread is inside :func:`style`"""
+    return getattr(_style_depth, 'value', 0) > 0
+
+
+@contextlib.contextmanager
+def style():
+    """
+    Context manager applying :data:`STYLE` to the figures built and rendered inside it.
+
+    The block holds a process-wide lock, so one thread at a time styles rcParams and the
+    previous settings are restored before the next one enters.  Nested blocks of the same
+    thread reuse the applied style.
+    """
+    with _style_lock:
+        depth = getattr(_style_depth, 'value', 0)
+        _style_depth.value = depth + 1
+        try:
+            if depth:
+                yield
+            else:
+                with matplotlib.style.context(STYLE):
+                    yield
+        finally:
+            _style_depth.value = depth
+
+
+def _new_figure(**kwargs):
+    kwargs.setdefault('tight_layout', True)
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+@contextlib.contextmanager
+def subplots(nrows=1, ncols=1, **kwargs):
+    """
+    Styled figure and axes, the explicit-object equivalent of ``plt.subplots``.
+
+    Parameters:
+    -----------
+    nrows, ncols : int
+        Grid of axes
+    **kwargs
+        ``Figure`` arguments (``figsize``, ``dpi``, ...; ``tight_layout`` defaults to
+        True) and ``Figure.subplots`` arguments (``sharex``, ``gridspec_kw``, ...)
+
+    Yields:
+    -------
+    tuple
+        ``(fig, axes)`` as returned by ``plt.subplots``
+    """
+    subplot_kwargs = {key: kwargs.pop(key) for key in ('sharex', 'sharey', 'squeeze', 'width_ratios',
+                                                       'height_ratios', 'subplot_kw', 'gridspec_kw')
+                      if key in kwargs}
+    with style():
+        fig = _new_figure(**kwargs)
+        yield fig, fig.subplots(nrows, ncols, **subplot_kwargs)
+
+
+@contextlib.contextmanager
+def figure(**kwargs):
+    """Styled empty figure, for layouts built with ``fig.add_subplot``"""
+    with style():
+        yield _new_figure(**kwargs)
+
+
+def encode(fig):
+    """
+    PNG of a figure as displayed by ``st.pyplot``.
+
+    The figure is saved with :data:`SAVEFIG_KWARGS` and downsized to
+    :data:`MAX_IMAGE_WIDTH`, so ``st.image`` can send the bytes unchanged.
+    """
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    with style():
+        fig.savefig(buffer, **SAVEFIG_KWARGS)
+    image = Image.open(buffer)
+    if image.width > MAX_IMAGE_WIDTH:
+        image = image.resize((MAX_IMAGE_WIDTH, int(1.0 * image.height * MAX_IMAGE_WIDTH / image.width)),
+                             resample=Image.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.environ.get('CHEMENGSIM_RENDER_WORKERS', DEFAULT_RENDER_WORKERS))
+            _executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='chemengsim-render')
+        return _executor
+
+
+def render(fig):
+    """
+    :func:`encode` a figure on the bounded render pool, waiting for the PNG.
+
+    Inside a styled block the figure is encoded on the calling thread, which already
+    holds the style lock the pool would wait for.
+    """
+    with timing.span('render.png'):
+        if _styled():
+            return encode(fig)
+        return _get_executor().submit(encode, fig).result()
+
+
+def show(fig):
+    """Render a figure and show it with ``st.image``"""
+    import streamlit as st
+
+    png = render(fig)
+    with timing.span('render.image'):
+        st.image(png)
+
+
+png_cache = ResultCache(max_entries=1024,
+                        max_bytes=int(float(os.environ.get('CHEMENGSIM_PNG_CACHE_MB', DEFAULT_PNG_CACHE_MB)) * 2**20),
+                        ttl=None)
+
+
+def rasterize(draw, *args, figsize=(10, 6)):
+    """
+    Render ``draw(ax, *args)`` on a fresh, styled figure.
+
+    Parameters:
+    -----------
+    draw : callable
+        Function drawing on the figure's single Axes
+    *args
+        Data passed to ``draw``
+    figsize : tuple
+        Figure size in inches
+
+    Returns:
+    --------
+    bytes
+        PNG as returned by :func:`encode`
+    """
+    with subplots(figsize=figsize) as (fig, ax):
+        draw(ax, *args)
+        return render(fig)
+
+
+def render_png(draw, *args, figsize=(10, 6)):
+    """
+    :func:`rasterize` cached on the drawing function, its arguments, ``figsize`` and :data:`STYLE`.
+
+    ``draw`` must be a module-level function depending only on its arguments.
+    """
+    key = (draw.__module__, draw.__qualname__, normalize(args), normalize(figsize), normalize(STYLE))
+    hit, png = png_cache.get(key)
+    if hit:
+        return png
+    return png_cache.put(key, rasterize(draw, *args, figsize=figsize))
+
+
+def image(draw, *args, figsize=(10, 6)):
+    """Show the cached PNG of ``draw(ax, *args)`` with ``st.image``"""
+    import streamlit as st
+
+    png = render_png(draw, *args, figsize=figsize)
+    with timing.span('render.image'):
+        st.image(png)
@@ -0,0 +1,122 @@
+"""
+Experiment Registry
+===================
+
+Single source of the experiment metadata used by the sidebar, home page, quizzes, demo
+videos and chat assistant.
+
+Experiment modules are imported lazily by :meth:`Experiment.load` when a page is
+selected, so a cold start only pays for Streamlit and the home page.  :func:`prewarm`
+imports the remaining modules on a background thread once the first page is shown.
+Set ``CHEMENGSIM_PREWARM=0`` to disable pre-warming (e.g. on memory-constrained devices).
+"""
+
+import importlib
+import os
+import threading
+from dataclasses import dataclass
+
+from chemengsim import timing
+
+HOME = "Home"
+
+
+@dataclass(frozen=True)
+class Experiment:
+    """Metadata of one lab experiment"""
+    number: int
+    slug: str           # module name in chemengsim.experiments
+    title: str
+    description: str    # home page card text
+    quiz_key: str       # key of quiz_module.quiz_questions
+    video_key: str      # name passed to demo_videos.display_demo_video
+
+    @property
+    def label(self):
+        """Sidebar option, e.g. ``'1. Isothermal Batch Reactor'``"""
+        return f"{self.number}. {self.title}"
+
+    @property
+    def module_name(self):
+        return f"chemengsim.experiments.{self.slug}"
+
+    def load(self):
+        """Import (on first use) and return the experiment's Streamlit module"""
+        with timing.span(f"import.{self.slug}"):
+            return importlib.import_module(self.module_name)
+
+
+def _experiment(number, slug, title, description):
+    return Experiment(number=number, slug=slug, title=title, description=description,
+                      quiz_key=slug, video_key=slug)
+
+
+EXPERIMENTS = (
+    _experiment(1, "batch_reactor", "Isothermal Batch Reactor",
+                "Study of a non-catalytic homogeneous reaction in a batch reactor, including concentration profiles and conversion analysis."),
+    _experiment(2, "semi_batch_reactor", "Isothermal Semi-batch Reactor",
+                "Simulation of reactions in semi-batch mode with continuous addition of one reactant."),
+    _experiment(3, "cstr", "Isothermal CSTR",
+                "Continuous stirred tank reactor simulation with heat transfer analysis."),
+    _experiment(4, "pfr", "Isothermal PFR",
+                "Plug flow reactor with variable parameters and comparison to other reactor types."),
+    _experiment(5, "crushers", "Crushers and Ball Mill",
+                "Size reduction equipment simulation and analysis of product size distribution."),
+    _experiment(6, "filter_press", "Plate and Frame Filter Press",
+                "Solid-liquid separation with analysis of filtration rates and cake formation."),
+    _experiment(7, "rotary_vacuum_filter", "Rotary Vacuum Filter",
+                "Continuous filtration process with drum operation visualization."),
+    _experiment(8, "centrifuge_flotation", "Centrifuge and Flotation",
+                "Solid-liquid separation in basket centrifuge and mineral separation in flotation cells."),
+    _experiment(9, "classifiers", "Classifiers",
+                "Particle classification using cone classifiers and thickeners for solid-liquid separation."),
+    _experiment(10, "trommel", "Trommel",
+                "Rotary screen simulation with particle size distribution and efficiency analysis."),
+)
+
+_BY_LABEL = {experiment.label: experiment for experiment in EXPERIMENTS}
+_BY_SLUG = {experiment.slug: experiment for experiment in EXPERIMENTS}
+
+
+def labels():
+    """Sidebar options: the home page followed by every experiment"""
+    return [HOME] + [experiment.label for experiment in EXPERIMENTS]
+
+
+def by_label(label):
+    """Experiment for a sidebar option, or None for the home page"""
+    return _BY_LABEL.get(label)
+
+
+def by_slug(slug):
+    """Experiment for a module name, or None if unknown"""
+    return _BY_SLUG.get(slug)
+
+
+_prewarm_lock = threading.Lock()
+_prewarm_thread = None
+
+
+def prewarm():
+    """
+    Import every experiment module on a daemon thread, once per process.
+
+    Returns the thread, or None when pre-warming is disabled.
+    """
+    global _prewarm_thread
+    if os.environ.get("CHEMENGSIM_PREWARM", "1").lower() in ("0", "false", "no"):
+        return None
+    with _prewarm_lock:
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(target=_import_all, name="chemengsim-prewarm", daemon=True)
+            _prewarm_thread.start()
+        return _prewarm_thread
+
+
+def _import_all():
+    for experiment in EXPERIMENTS:
+        try:
+            importlib.import_module(experiment.module_name)
+        except Exception:
+            # The page reports import errors when it is opened
+            pass
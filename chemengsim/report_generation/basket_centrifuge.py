@@ -10,8 +10,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from .report_generator import ReportGenerator
+from chemengsim import timing
 import plotly.graph_objects as go
 
+@timing.timed('report.basket_centrifuge.calculate_water_retention_recovery')
 def calculate_water_retention_recovery(data):
     """Calculate water retention and recovery metrics"""
     # Calculate required values
@@ -45,6 +47,7 @@ def calculate_water_retention_recovery(data):
     
     return results
 
+@timing.timed('report.basket_centrifuge.generate_centrifuge_plots')
 def generate_centrifuge_plots(results):
     """Generate plots for centrifuge experiment"""
     # Convert rpm values to numeric
@@ -84,6 +87,7 @@ def generate_centrifuge_plots(results):
     
     return fig1, fig2
 
+@timing.timed('report.basket_centrifuge.generate_matplotlib_plots')
 def generate_matplotlib_plots(results):
     """Generate matplotlib plots for document embedding"""
     # Convert rpm values to numeric
@@ -0,0 +1,293 @@
+"""
+Batch Reactor Report Generation Module
+======================================
+
+Module for generating reports for Isothermal Batch Reactor experiments.
+
+Observations of many runs at different temperatures (e.g. a whole lab section) are
+uploaded as one sheet and fitted jointly by :mod:`chemengsim.core.estimation`.
+"""
+
+import io
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from .report_generator import ReportGenerator
+from chemengsim import timing
+from chemengsim.core import estimation, kinetics
+import plotly.colors
+import plotly.graph_objects as go
+
+def read_observation_sheet(uploaded_file):
+    """Read an uploaded CSV or Excel observation sheet"""
+    if uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
+        return pd.read_excel(uploaded_file)
+    return pd.read_csv(io.BytesIO(uploaded_file.getvalue()))
+
+@timing.timed('report.batch_reactor.calculate_kinetic_parameters')
+def calculate_kinetic_parameters(data, confidence=0.95):
+    """Fit k_ref and E/R jointly to all runs, and k to each run"""
+    runs = estimation.runs_from_dataframe(data)
+    fit = estimation.fit_arrhenius(runs, confidence=confidence)
+    rate_constants = estimation.fit_rate_constants(runs)
+    return runs, fit, rate_constants
+
+def _fitted_curves(runs, fit, num_points=100):
+    """Measured points and fitted concentration curve of every run"""
+    curves = []
+    for label in runs.labels:
+        run = runs.select(runs.run == label)
+        time = np.linspace(0, run.time.max(), num_points)
+        conc = kinetics.second_order_conc(run.initial_conc_naoh[0], run.initial_conc_ea[0],
+                                          fit.rate_constant(run.temperature[0]), time)
+        curves.append((f"{label} ({run.temperature[0]:g} °C)", run, time, conc))
+    return curves
+
+def _arrhenius_line(fit, rate_constants):
+    """Inverse temperatures of the runs and the jointly fitted ln k through them"""
+    temp_kelvin = np.linspace(rate_constants.temperatures.min(), rate_constants.temperatures.max(), 50) + 273.15
+    return 1 / temp_kelvin, np.log(fit.rate_constant(temp_kelvin - 273.15))
+
+@timing.timed('report.batch_reactor.generate_fit_plots')
+def generate_fit_plots(runs, fit, rate_constants):
+    """Generate plots of the fitted runs and the Arrhenius plot"""
+    # Plot 1: Measured and fitted NaOH concentration of every run
+    fig1 = go.Figure()
+    colors = plotly.colors.qualitative.Plotly
+    for i, (name, run, time, conc) in enumerate(_fitted_curves(runs, fit)):
+        color = colors[i % len(colors)]
+        fig1.add_trace(go.Scatter(x=time, y=conc, mode='lines', name=name, legendgroup=name,
+                                  line=dict(color=color)))
+        fig1.add_trace(go.Scatter(
+            x=run.time,
+            y=run.conc_naoh,
+            mode='markers',
+            name=name,
+            legendgroup=name,
+            showlegend=False,
+            marker=dict(color=color)
+        ))
+    fig1.update_layout(
+        title='Measured (markers) and Fitted (lines) NaOH Concentration',
+        xaxis_title='Time (min)',
+        yaxis_title='NaOH Concentration (mol/L)',
+        template='plotly_white'
+    )
+
+    # Plot 2: Arrhenius plot of the per-run rate constants and the joint fit
+    inverse_temp, ln_k = _arrhenius_line(fit, rate_constants)
+    fig2 = go.Figure()
+    fig2.add_trace(go.Scatter(
+        x=1 / (rate_constants.temperatures + 273.15),
+        y=np.log(rate_constants.k_values),
+        error_y=dict(type='data', array=rate_constants.k_stderr / rate_constants.k_values),
+        mode='markers',
+        name='Individual runs'
+    ))
+    fig2.add_trace(go.Scatter(x=inverse_temp, y=ln_k, mode='lines', name='Joint fit'))
+    fig2.update_layout(
+        title=f'Arrhenius Plot (E = {fit.activation_energy:.1f} kJ/mol)',
+        xaxis_title='1/T (1/K)',
+        yaxis_title='ln k',
+        template='plotly_white'
+    )
+
+    return fig1, fig2
+
+@timing.timed('report.batch_reactor.generate_matplotlib_plots')
+def generate_matplotlib_plots(runs, fit, rate_constants):
+    """Generate matplotlib plots for document embedding"""
+    # Plot 1: Measured and fitted NaOH concentration of every run
+    fig1, ax1 = plt.subplots(figsize=(8, 5))
+    for name, run, time, conc in _fitted_curves(runs, fit):
+        line, = ax1.plot(time, conc, '-', label=name)
+        ax1.plot(run.time, run.conc_naoh, 'o', color=line.get_color())
+    ax1.set_xlabel('Time (min)')
+    ax1.set_ylabel('NaOH Concentration (mol/L)')
+    ax1.set_title('Measured (markers) and Fitted (lines) NaOH Concentration')
+    if len(runs.labels) <= 10:
+        ax1.legend(fontsize='small')
+    ax1.grid(True)
+
+    # Plot 2: Arrhenius plot of the per-run rate constants and the joint fit
+    inverse_temp, ln_k = _arrhenius_line(fit, rate_constants)
+    fig2, ax2 = plt.subplots(figsize=(8, 5))
+    ax2.errorbar(1 / (rate_constants.temperatures + 273.15), np.log(rate_constants.k_values),
+                 yerr=rate_constants.k_stderr / rate_constants.k_values, fmt='o', color='blue',
+                 label='Individual runs')
+    ax2.plot(inverse_temp, ln_k, '-', color='red', label='Joint fit')
+    ax2.set_xlabel('1/T (1/K)')
+    ax2.set_ylabel('ln k')
+    ax2.set_title(f'Arrhenius Plot (E = {fit.activation_energy:.1f} kJ/mol)')
+    ax2.legend()
+    ax2.grid(True)
+
+    return fig1, fig2
+
+def create_batch_reactor_form():
+    """Create input form for batch reactor experiment"""
+    st.title("Isothermal Batch Reactor Experiment")
+
+    st.markdown("""
+    ## Experiment: Saponification of Ethyl Acetate in a Batch Reactor
+
+    Upload or enter the NaOH concentration (or conductivity) measured during each run. Runs at
+    several temperatures, e.g. from a whole lab section, are fitted together. The system will calculate:
+    - The rate constant at the reference temperature and the activation energy, with confidence intervals
+    - The rate constant of each run
+    - Graphs of the fitted concentration profiles and the Arrhenius plot
+    """)
+
+    # Student information
+    st.subheader("Student Information")
+    student_name = st.text_input("Your Name", key="batch_reactor_student_name")
+    student_id = st.text_input("Your ID", key="batch_reactor_student_id")
+
+    # Observation data
+    st.subheader("Observation Data")
+    st.markdown(f"""
+    One row per measurement with the columns `{estimation.RUN}`, `{estimation.TEMPERATURE}`,
+    `{estimation.INITIAL_CONC_NAOH}`, `{estimation.INITIAL_CONC_EA}`, `{estimation.TIME}` and either
+    `{estimation.CONC_NAOH}` or `{estimation.CONDUCTIVITY}` with `{estimation.FINAL_CONDUCTIVITY}`
+    (conductivity runs need a reading at t = 0).
+    """)
+
+    uploaded_file = st.file_uploader("Upload observation sheet (CSV or Excel)", type=['csv', 'xlsx', 'xls'],
+                                     key="batch_reactor_upload")
+
+    # Initialize or get session state
+    if 'batch_reactor_data' not in st.session_state:
+        st.session_state.batch_reactor_data = estimation.example_runs()
+
+    if uploaded_file is not None:
+        try:
+            edited_df = read_observation_sheet(uploaded_file)
+        except Exception as e:
+            st.error(f"Could not read {uploaded_file.name}: {e}")
+            return
+        st.dataframe(edited_df, use_container_width=True)
+    else:
+        st.markdown("Or enter the observations from your experiment (sample data shown):")
+        edited_df = st.data_editor(
+            st.session_state.batch_reactor_data,
+            use_container_width=True,
+            num_rows="dynamic"
+        )
+
+        # Update session state when changes are made
+        if edited_df is not None:
+            st.session_state.batch_reactor_data = edited_df
+
+    confidence = st.select_slider("Confidence level", options=[0.90, 0.95, 0.99], value=0.95,
+                                  format_func=lambda value: f"{value:.0%}", key="batch_reactor_confidence")
+
+    generate_report = st.button("Generate Report", key="batch_reactor_generate_report")
+
+    if generate_report:
+        if not student_name or not student_id:
+            st.error("Please enter your name and ID before generating the report.")
+            return
+
+        try:
+            runs, fit, rate_constants = calculate_kinetic_parameters(edited_df, confidence)
+        except ValueError as e:
+            st.error(f"Cannot fit the observation data: {e}")
+            return
+
+        # Generate report
+        with st.spinner("Generating report..."):
+            # Create interactive plotly plots for display
+            fig1, fig2 = generate_fit_plots(runs, fit, rate_constants)
+
+            # Create matplotlib plots for document
+            doc_fig1, doc_fig2 = generate_matplotlib_plots(runs, fit, rate_constants)
+
+            # Display results
+            st.subheader("Results")
+            st.write(f"{fit.n_runs} runs, {fit.n_observations} measurements, "
+                     f"residual standard deviation {fit.residual_std:.2e} mol/L")
+            st.dataframe(fit.to_dataframe())
+            st.dataframe(rate_constants.to_dataframe())
+
+            # Display plots
+            st.plotly_chart(fig1, use_container_width=True)
+            st.plotly_chart(fig2, use_container_width=True)
+
+            # Create Word document report
+            report = ReportGenerator("batch_reactor", "Isothermal Batch Reactor Experiment")
+            report.create_new_document()
+
+            # Add student info
+            student_info = {'name': student_name, 'id': student_id}
+            report.add_title_page(student_info)
+
+            # Add aim and objectives
+            aim = "To study a non-catalytic homogeneous saponification reaction in an isothermal batch reactor."
+            objectives = [
+                "To determine the rate constant of the reaction of ethyl acetate with NaOH at different temperatures.",
+                "To determine the activation energy of the reaction."
+            ]
+            report.add_aim_and_objective(aim, objectives)
+
+            # Add theory
+            report.add_theory([
+                "The saponification CH3COOC2H5 + NaOH → CH3COONa + C2H5OH is second order, first order in each reactant: -dCA/dt = k·CA·CB.",
+                "For equal initial concentrations the integrated rate law is 1/CA - 1/CA0 = k·t; for unequal feeds "
+                "ln(CB·CA0/(CA·CB0)) = (CB0 - CA0)·k·t.",
+                f"The temperature dependence follows k = k_ref·exp(-(E/R)·(1/T - 1/T_ref)) with T_ref = {kinetics.T_REF:.2f} K."
+            ])
+
+            # Add observations
+            report.add_observation_table(edited_df)
+
+            # Add calculations
+            report.add_calculations(
+                [
+                    "k_ref and E/R were estimated jointly from all measurements by nonlinear least squares on the "
+                    "integrated rate law, with confidence intervals from the linearized parameter covariance.",
+                    f"Residual standard deviation = {fit.residual_std:.3e} mol/L "
+                    f"({fit.n_observations} measurements, {fit.n_runs} runs)",
+                    f"Correlation between the k_ref and E/R estimates = {fit.correlation:.3f}"
+                ]
+            )
+
+            # Add results
+            report.add_results_table(fit.to_dataframe().round(5), "Kinetic Parameters")
+            report.add_results_table(rate_constants.to_dataframe().round(5), "Rate Constant of Each Run")
+
+            # Add graphs
+            report.document.add_paragraph()
+            report.add_graph(doc_fig1, "Figure 1: Measured and Fitted NaOH Concentration")
+            report.add_graph(doc_fig2, "Figure 2: Arrhenius Plot")
+
+            # Add discussion
+            level = f"{fit.confidence:.0%}"
+            discussion = [
+                f"The rate constant at {kinetics.T_REF - 273.15:.0f} °C is {fit.k_ref:.4f} L/(mol·min) "
+                f"({level} CI {fit.k_ref_ci[0]:.4f} to {fit.k_ref_ci[1]:.4f}).",
+                f"The activation energy is {fit.activation_energy:.1f} kJ/mol "
+                f"({level} CI {fit.activation_energy_ci[0]:.1f} to {fit.activation_energy_ci[1]:.1f} kJ/mol). "
+                "The rate constant increases with temperature as the fraction of molecular collisions with "
+                "sufficient energy to react increases."
+            ]
+            report.add_discussion(discussion)
+
+            # Add conclusion
+            conclusion = [
+                "The saponification of ethyl acetate follows second-order kinetics in the batch reactor.",
+                f"The activation energy of the reaction is {fit.activation_energy:.1f} kJ/mol."
+            ]
+            report.add_conclusion(conclusion)
+
+            # Create download button
+            report.create_downloadable_report()
+
+def app():
+    """Main function to run the batch reactor report generation app"""
+    create_batch_reactor_form()
+
+def main():
+    """Entry point for the batch reactor module when called from main.py"""
+    app()
@@ -10,9 +10,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from .report_generator import ReportGenerator
+from chemengsim import timing
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+@timing.timed('report.classifiers.calculate_separation_efficiency')
 def calculate_separation_efficiency(data, total_coal_mass=30):
     """Calculate separation efficiency for single cone classifier"""
     # Copy original data
@@ -28,6 +30,7 @@ def calculate_separation_efficiency(data, total_coal_mass=30):
     
     return results
 
+@timing.timed('report.classifiers.calculate_thickener_concentration')
 def calculate_thickener_concentration(data, calibration_data):
     """Calculate concentrations for thickener using calibration curve"""
     # Copy original data
@@ -79,6 +82,7 @@ def get_concentration_from_density(density, calibration_data):
     # Ensure non-negative values
     return max(0, concentration)
 
+@timing.timed('report.classifiers.generate_classifier_plots')
 def generate_classifier_plots(results):
     """Generate plots for single cone classifier experiment"""
     # Flow rate vs separation efficiency
@@ -101,6 +105,7 @@ def generate_classifier_plots(results):
     
     return fig
 
+@timing.timed('report.classifiers.generate_thickener_plots')
 def generate_thickener_plots(results):
     """Generate plots for thickener experiment"""
     # Create subplots
@@ -165,6 +170,7 @@ def generate_thickener_plots(results):
     
     return fig
 
+@timing.timed('report.classifiers.generate_matplotlib_plots')
 def generate_matplotlib_plots(results, experiment_type):
     """Generate matplotlib plots for document embedding"""
     if experiment_type == 'classifier':
@@ -10,8 +10,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from .report_generator import ReportGenerator
+from chemengsim import timing
 import plotly.graph_objects as go
 
+@timing.timed('report.froth_flotation.calculate_coal_recovery')
 def calculate_coal_recovery(data):
     """Calculate coal recovery metrics"""
     # Copy original data
@@ -30,6 +32,7 @@ def calculate_coal_recovery(data):
     
     return results
 
+@timing.timed('report.froth_flotation.generate_flotation_plots')
 def generate_flotation_plots(results):
     """Generate plots for flotation experiment"""
     # Convert pine oil values to numeric
@@ -53,6 +56,7 @@ def generate_flotation_plots(results):
     
     return fig
 
+@timing.timed('report.froth_flotation.generate_matplotlib_plot')
 def generate_matplotlib_plot(results):
     """Generate matplotlib plot for document embedding"""
     # Convert pine oil values to numeric
@@ -85,7 +85,10 @@ def main():
     )
     
     # Display appropriate report generator based on selection
-    if experiment == "Rotary Vacuum Filter":
+    if experiment == "Batch Reactor":
+        from chemengsim.report_generation import batch_reactor
+        batch_reactor.main()
+    elif experiment == "Rotary Vacuum Filter":
         from chemengsim.report_generation import rotary_vacuum_filter
         rotary_vacuum_filter.main()
     elif experiment == "Classifiers":
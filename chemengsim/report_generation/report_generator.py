@@ -17,6 +17,7 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 import os
 import datetime
 from . import report_utils
+from chemengsim import timing
 
 class ReportGenerator:
     """Base class for generating experiment reports"""
@@ -90,6 +91,7 @@ class ReportGenerator:
         else:
             self.document.add_paragraph(theory_text)
             
+    @timing.timed('report.add_observation_table')
     def add_observation_table(self, table_data, table_title="Observations"):
         """Add observation data table to the document"""
         self.document.add_heading(table_title, level=1)
@@ -132,6 +134,7 @@ class ReportGenerator:
         else:
             self.document.add_paragraph(calculations_text)
             
+    @timing.timed('report.add_results_table')
     def add_results_table(self, results_data, table_title="Results"):
         """Add results data table to the document"""
         self.document.add_heading(table_title, level=1)
@@ -155,6 +158,7 @@ class ReportGenerator:
         else:
             st.error("Results data must be a pandas DataFrame")
             
+    @timing.timed('report.add_graph')
     def add_graph(self, fig, caption=None, width=6):
         """Add a matplotlib figure to the document"""
         # Save figure to memory
@@ -193,6 +197,7 @@ class ReportGenerator:
         else:
             self.document.add_paragraph(conclusion_text)
             
+    @timing.timed('report.save_document')
     def save_document(self, filename=None):
         """Save the document to a file"""
         if filename is None:
@@ -203,6 +208,7 @@ class ReportGenerator:
         self.document.save(file_path)
         return file_path
         
+    @timing.timed('report.create_downloadable_report')
     def create_downloadable_report(self):
         """Create a downloadable report"""
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -21,6 +21,7 @@ from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import sys
 import shutil
+from chemengsim import timing
 
 # Define paths
 TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
@@ -30,6 +31,7 @@ OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
 os.makedirs(TEMPLATE_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+@timing.timed('report.fig_to_base64')
 def fig_to_base64(fig):
     """Convert a matplotlib figure to base64 encoded image"""
     buf = io.BytesIO()
@@ -38,6 +40,7 @@ def fig_to_base64(fig):
     img_str = base64.b64encode(buf.read()).decode()
     return img_str
 
+@timing.timed('report.create_downloadable_docx')
 def create_downloadable_docx(document, filename):
     """Create a downloadable link for a docx document"""
     # Save document to temp file
@@ -63,6 +66,7 @@ def create_table_dataframe(column_names, num_rows=1):
         df = pd.concat([df, pd.DataFrame([[""] * len(column_names)], columns=column_names)], ignore_index=True)
     return df
 
+@timing.timed('report.insert_plotly_figure')
 def insert_plotly_figure(fig, document, width=6, height=4):
     """Save a plotly figure as image and insert into document"""
     # Save plotly figure as png
@@ -173,6 +177,7 @@ def create_download_link(file_content, file_name, text="Download File"):
     href = f'<a href="data:application/octet-stream;base64,{b64}" download="{file_name}">{text}</a>'
     return href
 
+@timing.timed('report.generate_report_download_link')
 def generate_report_download_link(document, filename=None):
     """
     Generates a download link for a Word document.
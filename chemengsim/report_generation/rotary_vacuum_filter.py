@@ -10,9 +10,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from .report_generator import ReportGenerator
+from chemengsim import timing
 import plotly.graph_objects as go
 from scipy.stats import linregress
 
+@timing.timed('report.rotary_vacuum_filter.calculate_specific_cake_resistance')
 def calculate_specific_cake_resistance(data, vacuum_pressure, area, viscosity):
     """Calculate specific cake resistance and filter medium resistance"""
     # Copy data and ensure numeric values
@@ -44,6 +46,7 @@ def calculate_specific_cake_resistance(data, vacuum_pressure, area, viscosity):
     
     return df, alpha, r_m, slope, intercept
 
+@timing.timed('report.rotary_vacuum_filter.generate_vacuum_filter_plots')
 def generate_vacuum_filter_plots(df):
     """Generate plots for vacuum filter experiment"""
     # Plot: V vs t/V
@@ -78,6 +81,7 @@ def generate_vacuum_filter_plots(df):
     
     return fig, slope, intercept
 
+@timing.timed('report.rotary_vacuum_filter.generate_matplotlib_plot')
 def generate_matplotlib_plot(df, slope, intercept):
     """Generate matplotlib plot for document embedding"""
     fig, ax = plt.subplots(figsize=(8, 5))
@@ -0,0 +1,257 @@
+"""
+Page Soak and Load Tests
+========================
+
+Headless reruns of the experiment pages checking that their figures are released and
+that concurrent sessions render the same images as a serial run.
+
+``python -m chemengsim.soak soak`` reruns every page 1000 times and fails if
+:class:`~matplotlib.figure.Figure` objects outlive the rerun that drew them or the
+resident memory keeps growing.  ``python -m chemengsim.soak load`` reruns the pages
+from concurrent sessions, reporting the throughput per session count and failing if any
+image differs from a serial run.
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import warnings
+from unittest import mock
+
+from matplotlib.figure import Figure
+
+from chemengsim import figures
+
+DEFAULT_RERUNS = 1000
+DEFAULT_WARMUP = 50
+DEFAULT_MAX_GROWTH_MB = 20.0
+DEFAULT_SESSIONS = (1, 2, 4, 8)
+DEFAULT_LOAD_RERUNS = 5
+CHECK_EVERY = 100  # reruns between counts of the live figures
+
+
+def live_figures():
+    """
+    Number of :class:`~matplotlib.figure.Figure` objects still reachable after a full
+    garbage collection, whether or not pyplot manages them
+    """
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def _rss_mb():
+    """Resident set size of the current process (MB)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        # Peak rather than current RSS where /proc is unavailable; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def _page_app(page):
+    from chemengsim.benchmarks import PAGES
+
+    module_name, function = PAGES[page]
+    return getattr(importlib.import_module(module_name), function)
+
+
+def soak(page, reruns=DEFAULT_RERUNS, warmup=DEFAULT_WARMUP, max_growth_mb=DEFAULT_MAX_GROWTH_MB,
+         draw=False, progress=None):
+    """
+    Rerun a page headlessly and check that figures are released.
+
+    The first ``warmup`` reruns fill the import, font and model caches; the resident
+    memory measured after them is the baseline for the remaining reruns.  The live
+    figures are counted after the warm-up, every :data:`CHECK_EVERY` reruns and at the
+    end; any figure surviving a rerun is a leak.
+
+    Parameters:
+    -----------
+    page : str
+        Key of :data:`chemengsim.benchmarks.PAGES`
+    reruns : int
+        Number of reruns after the warm-up
+    warmup : int
+        Number of reruns before the baseline is measured
+    max_growth_mb : float
+        Allowed growth of the resident memory over the baseline (MB)
+    draw : bool
+        Render every figure passed to :func:`chemengsim.figures.show`, exercising the
+        renderer caches
+    progress : callable or None
+        Called with ``(page, rerun)`` every 100 reruns
+
+    Returns:
+    --------
+    dict
+        Baseline and final RSS (MB), growth, most figures found alive and whether the page passed
+    """
+    app = _page_app(page)
+    warmup = max(warmup, 1)
+    leaked = 0
+
+    def show_figure(fig):
+        if draw:
+            figures.render(fig)
+
+    with mock.patch.object(figures, 'show', show_figure):
+        for rerun in range(warmup + reruns):
+            app()
+            if rerun + 1 == warmup:
+                leaked = live_figures()
+                baseline = _rss_mb()
+            elif (rerun + 1) % CHECK_EVERY == 0 or rerun + 1 == warmup + reruns:
+                leaked = max(leaked, live_figures())
+            if progress is not None and (rerun + 1) % CHECK_EVERY == 0:
+                progress(page, rerun + 1)
+    final = _rss_mb()
+    growth = final - baseline
+    return {
+        'reruns': reruns,
+        'baseline_mb': baseline,
+        'final_mb': final,
+        'growth_mb': growth,
+        'live_figures': leaked,
+        'passed': leaked == 0 and growth <= max_growth_mb
+    }
+
+
+def load(pages, sessions=DEFAULT_SESSIONS, reruns=DEFAULT_LOAD_RERUNS):
+    """
+    Rerun pages from concurrent sessions and compare every image with a serial run.
+
+    The PNG cache is disabled so every rerun renders its figures.
+
+    Parameters:
+    -----------
+    pages : list of str
+        Keys of :data:`chemengsim.benchmarks.PAGES`, cycled through by every session
+    sessions : sequence of int
+        Numbers of concurrent sessions to measure
+    reruns : int
+        Reruns per session
+
+    Returns:
+    --------
+    list of dict
+        Per session count: total reruns, elapsed time (s), reruns per second, speedup over
+        one session and the number of images that differ from the serial run
+    """
+    import streamlit as st
+
+    captured = threading.local()
+
+    def capture(png, *args, **kwargs):
+        captured.images.append(png)
+
+    def rerun(page):
+        captured.images = []
+        _page_app(page)()
+        return captured.images
+
+    results = []
+    with mock.patch.object(st, 'image', capture), mock.patch.object(figures.png_cache, 'max_entries', 0):
+        # Serial reference, which also warms the model caches
+        expected = {page: rerun(page) for page in pages}
+
+        def session(index, mismatches):
+            for count in range(reruns):
+                page = pages[(index + count) % len(pages)]
+                if rerun(page) != expected[page]:
+                    mismatches.append(page)
+
+        for count in sessions:
+            mismatches = []
+            threads = [threading.Thread(target=session, args=(index, mismatches)) for index in range(count)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            throughput = count * reruns / elapsed
+            results.append({
+                'sessions': count,
+                'reruns': count * reruns,
+                'elapsed': elapsed,
+                'throughput': throughput,
+                'speedup': throughput / results[0]['throughput'] if results else 1.0,
+                'mismatches': len(mismatches)
+            })
+    return results
+
+
+def _soak_command(args, pages):
+    results = {}
+    for page in pages:
+        result = soak(page, args.reruns, args.warmup, args.max_growth, args.draw,
+                      progress=lambda page, rerun: print(f'  {page}: {rerun} reruns', file=sys.stderr))
+        results[page] = result
+        print(f"{page:24s} {result['baseline_mb']:8.1f} MB -> {result['final_mb']:8.1f} MB "
+              f"({result['growth_mb']:+.1f} MB, {result['live_figures']} live figures) "
+              f"{'ok' if result['passed'] else 'FAILED'}")
+    return results, all(result['passed'] for result in results.values())
+
+
+def _load_command(args, pages):
+    results = load(pages, args.sessions, args.reruns)
+    print(f"{'sessions':>8s} {'reruns':>7s} {'elapsed':>9s} {'reruns/s':>9s} {'speedup':>8s} {'mismatches':>11s}")
+    for result in results:
+        print(f"{result['sessions']:8d} {result['reruns']:7d} {result['elapsed']:8.2f}s "
+              f"{result['throughput']:9.2f} {result['speedup']:7.2f}x {result['mismatches']:11d}")
+    return results, not any(result['mismatches'] for result in results)
+
+
+def main(argv=None):
+    """Command-line soak and load tests of the experiment pages"""
+    from chemengsim.benchmarks import PAGES
+
+    parser = argparse.ArgumentParser(prog='python -m chemengsim.soak',
+                                     description='Soak and load tests of the experiment page figures.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    soak_parser = subparsers.add_parser('soak', help='rerun every page and check for figure leaks')
+    soak_parser.add_argument('--reruns', type=int, default=DEFAULT_RERUNS, help='reruns per page after the warm-up')
+    soak_parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='reruns before the baseline RSS')
+    soak_parser.add_argument('--max-growth', type=float, default=DEFAULT_MAX_GROWTH_MB,
+                             help='allowed RSS growth per page (MB)')
+    soak_parser.add_argument('--draw', action='store_true', help='also render every figure (slower)')
+    soak_parser.set_defaults(handler=_soak_command)
+
+    load_parser = subparsers.add_parser('load', help='rerun the pages from concurrent sessions')
+    load_parser.add_argument('--sessions', type=lambda text: [int(count) for count in text.split(',')],
+                             default=list(DEFAULT_SESSIONS), help='comma-separated session counts (default: 1,2,4,8)')
+    load_parser.add_argument('--reruns', type=int, default=DEFAULT_LOAD_RERUNS, help='reruns per session')
+    load_parser.set_defaults(handler=_load_command)
+
+    for subparser in (soak_parser, load_parser):
+        subparser.add_argument('pages', nargs='*', metavar='PAGE',
+                               help='pages to run (default: all): %s' % ', '.join(PAGES))
+        subparser.add_argument('-o', '--output', help='write the results as JSON')
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.pages) - set(PAGES))
+    if unknown:
+        parser.error('unknown pages: %s' % ', '.join(unknown))
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter('ignore')
+
+    results, passed = args.handler(args, args.pages or list(PAGES))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Span Timing
+===========
+
+Lightweight timing of the hot paths of a script run.
+
+Code marks stages with the :func:`span` context manager or the :func:`timed`
+decorator.  Spans are only recorded between :func:`begin` and :func:`end` on the
+current thread (each Streamlit session reruns its script on its own thread); outside
+a recording both reduce to a thread-local lookup, so instrumentation can stay in
+place permanently.
+
+Span names start with the stage they measure: ``compute.*`` for the models,
+``tabulate.*`` for DataFrame construction, ``render.*`` for figure encoding,
+``export.*`` for downloads and ``report.*`` for the report generators.
+
+Set ``CHEMENGSIM_METRICS_FILE`` to append every recorded run to a JSON lines file for
+offline analysis, and open the app with ``?debug=timing`` to show the timing panel in
+the sidebar.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+METRICS_FILE = os.environ.get('CHEMENGSIM_METRICS_FILE') or None
+
+_local = threading.local()
+_file_lock = threading.Lock()
+
+
+class _NullSpan:
+    """Span returned while nothing is recorded"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'tags', 'records', 'depth', 'start')
+
+    def __init__(self, name, tags, records):
+        self.name = name
+        self.tags = tags
+        self.records = records
+
+    def __enter__(self):
+        self.depth = _local.depth
+        _local.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        end = time.perf_counter()
+        _local.depth -= 1
+        record = {'name': self.name, 'start': self.start - _local.run_start,
+                  'duration': end - self.start, 'depth': self.depth}
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.tags)
+        self.records.append(record)
+        return False
+
+
+@dataclass
+class Run:
+    """Spans recorded between :func:`begin` and :func:`end`"""
+    label: str
+    timestamp: float
+    duration: float
+    spans: list = field(default_factory=list)
+
+    def totals(self):
+        """Call count and total duration (s) per span name, slowest first"""
+        totals = {}
+        for record in self.spans:
+            count, total = totals.get(record['name'], (0, 0.0))
+            totals[record['name']] = (count + 1, total + record['duration'])
+        return sorted(((name, count, total) for name, (count, total) in totals.items()),
+                      key=lambda item: item[2], reverse=True)
+
+    def to_json(self):
+        """One JSON line describing the run"""
+        return json.dumps({'label': self.label, 'timestamp': self.timestamp, 'duration': self.duration,
+                           'pid': os.getpid(), 'spans': sorted(self.spans, key=lambda r: r['start'])})
+
+
+def recording():
+    """Whether spans are being recorded on the current thread"""
+    return getattr(_local, 'records', None) is not None
+
+
+def begin(label):
+    """Start recording spans on the current thread"""
+    _local.records = []
+    _local.depth = 0
+    _local.label = label
+    _local.timestamp = time.time()
+    _local.run_start = time.perf_counter()
+
+
+def end():
+    """
+    Stop recording and return the :class:`Run`, appending it to the metrics file if configured.
+
+    Returns None when no recording was active.
+    """
+    records = getattr(_local, 'records', None)
+    if records is None:
+        return None
+    _local.records = None
+    run = Run(label=_local.label, timestamp=_local.timestamp,
+              duration=time.perf_counter() - _local.run_start, spans=records)
+    if METRICS_FILE:
+        line = run.to_json() + '\n'
+        with _file_lock:
+            with open(METRICS_FILE, 'a', encoding='utf-8') as f:
+                f.write(line)
+    return run
+
+
+def span(name, **tags):
+    """Context manager timing the enclosed block as ``name``, with optional JSON-serializable tags"""
+    records = getattr(_local, 'records', None)
+    if records is None:
+        return _NULL_SPAN
+    return _Span(name, tags, records)
+
+
+def timed(name=None):
+    """
+    Decorator timing every call of a function.
+
+    Can be applied bare (``@timed``), taking the span name from the function's module and
+    qualified name, or with an explicit name (``@timed('report.add_graph')``).
+    """
+    if callable(name):
+        return timed()(name)
+
+    def decorate(func):
+        label = name or '%s.%s' % (func.__module__.replace('chemengsim.', '', 1), func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            records = getattr(_local, 'records', None)
+            if records is None:
+                return func(*args, **kwargs)
+            with _Span(label, {}, records):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def render_panel(run):
+    """Show the spans of a run in a sidebar expander"""
+    import pandas as pd
+    import streamlit as st
+
+    spans = sorted(run.spans, key=lambda record: record['start'])
+    with st.sidebar.expander("⏱ Timing", expanded=True):
+        st.write(f"**Rerun:** {run.duration * 1000:.1f} ms")
+        st.dataframe(pd.DataFrame(
+            [(name, count, total * 1000) for name, count, total in run.totals()],
+            columns=['Span', 'Calls', 'Total (ms)']
+        ), hide_index=True)
+        st.dataframe(pd.DataFrame({
+            'Span': ['  ' * record['depth'] + record['name'] for record in spans],
+            'Start (ms)': [record['start'] * 1000 for record in spans],
+            'Duration (ms)': [record['duration'] * 1000 for record in spans]
+        }), hide_index=True)
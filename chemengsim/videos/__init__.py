@@ -3,9 +3,17 @@ Videos Module
 ===========
 
 This module contains the video demonstration functionality for the Chemical Engineering Lab Simulator.
+
+Submodules are imported on first access so that showing a demo does not import the
+matplotlib animation code of the video generators.
 """
 
-from . import demo_videos
-from . import create_videos
-from . import create_placeholders
-from . import create_simple_videos
\ No newline at end of file
+import importlib
+
+__all__ = ["demo_videos", "create_videos", "create_placeholders", "create_simple_videos"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+from chemengsim import registry
 
 def display_demo_video(experiment_name):
     """Display a demonstration video for the specified experiment
@@ -9,22 +10,9 @@ def display_demo_video(experiment_name):
     """
     st.title(f"Demonstration Video: {experiment_name.replace('_', ' ').title()}")
     
-    # Map experiment names to their titles for display
-    experiment_titles = {
-        "batch_reactor": "Isothermal Batch Reactor",
-        "semi_batch_reactor": "Isothermal Semi-batch Reactor",
-        "cstr": "Isothermal CSTR",
-        "pfr": "Isothermal PFR",
-        "crushers": "Crushers and Ball Mill",
-        "filter_press": "Plate and Frame Filter Press",
-        "rotary_vacuum_filter": "Rotary Vacuum Filter",
-        "centrifuge_flotation": "Centrifuge and Flotation",
-        "classifiers": "Classifiers",
-        "trommel": "Trommel"
-    }
-    
     # Get the title for the current experiment
-    title = experiment_titles.get(experiment_name, experiment_name.replace('_', ' ').title())
+    experiment = registry.by_slug(experiment_name)
+    title = experiment.title if experiment else experiment_name.replace('_', ' ').title()
     
     # Video file path (assuming videos are stored in the videos directory with the same name as the experiment)
     video_file = f"videos/{experiment_name}.mp4"
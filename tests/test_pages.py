@@ -0,0 +1,40 @@
+"""
+Page Smoke Tests
+================
+
+Headless runs of the experiment pages with ``streamlit.testing``, at the default
+sidebar values and at the edges of the sidebar ranges.
+"""
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+
+def semi_batch_page():
+    from chemengsim.experiments import semi_batch_reactor
+
+    semi_batch_reactor.app()
+
+
+def run(page, **inputs):
+    """Run ``page`` with the sidebar number inputs and sliders labelled by ``inputs`` set"""
+    at = AppTest.from_function(page, default_timeout=120)
+    at.run()
+    widgets = {widget.label: widget for widget in (*at.sidebar.number_input, *at.sidebar.slider)}
+    for label, value in inputs.items():
+        widgets[label].set_value(value)
+    at.run()
+    assert not at.exception, [exception.message for exception in at.exception]
+    return at
+
+
+@pytest.mark.parametrize('inputs', [
+    {},
+    {'Initial volume in reactor (L)': 10.0, 'Feed flow rate (L/min)': 1.0, 'Total Reaction Time (minutes)': 120},
+    {'Initial volume in reactor (L)': 0.1, 'Feed flow rate (L/min)': 0.01, 'Total Reaction Time (minutes)': 5},
+    {'Feed flow rate (L/min)': 0.5, 'Total Reaction Time (minutes)': 120},
+])
+def test_semi_batch_sidebar_range(inputs):
+    at = run(semi_batch_page, **inputs)
+    volume_limit = next(widget for widget in at.number_input if widget.label == 'Reactor volume limit (L)')
+    assert volume_limit.value <= volume_limit.max